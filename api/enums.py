@@ -172,6 +172,18 @@ class WingmanProTtsProvider(Enum):
 
 
 # Pydantic models for enums
+class AudioSampleFormat(Enum):
+    PCM16 = "pcm16"
+    FLOAT32 = "float32"
+
+
+class StartupState(Enum):
+    READY = "ready"
+    WARMING = "warming"
+    """Still loading in the background because it took longer than its ready timeout."""
+    FAILED = "failed"
+
+
 class BaseEnumModel(BaseModel):
     class Config:
         # fix pydantic serialization of enums
@@ -264,6 +276,14 @@ class WingmanProTtsProviderModel(BaseEnumModel):
     tts_provider: WingmanProTtsProvider
 
 
+class AudioSampleFormatModel(BaseEnumModel):
+    sample_format: AudioSampleFormat
+
+
+class StartupStateModel(BaseEnumModel):
+    state: StartupState
+
+
 # Add all additional Pydantic models for enums as needed
 
 
@@ -289,6 +309,8 @@ ENUM_TYPES = {
     "WingmanProTtsProvider": WingmanProTtsProviderModel,
     "PerplexityModel": PerplexityModelEnumModel,
     "RecordingDevice": RecordingDeviceModel,
+    "AudioSampleFormat": AudioSampleFormatModel,
+    "StartupState": StartupStateModel,
     # Add new enums here as key-value pairs
 }
 
@@ -2,6 +2,7 @@ from typing import Optional
 from typing_extensions import Annotated, TypedDict
 from pydantic import Base64Str, BaseModel, ConfigDict, Field, model_validator
 from api.enums import (
+    AudioSampleFormat,
     AzureApiVersion,
     AzureRegion,
     ConversationProvider,
@@ -17,6 +18,7 @@ from api.enums import (
     WingmanProSttProvider,
     WingmanProTtsProvider,
     PerplexityModel,
+    StartupState,
 )
 
 
@@ -120,6 +122,10 @@ class FasterWhisperSettings(BaseModel):
     compute_type: str
     """cpu, cuda, auto"""
     device: str
+    workers: Optional[int] = 1
+    """How many transcriptions can run in parallel. The workers share the model weights but each one needs its own CPU threads."""
+    batch_size: Optional[int] = 8
+    """Recordings longer than 30s are split into chunks that are transcribed in batches of this size."""
 
 
 class XVASynthSettings(BaseModel):
@@ -148,6 +154,94 @@ class FasterWhisperSttConfig(BaseModel):
     language_detection_threshold: float
 
 
+class FasterWhisperStats(BaseModel):
+    model_loaded: bool
+    model_load_time_ms: Optional[float] = None
+    workers: int
+    queue_depth: int
+    """Transcriptions waiting for a free worker."""
+    running: int
+    transcriptions: int
+    avg_queue_time_ms: float
+    """Average time a transcription waited for a worker (last 100)."""
+    avg_inference_time_ms: float
+    """Average time the model needed per transcription (last 100)."""
+    max_inference_time_ms: float
+
+
+class RuntimeExecutorStats(BaseModel):
+    name: str
+    max_workers: int
+    active: int
+    """Jobs that are running on a worker right now."""
+    queued: int
+    """Jobs waiting for a free worker."""
+    completed: int
+    event_loops: int
+    """Event loops kept by the workers. Each worker creates at most one and runs it on a thread of its own."""
+
+
+class RuntimeStats(BaseModel):
+    main_loop_tasks: int
+    """Coroutines scheduled on the main loop that haven't finished yet."""
+    threads: int
+    """All threads of the process, including the ones of audio streams and SDKs."""
+    dedicated_threads: int
+    """Lifetime loops running on a thread of their own, e.g. the joystick loop and monitoring loops of skills."""
+    event_loops: int
+    executors: list[RuntimeExecutorStats]
+
+
+class WebSocketClientStats(BaseModel):
+    client: str
+    endpoint: str
+    queued: int
+    """Messages waiting to be sent to this client."""
+    max_queued: int
+    sent: int
+    dropped: int
+    """Droppable messages (e.g. log lines, audio chunks) that didn't fit into the queue."""
+    coalesced: int
+    """State updates that replaced an older one still waiting in the queue."""
+    lag_ms: float
+    """How long the oldest waiting message has been queued."""
+    avg_lag_ms: float
+    """Average time from broadcast to sent (last 100)."""
+    max_lag_ms: float
+
+
+class WebSocketStats(BaseModel):
+    replay_queued: int
+    """Messages broadcast while no client was connected, replayed to the next ready client."""
+    replay_dropped: int
+    clients: list[WebSocketClientStats]
+
+
+class PubSubTopicStats(BaseModel):
+    name: str
+    topic: str
+    delivery: str
+    subscribers: int
+    publishes: int
+    errors: int
+    """Subscribers that raised an exception. They are logged and don't affect the others."""
+    avg_publish_ms: float
+    """Average time from publish to the delivery to all subscribers (without fire-and-forget deliveries)."""
+    max_publish_ms: float
+
+
+class AudioStreamFormat(BaseModel):
+    """The format of a framed audio stream (see services/audio_protocol.py), negotiated with remote devices."""
+
+    sample_format: AudioSampleFormat = AudioSampleFormat.PCM16
+    sample_rate: int = 16000
+    channels: int = 1
+    chunk_size: int = 2048
+    """The maximum payload of an audio frame in bytes."""
+    server_endpointing: bool = False
+    """The server detects the end of an utterance and starts the transcription without waiting for the device to end it."""
+
+
 class WhispercppTranscript(BaseModel):
     text: str
 
@@ -478,6 +572,8 @@ class FeaturesConfig(BaseModel):
     remember_messages: Optional[int] = None
     image_generation_provider: ImageGenerationProvider
     use_generic_instant_responses: bool
+    stream_responses: Optional[bool] = False
+    """Speak the AI response sentence by sentence while it is still being generated. Not supported by Wingman Pro."""
 
 
 class AudioFile(BaseModel):
@@ -677,6 +773,10 @@ class SkillConfig(CustomClassConfig):
     """You can add custom properties here to use in your custom skill class."""
     hint: Optional[LocalizedMetadata] = None
     examples: Optional[list[LocalizedMetadata]] = None
+    max_concurrent_tool_calls: Optional[int] = 1
+    """How many tool calls of this skill may run at the same time if the AI calls several tools at once. Tools of different skills always run in parallel."""
+    tool_call_timeout: Optional[float] = None
+    """Seconds after which a tool call of this skill is cancelled and reported as failed to the AI. No timeout if not set."""
 
 
 class SkillBase(BaseModel):
@@ -816,3 +916,51 @@ class BenchmarkResult(BaseModel):
 
 
 BenchmarkResult.model_rebuild()
+
+
+class SkillStartupTiming(BaseModel):
+    skill_name: str
+    state: StartupState
+    benchmark: Optional[BenchmarkResult] = None
+    """Loading, validation and preparation of the skill. Set once it's ready or failed."""
+
+
+class WingmanStartupTiming(BaseModel):
+    wingman_name: str
+    state: StartupState
+    benchmark: BenchmarkResult
+    """Instantiation, validation, skills and preparation of the Wingman."""
+    skills: list[SkillStartupTiming]
+
+
+class StartupTimings(BaseModel):
+    benchmark: Optional[BenchmarkResult] = None
+    """The whole Tower startup until all Wingmen are ready (warming skills excluded)."""
+    wingmen: list[WingmanStartupTiming]
+
+
+class StartupPhaseTiming(BaseModel):
+    name: str
+    start_ms: float
+    """Since the start of main.py"""
+    duration_ms: float
+
+
+class ImportTiming(BaseModel):
+    module: str
+    start_ms: float
+    """Since the start of main.py"""
+    duration_ms: float
+    """Including the modules it imported"""
+    self_ms: float
+    """Without the modules it imported"""
+    thread: str
+
+
+class StartupTimelineResult(BaseModel):
+    time_to_first_connect_ms: Optional[float] = None
+    """From the start of main.py to the first websocket connection of a client. None if no client connected yet."""
+    first_connect_budget_ms: float
+    phases: list[StartupPhaseTiming]
+    imports: list[ImportTiming]
+    """The slowest imports until the first client connected, by their own time. Only timed with --startup-timeline"""
@@ -0,0 +1,154 @@
+"""Benchmark of the push-to-talk capture callback: growing the recording with numpy.concatenate vs. the preallocated AudioRingBuffer.
+
+Feeds simulated sounddevice callbacks for recordings of different lengths and reports the time per callback
+and the memory allocated while recording (via tracemalloc).
+
+Usage (from the repository root):
+    python -m benchmarks.audio_capture --durations 5 30 120 --blocksize 256
+"""
+
+import argparse
+import time
+import tracemalloc
+import numpy
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.printr import Printr
+from services.ring_buffer import AudioRingBuffer
+
+printr = Printr()
+
+
+class ConcatenateCapture:
+    """The previous implementation of AudioRecorder: the whole recording is copied on every callback."""
+
+    def __init__(self, _capacity: int, _channels: int):
+        self.recording_data = None
+
+    def write(self, indata: numpy.ndarray):
+        if self.recording_data is None:
+            self.recording_data = indata.copy()
+        else:
+            self.recording_data = numpy.concatenate((self.recording_data, indata))
+
+    def read(self) -> numpy.ndarray:
+        return self.recording_data
+
+
+class RingBufferCapture:
+    def __init__(self, capacity: int, channels: int):
+        self.buffer = AudioRingBuffer(capacity=capacity, channels=channels)
+
+    def write(self, indata: numpy.ndarray):
+        self.buffer.write(indata)
+
+    def read(self) -> numpy.ndarray:
+        return self.buffer.read()
+
+
+CAPTURES = {"concatenate": ConcatenateCapture, "ring buffer": RingBufferCapture}
+
+
+def record(
+    capture_type,
+    duration: float,
+    samplerate: int,
+    channels: int,
+    blocksize: int,
+    max_duration: float,
+    stats: LatencyStats = None,
+    label: str = "",
+) -> numpy.ndarray:
+    """Simulates one recording. The ring buffer is created up front, just like AudioRecorder does on startup."""
+    capture = capture_type(int(max_duration * samplerate), channels)
+    indata = numpy.random.default_rng(0).uniform(
+        -0.1, 0.1, (blocksize, channels)
+    ).astype(numpy.float32)
+    callbacks = int(duration * samplerate / blocksize)
+
+    for _ in range(callbacks):
+        start_time = time.perf_counter()
+        capture.write(indata)
+        if stats:
+            stats.add(label, (time.perf_counter() - start_time) * 1000)
+    return capture.read()
+
+
+def measure_allocations(
+    capture_type,
+    duration: float,
+    samplerate: int,
+    channels: int,
+    blocksize: int,
+    max_duration: float,
+) -> tuple[float, float]:
+    """Returns the peak and the remaining memory (in MB) allocated while recording, without the preallocation."""
+    tracemalloc.start()
+    try:
+        capture = capture_type(int(max_duration * samplerate), channels)
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        indata = numpy.zeros((blocksize, channels), dtype=numpy.float32)
+        for _ in range(int(duration * samplerate / blocksize)):
+            capture.write(indata)
+        current, peak = tracemalloc.get_traced_memory()
+        del capture
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / 1024**2, (current - baseline) / 1024**2
+
+
+def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    allocations: list[str] = []
+    options = {
+        "samplerate": args.samplerate,
+        "channels": args.channels,
+        "blocksize": args.blocksize,
+        "max_duration": max(args.durations),
+    }
+
+    for duration in args.durations:
+        results = {}
+        for name, capture_type in CAPTURES.items():
+            if name not in args.capture:
+                continue
+            label = f"[{duration:g}s] {name} callback"
+            start_time = time.perf_counter()
+            results[name] = record(
+                capture_type, duration, stats=stats, label=label, **options
+            )
+            total_ms = (time.perf_counter() - start_time) * 1000
+            peak_mb, current_mb = measure_allocations(capture_type, duration, **options)
+            allocations.append(
+                f"[{duration:g}s] {name}: total {total_ms:.1f}ms, peak allocated {peak_mb:.2f}MB, still allocated {current_mb:.2f}MB"
+            )
+        if len(results) > 1:
+            first, *others = results.values()
+            if any(not numpy.array_equal(first, other) for other in others):
+                raise RuntimeError(f"The {duration}s recordings differ.")
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(allocations), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 30, 120])
+    parser.add_argument("--samplerate", type=int, default=16000)
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument(
+        "--blocksize",
+        type=int,
+        default=256,
+        help="Frames per simulated sounddevice callback.",
+    )
+    parser.add_argument(
+        "--capture",
+        action="append",
+        choices=list(CAPTURES),
+        help="Only run these implementations (repeatable). Default: all",
+    )
+    args = parser.parse_args()
+    args.capture = args.capture or list(CAPTURES)
+    main(args)
@@ -0,0 +1,143 @@
+"""Per-playback post-processing latency of AudioPlayer.play_with_effects, before and after the effects asset cache.
+
+The previous path read every beep and noise layer from disk on each playback, resampled it with an FFT
+(scipy.signal.resample) to the rate of the TTS audio and looped over one Pedalboard per effect. Now assets are
+decoded and resampled once per (file, sample rate, channels) and every effect set is one cached Pedalboard chain.
+
+Usage (from the repository root):
+    python -m benchmarks.audio_effects --iterations 20 --duration 5 --sample-rate 24000
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample
+from api.enums import LogType, SoundEffect
+from api.interface import SoundConfig
+from benchmarks.fake_providers import NullAudioPlayer
+from benchmarks.stats import LatencyStats
+from services.printr import Printr
+from services.sound_effects import (
+    EFFECTS,
+    get_additional_layer_file,
+)
+
+printr = Printr()
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "audio_samples")
+
+EFFECT_SETS = {
+    "AI": [SoundEffect.AI],
+    "low quality radio": [SoundEffect.LOW_QUALITY_RADIO],
+    "medium quality radio": [SoundEffect.MEDIUM_QUALITY_RADIO],
+    "high end radio": [SoundEffect.HIGH_END_RADIO],
+    "interior + medium radio": [
+        SoundEffect.INTERIOR_MEDIUM,
+        SoundEffect.MEDIUM_QUALITY_RADIO,
+    ],
+}
+
+
+class LegacyEffects:
+    """A replica of the previous post-processing of AudioPlayer.play_with_effects."""
+
+    def get_sound_effects(self, config: SoundConfig):
+        # the mapping was rebuilt on every call
+        mapping = dict(EFFECTS)
+        return [
+            mapping[effect.value] for effect in config.effects if effect.value in mapping
+        ]
+
+    def read(self, file_name: str, sample_rate: int):
+        audio, file_sample_rate = sf.read(
+            os.path.join(SAMPLES_DIR, file_name), dtype="float32"
+        )
+        if file_sample_rate != sample_rate:
+            audio = resample(
+                audio, int(round(audio.shape[0] * sample_rate / file_sample_rate))
+            )
+        return audio
+
+    def add_wav_effect(self, audio, sample_rate, file_name):
+        beep_audio = self.read(file_name, sample_rate)
+        if beep_audio.ndim == 1 and audio.ndim == 2:
+            beep_audio = np.tile(beep_audio[:, np.newaxis], (1, audio.shape[1]))
+        if beep_audio.ndim == 2 and audio.ndim == 1:
+            audio = audio[:, np.newaxis]
+        return np.concatenate((beep_audio, audio, beep_audio), axis=0)
+
+    def mix_in_layer(self, audio, sample_rate, file_name, gain_boost_db):
+        noise_audio = self.read(file_name, sample_rate)
+        if noise_audio.ndim == 1:
+            noise_audio = noise_audio[:, None]
+        if audio.ndim == 1:
+            audio = audio[:, None]
+        if noise_audio.shape[1] != audio.shape[1]:
+            noise_audio = np.tile(noise_audio, (1, audio.shape[1]))
+        if len(noise_audio) < len(audio):
+            repeat_count = int(np.ceil(len(audio) / len(noise_audio)))
+            noise_audio = np.tile(noise_audio, (repeat_count, 1))[: len(audio)]
+        noise_audio = noise_audio[: len(audio)]
+        return audio + 10 ** (gain_boost_db / 20) * noise_audio
+
+    def apply_effects(self, audio, sample_rate, config: SoundConfig):
+        for sound_effect in self.get_sound_effects(config):
+            audio = sound_effect(audio, sample_rate)
+
+        mixed_layer_file = None
+        for effect in config.effects:
+            if not mixed_layer_file:
+                mixed_layer_file = get_additional_layer_file(effect)
+        if mixed_layer_file:
+            audio = self.mix_in_layer(audio, sample_rate, mixed_layer_file, -9.0)
+
+        if SoundEffect.HIGH_END_RADIO in config.effects:
+            audio = self.add_wav_effect(audio, sample_rate, "Radio_Static_Beep.wav")
+        if config.play_beep:
+            audio = self.add_wav_effect(audio, sample_rate, "beep.wav")
+        return audio
+
+
+def create_speech(duration: float, sample_rate: int) -> np.ndarray:
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    audio = 0.3 * np.sin(2 * np.pi * 180 * t) * np.sin(2 * np.pi * 3 * t)
+    return audio.astype(np.float32)
+
+
+def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    legacy = LegacyEffects()
+    player = NullAudioPlayer()
+    audio = create_speech(args.duration, args.sample_rate)
+
+    for name, effects in EFFECT_SETS.items():
+        config = SoundConfig(
+            play_beep=True, play_beep_apollo=False, effects=effects, volume=1.0
+        )
+        for _ in range(args.iterations):
+            start_time = time.perf_counter()
+            legacy.apply_effects(audio.copy(), args.sample_rate, config)
+            stats.add(f"[before] {name}", (time.perf_counter() - start_time) * 1000)
+
+            start_time = time.perf_counter()
+            player.apply_effects(audio.copy(), args.sample_rate, config)
+            stats.add(f"[after] {name}", (time.perf_counter() - start_time) * 1000)
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--duration", type=float, default=5.0, help="Length of the TTS audio in seconds."
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=24000,
+        help="Sample rate of the TTS audio. The samples in audio_samples/ are resampled to it.",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,291 @@
+"""Throughput and end-to-end lag of the remote audio protocols over a loopback connection, raw vs. framed.
+
+A simulated device and server talk over a local TCP connection. Every message is length-prefixed like a websocket
+message. Three scenarios are measured:
+
+- Uplink: the device streams PCM as fast as it can. The server collects the utterance and hands it over to the STT.
+  Raw: a bytearray, copied into bytes at the end. Framed: decode_frame and the AudioReceiveBuffer.
+- Endpointing: the device streams a phrase in real time and ends the utterance after its own silence timeout.
+  With server_endpointing, the transcription starts once the VoiceActivityDetector of the server hears the pause.
+- Downlink: TTS is produced faster than real time and sent over a link slower than that. Raw: an unbounded queue
+  (like the previous Esp32Handler). Framed: at most MAX_DOWNLINK_LAG seconds of audio are queued.
+
+Usage (from the repository root):
+    python -m benchmarks.audio_protocol --seconds 10 --chunk-size 2048
+"""
+
+import argparse
+import asyncio
+import time
+import numpy
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from benchmarks.voice_activity import synthesize_phrase
+from services.audio_input import AudioInput
+from services.audio_protocol import (
+    MAX_DOWNLINK_LAG,
+    AudioFramer,
+    AudioReceiveBuffer,
+    FrameType,
+    decode_frame,
+    negotiate,
+    timestamp_us,
+    to_mono_float32,
+    to_samples,
+)
+from services.printr import Printr
+from services.voice_activity_detector import VoiceActivityDetector
+
+printr = Printr()
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+DEVICE_END_SILENCE = 1.0
+"""How long the device waits after the speech before it ends the utterance."""
+
+
+async def send_message(writer: asyncio.StreamWriter, payload: bytes):
+    writer.write(len(payload).to_bytes(4, "little") + payload)
+    await writer.drain()
+
+
+async def receive_message(reader: asyncio.StreamReader) -> bytes:
+    size = int.from_bytes(await reader.readexactly(4), "little")
+    return await reader.readexactly(size)
+
+
+async def connect(handle) -> tuple[asyncio.StreamWriter, asyncio.AbstractServer]:
+    """Starts a server that runs handle(reader) for the connection and returns the writer of the device."""
+    server = await asyncio.start_server(
+        lambda reader, writer: handle(reader), host="127.0.0.1", port=0
+    )
+    port = server.sockets[0].getsockname()[1]
+    _reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    return writer, server
+
+
+async def uplink(framed: bool, args: argparse.Namespace, stats: LatencyStats) -> str:
+    mode = "framed" if framed else "raw"
+    audio_format = negotiate({"chunk_size": args.chunk_size})
+    pcm = numpy.random.default_rng(0).integers(
+        -8000, 8000, int(args.seconds * SAMPLE_RATE), dtype="<i2"
+    )
+    data = pcm.tobytes()
+    done = asyncio.get_running_loop().create_future()
+
+    async def server(reader: asyncio.StreamReader):
+        buffer = AudioReceiveBuffer() if framed else bytearray()
+        while True:
+            message = await receive_message(reader)
+            if framed:
+                frame_type, sequence, _timestamp, payload = decode_frame(message)
+                if frame_type == FrameType.END:
+                    break
+                buffer.append(payload, sequence)
+            elif not message:
+                break
+            else:
+                buffer += message
+        end_received = time.perf_counter()
+        if framed:
+            audio_input = AudioInput(
+                samples=to_samples(buffer.take(), audio_format),
+                sample_rate=SAMPLE_RATE,
+            )
+        else:
+            audio_input = AudioInput.from_pcm16(bytes(buffer), sample_rate=SAMPLE_RATE)
+        done.set_result((end_received, audio_input))
+
+    writer, server_handle = await connect(server)
+    framer = AudioFramer(audio_format)
+    start_time = time.perf_counter()
+    if framed:
+        for frame in framer.frames(data):
+            await send_message(writer, frame)
+        await send_message(writer, framer.end())
+    else:
+        for start in range(0, len(data), args.chunk_size):
+            await send_message(writer, data[start : start + args.chunk_size])
+        await send_message(writer, b"")
+    end_received, audio_input = await done
+    handed_over = time.perf_counter()
+    writer.close()
+    server_handle.close()
+
+    stats.add(f"[{mode}] Uplink hand-off to STT", (handed_over - end_received) * 1000)
+    seconds = handed_over - start_time
+    return (
+        f"[{mode}] uplink: {len(data) / seconds / 1024 / 1024:.1f} MB/s "
+        f"({audio_input.duration:.0f}s of audio in {seconds * 1000:.0f}ms)"
+    )
+
+
+async def endpointing(framed: bool, phrase: numpy.ndarray, stats: LatencyStats):
+    mode = "framed" if framed else "raw"
+    audio_format = negotiate({"server_endpointing": framed})
+    pcm = (
+        numpy.concatenate((phrase, numpy.zeros(int(DEVICE_END_SILENCE * SAMPLE_RATE))))
+        * 32767
+    ).astype("<i2")
+    triggered = asyncio.get_running_loop().create_future()
+
+    async def server(reader: asyncio.StreamReader):
+        vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE)
+        while not triggered.done():
+            message = await receive_message(reader)
+            if not framed:
+                if not message:
+                    triggered.set_result(time.perf_counter())
+                continue
+            frame_type, _sequence, _timestamp, payload = decode_frame(message)
+            if frame_type == FrameType.END:
+                triggered.set_result(time.perf_counter())
+            elif frame_type == FrameType.AUDIO:
+                samples = to_mono_float32(to_samples(payload, audio_format))
+                if vad.process(samples):
+                    triggered.set_result(time.perf_counter())
+
+    writer, server_handle = await connect(server)
+    framer = AudioFramer(audio_format)
+    data = pcm.tobytes()
+    chunk_size = audio_format.chunk_size
+    start_time = time.perf_counter()
+    speech_ended = start_time + len(phrase) / SAMPLE_RATE
+    for start in range(0, len(data), chunk_size):
+        # the device sends in real time
+        delay = start_time + start / BYTES_PER_SECOND - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        chunk = data[start : start + chunk_size]
+        if framed:
+            for frame in framer.frames(chunk):
+                await send_message(writer, frame)
+        else:
+            await send_message(writer, chunk)
+        if triggered.done():
+            break
+    if not triggered.done():
+        await send_message(writer, framer.end() if framed else b"")
+    trigger_time = await triggered
+    writer.close()
+    server_handle.close()
+    stats.add(
+        f"[{mode}] End of speech to STT start", (trigger_time - speech_ended) * 1000
+    )
+
+
+async def downlink(framed: bool, args: argparse.Namespace, stats: LatencyStats) -> str:
+    mode = "framed" if framed else "raw"
+    audio_format = negotiate({"chunk_size": args.chunk_size})
+    link_bytes_per_second = BYTES_PER_SECOND * args.link_speed
+    max_queued = MAX_DOWNLINK_LAG * BYTES_PER_SECOND
+    to_device: asyncio.Queue = asyncio.Queue()
+    queued = 0
+    dropped = 0
+    received = 0
+    produced_at: list[int] = []
+    done = asyncio.get_running_loop().create_future()
+
+    async def device(reader: asyncio.StreamReader):
+        nonlocal received
+        while True:
+            message = await receive_message(reader)
+            if framed:
+                frame_type, _sequence, timestamp, payload = decode_frame(message)
+                if frame_type == FrameType.END:
+                    break
+                received += len(payload)
+            else:
+                if not message:
+                    break
+                timestamp = produced_at[received // args.chunk_size]
+                received += len(message)
+            stats.add(f"[{mode}] Downlink lag", (timestamp_us() - timestamp) / 1000)
+        done.set_result(time.perf_counter())
+
+    writer, server_handle = await connect(device)
+
+    async def send_messages():
+        nonlocal queued
+        while True:
+            message = await to_device.get()
+            # the link to the device is slower than the TTS
+            await asyncio.sleep(len(message) / link_bytes_per_second)
+            await send_message(writer, message)
+            queued = max(queued - len(message), 0)
+            if not message or message == end_frame:
+                return
+
+    framer = AudioFramer(audio_format)
+    end_frame = framer.end() if framed else b""
+    sender = asyncio.create_task(send_messages())
+    pcm = numpy.zeros(int(args.seconds * SAMPLE_RATE), dtype="<i2").tobytes()
+    start_time = time.perf_counter()
+    for start in range(0, len(pcm), args.chunk_size):
+        delay = (
+            start_time
+            + start / BYTES_PER_SECOND / args.tts_speed
+            - time.perf_counter()
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+        chunk = pcm[start : start + args.chunk_size]
+        messages = framer.frames(chunk) if framed else (chunk,)
+        for message in messages:
+            if framed and queued >= max_queued:
+                dropped += 1
+                continue
+            if not framed:
+                produced_at.append(timestamp_us())
+            queued += len(message)
+            await to_device.put(message)
+    await to_device.put(end_frame)
+    await sender
+    finished = await done
+    writer.close()
+    server_handle.close()
+    return (
+        f"[{mode}] downlink: {received / 1024:.0f} KB received in "
+        f"{finished - start_time:.1f}s, {dropped} frames dropped"
+    )
+
+
+async def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    lines = []
+    rng = numpy.random.default_rng(args.seed)
+    phrases = [synthesize_phrase(rng, amplitude=0.3) for _ in range(args.phrases)]
+    for framed in (False, True):
+        lines.append(await uplink(framed, args, stats))
+        for phrase in phrases:
+            await endpointing(framed, phrase, stats)
+        lines.append(await downlink(framed, args, stats))
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--seconds", type=float, default=10.0, help="Length of the streamed audio."
+    )
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument(
+        "--phrases", type=int, default=5, help="Phrases streamed in real time."
+    )
+    parser.add_argument(
+        "--tts-speed",
+        type=float,
+        default=4.0,
+        help="How much faster than real time the TTS produces audio.",
+    )
+    parser.add_argument(
+        "--link-speed",
+        type=float,
+        default=1.5,
+        help="The bandwidth of the link to the device relative to real time audio.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,208 @@
+"""Callback jitter, underruns and allocations of the streaming playback, bytearray buffer vs. StreamingPlayback.
+
+A simulated device thread calls the stream callback once per block, like sounddevice does, while a producer
+delivers int16 PCM in the chunk sizes and at the pace of the streaming TTS providers:
+
+- Azure: the Speech SDK AudioDataStream is read in 2048 byte chunks, much faster than real time.
+- Wingman Pro: HTTP chunks of varying (odd) sizes with network jitter and the occasional stall.
+- ElevenLabs: larger chunks at about real time pace.
+
+The previous engine appended to a bytearray, resliced it in the callback and mixed and converted the block there.
+
+Usage (from the repository root):
+    python -m benchmarks.audio_stream --duration 10 --block-frames 512
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from threading import Thread
+import numpy as np
+import sounddevice as sd
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.audio_stream import StreamingPlayback
+from services.printr import Printr
+
+printr = Printr()
+
+SAMPLE_RATE = 16000
+DTYPE = "int16"
+BYTES_PER_SAMPLE = 2
+
+# (first byte latency, speed relative to real time, chunk size range in bytes, stall probability)
+PROVIDERS = {
+    "Azure": (0.3, 4.0, (2048, 2048), 0.0),
+    "Wingman Pro": (0.4, 2.0, (1, 2048), 0.02),
+    "ElevenLabs": (0.5, 1.2, (4096, 16384), 0.0),
+}
+
+
+class BytearrayPlayback:
+    """A replica of the previous stream_with_effects callback (without the mixed-in layer)."""
+
+    def __init__(self, volume: float = 1.0):
+        self.buffer = bytearray()
+        self.volume = volume
+        self.started = False
+        self.data_received = False
+        self.stream_finished = False
+        self.underruns = 0
+
+    def callback(self, outdata, frames, time, status):
+        if self.data_received and len(self.buffer) == 0:
+            self.stream_finished = True
+            outdata[:] = bytes(len(outdata))
+            return
+
+        if len(self.buffer) > 0:
+            num_elements = frames
+            data_chunk = np.frombuffer(
+                self.buffer[: num_elements * BYTES_PER_SAMPLE], dtype=DTYPE
+            ).astype(np.float32)
+            if len(data_chunk) < num_elements and not self.data_received:
+                self.underruns += 1
+            if len(data_chunk) < num_elements:
+                data_chunk = np.pad(
+                    data_chunk, (0, num_elements - len(data_chunk)), "constant"
+                )
+            data_chunk = data_chunk.flatten() * self.volume
+            data_chunk_bytes = data_chunk.astype(DTYPE).tobytes()
+            outdata[: len(data_chunk_bytes)] = data_chunk_bytes[: len(outdata)]
+            self.buffer = self.buffer[num_elements * BYTES_PER_SAMPLE :]
+        elif self.started:
+            self.underruns += 1
+
+    async def write(self, samples: np.ndarray) -> bool:
+        self.started = True
+        self.buffer.extend(samples.tobytes())
+        return True
+
+    def finish(self):
+        self.data_received = True
+
+    @property
+    def is_finished(self) -> bool:
+        return self.stream_finished
+
+
+class RingBufferPlayback(StreamingPlayback):
+    @property
+    def is_finished(self) -> bool:
+        return self.finished.is_set()
+
+
+def drive(playback, block_frames: int, trace: bool, result: dict):
+    """Calls the callback on a fixed schedule, like the audio device would."""
+    period = block_frames / SAMPLE_RATE
+    outdata = bytearray(block_frames * BYTES_PER_SAMPLE)
+    durations, intervals = [], []
+    allocated = 0
+    allocations = 0
+    next_time = time.perf_counter()
+    last_start = None
+    started_at = next_time
+    while not playback.is_finished:
+        next_time += period
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        start = time.perf_counter()
+        if last_start is not None:
+            intervals.append(start - last_start)
+        last_start = start
+        if trace:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        try:
+            playback.callback(outdata, block_frames, None, None)
+        except sd.CallbackStop:
+            playback.on_finished()
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - before
+            allocations += 1 if peak > before else 0
+        durations.append(time.perf_counter() - start)
+    result["durations"] = durations
+    result["intervals"] = intervals
+    result["allocated"] = allocated
+    result["allocations"] = allocations
+    result["seconds"] = time.perf_counter() - started_at
+
+
+async def produce(playback, provider: str, duration: float, rng: random.Random):
+    first_byte, speed, (min_size, max_size), stall = PROVIDERS[provider]
+    pcm = (
+        np.sin(2 * np.pi * 220 * np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE)
+        * 8000
+    ).astype(DTYPE)
+    data = pcm.tobytes()
+    await asyncio.sleep(first_byte)
+    position = 0
+    incomplete = b""
+    while position < len(data):
+        size = rng.randint(min_size, max_size)
+        chunk = incomplete + data[position : position + size]
+        position += size
+        # like the providers, only whole samples are passed on
+        remainder = len(chunk) % BYTES_PER_SAMPLE
+        incomplete = chunk[len(chunk) - remainder :]
+        chunk = chunk[: len(chunk) - remainder]
+        await asyncio.sleep(size / BYTES_PER_SAMPLE / SAMPLE_RATE / speed)
+        if rng.random() < stall:
+            await asyncio.sleep(0.25)
+        await playback.write(np.frombuffer(chunk, dtype=DTYPE))
+    playback.finish()
+
+
+def run(engine: str, provider: str, args: argparse.Namespace, trace: bool) -> dict:
+    playback = (
+        BytearrayPlayback()
+        if engine == "bytearray"
+        else RingBufferPlayback(sample_rate=SAMPLE_RATE, dtype=DTYPE)
+    )
+    result = {}
+    device = Thread(target=drive, args=(playback, args.block_frames, trace, result))
+    device.start()
+    asyncio.run(produce(playback, provider, args.duration, random.Random(args.seed)))
+    device.join()
+    result["underruns"] = playback.underruns
+    return result
+
+
+def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    period_ms = args.block_frames / SAMPLE_RATE * 1000
+    lines = []
+    for provider in PROVIDERS:
+        for engine in ("bytearray", "ring buffer"):
+            label = f"[{engine}] {provider}"
+            result = run(engine, provider, args, trace=False)
+            for duration in result["durations"]:
+                stats.add(f"{label} callback", duration * 1000)
+            for interval in result["intervals"]:
+                stats.add(f"{label} jitter", abs(interval * 1000 - period_ms))
+
+            tracemalloc.start()
+            traced = run(engine, provider, args, trace=True)
+            tracemalloc.stop()
+            lines.append(
+                f"{label}: {result['underruns']} underruns, "
+                f"{traced['allocations'] / traced['seconds']:.1f} allocating callbacks/s, "
+                f"{traced['allocated'] / traced['seconds'] / 1024:.1f} KB/s allocated"
+            )
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Length of the streamed audio."
+    )
+    parser.add_argument("--block-frames", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
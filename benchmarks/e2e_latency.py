@@ -0,0 +1,283 @@
+"""End-to-end latency benchmark of the Wingman pipeline (transcribe → LLM/tools → TTS → playback) without network access.
+
+Usage (from the repository root):
+    python -m benchmarks.e2e_latency --iterations 20 --token-delay 0.02
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import time
+import yaml
+from api.enums import LogType
+from api.interface import Config, SettingsConfig, WingmanConfig
+from benchmarks.fake_providers import (
+    FakeProviderServer,
+    NullAudioPlayer,
+    ScriptedResponse,
+    ScriptedSession,
+    ScriptedToolCall,
+    ScriptedTurn,
+)
+from benchmarks.stats import LatencyStats
+from providers.whispercpp import Whispercpp
+from services.audio_input import AudioInput
+from services.printr import Printr
+from services.tower import Tower
+from wingmen.wingman import Wingman
+
+printr = Printr()
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "templates", "configs")
+WINGMAN_NAME = "Benchmark"
+
+SESSIONS = [
+    ScriptedSession(
+        name="chat",
+        turns=[
+            ScriptedTurn(
+                transcript="Benchmark, what is the status of the ship?",
+                responses=[
+                    ScriptedResponse(
+                        content="All systems are nominal. Shields are at full strength and the quantum drive is ready. Fuel is at eighty percent."
+                    )
+                ],
+            ),
+        ],
+    ),
+    ScriptedSession(
+        name="command",
+        turns=[
+            ScriptedTurn(
+                transcript="Benchmark, deploy the landing gear.",
+                responses=[
+                    ScriptedResponse(
+                        tool_calls=[
+                            ScriptedToolCall(
+                                name="execute_command",
+                                arguments={"command_name": "DeployLandingGear"},
+                            )
+                        ]
+                    ),
+                    ScriptedResponse(content="Landing gear is down."),
+                ],
+            ),
+        ],
+    ),
+    ScriptedSession(
+        name="streamed chat",
+        stream_responses=True,
+        turns=[
+            ScriptedTurn(
+                transcript="Benchmark, tell me about our destination.",
+                responses=[
+                    ScriptedResponse(
+                        content="We are heading to Port Olisar. It orbits Crusader and is a popular trading hub. Expect heavy traffic on approach, so keep your speed low. I will request landing clearance once we are in range."
+                    )
+                ],
+            ),
+        ],
+    ),
+]
+
+
+class BenchmarkCollector:
+    """Stands in for the ConnectionManager and collects the Benchmark results that Printr would send to the client."""
+
+    def __init__(self, stats: LatencyStats):
+        self.stats = stats
+        self.prefix = ""
+        """Prepended to the labels, e.g. the name of the running session."""
+
+    async def broadcast(self, command):
+        benchmark_result = getattr(command, "benchmark_result", None)
+        if benchmark_result:
+            self.stats.add_benchmark_result(benchmark_result, prefix=self.prefix)
+
+
+def deep_merge(source: dict, updates: dict) -> dict:
+    merged = copy.deepcopy(source)
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def read_yaml(file_name: str) -> dict:
+    with open(os.path.join(TEMPLATES_DIR, file_name), "r", encoding="UTF-8") as file:
+        return yaml.safe_load(file)
+
+
+def create_settings(server: FakeProviderServer) -> SettingsConfig:
+    settings = read_yaml("settings.yaml")
+    settings["voice_activation"]["whispercpp"] = {
+        "host": f"http://{server.host}",
+        "port": server.port,
+        "enable": True,
+    }
+    return SettingsConfig(**settings)
+
+
+def create_config(server: FakeProviderServer, session: ScriptedSession) -> Config:
+    defaults = read_yaml("defaults.yaml")
+    wingman = deep_merge(
+        {key: value for key, value in defaults.items() if key != "commands"},
+        {
+            "name": WINGMAN_NAME,
+            "description": "Offline benchmark wingman",
+            "prompts": {"backstory": "You are a helpful ship computer."},
+            "features": {
+                "conversation_provider": "local_llm",
+                "stt_provider": "whispercpp",
+                "tts_provider": "openai_compatible",
+                "use_generic_instant_responses": False,
+                "stream_responses": session.stream_responses,
+            },
+            "local_llm": {
+                "endpoint": f"{server.base_url}/v1",
+                "conversation_model": "fake-model",
+            },
+            "openai_compatible_tts": {
+                "base_url": f"{server.base_url}/v1",
+                "api_key": "not-needed",
+                "voice": "fake-voice",
+                "model": "fake-tts",
+            },
+            "commands": (defaults.get("commands") or [])
+            + [{"name": "DeployLandingGear", "actions": []}],
+        },
+    )
+    return Config(**defaults, wingmen={WINGMAN_NAME: WingmanConfig(**wingman)})
+
+
+def create_silence(server: FakeProviderServer) -> AudioInput:
+    """The fake STT ignores the audio, but the providers need something to upload."""
+    return AudioInput(encoded=server.to_wav(bytes(server.sample_rate * 2)))
+
+
+async def wait_for_playback(audio_player: NullAudioPlayer, idle_time: float = 0.2):
+    """Streamed sentences are spoken in the background, so wait until the player stays idle for a moment."""
+    idle_since = time.perf_counter()
+    while time.perf_counter() - idle_since < idle_time:
+        if audio_player.is_playing:
+            idle_since = time.perf_counter()
+        await asyncio.sleep(0.01)
+
+
+async def run_session(
+    session: ScriptedSession,
+    server: FakeProviderServer,
+    settings: SettingsConfig,
+    recording: AudioInput,
+    iterations: int,
+    playback_speed: float,
+    collector: BenchmarkCollector,
+):
+    stats = collector.stats
+    collector.prefix = f"[{session.name}] "
+    audio_player = NullAudioPlayer(playback_speed=playback_speed)
+    tower = Tower(
+        config=create_config(server, session),
+        config_dir=None,
+        config_manager=None,
+        audio_player=audio_player,
+        audio_library=None,
+        whispercpp=Whispercpp(settings=settings.voice_activation.whispercpp),
+        fasterwhisper=None,
+        xvasynth=None,
+    )
+    errors = await tower.instantiate_wingmen(settings)
+    for error in errors:
+        printr.print(error.message, color=LogType.ERROR, server_only=True)
+
+    first_audio_time: float = None
+
+    def on_playback_started():
+        nonlocal first_audio_time
+        if first_audio_time is None:
+            first_audio_time = time.perf_counter()
+
+    audio_player.playback_events.subscribe("started", on_playback_started)
+
+    for _iteration in range(iterations):
+        for turn in session.turns:
+            wingman: Wingman = tower.get_wingman_from_text(turn.transcript)
+            if not wingman:
+                raise RuntimeError(f"Wingman '{WINGMAN_NAME}' could not be loaded.")
+            wingman.reset_conversation_history()
+
+            server.next_transcript = turn.transcript
+            first_audio_time = None
+            start_time = time.perf_counter()
+            await wingman.process(audio_input=recording)
+            process_time = time.perf_counter()
+            await wait_for_playback(audio_player)
+            # the benchmark results reach the collector through the Printr pipeline
+            printr.flush()
+
+            stats.add(f"[{session.name}] Process", (process_time - start_time) * 1000)
+            if first_audio_time:
+                stats.add(
+                    f"[{session.name}] Time to first audio",
+                    (first_audio_time - start_time) * 1000,
+                )
+
+    for wingman in tower.wingmen:
+        await wingman.unload()
+
+
+async def main(args: argparse.Namespace):
+    collector = BenchmarkCollector(LatencyStats())
+    Printr.set_connection_manager(collector)
+
+    server = FakeProviderServer(
+        turns=[turn for session in SESSIONS for turn in session.turns],
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        stt_delay=args.stt_delay,
+        tts_delay=args.tts_delay,
+    )
+    server.start()
+    try:
+        settings = create_settings(server)
+        recording = create_silence(server)
+        for session in SESSIONS:
+            if args.session and session.name not in args.session:
+                continue
+            await run_session(
+                session=session,
+                server=server,
+                settings=settings,
+                recording=recording,
+                iterations=args.iterations,
+                playback_speed=args.playback_speed,
+                collector=collector,
+            )
+    finally:
+        server.stop()
+
+    printr.print(collector.stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--session",
+        action="append",
+        help="Only run these sessions (repeatable). Default: all",
+    )
+    parser.add_argument("--first-token-delay", type=float, default=0.25)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--stt-delay", type=float, default=0.3)
+    parser.add_argument("--tts-delay", type=float, default=0.2)
+    parser.add_argument(
+        "--playback-speed",
+        type=float,
+        default=0.0,
+        help="Multiplier of the real audio duration for simulated playback. 0 = instant.",
+    )
+    asyncio.run(main(parser.parse_args()))
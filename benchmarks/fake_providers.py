@@ -0,0 +1,274 @@
+"""Deterministic stand-ins for the cloud providers so that the Wingman pipeline can be benchmarked offline.
+
+FakeProviderServer speaks just enough of the OpenAI and whispercpp HTTP APIs to be used as
+"local_llm" conversation provider, "openai_compatible" TTS provider and "whispercpp" STT provider.
+"""
+
+import asyncio
+import io
+import json
+import re
+import socket
+import threading
+import time
+import wave
+from typing import Optional
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from services.audio_player import AudioPlayer
+
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+
+class ScriptedToolCall(BaseModel):
+    name: str
+    arguments: dict = {}
+
+
+class ScriptedResponse(BaseModel):
+    content: Optional[str] = None
+    tool_calls: list[ScriptedToolCall] = []
+
+
+class ScriptedTurn(BaseModel):
+    transcript: str
+    """What the user "says". Returned by the fake STT and used to look up the responses."""
+    responses: list[ScriptedResponse]
+    """One response per LLM call of this turn, e.g. a tool call followed by the final answer."""
+
+
+class ScriptedSession(BaseModel):
+    name: str
+    turns: list[ScriptedTurn]
+    stream_responses: bool = False
+
+
+class FakeProviderServer:
+    """A local OpenAI-compatible LLM, TTS and whispercpp STT server with scripted responses and configurable latencies (in seconds)."""
+
+    def __init__(
+        self,
+        turns: list[ScriptedTurn],
+        host: str = "127.0.0.1",
+        first_token_delay: float = 0.25,
+        token_delay: float = 0.02,
+        stt_delay: float = 0.3,
+        tts_delay: float = 0.2,
+        tts_seconds_per_char: float = 0.06,
+        sample_rate: int = 24000,
+    ):
+        self.turns = {turn.transcript: turn for turn in turns}
+        self.host = host
+        self.port: int = None
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.stt_delay = stt_delay
+        self.tts_delay = tts_delay
+        self.tts_seconds_per_char = tts_seconds_per_char
+        self.sample_rate = sample_rate
+        self.next_transcript = ""
+        """Returned by the next transcription request."""
+        self.request_count = 0
+
+        self.app = FastAPI()
+        self.app.add_api_route(
+            "/v1/chat/completions", self.chat_completions, methods=["POST"]
+        )
+        self.app.add_api_route("/v1/audio/speech", self.speech, methods=["POST"])
+        self.app.add_api_route(
+            "/v1/audio/transcriptions", self.transcription, methods=["POST"]
+        )
+        self.app.add_api_route("/inference", self.transcription, methods=["POST"])
+        self.app.add_api_route("/", self.ping, methods=["GET"])
+
+        self.server: uvicorn.Server = None
+        self.thread: threading.Thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(self.app, log_level="warning", lifespan="off")
+        )
+        self.thread = threading.Thread(
+            target=self.server.run, kwargs={"sockets": [sock]}, daemon=True
+        )
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        if self.server:
+            self.server.should_exit = True
+            self.thread.join()
+            self.server = None
+
+    async def ping(self):
+        return "Ok"
+
+    # ─────────────────────────────────── LLM ─────────────────────────────────── #
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        self.request_count += 1
+        response = self.__get_scripted_response(body.get("messages", []))
+        model = body.get("model") or "fake-model"
+        completion_id = f"chatcmpl-fake-{self.request_count}"
+        tool_calls = [
+            {
+                "id": f"call_{self.request_count}_{index}",
+                "type": "function",
+                "function": {
+                    "name": tool_call.name,
+                    "arguments": json.dumps(tool_call.arguments),
+                },
+            }
+            for index, tool_call in enumerate(response.tool_calls)
+        ]
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        tokens = TOKEN_PATTERN.findall(response.content or "")
+
+        if body.get("stream"):
+            return StreamingResponse(
+                self.__stream_chunks(
+                    completion_id, model, tokens, tool_calls, finish_reason
+                ),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(self.first_token_delay + self.token_delay * len(tokens))
+        return JSONResponse(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": finish_reason,
+                        "message": {
+                            "role": "assistant",
+                            "content": response.content,
+                            "tool_calls": tool_calls or None,
+                        },
+                    }
+                ],
+            }
+        )
+
+    async def __stream_chunks(
+        self,
+        completion_id: str,
+        model: str,
+        tokens: list[str],
+        tool_calls: list[dict],
+        finish_reason: str,
+    ):
+        def chunk(delta: dict, finish_reason: str = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        await asyncio.sleep(self.first_token_delay)
+        yield chunk({"role": "assistant", "content": ""})
+        for token in tokens:
+            await asyncio.sleep(self.token_delay)
+            yield chunk({"content": token})
+        for index, tool_call in enumerate(tool_calls):
+            yield chunk({"tool_calls": [{"index": index, **tool_call}]})
+        yield chunk({}, finish_reason)
+        yield "data: [DONE]\n\n"
+
+    def __get_scripted_response(self, messages: list[dict]) -> ScriptedResponse:
+        """Finds the turn by the last user message and picks the response by the number of LLM round trips since then."""
+        last_user_index = max(
+            (i for i, message in enumerate(messages) if message.get("role") == "user"),
+            default=None,
+        )
+        if last_user_index is None:
+            return ScriptedResponse(content="Ok.")
+
+        turn = self.turns.get(messages[last_user_index].get("content"))
+        if not turn or not turn.responses:
+            return ScriptedResponse(content="I don't know what to say.")
+
+        step = sum(
+            1
+            for message in messages[last_user_index + 1 :]
+            if message.get("role") == "assistant"
+        )
+        return turn.responses[min(step, len(turn.responses) - 1)]
+
+    # ─────────────────────────────────── TTS ─────────────────────────────────── #
+
+    async def speech(self, request: Request):
+        body = await request.json()
+        await asyncio.sleep(self.tts_delay)
+        pcm = self.generate_pcm(len(body.get("input", "")) * self.tts_seconds_per_char)
+        if body.get("response_format") == "pcm":
+            return Response(content=pcm, media_type="audio/pcm")
+        return Response(content=self.to_wav(pcm), media_type="audio/wav")
+
+    def generate_pcm(self, duration: float) -> bytes:
+        """A quiet 16 bit mono sine tone, so that effects have something to work with."""
+        samples = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+        tone = 0.1 * np.sin(2 * np.pi * 220 * samples)
+        return (tone * 32767).astype(np.int16).tobytes()
+
+    def to_wav(self, pcm: bytes) -> bytes:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(pcm)
+        return buffer.getvalue()
+
+    # ─────────────────────────────────── STT ─────────────────────────────────── #
+
+    async def transcription(self, file: UploadFile):
+        await file.read()
+        await asyncio.sleep(self.stt_delay)
+        return {"text": self.next_transcript}
+
+
+class NullAudioPlayer(AudioPlayer):
+    """An AudioPlayer without output device. Playback takes the real audio duration multiplied by playback_speed (0 = instant)."""
+
+    def __init__(self, playback_speed: float = 0.0):
+        super().__init__(
+            event_queue=None, on_playback_started=None, on_playback_finished=None
+        )
+        self.playback_speed = playback_speed
+
+    def start_playback(
+        self,
+        audio,
+        sample_rate,
+        channels,
+        finished_callback,
+        volume: list[float] | float,
+    ):
+        self.is_playing = True
+        time.sleep(len(audio) / sample_rate * self.playback_speed)
+        if finished_callback:
+            finished_callback()
+        else:
+            self.is_playing = False
@@ -0,0 +1,127 @@
+"""CPU-only benchmark of the FasterWhisper model manager on the files in audio_samples/.
+
+For every worker count, the model is loaded lazily by the first transcription (cold start). Afterwards, the samples
+are transcribed with the given number of concurrent requests, like push-to-talk, voice activation and the ESP32
+socket would do at the same time. Reports the latency per request, the throughput and the observed queue depth.
+
+Usage (from the repository root):
+    python -m benchmarks.fasterwhisper_pool --model tiny --workers 1 2 4 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import time
+from api.enums import LogType
+from api.interface import FasterWhisperSettings, FasterWhisperSttConfig
+from benchmarks.e2e_latency import read_yaml
+from benchmarks.stats import LatencyStats
+from providers.faster_whisper import FasterWhisper
+from services.audio_input import AudioInput
+from services.printr import Printr
+
+printr = Printr()
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "audio_samples")
+
+
+def load_samples() -> list[AudioInput]:
+    samples = [
+        AudioInput.from_file(file_path)
+        for file_path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.wav")))
+    ]
+    if not samples:
+        raise RuntimeError(f"No samples found in {SAMPLES_DIR}.")
+    # decode and resample once, so that only the inference is measured
+    for sample in samples:
+        sample.to_float32(sample_rate=16000)
+    return samples
+
+
+async def watch_queue_depth(fasterwhisper: FasterWhisper, depths: list[int]):
+    while True:
+        depths.append(fasterwhisper.get_stats().queue_depth)
+        await asyncio.sleep(0.01)
+
+
+async def run(
+    workers: int,
+    args: argparse.Namespace,
+    samples: list[AudioInput],
+    config: FasterWhisperSttConfig,
+    stats: LatencyStats,
+) -> str:
+    fasterwhisper = FasterWhisper(
+        settings=FasterWhisperSettings(
+            model_size=args.model,
+            compute_type=args.compute_type,
+            device="cpu",
+            workers=workers,
+        ),
+        app_root_path=os.getcwd(),
+        app_is_bundled=False,
+        warm_up=False,
+    )
+    label = f"[{workers} workers]"
+
+    start_time = time.perf_counter()
+    await fasterwhisper.transcribe(config=config, audio_input=samples[0], hotwords=None)
+    stats.add(f"{label} Cold start", (time.perf_counter() - start_time) * 1000)
+
+    requests = [samples[i % len(samples)] for i in range(args.requests)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def transcribe(sample: AudioInput):
+        async with semaphore:
+            request_start = time.perf_counter()
+            await fasterwhisper.transcribe(
+                config=config, audio_input=sample, hotwords=None
+            )
+            stats.add(f"{label} Request", (time.perf_counter() - request_start) * 1000)
+
+    depths: list[int] = []
+    watcher = asyncio.create_task(watch_queue_depth(fasterwhisper, depths))
+    start_time = time.perf_counter()
+    await asyncio.gather(*(transcribe(sample) for sample in requests))
+    total_time = time.perf_counter() - start_time
+    watcher.cancel()
+
+    result = fasterwhisper.get_stats()
+    return (
+        f"{label} {len(requests) / total_time:.2f} transcriptions/s, "
+        f"max queue depth {max(depths, default=0)}, "
+        f"avg queue time {result.avg_queue_time_ms:.1f}ms, "
+        f"avg inference {result.avg_inference_time_ms:.1f}ms, "
+        f"model load {result.model_load_time_ms or 0:.0f}ms"
+    )
+
+
+async def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    samples = load_samples()
+    config = FasterWhisperSttConfig(
+        **read_yaml("settings.yaml")["voice_activation"]["fasterwhisper_config"]
+    )
+
+    summaries = [
+        await run(workers, args, samples, config, stats) for workers in args.workers
+    ]
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(summaries), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="How many transcriptions are requested at the same time.",
+    )
+    parser.add_argument("--requests", type=int, default=40)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,184 @@
+"""Per-utterance latency of instant activation and get_command with 100, 1k and 10k phrases, before and after the CommandMatcher.
+
+Commands get generated phrases like the ones quick_commands learns ("power to shields", "open the cargo door", ...).
+Utterances are exact phrases, phrases with recognition errors and unrelated sentences that have to go to the LLM.
+The previous path rebuilt the phrase dict and ran difflib.get_close_matches over every phrase for every utterance
+and found commands by name with a linear scan. Both paths must pick the same commands.
+
+Usage (from the repository root):
+    python -m benchmarks.instant_activation --phrases 100 1000 10000 --utterances 200
+"""
+
+import argparse
+import difflib
+import random
+import time
+from api.enums import LogType
+from api.interface import CommandConfig
+from benchmarks.stats import LatencyStats
+from services.command_matcher import CommandMatcher
+from services.printr import Printr
+
+printr = Printr()
+
+VERBS = ["open", "close", "toggle", "power", "deploy", "retract", "target", "fire"]
+NOUNS = [
+    "shields",
+    "engines",
+    "weapons",
+    "cargo door",
+    "landing gear",
+    "lights",
+    "quantum drive",
+    "missiles",
+    "scanner",
+    "ramp",
+    "mining laser",
+    "countermeasures",
+]
+EXTRAS = ["", "the ", "all ", "my ", "front ", "rear ", "left ", "right "]
+SENTENCES = [
+    "what is the best place to sell laranite right now",
+    "how far is it to the next jump point",
+    "tell me a joke about space pirates",
+    "can you check the weather in lorville",
+]
+
+
+def legacy_match(commands: list[CommandConfig], transcript: str):
+    """A replica of the previous _execute_instant_activation_command (without executing)."""
+    commands_by_instant_activation = {}
+    for command in commands:
+        if command.instant_activation:
+            for phrase in command.instant_activation:
+                if phrase.lower() in commands_by_instant_activation:
+                    commands_by_instant_activation[phrase.lower()].append(command)
+                else:
+                    commands_by_instant_activation[phrase.lower()] = [command]
+
+    phrase = difflib.get_close_matches(
+        transcript.lower(),
+        commands_by_instant_activation.keys(),
+        n=1,
+        cutoff=0.8,
+    )
+    if not phrase:
+        return None
+    return commands_by_instant_activation[phrase[0]]
+
+
+def legacy_get_command(commands: list[CommandConfig], command_name: str):
+    """A replica of the previous get_command."""
+    return next((item for item in commands if item.name == command_name), None)
+
+
+def generate_commands(rng: random.Random, phrase_count: int) -> list[CommandConfig]:
+    commands = []
+    phrases = set()
+    while len(phrases) < phrase_count:
+        phrase = (
+            f"{rng.choice(VERBS)} {rng.choice(EXTRAS)}{rng.choice(NOUNS)}"
+            f" {len(phrases) // 40 or ''}".strip()
+        )
+        if phrase in phrases:
+            continue
+        phrases.add(phrase)
+        if not commands or len(commands[-1].instant_activation) >= 5:
+            commands.append(
+                CommandConfig(name=f"Command{len(commands)}", instant_activation=[])
+            )
+        commands[-1].instant_activation.append(phrase)
+    return commands
+
+
+def misrecognize(rng: random.Random, phrase: str) -> str:
+    characters = list(phrase)
+    for _ in range(rng.randint(1, 2)):
+        index = rng.randrange(len(characters))
+        characters[index] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    return "".join(characters)
+
+
+def generate_utterances(
+    rng: random.Random, commands: list[CommandConfig], count: int
+) -> list[str]:
+    phrases = [phrase for command in commands for phrase in command.instant_activation]
+    utterances = []
+    for index in range(count):
+        if index % 3 == 0:
+            utterances.append(rng.choice(phrases).upper())
+        elif index % 3 == 1:
+            utterances.append(misrecognize(rng, rng.choice(phrases)))
+        else:
+            utterances.append(rng.choice(SENTENCES))
+    return utterances
+
+
+def run(phrase_count: int, args: argparse.Namespace, stats: LatencyStats) -> str:
+    rng = random.Random(args.seed)
+    commands = generate_commands(rng, phrase_count)
+    utterances = generate_utterances(rng, commands, args.utterances)
+    names = [rng.choice(commands).name for _ in range(args.utterances)]
+
+    start_time = time.perf_counter()
+    matcher = CommandMatcher(commands)
+    build_ms = (time.perf_counter() - start_time) * 1000
+
+    mismatches = 0
+    for utterance in utterances:
+        start_time = time.perf_counter()
+        expected = legacy_match(commands, utterance)
+        stats.add(
+            f"[{phrase_count} phrases] Legacy match",
+            (time.perf_counter() - start_time) * 1000,
+        )
+        start_time = time.perf_counter()
+        matched = matcher.match(utterance)
+        stats.add(
+            f"[{phrase_count} phrases] Matcher match",
+            (time.perf_counter() - start_time) * 1000,
+        )
+        if matched != expected:
+            mismatches += 1
+
+    for name in names:
+        start_time = time.perf_counter()
+        legacy_get_command(commands, name)
+        stats.add(
+            f"[{phrase_count} phrases] Legacy get_command",
+            (time.perf_counter() - start_time) * 1000,
+        )
+        start_time = time.perf_counter()
+        matcher.get_command(name)
+        stats.add(
+            f"[{phrase_count} phrases] Matcher get_command",
+            (time.perf_counter() - start_time) * 1000,
+        )
+
+    return (
+        f"[{phrase_count} phrases] index built in {build_ms:.1f}ms, "
+        f"{mismatches} of {len(utterances)} utterances matched differently"
+    )
+
+
+def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    lines = [run(phrase_count, args, stats) for phrase_count in args.phrases]
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--phrases",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="Numbers of instant_activation phrases to test.",
+    )
+    parser.add_argument("--utterances", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,180 @@
+"""Throughput and caller-side latency of Printr, synchronous logging vs. the LogPipeline.
+
+Worker threads (like the jobs of the Runtime) log lines for a wingman that are sent to the client. Previously every
+call wrote to the console and the log file, walked the stack to find the wingman and, without a running event loop
+in the thread, sent the LogCommand with asyncio.run. Now callers enqueue a LogRecord and one consumer thread writes
+the batches.
+
+Console output is discarded during the runs. The log file is written as usual.
+
+Usage (from the repository root):
+    python -m benchmarks.printr_pipeline --threads 8 --lines 2000
+"""
+
+import argparse
+import asyncio
+import inspect
+import os
+import threading
+import time
+from api.commands import LogCommand
+from api.enums import LogSource, LogType
+from benchmarks.stats import LatencyStats
+from services.printr import Printr, wingman_context
+
+printr = Printr()
+
+
+class CountingClient:
+    """Stands in for the ConnectionManager. Serializes the commands like it would and counts them."""
+
+    def __init__(self, send_delay: float):
+        self.send_delay = send_delay
+        self.lock = threading.Lock()
+        self.received = 0
+
+    async def broadcast(self, command):
+        command.model_dump_json()
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        with self.lock:
+            self.received += 1
+
+
+class LegacyPrintr:
+    """A replica of the previous Printr.print."""
+
+    def __init__(self, client: CountingClient):
+        self.client = client
+
+    def print(self, text, color: LogType = LogType.SUBTLE):
+        color_code = printr.get_terminal_color(color)
+        printr.console_logger.info(printr.clr(text, color_code))
+        printr.logger.info(text)
+        coroutine = self.send_to_gui(text, color)
+        try:
+            asyncio.get_running_loop().create_task(coroutine)
+        except RuntimeError:
+            asyncio.run(coroutine)
+
+    async def send_to_gui(self, text, log_type: LogType):
+        wingman_name = None
+        current_frame = inspect.currentframe()
+        while current_frame:
+            if "self" in current_frame.f_locals:
+                caller_instance = current_frame.f_locals["self"]
+                if caller_instance.__class__.__name__ == "Wingman":
+                    wingman_name = caller_instance.name
+                    break
+            current_frame = current_frame.f_back
+
+        await self.client.broadcast(
+            command=LogCommand(
+                text=text,
+                log_type=log_type,
+                source=LogSource.WINGMAN,
+                source_name=wingman_name,
+                wingman_name=wingman_name,
+            )
+        )
+
+
+class Wingman:
+    """Logs from a worker thread, a few frames below a wingman method like the skills and providers do."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def log_lines(
+        self, mode: str, lines: int, legacy: LegacyPrintr, latencies: list
+    ):
+        wingman_context.set(self.name)
+        for line in range(lines):
+            text = f"{self.name}: line {line}"
+            start_time = time.perf_counter()
+            if mode == "legacy":
+                legacy.print(text)
+            else:
+                printr.print(text, source=LogSource.WINGMAN, source_name=self.name)
+            latencies.append(time.perf_counter() - start_time)
+
+
+def run(
+    mode: str,
+    args: argparse.Namespace,
+    client: CountingClient,
+    stats: LatencyStats,
+) -> str:
+    legacy = LegacyPrintr(client)
+    received_before = client.received
+    pipeline = printr.pipeline
+    coalesced_before, dropped_before = pipeline.coalesced, pipeline.dropped
+    latencies: list[list[float]] = [[] for _ in range(args.threads)]
+    threads = [
+        threading.Thread(
+            target=Wingman(f"Wingman {index}").log_lines,
+            args=(mode, args.lines, legacy, latencies[index]),
+        )
+        for index in range(args.threads)
+    ]
+
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    callers_done = time.perf_counter() - start_time
+    printr.flush(timeout=600)
+    # the consumer hands the last batch to the client without waiting for it
+    expected = args.threads * args.lines
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and client.received - received_before < (
+        expected - (pipeline.coalesced - coalesced_before)
+        - (pipeline.dropped - dropped_before)
+    ):
+        time.sleep(0.01)
+    seconds = time.perf_counter() - start_time
+
+    for thread_latencies in latencies:
+        for latency in thread_latencies:
+            stats.add(f"[{mode}] Caller", latency * 1000)
+    lines = args.threads * args.lines
+    return (
+        f"[{mode}] {lines} lines: callers done after {callers_done:.2f}s, "
+        f"written and sent after {seconds:.2f}s ({lines / seconds:.0f} lines/s), "
+        f"{pipeline.coalesced - coalesced_before} coalesced, "
+        f"{pipeline.dropped - dropped_before} dropped"
+    )
+
+
+def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    client = CountingClient(send_delay=args.send_delay)
+    Printr.set_connection_manager(client)
+
+    console_stream = printr.console_handler.stream
+    lines = []
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        printr.console_handler.setStream(devnull)
+        try:
+            for mode in ("legacy", "pipeline"):
+                lines.append(run(mode, args, client, stats))
+        finally:
+            printr.console_handler.setStream(console_stream)
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--lines", type=int, default=2000, help="Lines per thread.")
+    parser.add_argument(
+        "--send-delay",
+        type=float,
+        default=0.0,
+        help="Seconds the client takes to receive a command.",
+    )
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""Per-publish latency of PubSub at audio chunk rates, the previous implementation vs. the delivery modes.
+
+Publishes chunks of streamed TTS audio to subscribers like the ones of stream_event: the ESP32 handler and a /ws/audio
+client (async) plus a sync one. The previous PubSub called inspect.signature for every subscriber on every publish
+and awaited them one after another. Now the metadata is resolved on subscribe.
+
+Usage (from the repository root):
+    python -m benchmarks.pubsub --publishes 10000 --subscriber-delay 0
+"""
+
+import argparse
+import asyncio
+import inspect
+import time
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.printr import Printr
+from services.pub_sub import DeliveryMode, PubSub
+
+printr = Printr()
+
+CHUNK = bytes(2048)
+"""A chunk of stream_with_effects: 1024 int16 samples, 64ms at 16kHz."""
+
+
+class LegacyPubSub:
+    """A replica of the previous PubSub."""
+
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, event_type, fn):
+        if event_type not in self.subscribers:
+            self.subscribers[event_type] = []
+        self.subscribers[event_type].append(fn)
+
+    async def publish(self, event_type, data=None):
+        if event_type in self.subscribers:
+            for fn in self.subscribers[event_type]:
+                params = inspect.signature(fn).parameters
+                param_count = len(params)
+                is_method = "self" in params
+                expects_arg = (param_count > 1) if is_method else (param_count > 0)
+
+                if asyncio.iscoroutinefunction(fn):
+                    if expects_arg and data is not None:
+                        await fn(data)
+                    else:
+                        await fn()
+                else:
+                    if expects_arg and data is not None:
+                        fn(data)
+                    else:
+                        fn()
+
+
+class RemoteClient:
+    """Takes the chunks like the ESP32 handler does, optionally with a delay (e.g. a full queue)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def handle_stream_playback(self, audio_stream: bytes):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.queue.put_nowait(audio_stream)
+        if self.queue.qsize() > 100:
+            self.queue = asyncio.Queue()
+
+
+def count_chunk(_audio_stream: bytes):
+    pass
+
+
+async def run(mode: str, args: argparse.Namespace, stats: LatencyStats):
+    if mode == "legacy":
+        pub_sub = LegacyPubSub()
+    else:
+        pub_sub = PubSub("benchmark", delivery=DeliveryMode(mode))
+    clients = [RemoteClient(args.subscriber_delay) for _ in range(args.subscribers)]
+    for client in clients:
+        pub_sub.subscribe("audio", client.handle_stream_playback)
+    pub_sub.subscribe("audio", count_chunk)
+
+    start_time = time.perf_counter()
+    for _ in range(args.publishes):
+        publish_start = time.perf_counter()
+        await pub_sub.publish("audio", CHUNK)
+        stats.add(f"[{mode}] Publish", (time.perf_counter() - publish_start) * 1000)
+    seconds = time.perf_counter() - start_time
+    if mode == DeliveryMode.FIRE_AND_FORGET.value:
+        await asyncio.gather(*pub_sub.tasks)
+    return f"[{mode}] {args.publishes / seconds:.0f} publishes/s"
+
+
+async def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    lines = []
+    for mode in ["legacy"] + [mode.value for mode in DeliveryMode]:
+        lines.append(await run(mode, args, stats))
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--publishes", type=int, default=10000)
+    parser.add_argument(
+        "--subscribers", type=int, default=2, help="Async subscribers of the chunks."
+    )
+    parser.add_argument(
+        "--subscriber-delay",
+        type=float,
+        default=0.0,
+        help="Seconds every async subscriber needs per chunk.",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+"""Threads, event loops and latency under a burst of concurrent commands, thread-per-command vs. the shared Runtime.
+
+Sends a burst of text commands to one wingman (fake LLM and TTS, like e2e_latency) the way the client, push-to-talk
+and voice activation do. The previous path started a thread with a new event loop per command. Now commands are
+submitted to the "wingmen" executor of the Runtime, whose workers keep their event loop (and HTTP clients).
+
+Usage (from the repository root):
+    python -m benchmarks.runtime_burst --commands 50
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from api.enums import LogType
+from benchmarks.e2e_latency import SESSIONS, create_config, create_settings
+from benchmarks.fake_providers import FakeProviderServer, NullAudioPlayer
+from benchmarks.stats import LatencyStats
+from providers.whispercpp import Whispercpp
+from services.printr import Printr
+from services.runtime import Runtime
+from services.tower import Tower
+from wingmen.wingman import Wingman
+
+printr = Printr()
+
+
+class Gauges:
+    """Samples the thread count and the runtime gauges while the burst is running."""
+
+    def __init__(self, runtime: Runtime):
+        self.runtime = runtime
+        self.max_threads = 0
+        self.max_queued = 0
+        self.max_active = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.__sample, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop_event.set()
+        self.thread.join()
+
+    def __sample(self):
+        while not self.stop_event.wait(0.005):
+            stats = self.runtime.executors["wingmen"].get_stats()
+            self.max_threads = max(self.max_threads, threading.active_count())
+            self.max_queued = max(self.max_queued, stats.queued)
+            self.max_active = max(self.max_active, stats.active)
+
+
+def thread_per_command(wingman: Wingman, transcript: str, done: list[float]):
+    """The previous send_text_to_wingman."""
+
+    def run_async_process():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(wingman.process(transcript=transcript))
+        finally:
+            loop.close()
+        done.append(time.perf_counter())
+
+    threading.Thread(target=run_async_process).start()
+
+
+async def run_burst(
+    mode: str,
+    wingman: Wingman,
+    transcript: str,
+    args: argparse.Namespace,
+    runtime: Runtime,
+    stats: LatencyStats,
+) -> str:
+    loops_before = runtime.get_stats().event_loops
+    done: list[float] = []
+
+    def runtime_done(_future):
+        done.append(time.perf_counter())
+
+    with Gauges(runtime) as gauges:
+        start_time = time.perf_counter()
+        for _ in range(args.commands):
+            if mode == "thread per command":
+                thread_per_command(wingman, transcript, done)
+            else:
+                runtime.submit(
+                    wingman.process, transcript=transcript
+                ).add_done_callback(runtime_done)
+        while len(done) < args.commands:
+            await asyncio.sleep(0.01)
+
+    for finished_at in done:
+        stats.add(f"[{mode}] Command", (finished_at - start_time) * 1000)
+    loops = (
+        args.commands
+        if mode == "thread per command"
+        else runtime.get_stats().event_loops - loops_before
+    )
+    return (
+        f"[{mode}] {args.commands} commands in {(max(done) - start_time):.2f}s, "
+        f"peak {gauges.max_threads} threads, {loops} new event loops, "
+        f"peak {gauges.max_active} active / {gauges.max_queued} queued in the wingmen executor"
+    )
+
+
+async def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    session = next(session for session in SESSIONS if session.name == "chat")
+    transcript = session.turns[0].transcript
+    server = FakeProviderServer(turns=session.turns, tts_seconds_per_char=0.0)
+    server.start()
+    runtime = Runtime()
+    runtime.set_main_loop(asyncio.get_running_loop())
+    try:
+        settings = create_settings(server)
+        tower = Tower(
+            config=create_config(server, session),
+            config_dir=None,
+            config_manager=None,
+            audio_player=NullAudioPlayer(),
+            audio_library=None,
+            whispercpp=Whispercpp(settings=settings.voice_activation.whispercpp),
+            fasterwhisper=None,
+            xvasynth=None,
+        )
+        await tower.instantiate_wingmen(settings)
+        wingman = tower.get_wingman_from_text(transcript)
+
+        lines = [f"threads before the burst: {threading.active_count()}"]
+        for mode in ("thread per command", "runtime"):
+            lines.append(
+                await run_burst(mode, wingman, transcript, args, runtime, stats)
+            )
+        for wingman in tower.wingmen:
+            await wingman.unload()
+    finally:
+        runtime.shutdown()
+        server.stop()
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
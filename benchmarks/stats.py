@@ -0,0 +1,57 @@
+import math
+from api.interface import BenchmarkResult
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Linear interpolation between the closest ranks, like numpy.percentile."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class LatencyStats:
+    """Collects samples (in ms) per label and reports their percentiles."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+
+    def add(self, label: str, execution_time_ms: float):
+        self.samples.setdefault(label, []).append(execution_time_ms)
+
+    def add_benchmark_result(self, result: BenchmarkResult, prefix: str = ""):
+        """Adds a Benchmark result and all of its snapshots, e.g. "Command/AI Processing > AI Commands & Skills"."""
+        label = f"{prefix}{result.label}"
+        self.add(label, result.execution_time_ms)
+        for snapshot in result.snapshots or []:
+            self.add_benchmark_result(snapshot, prefix=f"{label} > ")
+
+    def summary(self, label: str) -> dict[str, float]:
+        values = self.samples.get(label, [])
+        return {
+            "n": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": max(values) if values else math.nan,
+        }
+
+    def report(self) -> str:
+        width = max((len(label) for label in self.samples), default=5)
+        lines = [
+            f"{'label':<{width}} {'n':>5} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}"
+        ]
+        for label in self.samples:
+            summary = self.summary(label)
+            lines.append(
+                f"{label:<{width}} {summary['n']:>5} "
+                + " ".join(
+                    f"{summary[key]:>8.1f}ms" for key in ("p50", "p95", "p99", "max")
+                )
+            )
+        return "\n".join(lines)
@@ -0,0 +1,124 @@
+"""STT latency with and without the disk round-trip: a recording is either handed to the provider in memory,
+or written to a WAV file and read back (like before AudioInput existed).
+
+Measures the whole hand-off from the recorded PCM to the transcript. whispercpp runs against the local fake server,
+so only the encoding/upload overhead is measured. Pass --fasterwhisper-model to include a real local transcription.
+
+Usage (from the repository root):
+    python -m benchmarks.stt_input --iterations 50 --durations 2 10
+    python -m benchmarks.stt_input --fasterwhisper-model tiny
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import numpy
+import soundfile
+from api.enums import LogType
+from api.interface import (
+    FasterWhisperSettings,
+    FasterWhisperSttConfig,
+    WhispercppSettings,
+    WhispercppSttConfig,
+)
+from benchmarks.e2e_latency import read_yaml
+from benchmarks.fake_providers import FakeProviderServer
+from benchmarks.stats import LatencyStats
+from providers.whispercpp import Whispercpp
+from services.audio_input import AudioInput
+from services.printr import Printr
+
+printr = Printr()
+
+SAMPLE_RATE = 16000
+
+
+def create_recording(duration: float) -> numpy.ndarray:
+    """Like AudioRecorder.stop_recording: float32 PCM of shape (frames, 1)."""
+    rng = numpy.random.default_rng(0)
+    return rng.uniform(-0.1, 0.1, (int(duration * SAMPLE_RATE), 1)).astype(
+        numpy.float32
+    )
+
+
+def to_audio_input(recording: numpy.ndarray, mode: str, directory: str) -> AudioInput:
+    if mode == "memory":
+        return AudioInput(samples=recording, sample_rate=SAMPLE_RATE)
+    file_path = os.path.join(directory, "recording.wav")
+    soundfile.write(file_path, recording, SAMPLE_RATE)
+    return AudioInput.from_file(file_path)
+
+
+async def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    voice_activation = read_yaml("settings.yaml")["voice_activation"]
+
+    server = FakeProviderServer(turns=[], stt_delay=0)
+    server.start()
+    whispercpp = Whispercpp(
+        settings=WhispercppSettings(
+            enable=True, host=f"http://{server.host}", port=server.port
+        )
+    )
+    whispercpp_config = WhispercppSttConfig(**voice_activation["whispercpp_config"])
+
+    fasterwhisper = None
+    if args.fasterwhisper_model:
+        from providers.faster_whisper import FasterWhisper
+
+        fasterwhisper = FasterWhisper(
+            settings=FasterWhisperSettings(
+                model_size=args.fasterwhisper_model, compute_type="auto", device="cpu"
+            ),
+            app_root_path=os.getcwd(),
+            app_is_bundled=False,
+            warm_up=False,
+        )
+        fasterwhisper_config = FasterWhisperSttConfig(
+            **voice_activation["fasterwhisper_config"]
+        )
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for duration in args.durations:
+                recording = create_recording(duration)
+                for _iteration in range(args.iterations):
+                    for mode in ("disk", "memory"):
+                        start_time = time.perf_counter()
+                        await whispercpp.transcribe(
+                            audio_input=to_audio_input(recording, mode, directory),
+                            config=whispercpp_config,
+                        )
+                        stats.add(
+                            f"[{duration:g}s] whispercpp from {mode}",
+                            (time.perf_counter() - start_time) * 1000,
+                        )
+
+                        if fasterwhisper:
+                            start_time = time.perf_counter()
+                            await fasterwhisper.transcribe(
+                                config=fasterwhisper_config,
+                                audio_input=to_audio_input(recording, mode, directory),
+                                hotwords=None,
+                            )
+                            stats.add(
+                                f"[{duration:g}s] fasterwhisper from {mode}",
+                                (time.perf_counter() - start_time) * 1000,
+                            )
+    finally:
+        server.stop()
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--durations", type=float, nargs="+", default=[2, 10])
+    parser.add_argument(
+        "--fasterwhisper-model",
+        help="Also transcribe with FasterWhisper using this model, e.g. 'tiny'. Default: skip",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,520 @@
+"""Wall time, peak memory and rows/s of a full UEX import of the uexcorp skill, before and after the bulk importer.
+
+Serves a recorded (or generated) UEX API fixture from a local HTTP server and imports it into a fresh database. The
+previous importer fetched one table after another and persisted every row with its own INSERT OR REPLACE statement.
+The bulk importer fetches independent tables in parallel and writes each table with executemany in one transaction.
+Both write to the current (WAL) database, so only the import path differs. Peak memory is measured with tracemalloc
+in a separate run, as tracing slows down the import.
+
+A fixture is a directory with one <endpoint>.json per endpoint, holding the body of the UEX API response. Endpoints
+requested per category, commodity or star system hold the rows of all of them. Record one with --record-from.
+
+Usage (from the repository root):
+    python -m benchmarks.uexcorp_import --scale 1.0 --iterations 3 --latency 50
+    python -m benchmarks.uexcorp_import --fixture uex_fixture --record-from https://api.uexcorp.space/2.0
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import requests
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from benchmarks.uexcorp_queries import INIT_SQL, TABLE_SIZES
+from services.printr import Printr
+from skills.uexcorp.uexcorp.api.uex import Uex
+from skills.uexcorp.uexcorp.database.database import Database
+from skills.uexcorp.uexcorp.handler.import_handler import ImportHandler
+from skills.uexcorp.uexcorp.helper import Helper
+from skills.uexcorp.uexcorp.model.import_data import ImportData
+
+printr = Printr()
+
+ENDPOINTS = {
+    "category": (Uex.CATEGORIES, None),
+    "category_attribute": (Uex.CATEGORIES_ATTRIBUTES, None),
+    "city": (Uex.CITIES, None),
+    "commodity": (Uex.COMMODITIES, None),
+    "company": (Uex.COMPANIES, None),
+    "faction": (Uex.FACTIONS, None),
+    "item": (Uex.ITEMS, ("id_category", "category")),
+    "jurisdiction": (Uex.JURISDICTIONS, None),
+    "star_system": (Uex.STAR_SYSTEMS, None),
+    "moon": (Uex.MOONS, None),
+    "orbit": (Uex.ORBITS, None),
+    "orbit_distance": (Uex.ORBITS_DISTANCES, ("id_star_system", "star_system")),
+    "outpost": (Uex.OUTPOSTS, None),
+    "planet": (Uex.PLANETS, None),
+    "poi": (Uex.POI, None),
+    "refinery_method": (Uex.REFINERIES_METHODS, None),
+    "space_station": (Uex.SPACE_STATIONS, None),
+    "terminal": (Uex.TERMINALS, None),
+    "vehicle": (Uex.VEHICLES, None),
+    "commodity_status": (Uex.COMMODITIES_STATUS, None),
+    "item_price": (Uex.ITEMS_PRICES, None),
+    "item_attribute": (Uex.ITEMS_ATTRIBUTES, ("id_category", "category")),
+    "refinery_audit": (Uex.REFINERIES_AUDITS, None),
+    "fuel_price": (Uex.FUEL_PRICES, None),
+    "vehicle_purchase_price": (Uex.VEHICLES_PURCHASES_PRICES, None),
+    "vehicle_rental_price": (Uex.VEHICLES_RENTALS_PRICES, None),
+    "commodity_alert": (Uex.COMMODITIES_ALERTS, None),
+    "commodity_price": (Uex.COMMODITIES_PRICES, None),
+    "commodity_raw_price": (Uex.COMMODITIES_RAW_PRICES, None),
+    "commodity_route": (Uex.COMMODITIES_ROUTES, ("id_commodity", "commodity")),
+    "game_version": (Uex.GAME_VERSIONS, None),
+}
+"""table => (endpoint, (request parameter, table of its ids) for endpoints requested per id), in import order"""
+
+FIXTURE_SIZES = {
+    **TABLE_SIZES,
+    "category_attribute": 600,
+    "faction": 30,
+    "jurisdiction": 30,
+    "orbit_distance": 400,
+    "refinery_method": 12,
+    "refinery_audit": 2000,
+    "fuel_price": 300,
+    "commodity_alert": 50,
+}
+"""Rows per table of a generated fixture at scale 1.0."""
+
+
+class BenchmarkDebugHandler:
+    def write(self, content: str, print_to_console: bool = False):
+        pass
+
+
+class BenchmarkErrorHandler:
+    def __init__(self):
+        self.errors = 0
+
+    def write(self, function: str, arguments: list | dict, error, write_traceback: bool = True):
+        self.errors += 1
+
+
+class BenchmarkConfigHandler:
+    def __init__(self, api_url: str):
+        self.api_url = api_url
+
+    def get_api_url(self) -> str:
+        return self.api_url
+
+    def get_api_timeout(self) -> int:
+        return 30
+
+    def get_cache_lifetime_short(self) -> int:
+        return 3600
+
+    def get_cache_lifetime_mid(self) -> int:
+        return 3600
+
+    def get_cache_lifetime_long(self) -> int:
+        return 3600
+
+
+class BenchmarkHelper:
+    """What the models, the import handler and the API client need of the skill's Helper."""
+
+    def __init__(self, data_path: str, api_url: str):
+        self.handler_debug = BenchmarkDebugHandler()
+        self.handler_error = BenchmarkErrorHandler()
+        self.handler_config = BenchmarkConfigHandler(api_url)
+        self.handler_import = None
+        self.timers = {}
+        self.database = Database(data_path, "benchmark", self)
+
+    def get_database(self) -> Database:
+        return self.database
+
+    def get_handler_import(self):
+        return self.handler_import
+
+    def get_handler_debug(self) -> BenchmarkDebugHandler:
+        return self.handler_debug
+
+    def get_handler_error(self) -> BenchmarkErrorHandler:
+        return self.handler_error
+
+    def get_handler_config(self) -> BenchmarkConfigHandler:
+        return self.handler_config
+
+    def get_timestamp(self) -> int:
+        return int(time.time())
+
+    def start_timer(self, id: str = "default"):
+        self.timers[id] = self.get_timestamp()
+
+    def end_timer(self, id: str = "default") -> int:
+        return self.get_timestamp() - self.timers.pop(id, self.get_timestamp())
+
+    def sync_fasterwhisper_hotwords(self, unload: bool = False):
+        pass
+
+    def on_import_completed(self, imported_rows_count: int):
+        pass
+
+
+class LegacyImportHandler:
+    """A replica of the previous ImportHandler: one table after another, every row persisted on its own."""
+
+    def __init__(self, helper: BenchmarkHelper):
+        self.helper = helper
+        self.api = Uex(helper)
+        self.common_data = {"last_import_run_id": helper.get_timestamp()}
+        self.stats: dict[str, dict[str, float | int]] = {}
+
+    def get_common_data(self) -> dict[str, any]:
+        return self.common_data
+
+    def import_data(self) -> int:
+        total_count = 0
+        for table, (endpoint, per_id) in ENDPOINTS.items():
+            import_data = ImportData(table, load=True)
+            if not import_data.needs_import(3600):
+                continue
+
+            start_time = time.perf_counter()
+            get = None
+            if per_id:
+                key, source = per_id
+                get = {key: request_ids(self.helper.get_database(), table, source)}
+            models = build_models(table, self.api.fetch(endpoint, get))
+            fetch_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            for index, model in enumerate(models):
+                legacy_persist(model, index < len(models) - 1)
+            import_data.set_date_imported(self.helper.get_timestamp())
+            import_data.set_dataset_count(len(models))
+            import_data.set_time_taken(int(fetch_time))
+            import_data.persist()
+            write_time = time.perf_counter() - start_time
+
+            self.stats[table] = {
+                "changed": len(models),
+                "fetch_time": fetch_time,
+                "write_time": write_time,
+                "rows_per_second": int(len(models) / write_time) if write_time > 0 else len(models),
+            }
+            total_count += len(models)
+        return total_count
+
+
+def legacy_persist(model, skip_commit: bool = False) -> bool:
+    """The previous DataModel.persist: builds and executes an INSERT OR REPLACE statement per row."""
+    if not model.data or not model.table:
+        return False
+
+    for key, value in model.helper.get_handler_import().get_common_data().items():
+        if key in model.data:
+            model.data[key] = value
+
+    clean_data = {}
+    for key, value in model.data.items():
+        if isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, dict) or isinstance(value, list):
+            value = json.dumps(value)
+        clean_data[f"`{key}`"] = value
+
+    sql = f"INSERT OR REPLACE INTO {model.table} ({','.join(clean_data.keys())}) VALUES ({','.join(['?'] * len(clean_data))})"
+    try:
+        model.helper.get_database().execute(sql, tuple(clean_data.values()))
+    except Exception as e:
+        model.helper.get_handler_error().write("data_model.persist", [sql], e)
+        return False
+    if not skip_commit:
+        model.helper.get_database().commit()
+    return True
+
+
+def request_ids(database: Database, table: str, source: str) -> list[int]:
+    """The ids the importer requests a per id endpoint with (see ImportHandler)."""
+    where = {
+        "item": "",
+        "item_attribute": " WHERE is_game_related = 1",
+        "orbit_distance": " WHERE is_available = 1",
+        "commodity_route": " WHERE price_buy > 0 AND price_sell > 0",
+    }[table]
+    return [row[0] for row in database.fetch_all(f"SELECT id FROM {source}{where}")]
+
+
+def build_models(table: str, response: list | dict) -> list:
+    """Builds the models like the previous ImportHandler did."""
+    from skills.uexcorp.uexcorp.model.commodity_status import CommodityStatus
+    from skills.uexcorp.uexcorp.model.game_version import GameVersion
+
+    if table == "commodity_status":
+        models = []
+        for key, is_buy in (("buy", True), ("sell", False)):
+            for data in (response or {}).get(key, []):
+                model = CommodityStatus(data["code"], is_buy)
+                model.set_data(data)
+                models.append(model)
+        return models
+    if table == "game_version":
+        model = GameVersion()
+        model.set_data(response or {})
+        return [model] if response else []
+
+    model_class = get_model_class(table)
+    models = []
+    for data in response or []:
+        if table == "category" and "name" in data and "section" in data:
+            data["combined_name"] = f"{data['section']} {data['name']}"
+        model = model_class(**{key: data[key] for key in model_class.required_keys if key in data})
+        model.set_data(data)
+        models.append(model)
+    return models
+
+
+def get_model_class(table: str) -> type:
+    from importlib import import_module
+
+    module = import_module(f"skills.uexcorp.uexcorp.model.{table}")
+    return getattr(module, "".join(part.capitalize() for part in table.split("_")))
+
+
+def generate_fixture(rng: random.Random, scale: float) -> dict[str, list | dict]:
+    """Rows with the columns of the tables, ids referencing the generated rows of the other tables."""
+    sizes = {
+        table: max(1, int(size * scale)) if size > 500 else size
+        for table, size in FIXTURE_SIZES.items()
+    }
+
+    def value(table: str, key: str, index: int):
+        if key == "id":
+            return index
+        if key.startswith("id_"):
+            source = key[3:].removesuffix("_origin").removesuffix("_destination")
+            return rng.randint(1, sizes.get(source, 20))
+        if key.startswith(("is_", "has_")):
+            return 1 if key in ("is_available", "is_available_live", "is_game_related") else rng.randint(0, 1)
+        if key.startswith(("price", "scu", "distance", "profit", "investment", "score")):
+            return round(rng.uniform(1, 10000), 2)
+        if key.startswith("date_"):
+            return 1700000000 + index
+        return f"{table} {key} {index}"
+
+    schema = sqlite3.connect(":memory:")
+    with open(INIT_SQL, "r", encoding="UTF-8") as file:
+        schema.executescript(file.read())
+
+    fixture = {}
+    for table in ENDPOINTS:
+        if table in ("commodity_status", "game_version"):
+            continue
+        keys = [
+            column[1]
+            for column in schema.execute(f"PRAGMA table_info({table})")
+            if column[1] not in ("last_import_run_id", "combined_name", "is_blacklisted")
+        ]
+        fixture[table] = [
+            {key: value(table, key, index) for key in keys}
+            for index in range(1, sizes[table] + 1)
+        ]
+    fixture["commodity_status"] = {
+        key: [
+            {"code": code, "name": f"Status {code}", "percentage": str(code * 10), "colors": "green"}
+            for code in range(1, 8)
+        ]
+        for key in ("buy", "sell")
+    }
+    fixture["game_version"] = {"live": "4.0.2", "ptu": "4.1.0"}
+    schema.close()
+    return fixture
+
+
+def load_fixture(path: str) -> dict[str, list | dict]:
+    fixture = {}
+    for table, (endpoint, _per_id) in ENDPOINTS.items():
+        with open(os.path.join(path, f"{endpoint}.json"), "r", encoding="UTF-8") as file:
+            fixture[table] = json.load(file)["data"]
+    return fixture
+
+
+def record_fixture(api_url: str, path: str):
+    """Records every endpoint from the API, the per id endpoints with the ids the importer would request."""
+    session = requests.Session()
+    os.makedirs(path, exist_ok=True)
+    recorded = {}
+
+    def get(endpoint: str, params: dict | None = None):
+        response = session.get(f"{api_url}/{endpoint}", params=params, timeout=60)
+        response.raise_for_status()
+        return response.json().get("data", [])
+
+    for table, (endpoint, per_id) in ENDPOINTS.items():
+        if not per_id:
+            recorded[table] = get(endpoint)
+            continue
+        key, source = per_id
+        rows = []
+        for row in recorded[source]:
+            if table == "item_attribute" and not row.get("is_game_related"):
+                continue
+            if table == "orbit_distance" and not row.get("is_available"):
+                continue
+            if table == "commodity_route" and not (row.get("price_buy") and row.get("price_sell")):
+                continue
+            rows += get(endpoint, {key: row["id"]})
+        recorded[table] = rows
+
+    for table, (endpoint, _per_id) in ENDPOINTS.items():
+        with open(os.path.join(path, f"{endpoint}.json"), "w", encoding="UTF-8") as file:
+            json.dump({"status": "ok", "data": recorded[table]}, file)
+
+
+def start_fixture_server(fixture: dict[str, list | dict], latency_ms: float) -> ThreadingHTTPServer:
+    """Serves the fixture like the UEX API, after latency_ms per request. Per id requests get the rows of the id.
+
+    All responses are encoded up front, so serving them takes as little time as possible of the importing process.
+    """
+
+    def encode(rows: list | dict) -> bytes:
+        return json.dumps({"status": "ok", "data": rows}).encode()
+
+    responses = {}
+    for table, rows in fixture.items():
+        endpoint, per_id = ENDPOINTS[table]
+        responses[(endpoint, None)] = encode(rows)
+        if per_id:
+            key = per_id[0]
+            grouped = {}
+            for row in rows:
+                # e.g. orbit distances are requested per id_star_system, but have an id_star_system_origin
+                grouped.setdefault(str(row.get(key, row.get(f"{key}_origin"))), []).append(row)
+            for value, group in grouped.items():
+                responses[(endpoint, (key, value))] = encode(group)
+    empty = encode([])
+
+    class FixtureRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qsl(url.query)
+            body = responses.get((url.path.strip("/"), params[0] if params else None), empty)
+            time.sleep(latency_ms / 1000)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_import(mode: str, api_url: str, trace_memory: bool = False) -> tuple[float, int, int, dict, int]:
+    """Imports into a fresh database. Returns wall time, peak memory, rows, per table stats and errors."""
+    with tempfile.TemporaryDirectory() as data_path:
+        helper = BenchmarkHelper(data_path, api_url)
+        # the models get the helper via Helper.get_instance()
+        Helper._instance = helper
+        if mode == "legacy":
+            handler = LegacyImportHandler(helper)
+        else:
+            handler = ImportHandler(helper)
+        helper.handler_import = handler
+
+        if trace_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        if mode == "legacy":
+            rows = handler.import_data()
+            table_stats = handler.stats
+        else:
+            handler.import_data(True)
+            table_stats = handler.get_import_stats()
+            rows = sum(stats["changed"] for stats in table_stats.values())
+        seconds = time.perf_counter() - start_time
+        peak = 0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        helper.get_database().destroy()
+        Helper._instance = None
+        return seconds, peak, rows, table_stats, helper.get_handler_error().errors
+
+
+def main(args: argparse.Namespace):
+    if args.record_from:
+        if not args.fixture:
+            raise ValueError("--record-from needs a --fixture directory to record into")
+        record_fixture(args.record_from, args.fixture)
+    if args.fixture:
+        fixture = load_fixture(args.fixture)
+    else:
+        fixture = generate_fixture(random.Random(args.seed), args.scale)
+
+    server = start_fixture_server(fixture, args.latency)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    stats = LatencyStats()
+    lines = []
+    table_stats = {}
+
+    for mode in ("legacy", "bulk"):
+        for _ in range(args.iterations):
+            seconds, _peak, rows, table_stats[mode], errors = run_import(mode, api_url)
+            stats.add(f"[{mode}] full import", seconds * 1000)
+        _seconds, peak, _rows, _table_stats, _errors = run_import(mode, api_url, trace_memory=True)
+        lines.append(
+            f"[{mode}] {rows} rows, peak memory {peak / 1024 / 1024:.1f} MiB (tracemalloc), {errors} error(s)"
+        )
+
+    lines.append(f"{'table':<24} {'rows':>8} {'legacy rows/s':>14} {'bulk rows/s':>12} {'fetch (bulk)':>13}")
+    for table in ENDPOINTS:
+        legacy = table_stats["legacy"].get(table, {})
+        bulk = table_stats["bulk"].get(table, {})
+        lines.append(
+            f"{table:<24} {bulk.get('changed', 0):>8} {legacy.get('rows_per_second', 0):>14} "
+            f"{bulk.get('rows_per_second', 0):>12} {bulk.get('fetch_time', 0):>12.2f}s"
+        )
+
+    server.shutdown()
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor for the rows of the big tables of a generated fixture.",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=3, help="Full imports per importer."
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=50,
+        help="Delay of every API response in ms, like the round trip to the UEX API.",
+    )
+    parser.add_argument(
+        "--fixture", help="Directory of a recorded fixture (generated if not set)."
+    )
+    parser.add_argument(
+        "--record-from",
+        help="UEX API url to record the fixture from into --fixture first.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
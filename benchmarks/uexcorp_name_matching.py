@@ -0,0 +1,280 @@
+"""Lookup latency and LLM calls of the uexcorp skill's name matching, difflib plus an LLM call vs. the name index.
+
+Names are searched like the validators of the tools do (ships, commodities, locations and items), with searches the
+way speech to text and the LLM hand them over: exact, lowercased, with typos, spelled like they sound, with number
+words, joined or split words, without the manufacturer and as initials. The previous find_closest_match hashed the
+whole name list for its cache key, ran difflib.get_close_matches and a substring check over all names and asked the
+LLM for every search that wasn't an exact match. Now the validators keep a NameIndex per name list and the LLM is only
+asked if the index can't tell. The LLM is simulated by an oracle that knows the meant name, if it's in the candidates.
+Shows how many searches got the meant name (confidently from the index, from the LLM or not at all), how many were
+confidently wrong and how many LLM calls were avoided.
+
+Usage (from the repository root):
+    python -m benchmarks.uexcorp_name_matching --items 5000 --searches 500
+"""
+
+import argparse
+import asyncio
+import difflib
+import random
+import time
+from collections import Counter
+from types import SimpleNamespace
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.printr import Printr
+from skills.uexcorp.uexcorp.api.llm import Llm
+from skills.uexcorp.uexcorp.database.name_index import NameIndex
+
+printr = Printr()
+
+SHIPS = [
+    "Aegis Avenger Titan", "Aegis Eclipse", "Aegis Gladius", "Aegis Hammerhead", "Aegis Idris-P", "Aegis Reclaimer",
+    "Aegis Sabre", "Aegis Vanguard Warden", "Anvil Arrow", "Anvil C8X Pisces Expedition", "Anvil Carrack",
+    "Anvil Carrack Expedition", "Anvil F7C Hornet Mk II", "Anvil F7C-M Super Hornet Mk II", "Anvil Hurricane",
+    "Anvil Terrapin", "Anvil Valkyrie", "Argo MOLE", "Argo MPUV Cargo", "Argo RAFT", "Banu Defender",
+    "Crusader A2 Hercules Starlifter", "Crusader C2 Hercules Starlifter", "Crusader M2 Hercules Starlifter",
+    "Crusader Mercury Star Runner", "Crusader Spirit C1", "Drake Caterpillar", "Drake Corsair", "Drake Cutlass Black",
+    "Drake Cutlass Red", "Drake Cutter", "Drake Vulture", "Esperia Prowler", "Gatac Syulen", "MISC Freelancer MAX",
+    "MISC Hull C", "MISC Prospector", "MISC Starfarer", "Origin 300i", "Origin 400i", "Origin 600i Explorer",
+    "Origin 890 Jump", "RSI Aurora MR", "RSI Constellation Andromeda", "RSI Constellation Taurus", "RSI Polaris",
+    "RSI Scorpius", "RSI Zeus Mk II CL", "Tumbril Cyclone", "Tumbril Nova",
+]
+
+COMMODITIES = [
+    "Agricium", "Agricultural Supplies", "Aluminum", "Astatine", "Beryl", "Bexalite", "Borase", "Compboard",
+    "Copper", "Corundum", "Diamond", "Distilled Spirits", "E'tam", "Gold", "Hadanite", "Hephaestanite", "Laranite",
+    "Medical Supplies", "Neon", "Processed Food", "Quantainium", "Quartz", "Recycled Material Composite",
+    "Revenant Tree Pollen", "Scrap", "Stims", "Taranite", "Titanium", "Tungsten", "Waste", "WiDoW",
+]
+
+LOCATIONS = [
+    "Stanton", "Pyro", "Hurston", "Crusader", "ArcCorp", "microTech", "Lorville", "Orison", "Area18", "New Babbage",
+    "Port Olisar", "Port Tressler", "Everus Harbor", "Baijini Point", "Seraphim Station", "Grim HEX", "Arial", "Aberdeen",
+    "Magda", "Ita", "Cellin", "Daymar", "Yela", "Lyria", "Wala", "Calliope", "Clio", "Euterpe",
+    "HUR-L1 Green Glade Station", "HUR-L2 Faithful Dream Station", "CRU-L1 Ambitious Dream Station",
+    "ARC-L1 Wide Forest Station", "MIC-L1 Shallow Frontier Station", "Shubin Mining Facility SCD-1",
+    "Benson Mining Outpost", "Deakins Research Outpost", "Hickes Research Outpost", "Jumptown", "Paradise Cove",
+    "Brio's Breaker Yard", "Admin - Port Olisar", "TDD - Trade and Development Division - Area 18",
+    "Central Business District", "Covalex Distribution Centre S4DC05", "Ruin Station", "Checkmate", "Orbituary",
+]
+
+ITEM_MAKERS = ["Behring", "Klaus & Werner", "Gallenson", "Knightbridge", "Hurston Dynamics", "Preacher", "Amon & Reese"]
+ITEM_WORDS = [
+    "Arrowhead", "Devastator", "Karna", "Gallant", "Attrition", "Omnisky", "Deadbolt", "Sawbuck", "Strife", "Mantis",
+    "Tarantula", "Revenant", "Panther", "Scourge", "Salvo", "Coda", "Pulverizer", "Lumin", "Cyclone", "Hellion",
+]
+ITEM_TYPES = ["Sniper Rifle", "Rifle", "Pistol", "Cannon", "Repeater", "Shotgun", "Helmet", "Core", "Arms", "Legs"]
+
+NUMBER_WORDS = {digit: word for word, digit in NameIndex.NUMBER_WORDS.items()}
+RESPELLINGS = [("c", "k"), ("ph", "f"), ("y", "i"), ("ur", "er"), ("ll", "l"), ("x", "ks"), ("qu", "kw"), ("ee", "ea")]
+
+
+class LegacyLlm:
+    """A replica of the previous Llm.find_closest_match, up to where it asked the LLM."""
+
+    def __init__(self):
+        self.cache_search = {}
+
+    def find_close_matches(self, search: str, lst: list[str]) -> tuple[str | None, list[str]]:
+        checksum = f"{hash(frozenset(lst))}-{hash(search)}"
+        if checksum in self.cache_search:
+            return self.cache_search[checksum], []
+        if search in lst:
+            return search, []
+        close_matches = difflib.get_close_matches(search, lst, n=10, cutoff=0.4)
+        close_matches.extend(item for item in lst if search.lower() in item.lower() and item not in close_matches)
+        return None, close_matches
+
+
+class OracleWingman:
+    """Answers like an LLM that knows which name was meant, if it's in the list of the prompt."""
+
+    def __init__(self):
+        self.meant = None
+        self.calls = 0
+
+    async def actual_llm_call(self, messages: list[dict]):
+        self.calls += 1
+        prompt = messages[0]["content"]
+        candidates = prompt.split("represents this value best: ", 1)[1].split("\n", 1)[0].split(", ")
+        answer = self.meant if self.meant in candidates else "None"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+
+class BenchmarkHelper:
+    """What Llm needs of the skill's Helper."""
+
+    def __init__(self, wingman: OracleWingman):
+        self.wingman = wingman
+        self.context = []
+
+    def get_handler_debug(self) -> "BenchmarkHelper":
+        return self
+
+    def get_handler_error(self) -> "BenchmarkHelper":
+        return self
+
+    def get_handler_config(self) -> "BenchmarkHelper":
+        return self
+
+    def get_wingman(self) -> OracleWingman:
+        return self.wingman
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def add_context(self, context: str):
+        self.context.append(context)
+
+
+def generate_items(rng: random.Random, count: int) -> list[str]:
+    items = set()
+    while len(items) < count:
+        name = f"{rng.choice(ITEM_WORDS)} {rng.choice(ITEM_TYPES)}"
+        if rng.random() < 0.4:
+            name = f"{rng.choice(ITEM_MAKERS)} {name}"
+        if rng.random() < 0.5:
+            name += f" {rng.choice(['S', 'Mk ', ''])}{rng.randint(1, 12)}"
+        if rng.random() < 0.3:
+            name += f" \"{rng.choice(ITEM_WORDS)} Edition\""
+        items.add(name)
+    return sorted(items)
+
+
+def speak(rng: random.Random, name: str, variant: str) -> str | None:
+    """The name like it comes from speech to text, None if the variant doesn't apply to it."""
+    words = name.replace("-", " ").split()
+    long_words = [index for index, word in enumerate(words) if len(word) >= 5 and word.isalpha()]
+    if variant == "exact":
+        return name
+    if variant == "lowercase":
+        return name.lower().replace("-", " ")
+    if variant == "typo" and long_words:
+        index = rng.choice(long_words)
+        word = words[index]
+        position = rng.randrange(1, len(word) - 1)
+        operation = rng.choice(["replace", "delete", "double"])
+        if operation == "replace":
+            word = word[:position] + rng.choice("aeioumnrst") + word[position + 1:]
+        elif operation == "delete":
+            word = word[:position] + word[position + 1:]
+        else:
+            word = word[:position] + word[position] + word[position:]
+        words[index] = word
+        return " ".join(words)
+    if variant == "sound":
+        for source, target in rng.sample(RESPELLINGS, len(RESPELLINGS)):
+            if source in name.lower():
+                return name.lower().replace(source, target)
+        return None
+    if variant == "number words" and any(word.isdigit() and word in NUMBER_WORDS for word in words):
+        return " ".join(NUMBER_WORDS.get(word, word) for word in words)
+    if variant == "spacing" and len(words) > 1:
+        index = rng.randrange(len(words) - 1)
+        return " ".join(words[:index] + [words[index] + words[index + 1].lower()] + words[index + 2:])
+    if variant == "spacing" and long_words:
+        word = words[long_words[0]]
+        return " ".join(words[:long_words[0]] + [word[:len(word) // 2], word[len(word) // 2:]] + words[long_words[0] + 1:])
+    if variant == "without maker" and len(words) > 2:
+        return " ".join(words[1:])
+    if variant == "initials" and len(words) > 1 and all(word[0].isalpha() for word in words):
+        return "".join(word[0] for word in words).upper()
+    return None
+
+
+VARIANTS = ["exact", "lowercase", "typo", "sound", "number words", "spacing", "without maker", "initials"]
+
+
+async def run(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    lists = {
+        "ship": SHIPS,
+        "commodity": COMMODITIES,
+        "location": LOCATIONS,
+        "item": generate_items(rng, args.items),
+    }
+
+    stats = LatencyStats()
+    lines = []
+    results = {}
+    for key, names in lists.items():
+        start_time = time.perf_counter()
+        index = NameIndex(names)
+        lines.append(f"{key}: {len(names)} name(s), index built in {(time.perf_counter() - start_time) * 1000:.1f}ms")
+
+        searches = []
+        while len(searches) < args.searches:
+            meant = rng.choice(names)
+            variant = rng.choice(VARIANTS)
+            search = speak(rng, meant, variant)
+            if search:
+                searches.append((variant, meant, search))
+
+        legacy = LegacyLlm()
+        wingman = OracleWingman()
+        llm = Llm(BenchmarkHelper(wingman))
+        for variant, meant, search in searches:
+            result = results.setdefault(variant, Counter())
+
+            start_time = time.perf_counter()
+            match, close_matches = legacy.find_close_matches(search, names)
+            stats.add(f"[legacy] {key}", (time.perf_counter() - start_time) * 1000)
+            result["searches"] += 1
+            if match is None:
+                result["legacy llm calls"] += 1 if close_matches else 0
+                result["legacy found"] += 1 if meant in close_matches else 0
+            else:
+                result["legacy found"] += 1 if match == meant else 0
+
+            wingman.meant = meant
+            calls = wingman.calls
+            start_time = time.perf_counter()
+            matches = index.search(search)
+            confident = index.get_confident_match(matches)
+            stats.add(f"[index] {key}", (time.perf_counter() - start_time) * 1000)
+            match, _options = await llm.find_closest_match(search, index)
+            result["index llm calls"] += wingman.calls - calls
+            if match == meant:
+                result["index found"] += 1
+            if confident is not None and confident != meant and search not in index:
+                result["index confidently wrong"] += 1
+
+    lines.append("")
+    lines.append(
+        f"{'variant':<15}{'searches':>9}{'legacy found':>14}{'legacy LLM':>12}"
+        f"{'index found':>13}{'index LLM':>11}{'wrong':>7}{'LLM avoided':>13}"
+    )
+    total = Counter()
+    for variant in VARIANTS + ["total"]:
+        result = total if variant == "total" else results.get(variant, Counter())
+        if variant != "total":
+            total.update(result)
+        avoided = 1 - result["index llm calls"] / result["legacy llm calls"] if result["legacy llm calls"] else 0
+        lines.append(
+            f"{variant:<15}{result['searches']:>9}{result['legacy found']:>14}{result['legacy llm calls']:>12}"
+            f"{result['index found']:>13}{result['index llm calls']:>11}{result['index confidently wrong']:>7}"
+            f"{avoided:>13.0%}"
+        )
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--items",
+        type=int,
+        default=5000,
+        help="Number of generated item names, like the items of a full UEX import.",
+    )
+    parser.add_argument(
+        "--searches",
+        type=int,
+        default=500,
+        help="Searches per name list.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
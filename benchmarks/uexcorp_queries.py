@@ -0,0 +1,477 @@
+"""Query latency of the uexcorp skill's database over a fully imported dataset, before and after the WAL storage.
+
+Generates a dataset the size of a full UEX import (prices, routes, items and locations of all star systems) and runs
+the queries the models and tools send via the data_access classes (built with the skill's Filter). The previous
+storage had no indexes and shared one connection and cursor between all threads, guarded by a flag polled every
+100ms. The concurrent run reads from several threads while another one re-imports prices and shows the latency under
+load and how many reads returned the rows of another query (or failed). It only runs against the WAL storage: reading
+from the shared cursor of the previous one in several threads can crash the interpreter.
+
+Usage (from the repository root):
+    python -m benchmarks.uexcorp_queries --scale 1.0 --iterations 20 --readers 4
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.printr import Printr
+from skills.uexcorp.uexcorp.database.database import Database
+from skills.uexcorp.uexcorp.database.filter import Filter
+
+printr = Printr()
+
+INIT_SQL = os.path.join("skills", "uexcorp", "uexcorp", "database", "init.sql")
+
+TABLE_SIZES = {
+    "star_system": 5,
+    "planet": 40,
+    "orbit": 60,
+    "moon": 120,
+    "city": 20,
+    "outpost": 250,
+    "poi": 400,
+    "space_station": 80,
+    "terminal": 900,
+    "category": 150,
+    "company": 150,
+    "commodity": 200,
+    "commodity_price": 12000,
+    "commodity_raw_price": 2000,
+    "commodity_route": 60000,
+    "item": 12000,
+    "item_price": 60000,
+    "item_attribute": 150000,
+    "vehicle": 300,
+    "vehicle_purchase_price": 1500,
+    "vehicle_rental_price": 1500,
+}
+"""Rows per table at scale 1.0, about the size of a full UEX import."""
+
+
+class BenchmarkHelper:
+    """What Database needs of the skill's Helper."""
+
+    def get_handler_debug(self) -> "BenchmarkHelper":
+        return self
+
+    def write(self, message: str, *args):
+        pass
+
+
+class LegacyDatabase:
+    """A replica of the previous Database (one shared connection and cursor, no indexes)."""
+
+    def __init__(self, data_path: str):
+        self.connection = sqlite3.connect(
+            os.path.join(data_path, "legacy.db"), check_same_thread=False
+        )
+        self.connection.row_factory = sqlite3.Row
+        self.cursor = self.connection.cursor()
+        self.__inuse = False
+        self.__queue_wait_time_max = 30
+        with open(INIT_SQL, "r", encoding="UTF-8") as file:
+            self.cursor.executescript(file.read())
+
+    def get_connection(self) -> sqlite3.Connection:
+        return self.connection
+
+    def get_cursor(self) -> sqlite3.Cursor:
+        return self.cursor
+
+    def execute(self, sql: str, parameters: tuple | dict | list = ()) -> bool:
+        self.__wait_for_database_capacity()
+        self.__inuse = True
+        self.get_cursor().execute(sql, parameters)
+        self.__inuse = False
+        return True
+
+    def fetch_all(self, sql: str, parameters: tuple | dict | list = ()):
+        """Like the previous DataAccess._fetch_all: execute, then fetch from the shared cursor."""
+        self.execute(sql, parameters)
+        return self.get_cursor().fetchall()
+
+    def commit(self):
+        self.connection.commit()
+
+    def __wait_for_database_capacity(self) -> None:
+        if self.__inuse:
+            for _ in range(int(self.__queue_wait_time_max / 0.1)):
+                if not self.__inuse:
+                    break
+                time.sleep(0.1)
+            self.__inuse = False
+
+
+def generate_dataset(rng: random.Random, scale: float) -> dict[str, list[dict]]:
+    sizes = {
+        table: max(1, int(size * scale)) if size > 500 else size
+        for table, size in TABLE_SIZES.items()
+    }
+
+    def ids(table: str) -> range:
+        return range(1, sizes[table] + 1)
+
+    def pick(table: str) -> int:
+        return rng.randint(1, sizes[table])
+
+    planets = {planet: pick("star_system") for planet in ids("planet")}
+    moons = {moon: pick("planet") for moon in ids("moon")}
+
+    def location(table: str, index: int, on_moon: bool = True) -> dict:
+        id_moon = pick("moon") if on_moon and rng.random() < 0.5 else 0
+        id_planet = moons[id_moon] if id_moon else pick("planet")
+        return {
+            "id": index,
+            "name": f"{table} {index}",
+            "id_star_system": planets[id_planet],
+            "id_planet": id_planet,
+            "id_moon": id_moon,
+            "id_orbit": pick("orbit"),
+            "is_available": 1,
+            "is_available_live": 1,
+        }
+
+    data = {
+        "star_system": [
+            {"id": index, "name": f"System {index}", "is_available": 1}
+            for index in ids("star_system")
+        ],
+        "planet": [
+            {"id": index, "name": f"Planet {index}", "id_star_system": star_system}
+            for index, star_system in planets.items()
+        ],
+        "orbit": [
+            {"id": index, "name": f"Orbit {index}", "id_star_system": pick("star_system")}
+            for index in ids("orbit")
+        ],
+        "moon": [
+            {
+                "id": index,
+                "name": f"Moon {index}",
+                "id_planet": planet,
+                "id_star_system": planets[planet],
+            }
+            for index, planet in moons.items()
+        ],
+        "category": [
+            {"id": index, "name": f"Category {index}", "is_game_related": 1}
+            for index in ids("category")
+        ],
+        "company": [
+            {"id": index, "name": f"Company {index}"} for index in ids("company")
+        ],
+        "commodity": [
+            {"id": index, "name": f"Commodity {index}", "is_available": 1}
+            for index in ids("commodity")
+        ],
+        "item": [
+            {
+                "id": index,
+                "name": f"Item {index}",
+                "id_category": pick("category"),
+                "id_company": pick("company"),
+            }
+            for index in ids("item")
+        ],
+        "vehicle": [
+            {
+                "id": index,
+                "name": f"Vehicle {index}",
+                "name_full": f"Company Vehicle {index}",
+                "id_company": pick("company"),
+            }
+            for index in ids("vehicle")
+        ],
+    }
+    for table in ["city", "outpost", "poi", "space_station"]:
+        data[table] = [location(table, index) for index in ids(table)]
+    data["terminal"] = [
+        {
+            **location("terminal", index, on_moon=False),
+            "type": rng.choice(["commodity", "item", "vehicle_buy", "vehicle_rent"]),
+            "id_city": pick("city") if rng.random() < 0.2 else 0,
+            "id_space_station": pick("space_station") if rng.random() < 0.3 else 0,
+        }
+        for index in ids("terminal")
+    ]
+    for table, column, source, price_column in [
+        ("commodity_price", "id_commodity", "commodity", "price_buy"),
+        ("commodity_raw_price", "id_commodity", "commodity", "price_sell"),
+        ("item_price", "id_item", "item", "price_buy"),
+        ("vehicle_purchase_price", "id_vehicle", "vehicle", "price_buy"),
+        ("vehicle_rental_price", "id_vehicle", "vehicle", "price_rent"),
+    ]:
+        data[table] = [
+            {
+                "id": index,
+                column: pick(source),
+                "id_terminal": pick("terminal"),
+                price_column: round(rng.uniform(1, 10000), 2),
+            }
+            for index in ids(table)
+        ]
+    data["item_attribute"] = [
+        {
+            "id": index,
+            "id_item": pick("item"),
+            "id_category": pick("category"),
+            "value": str(rng.randint(1, 100)),
+        }
+        for index in ids("item_attribute")
+    ]
+    data["commodity_route"] = [
+        {
+            "id": index,
+            "id_commodity": pick("commodity"),
+            "commodity_name": f"Commodity {pick('commodity')}",
+            "id_terminal_origin": pick("terminal"),
+            "id_terminal_destination": pick("terminal"),
+            "price_margin": round(rng.uniform(-100, 1000), 2),
+        }
+        for index in ids("commodity_route")
+    ]
+    return data
+
+
+def import_dataset(database: Database | LegacyDatabase, data: dict[str, list[dict]]):
+    connection = database.get_connection()
+    for table, rows in data.items():
+        columns = list(rows[0].keys())
+        connection.executemany(
+            f"INSERT OR REPLACE INTO {table} ({','.join(f'`{column}`' for column in columns)})"
+            f" VALUES ({','.join(['?'] * len(columns))})",
+            [tuple(row[column] for column in columns) for row in rows],
+        )
+    connection.commit()
+
+
+def build_query(table: str, *wheres: tuple) -> tuple[str, dict]:
+    """Builds the SQL like DataAccess does."""
+    query_filter = Filter(table)
+    for where in wheres:
+        query_filter.where(*where)
+    sql = f"""
+            SELECT  {table}.*
+            FROM {table}
+            {query_filter.resolve_joins()}
+            {query_filter.resolve_where()}
+            {query_filter.resolve_order_by()}
+            {query_filter.resolve_limit()} {query_filter.resolve_offset()}
+        """
+    return sql, query_filter.get_bind()
+
+
+def generate_queries(
+    rng: random.Random, data: dict[str, list[dict]], count: int
+) -> list[tuple[str, str, dict]]:
+    """(label, sql, binds) like the ones of the models (prices of a terminal, locations of a planet, ...) and tools."""
+
+    def pick(table: str, column: str = "id"):
+        return rng.choice(data[table])[column]
+
+    shapes = [
+        ("Prices of a terminal", lambda: build_query("commodity_price", ("id_terminal", pick("terminal")))),
+        ("Prices of a commodity", lambda: build_query("commodity_price", ("id_commodity", pick("commodity")))),
+        ("Prices of an item", lambda: build_query("item_price", ("id_item", pick("item")))),
+        ("Attributes of an item", lambda: build_query("item_attribute", ("id_item", pick("item")))),
+        (
+            "Items of categories",
+            lambda: build_query("item", ("id_category", [pick("category") for _ in range(3)])),
+        ),
+        (
+            "Outposts of a planet",
+            lambda: build_query("outpost", ("id_planet", pick("planet")), ("id_moon", 0)),
+        ),
+        ("POIs of a moon", lambda: build_query("poi", ("id_moon", pick("moon")))),
+        (
+            "Terminals of a station",
+            lambda: build_query("terminal", ("id_space_station", pick("space_station"))),
+        ),
+        (
+            "Routes from terminals",
+            lambda: build_query(
+                "commodity_route",
+                ("id_terminal_origin", [pick("terminal") for _ in range(10)]),
+            ),
+        ),
+        (
+            "Vehicle by name",
+            lambda: build_query("vehicle", ("name_full", pick("vehicle", "name_full"))),
+        ),
+    ]
+    queries = []
+    for _ in range(count):
+        for label, build in shapes:
+            sql, binds = build()
+            queries.append((label, sql, binds))
+    return queries
+
+
+def run_sequential(
+    mode: str,
+    database: Database | LegacyDatabase,
+    queries: list[tuple[str, str, dict]],
+    stats: LatencyStats,
+) -> list[int]:
+    counts = []
+    for label, sql, binds in queries:
+        start_time = time.perf_counter()
+        rows = database.fetch_all(sql, binds)
+        stats.add(f"[{mode}] {label}", (time.perf_counter() - start_time) * 1000)
+        counts.append(len(rows))
+    return counts
+
+
+def run_concurrent(
+    mode: str,
+    database: Database,
+    queries: list[tuple[str, str, dict]],
+    expected: list[int],
+    data: dict[str, list[dict]],
+    readers: int,
+    stats: LatencyStats,
+) -> str:
+    """Runs the queries from several threads while another one re-imports commodity prices (same rows)."""
+    wrong = 0
+    errors = 0
+    lock = threading.Lock()
+    importing = threading.Event()
+    importing.set()
+
+    def read(offset: int):
+        nonlocal wrong, errors
+        for index in range(offset, len(queries), readers):
+            label, sql, binds = queries[index]
+            start_time = time.perf_counter()
+            try:
+                rows = database.fetch_all(sql, binds)
+            except Exception:
+                with lock:
+                    errors += 1
+                continue
+            stats.add(f"[{mode}] {label}", (time.perf_counter() - start_time) * 1000)
+            if len(rows) != expected[index]:
+                with lock:
+                    wrong += 1
+
+    def write():
+        nonlocal errors
+        rows = data["commodity_price"]
+        columns = list(rows[0].keys())
+        sql = (
+            f"INSERT OR REPLACE INTO commodity_price ({','.join(f'`{column}`' for column in columns)})"
+            f" VALUES ({','.join(['?'] * len(columns))})"
+        )
+        while importing.is_set():
+            for index, row in enumerate(rows):
+                if not importing.is_set():
+                    break
+                try:
+                    database.execute(sql, tuple(row[column] for column in columns))
+                    # commits like the import handler does, at the end of a table
+                    if index == len(rows) - 1:
+                        database.commit()
+                except Exception:
+                    with lock:
+                        errors += 1
+        database.commit()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    threads = [threading.Thread(target=read, args=(offset,)) for offset in range(readers)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start_time
+    importing.clear()
+    writer.join()
+    return (
+        f"[{mode}] {len(queries) / seconds:.0f} queries/s with {readers} readers during an import, "
+        f"{wrong} wrong result(s), {errors} error(s)"
+    )
+
+
+def explain(database: Database, queries: list[tuple[str, str, dict]]) -> list[str]:
+    lines = []
+    seen = set()
+    for label, sql, binds in queries:
+        if label in seen:
+            continue
+        seen.add(label)
+        plan = " / ".join(
+            row["detail"] for row in database.fetch_all(f"EXPLAIN QUERY PLAN {sql}", binds)
+        )
+        lines.append(f"{label}: {plan}")
+    return lines
+
+
+def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    data = generate_dataset(rng, args.scale)
+    queries = generate_queries(rng, data, args.iterations)
+    stats = LatencyStats()
+    lines = []
+
+    with tempfile.TemporaryDirectory() as data_path:
+        # Database deletes all other database files in its directory
+        os.mkdir(os.path.join(data_path, "legacy"))
+        os.mkdir(os.path.join(data_path, "wal"))
+
+        start_time = time.perf_counter()
+        legacy = LegacyDatabase(os.path.join(data_path, "legacy"))
+        import_dataset(legacy, data)
+        lines.append(f"[legacy] imported in {time.perf_counter() - start_time:.1f}s")
+
+        start_time = time.perf_counter()
+        database = Database(
+            os.path.join(data_path, "wal"), "benchmark", BenchmarkHelper()
+        )
+        import_dataset(database, data)
+        lines.append(f"[wal] imported in {time.perf_counter() - start_time:.1f}s")
+
+        legacy_counts = run_sequential("legacy", legacy, queries, stats)
+        expected = run_sequential("wal", database, queries, stats)
+        mismatches = sum(
+            legacy_count != count for legacy_count, count in zip(legacy_counts, expected)
+        )
+        lines.append(f"{mismatches} of {len(queries)} queries returned different rows")
+
+        lines.append(
+            run_concurrent(
+                "wal, concurrent", database, queries, expected, data, args.readers, stats
+            )
+        )
+        lines += explain(database, queries)
+
+        legacy.get_connection().close()
+        database.destroy()
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor for the rows of the big tables (prices, routes, items).",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=20, help="Queries per query shape."
+    )
+    parser.add_argument(
+        "--readers", type=int, default=4, help="Threads reading concurrently."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
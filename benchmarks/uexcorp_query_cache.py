@@ -0,0 +1,305 @@
+"""Latency of repeated tool queries of the uexcorp skill, unique SQL per query vs. compiled query shapes.
+
+Runs queries like the ones of the tools (trade routes between terminals, items by name, prices of items, locations by
+name, ...) over a generated full UEX import, each shape many times with other values. The previous Filter named every
+bind parameter with a uuid, so every query had its own SQL text: it was built from scratch and prepared by sqlite
+every time. Now the bind parameters are named by position, DataAccess compiles the SQL once per data_access class
+and filter shape and sqlite reuses the prepared statement. Both read from the same (WAL) database, so only the query
+building differs. Ends with the slowest queries of the query log and their query plans.
+
+Usage (from the repository root):
+    python -m benchmarks.uexcorp_query_cache --scale 1.0 --iterations 200
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import uuid
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from benchmarks.uexcorp_import import BenchmarkHelper
+from benchmarks.uexcorp_queries import generate_dataset, import_dataset
+from services.printr import Printr
+from skills.uexcorp.uexcorp.data_access.data_access import DataAccess
+from skills.uexcorp.uexcorp.database.filter import Filter
+from skills.uexcorp.uexcorp.helper import Helper
+
+printr = Printr()
+
+
+class LegacyFilter:
+    """A replica of the previous Filter (uuid bind names, binds added while resolving)."""
+
+    def __init__(self, table: str | None = None):
+        self.base_table = table
+        self.wheres = []
+        self.grouped_wheres = []
+        self.limit = None
+        self.offset = None
+        self.binds = {}
+        self.order_by = {}
+
+    def where(self, field: str, value, operation: str | None = None, is_or: bool = False, value_is_field: bool = False):
+        self.wheres.append((field, value, operation, is_or, value_is_field))
+
+    def apply_filter(self, sub_filter: "LegacyFilter", is_or: bool = False):
+        self.binds.update(sub_filter.binds)
+        if sub_filter.wheres:
+            self.grouped_wheres.append({"where": sub_filter.wheres, "is_or": is_or})
+
+    def resolve_order_by(self) -> str:
+        if len(self.order_by) == 0:
+            return ""
+        order_by = "ORDER BY "
+        for field, direction in self.order_by.items():
+            order_by += f"{field} {direction},"
+        return order_by[:-1]
+
+    def resolve_limit(self) -> str:
+        return f"LIMIT {self.limit}" if self.limit is not None else "LIMIT -1"
+
+    def resolve_offset(self) -> str:
+        return f"OFFSET {self.offset}" if self.offset is not None else ""
+
+    def resolve_where(self) -> str:
+        if len(self.wheres) == 0 and len(self.grouped_wheres) == 0:
+            return ""
+
+        def resolve_where_loop(where: list[tuple[str, any, str | None, bool, bool]]) -> str:
+            where_str = ""
+            for i, (field, value, operation, is_or, value_is_field) in enumerate(where):
+                if "." not in field and "(" not in field:
+                    field = f"{self.base_table}.{field}"
+
+                if i > 0:
+                    where_str += " OR " if is_or else " AND "
+
+                param_name = f"param_{uuid.uuid4().hex}"
+                if isinstance(value, bool):
+                    self.binds[param_name] = 1 if value else 0
+                    value = f"{field} {operation if operation is not None else '='} :{param_name}"
+                elif isinstance(value, list):
+                    placeholders = []
+                    for item in value:
+                        item_param_name = f"param_{uuid.uuid4().hex}"
+                        self.binds[item_param_name] = item
+                        placeholders.append(f":{item_param_name}")
+                    value = f"{field} {operation if operation is not None else 'IN'} ({','.join(placeholders)})"
+                elif isinstance(value, int):
+                    self.binds[param_name] = value
+                    if value == 0:
+                        value = f"({field} {operation if operation is not None else '='} :{param_name} OR {field} IS NULL)"
+                    else:
+                        value = f"{field} {operation if operation is not None else '='} :{param_name}"
+                else:
+                    self.binds[param_name] = value
+                    value = f"{field} {operation if operation is not None else '='} :{param_name}"
+
+                where_str += value
+
+            return where_str
+
+        combined_where = "WHERE "
+        if len(self.wheres) > 0:
+            combined_where += resolve_where_loop(self.wheres)
+        if len(self.grouped_wheres) > 0:
+            if len(self.wheres) > 0:
+                combined_where += " AND (" if not self.grouped_wheres[0]["is_or"] else " OR ("
+            else:
+                combined_where += "("
+            for i, grouped_where in enumerate(self.grouped_wheres):
+                if i > 0:
+                    combined_where += " AND (" if not grouped_where["is_or"] else " OR ("
+                combined_where += resolve_where_loop(grouped_where["where"])
+                combined_where += ")"
+        return combined_where
+
+
+def legacy_fetch_all(database, query: dict) -> list:
+    """Like the previous DataAccess._fetch_all: builds the SQL from scratch, then reads."""
+    query_filter = LegacyFilter(query["table"])
+    apply_query(query_filter, LegacyFilter, query)
+    query_filter.order_by.update(query.get("order_by", {}))
+    query_filter.limit = query.get("limit")
+    query_filter.offset = query.get("offset")
+    cols = ""
+    for col, alias in query.get("cols", []):
+        cols += f"{col} AS {alias}, " if alias else f"{col}, "
+    sql = f"""
+            SELECT {cols} {query['table']}.*
+            FROM {query['table']}
+            {query_filter.resolve_where()}
+            {query_filter.resolve_order_by()}
+            {query_filter.resolve_limit()} {query_filter.resolve_offset()}
+        """
+    return database.fetch_all(sql, query_filter.binds)
+
+
+def compiled_fetch_all(query: dict) -> list:
+    data_access = DataAccess(query["table"])
+    apply_query(data_access.get_filter(), Filter, query)
+    for field, direction in query.get("order_by", {}).items():
+        data_access.order_by(field, direction)
+    if query.get("limit") is not None:
+        data_access.limit(query["limit"])
+    if query.get("offset") is not None:
+        data_access.offset(query["offset"])
+    for col, alias in query.get("cols", []):
+        data_access.add_col(col, alias)
+    return data_access._fetch_all()
+
+
+def apply_query(query_filter: Filter | LegacyFilter, filter_class: type, query: dict):
+    for where in query.get("where", []):
+        query_filter.where(*where)
+    for wheres, is_or in query.get("groups", []):
+        grouped_filter = filter_class()
+        for where in wheres:
+            grouped_filter.where(*where)
+        query_filter.apply_filter(grouped_filter, is_or)
+
+
+def generate_queries(rng: random.Random, data: dict[str, list[dict]], count: int) -> list[tuple[str, dict]]:
+    """(label, query) like the ones the tools build via the data_access classes."""
+
+    def pick(table: str, column: str = "id"):
+        return rng.choice(data[table])[column]
+
+    def picks(table: str, low: int, high: int, column: str = "id") -> list:
+        return [pick(table, column) for _ in range(rng.randint(low, high))]
+
+    def location_names(names: list[str]) -> list[tuple]:
+        columns = ["star_system_name", "planet_name", "moon_name", "space_station_name", "city_name", "name"]
+        return [(column, names, None, True) for column in columns]
+
+    def route() -> dict:
+        max_scu = rng.choice([32, 96, 696])
+        return {
+            "table": "commodity_route",
+            "where": [
+                ("id_terminal_origin", picks("terminal", 1, 12)),
+                ("id_terminal_destination", picks("terminal", 1, 3), "NOT IN"),
+            ],
+            "cols": [(f"MIN({max_scu}, scu_origin, scu_destination)", "'scu_origin'")],
+            "order_by": {"price_margin": "DESC", "distance": "ASC"},
+            "limit": rng.randint(1, 15),
+            "offset": rng.choice([None, 0, 1, 2]),
+        }
+
+    shapes = [
+        ("Trade routes between terminals", route),
+        (
+            "Terminals by location names",
+            lambda: {
+                "table": "terminal",
+                "where": [("type", "commodity"), ("is_available", True)],
+                "groups": [(location_names(picks("terminal", 1, 2, "name")), False)],
+            },
+        ),
+        (
+            "Items by name search",
+            lambda: {
+                "table": "item",
+                "groups": [
+                    (
+                        [("LOWER(name)", f"%{part}%", "LIKE", True) for part in picks("item", 1, 3, "id")],
+                        False,
+                    )
+                ],
+            },
+        ),
+        (
+            "Item prices at terminals",
+            lambda: {
+                "table": "item_price",
+                "where": [("id_terminal", picks("terminal", 1, 40)), ("price_buy", 0, ">")],
+            },
+        ),
+        (
+            "Outposts of a planet",
+            lambda: {"table": "outpost", "where": [("id_planet", pick("planet")), ("id_moon", 0)]},
+        ),
+        (
+            "Attributes of categories",
+            lambda: {"table": "item_attribute", "where": [("id_category", picks("category", 1, 5))], "limit": 100},
+        ),
+        (
+            "Vehicle by name",
+            lambda: {"table": "vehicle", "where": [("name_full", pick("vehicle", "name_full"))], "limit": 1},
+        ),
+    ]
+    queries = []
+    for _ in range(count):
+        for label, build in shapes:
+            queries.append((label, build()))
+    return queries
+
+
+def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    data = generate_dataset(rng, args.scale)
+    queries = generate_queries(rng, data, args.iterations)
+
+    stats = LatencyStats()
+    lines = []
+    with tempfile.TemporaryDirectory() as data_path:
+        helper = BenchmarkHelper(data_path, "")
+        # the data_access classes get the helper via Helper.get_instance()
+        Helper._instance = helper
+        database = helper.get_database()
+        import_dataset(database, data)
+
+        counts = {"legacy": [], "compiled": []}
+        seconds = {"legacy": 0.0, "compiled": 0.0}
+        for index, (label, query) in enumerate(queries):
+            # alternating, so neither mode runs on a warmer page cache
+            for mode in ("legacy", "compiled") if index % 2 else ("compiled", "legacy"):
+                start_time = time.perf_counter()
+                rows = legacy_fetch_all(database, query) if mode == "legacy" else compiled_fetch_all(query)
+                query_seconds = time.perf_counter() - start_time
+                stats.add(f"[{mode}] {label}", query_seconds * 1000)
+                seconds[mode] += query_seconds
+                counts[mode].append(len(rows))
+        for mode, mode_seconds in seconds.items():
+            lines.append(f"[{mode}] {len(queries) / mode_seconds:.0f} queries/s")
+
+        different = sum(1 for legacy, compiled in zip(counts["legacy"], counts["compiled"]) if legacy != compiled)
+        lines.append(f"{len(queries)} queries, {different} with a different row count")
+        lines.append(
+            f"[legacy] {len(queries)} distinct SQL text(s), "
+            f"[compiled] {len(database.get_query_log().get_entries())} distinct SQL text(s)"
+        )
+        lines.append("")
+        lines.append(database.get_query_log().get_report(limit=args.explain))
+
+        database.destroy()
+        Helper._instance = None
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor for the rows of the big tables (prices, routes, items).",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Runs of each query shape, every run with other values.",
+    )
+    parser.add_argument(
+        "--explain",
+        type=int,
+        default=5,
+        help="Number of the slowest queries to show with their query plans.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,197 @@
+"""Cost of re-importing the uexcorp skill's data after the UEX data changed a little or not at all, full rewrites vs.
+the delta sync.
+
+Replays a sequence of API snapshots from a local fixture server (see uexcorp_import). The first snapshot is a full
+import into a fresh database, every further one a sync of all tables, as if all cache lifetimes had expired. "full"
+forgets the content hashes before every sync, so every table is written completely like before the delta sync.
+"delta" skips unchanged tables and only writes the rows that changed. After every sync, the tables of both databases
+are compared.
+
+Generated snapshots: unchanged, then 1% and 10% of the rows of the price, route and alert tables changed, some of
+them removed and added. Recorded snapshots are fixture directories recorded with uexcorp_import --record-from.
+
+Usage (from the repository root):
+    python -m benchmarks.uexcorp_sync --scale 1.0 --latency 50
+    python -m benchmarks.uexcorp_sync --fixtures uex_monday uex_tuesday uex_wednesday
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from benchmarks.uexcorp_import import (
+    ENDPOINTS,
+    BenchmarkHelper,
+    generate_fixture,
+    load_fixture,
+    start_fixture_server,
+)
+from services.printr import Printr
+from skills.uexcorp.uexcorp.handler.import_handler import ImportHandler
+from skills.uexcorp.uexcorp.helper import Helper
+
+printr = Printr()
+
+CHANGING_TABLES = [
+    "commodity_alert",
+    "commodity_price",
+    "commodity_raw_price",
+    "commodity_route",
+    "fuel_price",
+    "item_price",
+    "refinery_audit",
+    "vehicle_purchase_price",
+    "vehicle_rental_price",
+]
+"""Tables of a generated fixture that change between snapshots, like prices do between imports."""
+
+
+def mutate_fixture(
+    rng: random.Random, fixture: dict[str, list | dict], fraction: float
+) -> dict[str, list | dict]:
+    """A copy with the given fraction of the rows of the changing tables changed, a tenth of those removed and added."""
+    snapshot = dict(fixture)
+    for table in CHANGING_TABLES:
+        rows = list(fixture[table])
+        count = max(1, int(len(rows) * fraction))
+        for index in rng.sample(range(len(rows)), count):
+            row = dict(rows[index])
+            # a price where there is one, e.g. refinery audits have none
+            column = next(
+                (column for column in row if column.startswith(("price", "scu"))),
+                next(column for column, value in row.items() if isinstance(value, float) or column == "date_added"),
+            )
+            row[column] = round(rng.uniform(1, 10000), 2)
+            rows[index] = row
+
+        replaced = count // 10
+        if replaced:
+            next_id = max(row.get("id") or 0 for row in rows) + 1
+            start = rng.randrange(len(rows) - replaced)
+            del rows[start:start + replaced]
+            for offset in range(replaced):
+                row = dict(rng.choice(rows))
+                if "id" in row:
+                    row["id"] = next_id + offset
+                rows.append(row)
+        snapshot[table] = rows
+    return snapshot
+
+
+def generate_snapshots(rng: random.Random, scale: float) -> list[tuple[str, dict]]:
+    fixture = generate_fixture(rng, scale)
+    snapshots = [("initial", fixture), ("unchanged", fixture)]
+    for fraction in (0.01, 0.1):
+        fixture = mutate_fixture(rng, fixture, fraction)
+        snapshots.append((f"{fraction:.0%} changed", fixture))
+    return snapshots
+
+
+def expire_imports(helper: BenchmarkHelper, forget_content: bool):
+    """Makes all tables due for import, like expired cache lifetimes."""
+    database = helper.get_database()
+    database.execute("UPDATE imports SET date_imported = 0")
+    if forget_content:
+        database.execute("UPDATE imports SET content_hash = NULL")
+    database.commit()
+
+
+def read_tables(helper: BenchmarkHelper) -> dict[str, list[tuple]]:
+    tables = {}
+    for table in ENDPOINTS:
+        rows = helper.get_database().fetch_all(f"SELECT * FROM {table}")
+        tables[table] = sorted(
+            (
+                tuple(value for key, value in dict(row).items() if key != "last_import_run_id")
+                for row in rows
+            ),
+            key=repr,
+        )
+    return tables
+
+
+def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    if args.fixtures:
+        snapshots = [(path, load_fixture(path)) for path in args.fixtures]
+    else:
+        snapshots = generate_snapshots(rng, args.scale)
+
+    stats = LatencyStats()
+    lines = []
+    helpers = {}
+    handlers = {}
+    with tempfile.TemporaryDirectory() as full_path, tempfile.TemporaryDirectory() as delta_path:
+        for index, (label, fixture) in enumerate(snapshots):
+            server = start_fixture_server(fixture, args.latency)
+            api_url = f"http://127.0.0.1:{server.server_address[1]}"
+            for mode, data_path in (("full", full_path), ("delta", delta_path)):
+                if mode not in helpers:
+                    helpers[mode] = BenchmarkHelper(data_path, api_url)
+                    handlers[mode] = ImportHandler(helpers[mode])
+                    helpers[mode].handler_import = handlers[mode]
+                helper = helpers[mode]
+                helper.get_handler_config().api_url = api_url
+                # the models get the helper via Helper.get_instance()
+                Helper._instance = helper
+                if index:
+                    expire_imports(helper, forget_content=mode == "full")
+                    # import runs are identified by their second, rows of the previous run must not share it
+                    time.sleep(1)
+
+                start_time = time.perf_counter()
+                handlers[mode].import_data(True)
+                seconds = time.perf_counter() - start_time
+                stats.add(f"[{mode}] {label}", seconds * 1000)
+
+                table_stats = handlers[mode].get_import_stats().values()
+                lines.append(
+                    f"[{mode}] {label}: {sum(table['fetched'] for table in table_stats)} fetched, "
+                    f"{sum(table['changed'] for table in table_stats)} changed, "
+                    f"{sum(table['deleted'] for table in table_stats)} deleted, "
+                    f"{sum(table['skipped'] for table in table_stats)} of {len(table_stats)} table(s) skipped, "
+                    f"writing took {sum(table['write_time'] for table in table_stats):.2f}s, "
+                    f"{helper.get_handler_error().errors} error(s)"
+                )
+            server.shutdown()
+
+            full_tables = read_tables(helpers["full"])
+            delta_tables = read_tables(helpers["delta"])
+            different = [table for table in ENDPOINTS if full_tables[table] != delta_tables[table]]
+            lines.append(
+                f"{label}: {len(different)} table(s) differ between full and delta"
+                + (f" ({', '.join(different)})" if different else "")
+            )
+
+        for helper in helpers.values():
+            helper.get_database().destroy()
+        Helper._instance = None
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor for the rows of the big tables of generated snapshots.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=50,
+        help="Delay of every API response in ms, like the round trip to the UEX API.",
+    )
+    parser.add_argument(
+        "--fixtures",
+        nargs="+",
+        help="Directories of recorded fixtures, replayed in order (generated if not set).",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
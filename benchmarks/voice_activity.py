@@ -0,0 +1,151 @@
+"""Accuracy and latency of the streaming VoiceActivityDetector vs. the previous whole-clip contains_speech check.
+
+Every clip is streamed in microphone-sized chunks between ambient noise. Clips are the noise files in audio_samples/
+(no speech), synthetic voiced phrases mixed with that noise (speech) and optionally your own recordings (speech).
+
+The previous path waited for speech_recognition to detect the end of the phrase (pause_threshold, 0.8s by default)
+and then ran filtfilt over the whole clip. The VAD decides while streaming and ends an utterance after a short pause.
+
+Usage (from the repository root):
+    python -m benchmarks.voice_activity --speech-dir path/to/recordings --threshold 0.01
+"""
+
+import argparse
+import glob
+import os
+import time
+import numpy
+from scipy.signal import butter, filtfilt
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.audio_input import AudioInput
+from services.printr import Printr
+from services.voice_activity_detector import VoiceActivityDetector
+
+printr = Printr()
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "audio_samples")
+SAMPLE_RATE = 16000
+CHUNK = 1024
+"""The chunk size of speech_recognition.Microphone."""
+PAUSE_THRESHOLD = 0.8
+"""The default speech_recognition.Recognizer.pause_threshold the previous path waited for."""
+
+
+def contains_speech(audio_data: numpy.ndarray, energy_threshold: float):
+    """The previous whole-clip check of AudioRecorder."""
+    nyq = 0.5 * SAMPLE_RATE
+    b, a = butter(5, [85 / nyq, 500 / nyq], btype="band")
+    filtered_audio = filtfilt(b, a, audio_data)
+    rms_energy = numpy.sqrt(numpy.mean(filtered_audio**2))
+    return rms_energy > energy_threshold, rms_energy
+
+
+def load(file_path: str) -> numpy.ndarray:
+    return AudioInput.from_file(file_path).to_float32(sample_rate=SAMPLE_RATE)
+
+
+def synthesize_phrase(rng: numpy.random.Generator, amplitude: float) -> numpy.ndarray:
+    """A voiced phrase: harmonics of a wandering fundamental, shaped into syllables."""
+    duration = rng.uniform(1.0, 3.0)
+    t = numpy.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = rng.uniform(100, 220) * (1 + 0.1 * numpy.sin(2 * numpy.pi * 0.7 * t))
+    phase = 2 * numpy.pi * numpy.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(numpy.sin(k * phase) / k for k in range(1, 8))
+    syllables = numpy.clip(numpy.sin(2 * numpy.pi * rng.uniform(3, 5) * t), 0, None)
+    phrase = voiced * syllables
+    return (amplitude * phrase / numpy.max(numpy.abs(phrase))).astype(numpy.float32)
+
+
+def create_clips(args: argparse.Namespace) -> list[tuple[str, numpy.ndarray, bool]]:
+    rng = numpy.random.default_rng(args.seed)
+    noises = {
+        os.path.basename(file_path): load(file_path)
+        for file_path in sorted(glob.glob(os.path.join(SAMPLES_DIR, "*.wav")))
+    }
+    clips = []
+    for name, noise in noises.items():
+        for gain in args.noise_gains:
+            clips.append((f"{name} x{gain}", (noise[: SAMPLE_RATE * 3] * gain), False))
+    for index in range(args.phrases):
+        noise = list(noises.values())[index % len(noises)]
+        phrase = synthesize_phrase(rng, amplitude=rng.uniform(0.01, 0.3))
+        background = numpy.resize(noise, len(phrase)) * rng.uniform(0.0, 0.05)
+        clips.append((f"phrase {index}", phrase + background, True))
+    if args.speech_dir:
+        for file_path in sorted(glob.glob(os.path.join(args.speech_dir, "*.wav"))):
+            clips.append((os.path.basename(file_path), load(file_path), True))
+    return clips
+
+
+def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    ambient = numpy.zeros(int(SAMPLE_RATE * 0.5), dtype=numpy.float32)
+    trailing = numpy.zeros(int(SAMPLE_RATE * 2.0), dtype=numpy.float32)
+    results = {"contains_speech": [], "vad": []}
+
+    for _name, clip, is_speech in create_clips(args):
+        # previous path: whole clip after the phrase ended
+        start_time = time.perf_counter()
+        detected, _energy = contains_speech(clip, args.threshold)
+        check_ms = (time.perf_counter() - start_time) * 1000
+        stats.add("contains_speech check", check_ms)
+        if detected:
+            stats.add("contains_speech decision delay", PAUSE_THRESHOLD * 1000 + check_ms)
+        results["contains_speech"].append((detected, is_speech))
+
+        # streaming VAD
+        vad = VoiceActivityDetector(
+            sample_rate=SAMPLE_RATE, energy_threshold=args.threshold
+        )
+        stream = numpy.concatenate((ambient, clip, trailing))
+        clip_end = len(ambient) + len(clip)
+        detected = False
+        for offset in range(0, len(stream), CHUNK):
+            start_time = time.perf_counter()
+            utterances = vad.process(stream[offset : offset + CHUNK])
+            chunk_ms = (time.perf_counter() - start_time) * 1000
+            stats.add("VAD chunk", chunk_ms)
+            for utterance in utterances:
+                if utterance.energy > args.threshold and not detected:
+                    detected = True
+                    audio_delay = (offset + CHUNK - clip_end) / SAMPLE_RATE
+                    stats.add("VAD decision delay", max(audio_delay, 0) * 1000 + chunk_ms)
+        utterance = vad.flush()
+        if utterance and utterance.energy > args.threshold:
+            detected = True
+        results["vad"].append((detected, is_speech))
+
+    lines = []
+    for name, decisions in results.items():
+        true_positives = sum(1 for detected, label in decisions if detected and label)
+        false_positives = sum(1 for detected, label in decisions if detected and not label)
+        false_negatives = sum(1 for detected, label in decisions if not detected and label)
+        correct = sum(1 for detected, label in decisions if detected == label)
+        lines.append(
+            f"{name}: accuracy {correct / len(decisions):.1%} ({correct}/{len(decisions)}), "
+            f"{true_positives} true positives, {false_positives} false positives, {false_negatives} false negatives"
+        )
+    agreement = sum(
+        1
+        for (old, _), (new, _) in zip(results["contains_speech"], results["vad"])
+        if old == new
+    )
+    lines.append(f"agreement: {agreement}/{len(results['vad'])}")
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threshold", type=float, default=0.01)
+    parser.add_argument(
+        "--speech-dir", help="A directory with WAV recordings that contain speech."
+    )
+    parser.add_argument("--phrases", type=int, default=40)
+    parser.add_argument(
+        "--noise-gains", type=float, nargs="+", default=[0.02, 0.1, 0.5]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,132 @@
+"""Broadcast latency with one slow client, sequential sends vs. per-client queues of the ConnectionManager.
+
+Log lines are broadcast at a steady rate to a few fast clients and one slow client (e.g. a GUI on a busy machine).
+Previously broadcast serialized the command and awaited every connection in turn, so the slow client held up the
+broadcaster and all other clients. Now every command is serialized once and queued per client.
+
+Usage (from the repository root):
+    python -m benchmarks.websocket_broadcast --messages 2000 --slow-delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from api.commands import LogCommand
+from api.enums import LogType
+from benchmarks.stats import LatencyStats
+from services.connection_manager import ConnectionManager
+from services.printr import Printr
+
+printr = Printr()
+
+
+class FakeWebSocket:
+    """Records when each log line arrives. Every send takes send_delay seconds."""
+
+    def __init__(self, name: str, port: int, send_delay: float):
+        self.name = name
+        self.client = SimpleNamespace(host="127.0.0.1", port=port)
+        self.send_delay = send_delay
+        self.received: dict[int, float] = {}
+
+    async def accept(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_text(self, data: str):
+        await asyncio.sleep(self.send_delay)
+        self.received[int(json.loads(data)["text"])] = time.perf_counter()
+
+
+class LegacyConnectionManager:
+    """A replica of the previous ConnectionManager.broadcast."""
+
+    def __init__(self):
+        self.active_connections = []
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    async def broadcast(self, command):
+        json_str = command.model_dump_json()
+        for connection in self.active_connections:
+            await connection.send_text(json_str)
+
+    async def disconnect(self, websocket):
+        self.active_connections.remove(websocket)
+
+
+async def run(mode: str, args: argparse.Namespace, stats: LatencyStats) -> list[str]:
+    manager = LegacyConnectionManager() if mode == "sequential" else ConnectionManager()
+    websockets = [
+        FakeWebSocket(f"fast {index}", 50000 + index, 0.0)
+        for index in range(args.fast_clients)
+    ] + [FakeWebSocket("slow", 50100, args.slow_delay)]
+    for websocket in websockets:
+        await manager.connect(websocket)
+
+    sent_at: dict[int, float] = {}
+    start_time = time.perf_counter()
+    for index in range(args.messages):
+        # a steady rate, no matter how long broadcast took
+        delay = start_time + index * args.interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        command = LogCommand(text=str(index), log_type=LogType.SUBTLE)
+        sent_at[index] = time.perf_counter()
+        await manager.broadcast(command)
+        stats.add(f"[{mode}] Broadcast", (time.perf_counter() - sent_at[index]) * 1000)
+    broadcaster_done = time.perf_counter() - start_time
+
+    # give the queues a moment to catch up with the fast clients
+    await asyncio.sleep(0.5)
+    lines = [f"[{mode}] broadcaster done after {broadcaster_done:.2f}s"]
+    if mode != "sequential":
+        for client in manager.get_stats().clients:
+            lines.append(
+                f"[{mode}] {client.client}: {client.sent} sent, "
+                f"{client.dropped} dropped, "
+                f"{client.queued} queued, avg lag {client.avg_lag_ms:.1f}ms, "
+                f"max lag {client.max_lag_ms:.1f}ms"
+            )
+    for websocket in websockets:
+        for index, received_at in websocket.received.items():
+            label = "slow client" if websocket.send_delay else "fast clients"
+            stats.add(
+                f"[{mode}] Delivery to {label}",
+                (received_at - sent_at[index]) * 1000,
+            )
+        await manager.disconnect(websocket)
+    return lines
+
+
+async def main(args: argparse.Namespace):
+    stats = LatencyStats()
+    lines = []
+    for mode in ("sequential", "per-client queues"):
+        lines.extend(await run(mode, args, stats))
+
+    printr.print(stats.report(), color=LogType.HIGHLIGHT, server_only=True)
+    printr.print("\n".join(lines), color=LogType.HIGHLIGHT, server_only=True)
+    printr.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument(
+        "--interval", type=float, default=0.002, help="Seconds between two log lines."
+    )
+    parser.add_argument("--fast-clients", type=int, default=3)
+    parser.add_argument(
+        "--slow-delay",
+        type=float,
+        default=0.02,
+        help="Seconds the slow client takes per message.",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -1,10 +1,18 @@
+# first, so the timeline includes all other imports
+import sys
+from services.startup_timeline import StartupTimeline
+
+startup_timeline = StartupTimeline()
+# timing every import slows down all of them, so only when asked for (before argparse is even imported)
+if "--startup-timeline" in sys.argv:
+    startup_timeline.install_import_timer()
+
 import argparse
 import asyncio
 import atexit
 from enum import Enum
 from os import path
 import signal
-import sys
 import traceback
 from typing import Any, Literal, get_args, get_origin
 import uvicorn
@@ -14,20 +22,30 @@ from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from api.commands import WebSocketCommandModel
-from api.interface import BenchmarkResult
+from api.interface import BenchmarkResult, StartupTimelineResult, WebSocketStats
 from api.enums import ENUM_TYPES, LogType, WingmanInitializationErrorType
 import keyboard.keyboard as keyboard
 from services.command_handler import CommandHandler
 from services.config_manager import ConfigManager
-from services.connection_manager import ConnectionManager
+from services.connection_manager import (
+    AUDIO_QUEUE_LIMIT,
+    ConnectionManager,
+    DeliveryPolicy,
+    OutgoingMessage,
+)
+from services.audio_protocol import PROTOCOL, AudioFramer, negotiate
 from services.esp32_handler import Esp32Handler
+from services.file import get_writable_dir
 from services.secret_keeper import SecretKeeper
 from services.printr import Printr
 from services.system_manager import SystemManager
 from wingman_core import WingmanCore
 
+startup_timeline.add_phase("Imports", startup_timeline.start_time)
+
 port = None
 host = None
+dump_startup_timeline = False
 
 connection_manager = ConnectionManager()
 
@@ -39,15 +57,17 @@ app_is_bundled = getattr(sys, "frozen", False)
 app_root_path = sys._MEIPASS if app_is_bundled else path.dirname(path.abspath(__file__))
 
 # creates all the configs from templates - do this first!
-config_manager = ConfigManager(app_root_path)
+with startup_timeline.phase("Config templates"):
+    config_manager = ConfigManager(app_root_path)
 printr.print(
     f"Config directory: {config_manager.config_dir}",
     server_only=True,
     color=LogType.HIGHLIGHT,
 )
 
-secret_keeper = SecretKeeper()
-SecretKeeper.set_connection_manager(connection_manager)
+with startup_timeline.phase("Secrets"):
+    secret_keeper = SecretKeeper()
+    SecretKeeper.set_connection_manager(connection_manager)
 
 system_manager = SystemManager()
 printr.print(
@@ -56,21 +76,27 @@ printr.print(
     color=LogType.HIGHLIGHT,
 )
 
-is_latest_version = system_manager.check_version()
-if not is_latest_version:
-    printr.print(
-        "A new Wingman AI version is available! Download at https://www.wingman-ai.com",
-        server_only=True,
-        color=LogType.WARNING,
-    )
+
+def on_version_checked(is_latest_version: bool):
+    if not is_latest_version:
+        printr.print(
+            "A new Wingman AI version is available! Download at https://www.wingman-ai.com",
+            server_only=True,
+            color=LogType.WARNING,
+        )
+
+
+# the startup doesn't wait for the network
+system_manager.check_version_in_background(on_version_checked)
 
 # uses the Singletons above, so don't move this up!
-core = WingmanCore(
-    config_manager=config_manager,
-    app_root_path=app_root_path,
-    app_is_bundled=app_is_bundled,
-)
-core.set_connection_manager(connection_manager)
+with startup_timeline.phase("Core"):
+    core = WingmanCore(
+        config_manager=config_manager,
+        app_root_path=app_root_path,
+        app_is_bundled=app_is_bundled,
+    )
+    core.set_connection_manager(connection_manager)
 
 keyboard.hook(core.on_key)
 
@@ -111,7 +137,8 @@ def exit_handler():
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     # executed before the application starts
-    modify_openapi()
+    with startup_timeline.phase("OpenAPI schema"):
+        modify_openapi()
 
     yield
 
@@ -221,6 +248,8 @@ app.include_router(secret_keeper.router)
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await connection_manager.connect(websocket)
+    if startup_timeline.mark_first_connect():
+        report_startup_timeline()
     command_handler = CommandHandler(connection_manager, core)
     try:
         while True:
@@ -243,11 +272,22 @@ async def oi_websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         print(traceback.format_exc())
         print(f"Connection lost. Error: {e}")
+    finally:
+        esp32_handler.close()
 
 
 @app.websocket("/ws/audio")
 async def websocket_global_audio_endpoint(websocket: WebSocket):
     await websocket.accept()
+    # chunks are queued, so a slow client neither stalls the playback nor the other subscribers
+    audio_client = connection_manager.attach(
+        websocket, endpoint="/ws/audio", queue_limit=AUDIO_QUEUE_LIMIT
+    )
+    # clients that connect with ?protocol=wingman-audio/1 (and optionally sample_format and chunk_size)
+    # get framed audio (see services/audio_protocol.py), others the raw chunks
+    framer = None
+    if websocket.query_params.get("protocol") == PROTOCOL:
+        framer = AudioFramer(negotiate(dict(websocket.query_params)))
     printr.print(
         f"Audio client {websocket.client.host} connected",
         server_only=True,
@@ -257,8 +297,9 @@ async def websocket_global_audio_endpoint(websocket: WebSocket):
     # Track connection state
     is_connected = True
 
-    # Reference to the callback function for cleanup
+    # Reference to the callback functions for cleanup
     audio_callback = None
+    audio_format_callback = None
 
     try:
         # Wait for the audio player to be ready
@@ -280,22 +321,35 @@ async def websocket_global_audio_endpoint(websocket: WebSocket):
                         if not is_connected:
                             return
 
-                        try:
-                            # Forward the audio chunk to the browser client
-                            await websocket.send_bytes(data)
-                        except Exception as e:
+                        if audio_client.closed:
                             printr.print(
-                                f"Error sending audio: {str(e)}",
+                                "Error sending audio: the client is gone",
                                 server_only=True,
                                 color=LogType.ERROR,
                             )
                             is_connected = False
+                            return
+
+                        # Forward the audio chunk to the browser client
+                        for frame in framer.frames(data) if framer else (data,):
+                            audio_client.send(
+                                OutgoingMessage(frame, policy=DeliveryPolicy.DROPPABLE)
+                            )
+
+                    async def on_audio_format(source_format):
+                        if framer and is_connected:
+                            start_frame = framer.start(source_format)
+                            audio_client.send(OutgoingMessage(start_frame))
 
                     # Save reference to the callback for later cleanup
                     audio_callback = on_audio_chunk
+                    audio_format_callback = on_audio_format
 
                     # Subscribe without expecting a return value
                     core.audio_player.stream_event.subscribe("audio", audio_callback)
+                    core.audio_player.stream_event.subscribe(
+                        "audio_format", audio_format_callback
+                    )
                     printr.print(
                         "Audio subscription successful",
                         server_only=True,
@@ -338,6 +392,7 @@ async def websocket_global_audio_endpoint(websocket: WebSocket):
     except Exception as e:
         printr.print(f"Audio error: {str(e)}", server_only=True, color=LogType.ERROR)
     finally:
+        await connection_manager.disconnect(websocket)
         # Clean up subscription using the audio_callback reference
         if (
             audio_callback is not None
@@ -347,6 +402,9 @@ async def websocket_global_audio_endpoint(websocket: WebSocket):
         ):
             try:
                 core.audio_player.stream_event.unsubscribe("audio", audio_callback)
+                core.audio_player.stream_event.unsubscribe(
+                    "audio_format", audio_format_callback
+                )
                 printr.print(
                     "Audio unsubscribed successfully",
                     server_only=True,
@@ -360,6 +418,11 @@ async def websocket_global_audio_endpoint(websocket: WebSocket):
                 )
 
 
+@app.get("/websocket/stats", tags=["main"], response_model=WebSocketStats)
+async def get_websocket_stats():
+    return connection_manager.get_stats()
+
+
 @app.post("/start-secrets", tags=["main"])
 async def start_secrets(secrets: dict[str, Any]):
     await secret_keeper.post_secrets(secrets)
@@ -382,6 +445,29 @@ async def get_client_account_name():
     return core.client_account_name
 
 
+@app.get("/startup/timeline", tags=["main"], response_model=StartupTimelineResult)
+async def get_startup_timeline(limit: int = 30):
+    return startup_timeline.get_result(limit)
+
+
+def report_startup_timeline():
+    over_budget = startup_timeline.is_over_budget()
+    if over_budget or dump_startup_timeline:
+        printr.print(
+            startup_timeline.report(),
+            color=LogType.WARNING if over_budget else LogType.HIGHLIGHT,
+            server_only=True,
+        )
+    if dump_startup_timeline:
+        file_path = path.join(get_writable_dir("logs"), "startup-timeline.json")
+        startup_timeline.dump(file_path)
+        printr.print(
+            f"Startup timeline written to {file_path}",
+            color=LogType.HIGHLIGHT,
+            server_only=True,
+        )
+
+
 # required to generate API specs for class BenchmarkResult that is only used internally
 @app.get("/dummy-benchmark", tags=["main"], response_model=BenchmarkResult)
 async def get_dummy_benchmark():
@@ -400,8 +486,12 @@ async def get_dummy_benchmark():
 
 
 async def async_main(host: str, port: int, sidecar: bool):
-    await core.config_service.migrate_configs(system_manager)
-    await core.config_service.load_config()
+    # everything that isn't submitted to one of its executors runs on this loop (incl. uvicorn)
+    core.runtime.set_main_loop(asyncio.get_running_loop())
+    with startup_timeline.phase("Config migration"):
+        await core.config_service.migrate_configs(system_manager)
+    with startup_timeline.phase("Config and Tower"):
+        await core.config_service.load_config()
     saved_secrets: list[str] = []
     for error in core.tower_errors:
         if (
@@ -420,7 +510,8 @@ async def async_main(host: str, port: int, sidecar: bool):
             core.startup_errors.append(error)
 
     try:
-        await core.startup()
+        with startup_timeline.phase("Core startup"):
+            await core.startup()
         event_loop = asyncio.get_running_loop()
         core.audio_player.set_event_loop(event_loop)
         asyncio.create_task(core.process_events())
@@ -461,10 +552,16 @@ if __name__ == "__main__":
         action="store_true",
         help="Whether or not Wingman AI Core was launched from a client (as sidecar).",
     )
+    parser.add_argument(
+        "--startup-timeline",
+        action="store_true",
+        help="Time all imports and print the startup timeline (phases and slowest imports) when the first client connects and write it to the logs directory.",
+    )
     args = parser.parse_args()
 
     host = args.host
     port = int(args.port)
+    dump_startup_timeline = args.startup_timeline
 
     try:
         loop = asyncio.get_running_loop()
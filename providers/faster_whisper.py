@@ -1,25 +1,48 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
 from os import path
 import platform
-from typing import Optional
-from faster_whisper import WhisperModel
+from threading import Lock, Thread
+import time
+from typing import TYPE_CHECKING, Optional
 from api.enums import LogType
 from api.interface import (
     FasterWhisperSettings,
+    FasterWhisperStats,
     FasterWhisperTranscript,
     FasterWhisperSttConfig,
     WingmanInitializationError,
 )
+from services.audio_input import AudioInput
 from services.printr import Printr
 
+if TYPE_CHECKING:
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+
 MODELS_DIR = "faster-whisper-models"
+SAMPLE_RATE = 16000
+BATCHED_MIN_DURATION = 30
+"""Shorter recordings fit into a single Whisper window, so batching them wouldn't help."""
+STATS_WINDOW = 100
 
 
 class FasterWhisper:
+    """Manages a FasterWhisper model that is shared by all transcriptions.
+
+    The model is loaded on first use or in a background warm-up, so it never blocks the startup.
+    Transcriptions run on a pool of worker threads and never block the event loop of the caller.
+    The model gets one CTranslate2 worker per thread, so concurrent transcriptions
+    (push-to-talk, voice activation, ESP32, client uploads) run in parallel on the same weights.
+    """
+
     def __init__(
         self,
         settings: FasterWhisperSettings,
         app_root_path: str,
         app_is_bundled: bool,
+        warm_up: bool = True,
     ):
         self.printr = Printr()
         self.settings = settings
@@ -30,9 +53,41 @@ class FasterWhisper:
             app_dir = path.dirname(app_root_path) if app_is_bundled else app_root_path
             self.models_dir = path.join(app_dir, MODELS_DIR)
 
-        self.__update_model()
+        self.model: "WhisperModel" = None
+        self.batched_model: "BatchedInferencePipeline" = None
+        self.model_load_time_ms: float = None
+        self.model_lock = Lock()
+        self.executor: ThreadPoolExecutor = None
+        self.executor_lock = Lock()
+
+        self.stats_lock = Lock()
+        self.queue_depth = 0
+        self.running = 0
+        self.transcriptions = 0
+        self.queue_times_ms: deque[float] = deque(maxlen=STATS_WINDOW)
+        self.inference_times_ms: deque[float] = deque(maxlen=STATS_WINDOW)
+
+        if warm_up:
+            self.warm_up()
+
+    @property
+    def workers(self) -> int:
+        return max(self.settings.workers or 1, 1)
+
+    def warm_up(self):
+        """Loads the model in the background, so that the first transcription doesn't have to wait for it."""
+        Thread(target=self.__get_model, name="FasterWhisperWarmUp", daemon=True).start()
+
+    def __get_model(self) -> "WhisperModel | None":
+        with self.model_lock:
+            if self.model is None:
+                self.__load_model()
+            return self.model
+
+    def __load_model(self):
+        # imports CTranslate2 and co., so it's done with the model (usually in the background)
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
 
-    def __update_model(self):
         if self.is_windows:
             model_file = path.join(self.models_dir, (self.settings.model_size))
             model = model_file if path.exists(model_file) else self.settings.model_size
@@ -41,13 +96,19 @@ class FasterWhisper:
             model = self.settings.model_size
 
         try:
+            start_time = time.perf_counter()
             self.model = WhisperModel(
                 model,
                 device=self.settings.device,
                 compute_type=self.settings.compute_type,
+                num_workers=self.workers,
+                # split the cores between the workers instead of oversubscribing them
+                cpu_threads=max((os.cpu_count() or 4) // self.workers, 1),
             )
+            self.batched_model = BatchedInferencePipeline(model=self.model)
+            self.model_load_time_ms = (time.perf_counter() - start_time) * 1000
             self.printr.print(
-                f"FasterWhisper initialized with model '{model}' (device: '{self.settings.device}').",
+                f"FasterWhisper initialized with model '{model}' (device: '{self.settings.device}', workers: {self.workers}) in {self.model_load_time_ms:.0f}ms.",
                 server_only=True,
                 color=LogType.POSITIVE,
             )
@@ -56,15 +117,48 @@ class FasterWhisper:
                 f"Failed to initialize FasterWhisper with model {model_file}. Error: {e}"
             )
 
-    def transcribe(
+    def __get_executor(self) -> ThreadPoolExecutor:
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="FasterWhisper"
+                )
+            return self.executor
+
+    async def transcribe(
         self,
         config: FasterWhisperSttConfig,
-        filename: str,
+        audio_input: AudioInput,
         hotwords: Optional[list[str]],
     ):
+        with self.stats_lock:
+            self.queue_depth += 1
+        future = self.__get_executor().submit(
+            self.__transcribe, config, audio_input, hotwords, time.perf_counter()
+        )
+        return await asyncio.wrap_future(future)
+
+    def __transcribe(
+        self,
+        config: FasterWhisperSttConfig,
+        audio_input: AudioInput,
+        hotwords: Optional[list[str]],
+        queued_at: float,
+    ):
+        with self.stats_lock:
+            self.queue_depth -= 1
+            self.running += 1
+            self.queue_times_ms.append((time.perf_counter() - queued_at) * 1000)
+
         try:
-            segments, info = self.model.transcribe(
-                filename,
+            model = self.__get_model()
+            batched_model = self.batched_model
+            if not model:
+                return None
+
+            # FasterWhisper expects 16kHz mono, so it doesn't need to decode anything
+            audio = audio_input.to_float32(sample_rate=SAMPLE_RATE)
+            options = dict(
                 without_timestamps=True,
                 beam_size=config.beam_size,
                 best_of=config.best_of,
@@ -79,29 +173,76 @@ class FasterWhisper:
                     None if config.language else config.language_detection_threshold
                 ),
             )
-            segments = list(segments)
-            text = ""
-            for segment in segments:
-                text += segment.text.strip()
+
+            start_time = time.perf_counter()
+            batch_size = self.settings.batch_size or 1
+            if len(audio) / SAMPLE_RATE > BATCHED_MIN_DURATION and batch_size > 1:
+                segments, info = batched_model.transcribe(
+                    audio, batch_size=batch_size, **options
+                )
+            else:
+                segments, info = model.transcribe(audio, **options)
+            # segments is a generator, the actual inference happens here
+            text = " ".join(segment.text.strip() for segment in segments)
+
+            with self.stats_lock:
+                self.transcriptions += 1
+                self.inference_times_ms.append(
+                    (time.perf_counter() - start_time) * 1000
+                )
 
             return FasterWhisperTranscript(
                 text=text,
                 language=info.language,
                 language_probability=info.language_probability,
             )
-
-        except FileNotFoundError:
-            self.printr.toast_error(
-                f"FasterWhisper file to transcribe '{filename}' not found."
-            )
         except Exception as e:
             self.printr.toast_error(f"FasterWhisper failed to transcribe. Error: {e}")
+        finally:
+            with self.stats_lock:
+                self.running -= 1
 
         return None
 
+    def get_stats(self) -> FasterWhisperStats:
+        with self.stats_lock:
+            queue_times = list(self.queue_times_ms)
+            inference_times = list(self.inference_times_ms)
+            return FasterWhisperStats(
+                model_loaded=self.model is not None,
+                model_load_time_ms=self.model_load_time_ms,
+                workers=self.workers,
+                queue_depth=self.queue_depth,
+                running=self.running,
+                transcriptions=self.transcriptions,
+                avg_queue_time_ms=(
+                    sum(queue_times) / len(queue_times) if queue_times else 0.0
+                ),
+                avg_inference_time_ms=(
+                    sum(inference_times) / len(inference_times)
+                    if inference_times
+                    else 0.0
+                ),
+                max_inference_time_ms=max(inference_times, default=0.0),
+            )
+
     def update_settings(self, settings: FasterWhisperSettings):
+        reload = settings.model_dump(exclude={"batch_size"}) != self.settings.model_dump(
+            exclude={"batch_size"}
+        )
         self.settings = settings
-        self.__update_model()
+        if not reload:
+            return
+
+        with self.model_lock:
+            self.model = None
+            self.batched_model = None
+        with self.executor_lock:
+            if self.executor:
+                # running transcriptions keep their reference to the old model and finish
+                self.executor.shutdown(wait=False)
+                self.executor = None
+        self.warm_up()
 
     def validate(self, errors: list[WingmanInitializationError]):
         pass
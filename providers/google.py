@@ -1,7 +1,8 @@
 import re
 from google import genai
 from google.genai import types
-from openai import APIStatusError, OpenAI
+from openai import APIStatusError, AsyncOpenAI
+from services.async_client_pool import AsyncClientPool
 from services.printr import Printr
 
 printr = Printr()
@@ -13,9 +14,18 @@ class GoogleGenAI:
             api_key=api_key,
             http_options=types.HttpOptions(api_version="v1alpha"),
         )
-        self.openai_client = OpenAI(
-            api_key=api_key,
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+        self.api_key = api_key
+        self.openai_clients = AsyncClientPool()
+
+    @property
+    def openai_client(self) -> AsyncOpenAI:
+        """The long-lived client of the OpenAI-compatible endpoint for the running event loop."""
+        return self.openai_clients.get(
+            None,
+            lambda: AsyncOpenAI(
+                api_key=self.api_key,
+                base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+            ),
         )
 
     def _handle_key_error(self):
@@ -39,7 +49,7 @@ class GoogleGenAI:
         else:
             printr.toast_error("The API did not provide further information.")
 
-    def ask(
+    async def ask(
         self,
         messages: list[dict[str, str]],
         model: str,
@@ -48,13 +58,13 @@ class GoogleGenAI:
     ):
         try:
             if not tools:
-                completion = self.openai_client.chat.completions.create(
+                completion = await self.openai_client.chat.completions.create(
                     stream=stream,
                     messages=messages,
                     model=model,
                 )
             else:
-                completion = self.openai_client.chat.completions.create(
+                completion = await self.openai_client.chat.completions.create(
                     stream=stream,
                     messages=messages,
                     model=model,
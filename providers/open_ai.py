@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
+import asyncio
 import re
 from typing import Literal, Mapping, Union
-from openai import NOT_GIVEN, NotGiven, Omit, OpenAI, APIStatusError, AzureOpenAI
-import azure.cognitiveservices.speech as speechsdk
+from openai import (
+    NOT_GIVEN,
+    NotGiven,
+    Omit,
+    AsyncOpenAI,
+    APIStatusError,
+    AsyncAzureOpenAI,
+)
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from api.enums import AzureRegion
 
 from api.interface import (
@@ -11,12 +19,97 @@ from api.interface import (
     AzureTtsConfig,
     SoundConfig,
 )
+from services.async_client_pool import AsyncClientPool
+from services.audio_input import AudioInput
 from services.audio_player import AudioPlayer
 from services.printr import Printr
 
 printr = Printr()
 
 
+class ChatCompletionAccumulator:
+    """Assembles the chunks of a streamed chat completion into a regular ChatCompletion.
+
+    Tool calls arrive as fragments spread over many chunks and are merged by their index.
+    """
+
+    def __init__(self):
+        self.id = ""
+        self.model = ""
+        self.created = 0
+        self.content_parts: list[str] = []
+        self.tool_calls: dict[int, dict] = {}
+        self.finish_reason = None
+
+    def add_chunk(self, chunk: ChatCompletionChunk) -> str | None:
+        """Adds a chunk and returns its content delta (if any)."""
+        self.id = self.id or chunk.id
+        self.model = self.model or chunk.model
+        self.created = self.created or chunk.created
+
+        if not chunk.choices:
+            return None
+
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+
+        delta = choice.delta
+        if delta is None:
+            return None
+
+        for tool_call_delta in delta.tool_calls or []:
+            tool_call = self.tool_calls.setdefault(
+                tool_call_delta.index,
+                {"id": "", "type": "function", "name": "", "arguments": ""},
+            )
+            if tool_call_delta.id:
+                tool_call["id"] = tool_call_delta.id
+            if tool_call_delta.function:
+                if tool_call_delta.function.name:
+                    tool_call["name"] += tool_call_delta.function.name
+                if tool_call_delta.function.arguments:
+                    tool_call["arguments"] += tool_call_delta.function.arguments
+
+        if delta.content:
+            self.content_parts.append(delta.content)
+        return delta.content
+
+    def to_completion(self) -> ChatCompletion:
+        tool_calls = [
+            {
+                "id": tool_call["id"],
+                "type": tool_call["type"],
+                "function": {
+                    "name": tool_call["name"],
+                    "arguments": tool_call["arguments"] or "{}",
+                },
+            }
+            for _index, tool_call in sorted(self.tool_calls.items())
+        ]
+        finish_reason = self.finish_reason or ("tool_calls" if tool_calls else "stop")
+
+        return ChatCompletion.model_validate(
+            {
+                "id": self.id,
+                "object": "chat.completion",
+                "created": self.created,
+                "model": self.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": finish_reason,
+                        "message": {
+                            "role": "assistant",
+                            "content": "".join(self.content_parts) or None,
+                            "tool_calls": tool_calls or None,
+                        },
+                    }
+                ],
+            }
+        )
+
+
 class BaseOpenAi(ABC):
     @abstractmethod
     def _create_client(self, *args, **kwargs):
@@ -43,18 +136,17 @@ class BaseOpenAi(ABC):
         else:
             printr.toast_error("The API did not provide further information.")
 
-    def _perform_transcription(
+    async def _perform_transcription(
         self,
-        client: OpenAI | AzureOpenAI,
-        filename: str,
+        client: AsyncOpenAI | AsyncAzureOpenAI,
+        audio_input: AudioInput,
         model: Literal["whisper-1"],
     ):
         try:
-            with open(filename, "rb") as audio_input:
-                transcript = client.audio.transcriptions.create(
-                    model=model, file=audio_input
-                )
-                return transcript
+            transcript = await client.audio.transcriptions.create(
+                model=model, file=audio_input.as_upload()
+            )
+            return transcript
         except APIStatusError as e:
             self._handle_api_error(e)
         except UnicodeEncodeError:
@@ -62,9 +154,9 @@ class BaseOpenAi(ABC):
 
         return None
 
-    def _perform_ask(
+    async def _perform_ask(
         self,
-        client: OpenAI | AzureOpenAI,
+        client: AsyncOpenAI | AsyncAzureOpenAI,
         messages: list[dict[str, str]],
         stream: bool,
         tools: list[dict[str, any]],
@@ -72,13 +164,13 @@ class BaseOpenAi(ABC):
     ):
         try:
             if not tools:
-                completion = client.chat.completions.create(
+                completion = await client.chat.completions.create(
                     stream=stream,
                     messages=messages,
                     model=model,
                 )
             else:
-                completion = client.chat.completions.create(
+                completion = await client.chat.completions.create(
                     stream=stream,
                     messages=messages,
                     model=model,
@@ -103,10 +195,20 @@ class OpenAi(BaseOpenAi):
     ):
         super().__init__()
         self.api_key = api_key
-        self.client = self._create_client(
-            api_key=api_key,
-            organization=organization,
-            base_url=base_url,
+        self.organization = organization
+        self.base_url = base_url
+        self.clients = AsyncClientPool()
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The long-lived client for the running event loop."""
+        return self.clients.get(
+            None,
+            lambda: self._create_client(
+                api_key=self.api_key,
+                organization=self.organization,
+                base_url=self.base_url,
+            ),
         )
 
     def _create_client(
@@ -116,25 +218,25 @@ class OpenAi(BaseOpenAi):
         base_url: str | None = None,
     ):
         """Create an OpenAI client with the given parameters."""
-        return OpenAI(
+        return AsyncOpenAI(
             api_key=api_key,
             organization=organization,
             base_url=base_url,
         )
 
-    def transcribe(self, filename: str, model: str = "whisper-1"):
-        return self._perform_transcription(
-            client=self.client, filename=filename, model=model
+    async def transcribe(self, audio_input: AudioInput, model: str = "whisper-1"):
+        return await self._perform_transcription(
+            client=self.client, audio_input=audio_input, model=model
         )
 
-    def ask(
+    async def ask(
         self,
         messages: list[dict[str, str]],
         model: str = None,
         stream: bool = False,
         tools: list[dict[str, any]] = None,
     ):
-        return self._perform_ask(
+        return await self._perform_ask(
             client=self.client,
             messages=messages,
             model=model,
@@ -153,7 +255,7 @@ class OpenAi(BaseOpenAi):
         wingman_name: str,
     ):
         try:
-            response = self.client.audio.speech.create(
+            response = await self.client.audio.speech.create(
                 model=model,
                 voice=voice,
                 speed=speed,
@@ -172,37 +274,64 @@ class OpenAi(BaseOpenAi):
 
 
 class OpenAiAzure(BaseOpenAi):
+    def __init__(self):
+        super().__init__()
+        self.clients = AsyncClientPool()
+
     def _create_client(self, api_key: str, config: AzureInstanceConfig):
         """Create an AzureOpenAI client with the given parameters."""
-        return AzureOpenAI(
+        return AsyncAzureOpenAI(
             api_key=api_key,
             azure_endpoint=config.api_base_url,
             api_version=config.api_version.value,
             azure_deployment=config.deployment_name,
         )
 
-    def transcribe_whisper(
+    def _get_client(self, api_key: str, config: AzureInstanceConfig):
+        """Returns the long-lived client for this instance config, e.g. "conversation" or "whisper"."""
+        key = (
+            api_key,
+            config.api_base_url,
+            config.api_version.value,
+            config.deployment_name,
+        )
+        return self.clients.get(
+            key, lambda: self._create_client(api_key=api_key, config=config)
+        )
+
+    async def transcribe_whisper(
         self,
-        filename: str,
+        audio_input: AudioInput,
         api_key: str,
         config: AzureInstanceConfig,
         model: str = "whisper-1",
     ):
-        azure_client = self._create_client(api_key=api_key, config=config)
-        return self._perform_transcription(
+        azure_client = self._get_client(api_key=api_key, config=config)
+        return await self._perform_transcription(
             client=azure_client,
-            filename=filename,
+            audio_input=audio_input,
             model=model,
         )
 
-    def transcribe_azure_speech(
-        self, filename: str, api_key: str, config: AzureSttConfig
+    async def transcribe_azure_speech(
+        self, audio_input: AudioInput, api_key: str, config: AzureSttConfig
     ):
+        # the Azure Speech SDK is only needed with Azure STT/TTS, so not imported at startup
+        import azure.cognitiveservices.speech as speechsdk
+
         speech_config = speechsdk.SpeechConfig(
             subscription=api_key,
             region=config.region.value,
         )
-        audio_config = speechsdk.AudioConfig(filename=filename)
+        # push the PCM directly instead of letting the SDK read a file
+        audio_stream = speechsdk.audio.PushAudioInputStream(
+            stream_format=speechsdk.audio.AudioStreamFormat(
+                samples_per_second=16000, bits_per_sample=16, channels=1
+            )
+        )
+        audio_stream.write(audio_input.to_pcm16(sample_rate=16000))
+        audio_stream.close()
+        audio_config = speechsdk.audio.AudioConfig(stream=audio_stream)
 
         auto_detect_source_language_config = (
             (
@@ -222,9 +351,10 @@ class OpenAiAzure(BaseOpenAi):
             language=language,
             auto_detect_source_language_config=auto_detect_source_language_config,
         )
-        return speech_recognizer.recognize_once_async().get()
+        # the Speech SDK only offers blocking futures, so wait for them off the event loop
+        return await asyncio.to_thread(speech_recognizer.recognize_once_async().get)
 
-    def ask(
+    async def ask(
         self,
         messages: list[dict[str, str]],
         api_key: str,
@@ -232,8 +362,8 @@ class OpenAiAzure(BaseOpenAi):
         stream: bool = False,
         tools: list[dict[str, any]] = None,
     ):
-        azure_client = self._create_client(api_key=api_key, config=config)
-        return self._perform_ask(
+        azure_client = self._get_client(api_key=api_key, config=config)
+        return await self._perform_ask(
             client=azure_client,
             messages=messages,
             # Azure uses the deployment name as the model
@@ -251,6 +381,8 @@ class OpenAiAzure(BaseOpenAi):
         audio_player: AudioPlayer,
         wingman_name: str,
     ):
+        import azure.cognitiveservices.speech as speechsdk
+
         speech_config = speechsdk.SpeechConfig(
             subscription=api_key,
             region=config.region.value,
@@ -263,10 +395,12 @@ class OpenAiAzure(BaseOpenAi):
             audio_config=None,
         )
 
-        result = (
-            speech_synthesizer.start_speaking_text_async(text).get()
-            if config.output_streaming
-            else speech_synthesizer.speak_text_async(text).get()
+        result = await asyncio.to_thread(
+            (
+                speech_synthesizer.start_speaking_text_async(text)
+                if config.output_streaming
+                else speech_synthesizer.speak_text_async(text)
+            ).get
         )
 
         def buffer_callback(audio_buffer):
@@ -293,6 +427,8 @@ class OpenAiAzure(BaseOpenAi):
                 )
 
     def get_available_voices(self, api_key: str, region: AzureRegion, locale: str = ""):
+        import azure.cognitiveservices.speech as speechsdk
+
         speech_config = speechsdk.SpeechConfig(subscription=api_key, region=region)
         speech_synthesizer = speechsdk.SpeechSynthesizer(
             speech_config=speech_config, audio_config=None
@@ -315,9 +451,15 @@ class OpenAiCompatibleTts:
         base_url: str | None = None,
     ):
         super().__init__()
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url=base_url,
+        self.api_key = api_key
+        self.base_url = base_url
+        self.clients = AsyncClientPool()
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The long-lived client for the running event loop."""
+        return self.clients.get(
+            None, lambda: AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
         )
 
     async def play_audio(
@@ -335,7 +477,7 @@ class OpenAiCompatibleTts:
         extra_headers: Mapping[str, Union[str, Omit]] | None = None,
     ):
         try:
-            response = self.client.audio.speech.create(
+            response = await self.client.audio.speech.create(
                 input=text,
                 model=model,
                 voice=voice,
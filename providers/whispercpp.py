@@ -1,3 +1,4 @@
+import httpx
 import requests
 from api.enums import LogType, WingmanInitializationErrorType
 from api.interface import (
@@ -6,6 +7,8 @@ from api.interface import (
     WhispercppTranscript,
     WingmanInitializationError,
 )
+from services.async_client_pool import AsyncClientPool
+from services.audio_input import AudioInput
 from services.printr import Printr
 
 
@@ -16,10 +19,11 @@ class Whispercpp:
     ):
         self.settings = settings
         self.printr = Printr()
+        self.clients = AsyncClientPool()
 
-    def transcribe(
+    async def transcribe(
         self,
-        filename: str,
+        audio_input: AudioInput,
         config: WhispercppSttConfig,
         response_format: str = "json",
         timeout: int = 10,
@@ -30,35 +34,30 @@ class Whispercpp:
             )
             return None
         try:
-            with open(filename, "rb") as file:
-                response = requests.post(
-                    url=f"{self.settings.host}:{self.settings.port}/inference",
-                    files={"file": file},
-                    data={
-                        "temperature": config.temperature,
-                        "response_format": response_format,
-                    },
-                    timeout=timeout,
-                )
-                response.raise_for_status()
-                # Wrap response.json = {"text":"transcription"} into a Pydantic model for typesafe further processing
-                return WhispercppTranscript(
-                    text=response.json()["text"].strip(),
-                )
-        except requests.HTTPError as e:
+            response = await self._get_client().post(
+                url=f"{self.settings.host}:{self.settings.port}/inference",
+                files={"file": audio_input.as_upload()},
+                data={
+                    "temperature": config.temperature,
+                    "response_format": response_format,
+                },
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            # Wrap response.json = {"text":"transcription"} into a Pydantic model for typesafe further processing
+            return WhispercppTranscript(
+                text=response.json()["text"].strip(),
+            )
+        except httpx.HTTPStatusError as e:
             self.printr.toast_error(
-                text=f"whispercpp transcription request failed: {e.strerror}"
+                text=f"whispercpp transcription request failed: {str(e)}"
             )
             return None
-        except requests.Timeout:
+        except httpx.TimeoutException:
             self.printr.toast_error(
                 text=f"whispercpp transcription request timed out after {timeout}s."
             )
             return None
-        except FileNotFoundError:
-            self.printr.toast_error(
-                f"whispercpp file to transcript'{filename}' not found."
-            )
 
     def update_settings(self, settings: WhispercppSettings):
         self.settings = settings
@@ -80,6 +79,10 @@ class Whispercpp:
                 server_only=True,
             )
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Returns the long-lived HTTP client for the whispercpp server (keeps the connection alive)."""
+        return self.clients.get(None, httpx.AsyncClient)
+
     def __is_server_running(self, timeout=5):
         try:
             response = requests.get(
@@ -1,3 +1,4 @@
+import httpx
 import openai
 import requests
 from api.enums import CommandTag, LogType
@@ -7,10 +8,15 @@ from api.interface import (
     SoundConfig,
     WingmanProSettings,
 )
+from services.async_client_pool import AsyncClientPool
+from services.audio_input import AudioInput
 from services.audio_player import AudioPlayer
 from services.printr import Printr
 from services.secret_keeper import SecretKeeper
 
+# shared by all WingmanPro instances so that the Wingmen and the system (voice activation, voice previews) reuse connections
+clients = AsyncClientPool()
+
 
 class WingmanPro:
     def __init__(
@@ -29,45 +35,43 @@ class WingmanPro:
             color=LogType.ERROR,
         )
 
-    def send_server_error(self, response: requests.Response):
+    def send_server_error(self, response: httpx.Response):
         self.printr.print(
             text=f"Server Error: {response.text}",
             color=LogType.ERROR,
         )
 
-    def transcribe_whisper(self, filename: str):
-        with open(filename, "rb") as audio_input:
-            files = {"audio_file": (filename, audio_input)}
-            response = requests.post(
-                url=f"{self.settings.base_url}/transcribe-whisper",
-                params={"region": self.settings.region},
-                files=files,
-                headers=self._get_headers(),
-                timeout=self.timeout,
-            )
-            if response.status_code == 403:
-                self.send_unauthorized_error()
-                return None
-            else:
-                response.raise_for_status()
-            json = response.json()
-            transcription = openai.types.audio.Transcription.model_validate(json)
-            return transcription
+    async def transcribe_whisper(self, audio_input: AudioInput):
+        response = await self._get_client().post(
+            url=f"{self.settings.base_url}/transcribe-whisper",
+            params={"region": self.settings.region},
+            files={"audio_file": audio_input.as_upload()},
+            headers=self._get_headers(),
+            timeout=self.timeout,
+        )
+        if response.status_code == 403:
+            self.send_unauthorized_error()
+            return None
+        else:
+            response.raise_for_status()
+        json = response.json()
+        transcription = openai.types.audio.Transcription.model_validate(json)
+        return transcription
 
-    def transcribe_azure_speech(self, filename: str, config: AzureSttConfig):
-        with open(filename, "rb") as audio_input:
-            files = {"file": (filename, audio_input)}
-            params = {
-                "region": self.settings.region,
-                "languages": config.languages,
-            }
-            response = requests.post(
-                url=f"{self.settings.base_url}/transcribe-azure-speech",
-                params=params,
-                headers=self._get_headers(),
-                files=files,
-                timeout=self.timeout,
-            )
+    async def transcribe_azure_speech(
+        self, audio_input: AudioInput, config: AzureSttConfig
+    ):
+        params = {
+            "region": self.settings.region,
+            "languages": config.languages,
+        }
+        response = await self._get_client().post(
+            url=f"{self.settings.base_url}/transcribe-azure-speech",
+            params=params,
+            headers=self._get_headers(),
+            files={"file": audio_input.as_upload()},
+            timeout=self.timeout,
+        )
         if response.status_code == 403:
             self.send_unauthorized_error()
             return None
@@ -76,7 +80,7 @@ class WingmanPro:
         json = response.json()
         return json
 
-    def ask(
+    async def ask(
         self,
         messages: list[dict[str, str]],
         deployment: str,
@@ -97,7 +101,7 @@ class WingmanPro:
             "stream": stream,
             "tools": tools,
         }
-        response = requests.post(
+        response = await self._get_client().post(
             url=f"{self.settings.base_url}/ask",
             params={"region": self.settings.region},
             headers=self._get_headers(),
@@ -190,7 +194,7 @@ class WingmanPro:
                 use_gain_boost=True,  # "Azure Streaming" low gain workaround
             )
         else:  # non-streaming
-            response = requests.post(
+            response = await self._get_client().post(
                 url=f"{self.settings.base_url}/generate-azure-speech",
                 params={"region": self.settings.region},
                 headers=self._get_headers(),
@@ -227,7 +231,7 @@ class WingmanPro:
             "speed": speed,
             "stream": False,
         }
-        response = requests.post(
+        response = await self._get_client().post(
             url=f"{self.settings.base_url}/generate-openai-speech",
             params={
                 "region": self.settings.region,
@@ -255,7 +259,7 @@ class WingmanPro:
         data = {
             "text": text,
         }
-        response = requests.post(
+        response = await self._get_client().post(
             url=f"{self.settings.base_url}/generate-image",
             params={
                 "region": self.settings.region,
@@ -298,6 +302,15 @@ class WingmanPro:
 
         return voice_infos
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Returns the long-lived HTTP client for the configured Wingman Pro server (keeps connections alive)."""
+        # a client for a previous server is closed
+        return clients.get(
+            self.settings.base_url,
+            lambda: httpx.AsyncClient(follow_redirects=True),
+            slot="server",
+        )
+
     def _get_headers(self):
         token = self.secret_keeper.secrets.get("wingman_pro", "")
         return {
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import weakref
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+LoopClients = tuple[asyncio.AbstractEventLoop, dict[Hashable, tuple[Hashable, object]]]
+"""(loop, slot => (key, client))"""
+
+pools: "weakref.WeakSet[AsyncClientPool]" = weakref.WeakSet()
+"""All living pools, so the clients of a loop can be closed before the loop shuts down."""
+
+
+class AsyncClientPool:
+    """Keeps long-lived async HTTP clients (AsyncOpenAI, httpx.AsyncClient...) so that their connections are reused.
+
+    The connection pool of an async client is bound to the event loop it was first used on.
+    Wingman requests run on the loops of the runtime's workers, so clients are kept per loop and per key
+    (e.g. a provider config). Clients are closed when
+    - their loop shuts down (see close_clients),
+    - another client replaces them in their slot, e.g. because the config of the key changed,
+    - the pool is cleared or garbage collected, e.g. together with a provider that was recreated for a new config.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients: dict[int, LoopClients] = {}
+        """id(loop) => clients of the loop"""
+        pools.add(self)
+        weakref.finalize(self, close_entries, self.clients).atexit = False
+
+    def get(
+        self, key: Hashable, factory: Callable[[], T], slot: Hashable = None
+    ) -> T:
+        """Returns the client for the given key on the running event loop, creating it if necessary.
+
+        A slot holds one client per loop (by default every key has its own slot). If the key of a slot changes,
+        its previous client is closed.
+        """
+        loop = asyncio.get_running_loop()
+        slot = key if slot is None else slot
+        with self.lock:
+            self.__prune()
+            entry = self.clients.get(id(loop))
+            if entry is None or entry[0] is not loop:
+                entry = (loop, {})
+                self.clients[id(loop)] = entry
+            current = entry[1].get(slot)
+            if current is not None and current[0] == key:
+                return current[1]
+            client = factory()
+            entry[1][slot] = (key, client)
+
+        if current is not None:
+            schedule_close(loop, [current[1]])
+        return client
+
+    def pop_loop(self, loop: asyncio.AbstractEventLoop) -> list[object]:
+        """Removes the clients of the loop from the pool and returns them."""
+        with self.lock:
+            entry = self.clients.get(id(loop))
+            if entry is None or entry[0] is not loop:
+                return []
+            del self.clients[id(loop)]
+        return [client for _key, client in entry[1].values()]
+
+    def clear(self):
+        """Removes all clients and closes them on their loops."""
+        with self.lock:
+            entries = dict(self.clients)
+            self.clients.clear()
+        close_entries(entries)
+
+    def __prune(self):
+        # clients of loops that were closed without close_clients can't be closed anymore
+        for loop_id, (loop, _clients) in list(self.clients.items()):
+            if loop.is_closed():
+                del self.clients[loop_id]
+
+
+async def close_client(client: object):
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception:
+        # the connections are gone with the loop anyway
+        pass
+
+
+async def close_clients(loop: asyncio.AbstractEventLoop | None = None):
+    """Closes the clients of all pools that were created on the loop (the running one by default).
+
+    Called on the loop before it shuts down.
+    """
+    loop = loop or asyncio.get_running_loop()
+    clients = [client for pool in list(pools) for client in pool.pop_loop(loop)]
+    await asyncio.gather(*(close_client(client) for client in clients))
+
+
+def schedule_close(loop: asyncio.AbstractEventLoop, clients: list[object]):
+    """Closes the clients on their loop, from any thread, without waiting for it."""
+    if not clients or loop.is_closed():
+        return
+
+    async def close():
+        await asyncio.gather(*(close_client(client) for client in clients))
+
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+
+    if running_loop is loop:
+        loop.create_task(close())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(close(), loop)
+
+
+def close_entries(entries: dict[int, LoopClients]):
+    for loop, clients in list(entries.values()):
+        schedule_close(loop, [client for _key, client in clients.values()])
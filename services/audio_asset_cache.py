@@ -0,0 +1,65 @@
+from math import gcd
+from os import path
+from threading import Lock
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+
+class AudioAssetCache:
+    """Keeps the audio samples used for effects (beeps, noise layers) decoded and resampled in memory.
+
+    Every (file, sample rate, channels) combination is only decoded and resampled once.
+    The returned arrays are shared and read-only, so callers must not modify them in place.
+    """
+
+    def __init__(self, sample_dir: str):
+        self.sample_dir = sample_dir
+        self.assets: dict[tuple[str, int | None, int | None], tuple[np.ndarray, int]] = {}
+        self.lock = Lock()
+
+    def get(
+        self, file_name: str, sample_rate: int = None, channels: int = None
+    ) -> tuple[np.ndarray, int]:
+        """Returns the audio of a file in audio_samples and its sample rate.
+
+        Args:
+            file_name (str): The file name relative to the sample directory.
+            sample_rate (int): Resample to this rate. Default: keep the rate of the file.
+            channels (int): 1 returns mono samples of shape (frames,), more returns shape (frames, channels). Default: keep the layout of the file.
+        """
+        key = (file_name, sample_rate, channels)
+        with self.lock:
+            asset = self.assets.get(key)
+        if asset is not None:
+            return asset
+
+        if sample_rate is None and channels is None:
+            audio, file_sample_rate = sf.read(
+                path.join(self.sample_dir, file_name), dtype="float32"
+            )
+        else:
+            audio, file_sample_rate = self.get(file_name)
+
+        if sample_rate and sample_rate != file_sample_rate:
+            divisor = gcd(sample_rate, file_sample_rate)
+            audio = resample_poly(
+                audio, sample_rate // divisor, file_sample_rate // divisor, axis=0
+            ).astype(np.float32)
+        if channels == 1 and audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        elif channels and channels > 1:
+            if audio.ndim == 1:
+                audio = audio[:, np.newaxis]
+            if audio.shape[1] != channels:
+                audio = np.tile(audio[:, :1], (1, channels))
+
+        audio.setflags(write=False)
+        asset = (audio, sample_rate or file_sample_rate)
+        with self.lock:
+            self.assets[key] = asset
+        return asset
+
+    def clear(self):
+        with self.lock:
+            self.assets.clear()
@@ -0,0 +1,111 @@
+import io
+from math import gcd
+from os import path
+import numpy
+import soundfile
+from scipy.signal import resample_poly
+
+
+class AudioInput:
+    """Recorded speech of the user, passed to the STT providers in memory.
+
+    Holds either PCM samples (microphone, ESP32) or the content of an audio file (e.g. an upload from the client).
+    Conversions are done on demand and cached, so every provider only pays for the format it actually needs
+    and nothing is written to disk.
+    """
+
+    def __init__(
+        self,
+        samples: numpy.ndarray = None,
+        sample_rate: int = 16000,
+        encoded: bytes = None,
+        name: str = "recording.wav",
+    ):
+        """
+        Args:
+            samples (numpy.ndarray): PCM samples of shape (frames,) or (frames, channels), either float32 or int16.
+            sample_rate (int): The sample rate of the samples.
+            encoded (bytes): The content of an audio file. Used if no samples are given.
+            name (str): The file name reported to APIs that expect an upload. Its extension tells them the format.
+        """
+        if samples is None and encoded is None:
+            raise ValueError("AudioInput needs either samples or encoded audio.")
+        self._samples = samples
+        self.sample_rate = sample_rate
+        self._encoded = encoded
+        self.name = name
+
+    @classmethod
+    def from_pcm16(
+        cls,
+        data: bytes,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        name: str = "recording.wav",
+    ) -> "AudioInput":
+        """Wraps raw 16 bit little-endian PCM, e.g. streamed by a device. Doesn't copy the data."""
+        samples = numpy.frombuffer(data, dtype="<i2").reshape(-1, channels)
+        return cls(samples=samples, sample_rate=sample_rate, name=name)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "AudioInput":
+        with open(file_path, "rb") as file:
+            return cls(encoded=file.read(), name=path.basename(file_path))
+
+    @property
+    def duration(self) -> float:
+        return len(self.__get_samples()) / self.sample_rate
+
+    def encode(self) -> bytes:
+        """Returns the audio as file content for APIs that need a container format. Only encodes (16 bit WAV) if necessary."""
+        if self._encoded is None:
+            buffer = io.BytesIO()
+            soundfile.write(
+                buffer,
+                self._samples,
+                self.sample_rate,
+                format="WAV",
+                subtype="PCM_16",
+            )
+            self._encoded = buffer.getvalue()
+        return self._encoded
+
+    def as_upload(self) -> tuple[str, bytes]:
+        """The (file name, content) tuple that httpx and the OpenAI SDK accept as file."""
+        return (self.name, self.encode())
+
+    def to_float32(self, sample_rate: int = None) -> numpy.ndarray:
+        """Returns the mono samples as float32 in [-1, 1], resampled to sample_rate if given."""
+        samples = self.__get_samples()
+        if samples.ndim > 1:
+            samples = samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1)
+        if samples.dtype == numpy.int16:
+            samples = samples.astype(numpy.float32) / 32768
+        samples = samples.astype(numpy.float32, copy=False)
+
+        if sample_rate and sample_rate != self.sample_rate:
+            divisor = gcd(sample_rate, self.sample_rate)
+            samples = resample_poly(
+                samples, sample_rate // divisor, self.sample_rate // divisor
+            ).astype(numpy.float32)
+        return samples
+
+    def to_pcm16(self, sample_rate: int = None) -> bytes:
+        """Returns the mono samples as raw 16 bit little-endian PCM, resampled to sample_rate if given."""
+        samples = self.__get_samples()
+        if (
+            samples.dtype == numpy.int16
+            and (samples.ndim == 1 or samples.shape[1] == 1)
+            and (not sample_rate or sample_rate == self.sample_rate)
+        ):
+            return samples.astype("<i2", copy=False).tobytes()
+
+        samples = numpy.clip(self.to_float32(sample_rate), -1.0, 1.0)
+        return (samples * 32767).astype("<i2").tobytes()
+
+    def __get_samples(self) -> numpy.ndarray:
+        if self._samples is None:
+            self._samples, self.sample_rate = soundfile.read(
+                io.BytesIO(self._encoded), dtype="float32"
+            )
+        return self._samples
@@ -1,13 +1,13 @@
 import asyncio
 import os
-import threading
-import time
+from concurrent.futures import Future
 from os import path
 from random import randint
 from api.interface import AudioFile, AudioFileConfig
 from services.printr import Printr
 from services.audio_player import AudioPlayer
 from services.file import get_writable_dir
+from services.runtime import DEDICATED, Runtime
 
 printr = Printr()
 DIR_AUDIO_LIBRARY = "audio_library"
@@ -27,6 +27,7 @@ class AudioLibrary:
         # Internal settings
         self.audio_library_path = get_writable_dir(DIR_AUDIO_LIBRARY)
         self.current_playbacks = {}
+        self.runtime = Runtime()
 
     async def handle_action(self, audio_file: AudioFile | AudioFileConfig, volume_modifier: float = 1.0):
         audio_config = self.__get_audio_file_config(audio_file)
@@ -138,15 +139,17 @@ class AudioLibrary:
             volume,
             selected_file,
         ]
-        self.__threaded_execution(
-            actual_start_playback, selected_file, audio_player, volume
+        # a playback blocks its thread until the file ends, the fades must not queue behind it
+        playback = self.__threaded_execution(
+            actual_start_playback,
+            selected_file,
+            audio_player,
+            volume,
+            executor=DEDICATED,
         )
         if audio_file.wait:
-            while True:
-                time.sleep(0.1)
-                status = self.get_playback_status(selected_file)
-                if not status[1]: # no audio player
-                    break
+            # done when the file has been played or the playback has been stopped
+            await asyncio.wrap_future(playback)
 
     async def stop_playback(
         self,
@@ -286,21 +289,9 @@ class AudioLibrary:
             volume[0] += step_size
             await asyncio.sleep(step_duration)
 
-    def __threaded_execution(self, function, *args) -> threading.Thread:
-        """Execute a function in a separate thread."""
-
-        def start_thread(function, *args):
-            if asyncio.iscoroutinefunction(function):
-                new_loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(new_loop)
-                new_loop.run_until_complete(function(*args))
-                new_loop.close()
-            else:
-                function(*args)
-
-        thread = threading.Thread(target=start_thread, args=(function, *args))
-        thread.start()
-        return thread
+    def __threaded_execution(self, function, *args, executor: str = "audio") -> Future:
+        """Execute a function on a worker of the shared runtime."""
+        return self.runtime.submit(function, *args, executor=executor)
 
     def __get_audio_file_config(
         self, audio_file: AudioFile | AudioFileConfig
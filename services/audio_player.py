@@ -1,22 +1,75 @@
 import asyncio
 import io
 import wave
+import time
 from os import path
-from threading import Thread
+from threading import Event, Lock, Thread
 from typing import Callable
 import numpy as np
 import soundfile as sf
 import sounddevice as sd
-from scipy.signal import resample
-from api.enums import SoundEffect
-from api.interface import SoundConfig
-from services.pub_sub import PubSub
+from api.enums import AudioSampleFormat, SoundEffect
+from api.interface import AudioStreamFormat, SoundConfig
+from services.audio_asset_cache import AudioAssetCache
+from services.audio_stream import StreamingPlayback
+from services.pub_sub import DeliveryMode, PubSub
 from services.sound_effects import (
     get_additional_layer_file,
     get_azure_workaround_gain_boost,
     get_sound_effects,
 )
 
+
+class Playback:
+    """A span of time in which an AudioPlayer is playing.
+
+    Can be awaited from any event loop or waited for from any thread, without polling is_playing.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.finished_at: float | None = None
+        self.finished = Event()
+        self.waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.lock = Lock()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished.is_set()
+
+    def finish(self):
+        with self.lock:
+            self.finished_at = time.perf_counter()
+            self.finished.set()
+            waiters, self.waiters = self.waiters, []
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self.__resolve, future)
+
+    async def wait(self, timeout: float = None) -> bool:
+        """Waits until the playback has finished. Returns False on timeout."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self.lock:
+            if self.finished.is_set():
+                return True
+            self.waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def wait_blocking(self, timeout: float = None) -> bool:
+        """Blocks the calling thread until the playback has finished. Returns False on timeout."""
+        return self.finished.wait(timeout)
+
+    @staticmethod
+    def __resolve(future: asyncio.Future):
+        if not future.done():
+            future.set_result(True)
+
+
 class AudioPlayer:
     def __init__(
         self,
@@ -24,23 +77,81 @@ class AudioPlayer:
         on_playback_started: Callable[[str], None],
         on_playback_finished: Callable[[str], None],
     ) -> None:
-        self.is_playing = False
+        self.playback_lock = Lock()
+        self.current_playback: Playback | None = None
+        self.playback_queues: list[
+            tuple[asyncio.AbstractEventLoop, asyncio.Queue[Playback]]
+        ] = []
+        self._is_playing = False
         self.event_queue = event_queue
         self.event_loop = None
         self.stream = None
         self.raw_stream = None
+        self.stream_playback = None
         self.wingman_name = ""
-        self.playback_events = PubSub()
-        self.stream_event = PubSub()
+        self.playback_events = PubSub("playback")
+        # chunks are published per buffer, so the subscribers (remote clients) get them concurrently
+        self.stream_event = PubSub("stream", delivery=DeliveryMode.CONCURRENT)
         self.on_playback_started = on_playback_started
         self.on_playback_finished = on_playback_finished
         self.sample_dir = path.join(
             path.abspath(path.dirname(__file__)), "../audio_samples"
         )
+        self.assets = AudioAssetCache(self.sample_dir)
 
     def set_event_loop(self, loop: asyncio.AbstractEventLoop):
         self.event_loop = loop
 
+    @property
+    def is_playing(self) -> bool:
+        return self._is_playing
+
+    @is_playing.setter
+    def is_playing(self, is_playing: bool):
+        with self.playback_lock:
+            self._is_playing = is_playing
+            playback = self.current_playback
+            if is_playing and playback is None:
+                self.current_playback = Playback()
+                for loop, queue in self.playback_queues:
+                    if not loop.is_closed():
+                        loop.call_soon_threadsafe(
+                            queue.put_nowait, self.current_playback
+                        )
+            elif not is_playing and playback is not None:
+                self.current_playback = None
+                playback.finish()
+
+    def subscribe_playbacks(self) -> asyncio.Queue[Playback]:
+        """Returns a queue that receives every Playback of this player when it starts.
+
+        The queue belongs to the running event loop. Call unsubscribe_playbacks when you're done with it.
+        """
+        queue: asyncio.Queue[Playback] = asyncio.Queue()
+        with self.playback_lock:
+            self.playback_queues.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe_playbacks(self, queue: asyncio.Queue[Playback]):
+        with self.playback_lock:
+            self.playback_queues = [
+                (loop, subscribed)
+                for loop, subscribed in self.playback_queues
+                if subscribed is not queue
+            ]
+
+    async def wait_until_idle(self, timeout: float = None) -> bool:
+        """Waits until nothing is playing anymore, including playbacks that start while waiting. Returns False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            playback = self.current_playback
+            if playback is None:
+                return True
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                return False
+            await playback.wait(remaining)
+
     def start_playback(
         self,
         audio,
@@ -116,21 +227,33 @@ class AudioPlayer:
         playhead = 0
         self.is_playing = True
 
+        stream_finished = Event()
+
+        def on_stream_finished():
+            if finished_callback:
+                finished_callback()
+            stream_finished.set()
+
         # Create and start the audio stream
         self.stream = sd.OutputStream(
             samplerate=sample_rate,
             channels=channels,
             callback=callback,
-            finished_callback=finished_callback,
+            finished_callback=on_stream_finished,
         )
         self.stream.start()
-        sd.sleep(int(len(audio) / sample_rate * 1000))
+        # returns as soon as the stream has played everything or has been stopped
+        stream_finished.wait()
 
     async def stop_playback(self):
         if self.stream is not None:
             self.stream.stop()
             self.stream = None
 
+        if self.stream_playback is not None:
+            self.stream_playback.stop()
+            self.stream_playback = None
+
         if self.raw_stream is not None:
             self.raw_stream.stop()
             self.raw_stream = None
@@ -169,29 +292,9 @@ class AudioPlayer:
         if self.is_playing:
             await self.stop_playback()
 
-        sound_effects = get_sound_effects(config)
-
-        for sound_effect in sound_effects:
-            audio = sound_effect(audio, sample_rate)
-
-        mixed_layer_file = None
-        for effect in config.effects:
-            if not mixed_layer_file:
-                mixed_layer_file = get_additional_layer_file(effect)
-
-        if mixed_layer_file:
-            audio = self._mix_in_layer(
-                audio, sample_rate, mixed_layer_file, mixed_layer_gain_boost_db
-            )
-
-        contains_high_end_radio = SoundEffect.HIGH_END_RADIO in config.effects
-        if contains_high_end_radio:
-            audio = self._add_wav_effect(audio, sample_rate, "Radio_Static_Beep.wav")
-
-        if config.play_beep:
-            audio = self._add_wav_effect(audio, sample_rate, "beep.wav")
-        elif config.play_beep_apollo:
-            audio = self._add_wav_effect(audio, sample_rate, "Apollo_Beep.wav")
+        audio = self.apply_effects(
+            audio, sample_rate, config, mixed_layer_gain_boost_db
+        )
 
         channels = audio.shape[1] if audio.ndim > 1 else 1
 
@@ -217,6 +320,40 @@ class AudioPlayer:
 
         await self.notify_playback_started(wingman_name)
 
+    def apply_effects(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        config: SoundConfig,
+        mixed_layer_gain_boost_db: float = -9.0,
+    ) -> np.ndarray:
+        """Applies the sound effects, the mixed-in layer and the beeps of the config to a complete audio clip."""
+        sound_effects = get_sound_effects(config)
+
+        for sound_effect in sound_effects:
+            audio = sound_effect(audio, sample_rate)
+
+        mixed_layer_file = None
+        for effect in config.effects:
+            if not mixed_layer_file:
+                mixed_layer_file = get_additional_layer_file(effect)
+
+        if mixed_layer_file:
+            audio = self._mix_in_layer(
+                audio, sample_rate, mixed_layer_file, mixed_layer_gain_boost_db
+            )
+
+        contains_high_end_radio = SoundEffect.HIGH_END_RADIO in config.effects
+        if contains_high_end_radio:
+            audio = self._add_wav_effect(audio, sample_rate, "Radio_Static_Beep.wav")
+
+        if config.play_beep:
+            audio = self._add_wav_effect(audio, sample_rate, "beep.wav")
+        elif config.play_beep_apollo:
+            audio = self._add_wav_effect(audio, sample_rate, "Apollo_Beep.wav")
+
+        return audio
+
     async def notify_playback_started(
         self, wingman_name: str, publish_event: bool = True
     ):
@@ -234,8 +371,9 @@ class AudioPlayer:
             await self.on_playback_finished(wingman_name)
 
     def play_wav_sample(self, audio_sample_file: str, volume: float):
-        file_path = path.join(self.sample_dir, audio_sample_file)
-        self.play_wav(file_path, volume)
+        audio, sample_rate = self.assets.get(audio_sample_file)
+        channels = audio.shape[1] if audio.ndim > 1 else 1
+        self.start_playback(audio, sample_rate, channels, None, volume)
 
     def play_wav(self, audio_file: str, volume: list[float] | float):
         audio, sample_rate = self.get_audio_from_file(audio_file)
@@ -259,6 +397,7 @@ class AudioPlayer:
             self.play_mp3(filename, volume)
         elif filename.endswith(".wav"):
             self.play_wav(filename, volume)
+        self.is_playing = False
         await self.notify_playback_finished(wingman_name, publish_event)
 
     def get_audio_from_file(self, filename: str) -> tuple:
@@ -272,18 +411,13 @@ class AudioPlayer:
     def _add_wav_effect(
         self, audio: np.ndarray, sample_rate: int, audio_sample_file: str
     ) -> np.ndarray:
-        beep_audio, beep_sample_rate = self.get_audio_from_file(
-            path.join(self.sample_dir, audio_sample_file)
+        # resampled to the sample rate and channels of 'audio' (once, then cached)
+        beep_audio, _ = self.assets.get(
+            audio_sample_file,
+            sample_rate=sample_rate,
+            channels=audio.shape[1] if audio.ndim == 2 else None,
         )
 
-        # Resample the beep sound if necessary to match the sample rate of 'audio'
-        if beep_sample_rate != sample_rate:
-            beep_audio = self._resample_audio(beep_audio, beep_sample_rate, sample_rate)
-
-        # Ensure beep_audio has the same number of channels as 'audio'
-        if beep_audio.ndim == 1 and audio.ndim == 2:
-            beep_audio = np.tile(beep_audio[:, np.newaxis], (1, audio.shape[1]))
-
         if beep_audio.ndim == 2 and audio.ndim == 1:
             audio = audio[:, np.newaxis]
 
@@ -292,19 +426,6 @@ class AudioPlayer:
 
         return audio_with_beeps
 
-    def _resample_audio(
-        self, audio: np.ndarray, original_sample_rate: int, target_sample_rate: int
-    ) -> np.ndarray:
-        # Calculate the number of samples after resampling
-        num_original_samples = audio.shape[0]
-        num_target_samples = int(
-            round(num_original_samples * target_sample_rate / original_sample_rate)
-        )
-        # Use scipy.signal resample method to resample the audio to the target sample rate
-        resampled_audio = resample(audio, num_target_samples)
-
-        return resampled_audio
-
     def _mix_in_layer(
         self,
         audio: np.ndarray,
@@ -312,15 +433,12 @@ class AudioPlayer:
         mix_layer_file: str,
         mix_layer_gain_boost_db: float = 0.0,
     ) -> np.ndarray:
-        noise_audio, noise_sample_rate = self.get_audio_from_file(
-            path.join(self.sample_dir, mix_layer_file)
+        noise_audio, _ = self.assets.get(
+            mix_layer_file,
+            sample_rate=sample_rate,
+            channels=audio.shape[1] if audio.ndim == 2 else None,
         )
 
-        if noise_sample_rate != sample_rate:
-            noise_audio = self._resample_audio(
-                noise_audio, noise_sample_rate, sample_rate
-            )
-
         # Ensure both audio and noise_audio have compatible shapes for addition
         if noise_audio.ndim == 1:
             noise_audio = noise_audio[:, None]
@@ -357,9 +475,9 @@ class AudioPlayer:
         dtype="int16",
         use_gain_boost=False,
     ):
-        buffer = bytearray()
-        stream_finished = False
-        data_received = False
+        playback = StreamingPlayback(
+            sample_rate=sample_rate, channels=channels, dtype=dtype
+        )
         mixed_pos = 0
 
         mix_layer_file = None
@@ -371,85 +489,33 @@ class AudioPlayer:
                     mix_layer_gain_boost_db += get_azure_workaround_gain_boost(effect)
 
         if mix_layer_file:
-            noise_audio, noise_sample_rate = self.get_audio_from_file(
-                path.join(self.sample_dir, mix_layer_file)
+            noise_audio, _ = self.assets.get(
+                mix_layer_file,
+                sample_rate=sample_rate,
+                channels=channels if channels > 1 else None,
             )
-            if noise_sample_rate != sample_rate:
-                noise_audio = self._resample_audio(
-                    noise_audio, noise_sample_rate, sample_rate
-                )
-            if channels > 1 and noise_audio.ndim == 1:
-                noise_audio = np.tile(noise_audio[:, None], (1, channels))
             noise_audio = noise_audio.flatten()
+            # Convert gain boost from dB to amplitude factor
+            amplitude_factor = 10 ** (mix_layer_gain_boost_db / 20)
 
         def get_mixed_chunk(length):
-            nonlocal mixed_pos, noise_audio
-            chunk = np.zeros(length, dtype=np.float32)
-            remaining = length
-            while remaining > 0:
-                if mixed_pos >= len(noise_audio):
-                    mixed_pos = 0
-                end_pos = min(len(noise_audio), mixed_pos + remaining)
-
-                num_samples_to_copy = end_pos - mixed_pos
-                if num_samples_to_copy > remaining:
-                    num_samples_to_copy = remaining
-
-                chunk[length - remaining : length - remaining + num_samples_to_copy] = (
-                    noise_audio[mixed_pos : (mixed_pos + num_samples_to_copy)]
-                )
-                remaining -= num_samples_to_copy
-                mixed_pos = mixed_pos + num_samples_to_copy
-            return chunk
-
-        def callback(outdata, frames, time, status):
-            nonlocal buffer, stream_finished, data_received, mixed_pos
-            if data_received and len(buffer) == 0:
-                stream_finished = True
-                outdata[:] = bytes(len(outdata))  # Fill the buffer with zeros
-                return
-
-            if len(buffer) > 0:
-                num_elements = frames * channels
-                byte_size = np.dtype(dtype).itemsize
-                data_chunk = np.frombuffer(
-                    buffer[: num_elements * byte_size], dtype=dtype
-                ).astype(np.float32)
-
-                if len(data_chunk) < num_elements:
-                    data_chunk = np.pad(
-                        data_chunk, (0, num_elements - len(data_chunk)), "constant"
-                    )
-
-                if channels > 1 and data_chunk.ndim == 1:
-                    data_chunk = np.tile(data_chunk[:, None], (1, channels)).flatten()
-
-                data_chunk = data_chunk[: frames * channels]
-
-                if mix_layer_file:
-                    mix_chunk = get_mixed_chunk(len(data_chunk))
-                    # Convert gain boost from dB to amplitude factor
-                    amplitude_factor = 10 ** (mix_layer_gain_boost_db / 20)
-                    data_chunk = (
-                        data_chunk + mix_chunk[: len(data_chunk)] * amplitude_factor
-                    )
-
-                data_chunk = data_chunk.flatten()
-                data_chunk = data_chunk * config.volume
-                data_chunk_bytes = data_chunk.astype(dtype).tobytes()
-                outdata[: len(data_chunk_bytes)] = data_chunk_bytes[: len(outdata)]
-                buffer = buffer[num_elements * byte_size :]
+            nonlocal mixed_pos
+            indices = (mixed_pos + np.arange(length)) % len(noise_audio)
+            mixed_pos = (mixed_pos + length) % len(noise_audio)
+            return noise_audio[indices]
 
         with sd.RawOutputStream(
             samplerate=sample_rate,
             channels=channels,
             dtype=dtype,
-            callback=callback,
+            callback=playback.callback,
+            finished_callback=playback.on_finished,
         ) as stream:
             if self.is_playing:
                 await self.stop_playback()
 
             self.raw_stream = stream
+            self.stream_playback = playback
             self.is_playing = True
             await self.notify_playback_started(wingman_name)
 
@@ -462,6 +528,20 @@ class AudioPlayer:
             if contains_high_end_radio:
                 self.play_wav_sample("Radio_Static_Beep.wav", config.volume)
 
+            # remote clients (ESP32, /ws/audio) announce the format before the chunks
+            await self.stream_event.publish(
+                "audio_format",
+                AudioStreamFormat(
+                    sample_format=(
+                        AudioSampleFormat.FLOAT32
+                        if playback.dtype == np.float32
+                        else AudioSampleFormat.PCM16
+                    ),
+                    sample_rate=sample_rate,
+                    channels=channels,
+                    chunk_size=buffer_size,
+                ),
+            )
             self.raw_stream.start()
 
             sound_effects = get_sound_effects(
@@ -471,7 +551,9 @@ class AudioPlayer:
             filled_size = buffer_callback(audio_buffer)
             while filled_size > 0:
                 data_in_numpy = np.frombuffer(
-                    audio_buffer[:filled_size], dtype=dtype
+                    audio_buffer,
+                    dtype=dtype,
+                    count=filled_size // playback.dtype.itemsize,
                 ).astype(np.float32)
 
                 for sound_effect in sound_effects:
@@ -481,19 +563,22 @@ class AudioPlayer:
 
                 if mix_layer_file:
                     noise_chunk = get_mixed_chunk(len(data_in_numpy))
-                    # Convert gain boost from dB to amplitude factor
-                    amplitude_factor = 10 ** (mix_layer_gain_boost_db / 20)
-                    data_in_numpy = data_in_numpy + noise_chunk * amplitude_factor
-
-                data_in_numpy = data_in_numpy * config.volume
-                processed_buffer = data_in_numpy.astype(dtype).tobytes()
-                buffer.extend(processed_buffer)
-                await self.stream_event.publish("audio", processed_buffer)
+                    data_in_numpy += noise_chunk * amplitude_factor
+
+                data_in_numpy *= config.volume
+                processed = data_in_numpy.astype(dtype)
+                if not await playback.write(processed):
+                    # the playback has been stopped
+                    return
+                await self.stream_event.publish("audio", processed.tobytes())
                 filled_size = buffer_callback(audio_buffer)
 
-            data_received = True
-            while not stream_finished:
-                sd.sleep(100)
+            playback.finish()
+            await playback.wait()
+            if self.stream_playback is playback:
+                self.stream_playback = None
+            if playback.stopped:
+                return
 
             contains_high_end_radio = SoundEffect.HIGH_END_RADIO in config.effects
             if contains_high_end_radio:
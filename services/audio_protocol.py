@@ -0,0 +1,215 @@
+"""A framed binary protocol to stream audio to and from remote devices (ESP32 clients and /ws/audio).
+
+Every binary websocket message is one frame: a fixed header followed by the payload.
+
+    type (uint8) | flags (uint8) | reserved (uint16) | sequence (uint32) | timestamp in µs (uint64) | payload
+
+START frames carry the AudioStreamFormat of the following audio as JSON, AUDIO frames carry samples and END frames
+are empty. Sequence numbers let the receiver detect lost and late frames, the timestamp (wall clock of the sender)
+the end-to-end lag. The sample format, sample rate and chunk size are negotiated once per connection.
+"""
+
+import struct
+import time
+from enum import IntEnum
+from typing import Iterator
+import numpy
+from api.enums import AudioSampleFormat
+from api.interface import AudioStreamFormat
+
+PROTOCOL = "wingman-audio/1"
+
+FRAME_HEADER = struct.Struct("<BBHIQ")
+
+MAX_DOWNLINK_LAG = 0.5
+"""Seconds of TTS audio that may wait to be sent to a device. Newer chunks are dropped beyond that."""
+
+MIN_CHUNK_SIZE = 256
+MAX_CHUNK_SIZE = 16384
+
+SAMPLE_DTYPES = {
+    AudioSampleFormat.PCM16: numpy.dtype("<i2"),
+    AudioSampleFormat.FLOAT32: numpy.dtype("<f4"),
+}
+
+
+class FrameType(IntEnum):
+    AUDIO = 1
+    START = 2
+    END = 3
+
+
+def negotiate(requested: dict | None) -> AudioStreamFormat:
+    """Accepts what the device asked for as far as the server supports it and falls back to the defaults otherwise."""
+    requested = requested or {}
+    audio_format = AudioStreamFormat()
+    try:
+        audio_format.sample_format = AudioSampleFormat(
+            requested.get("sample_format", audio_format.sample_format.value)
+        )
+    except ValueError:
+        pass
+    try:
+        audio_format.sample_rate = int(
+            requested.get("sample_rate", audio_format.sample_rate)
+        )
+        audio_format.channels = max(
+            int(requested.get("channels", audio_format.channels)), 1
+        )
+        chunk_size = int(requested.get("chunk_size", audio_format.chunk_size))
+    except (TypeError, ValueError):
+        chunk_size = audio_format.chunk_size
+    frame_size = SAMPLE_DTYPES[audio_format.sample_format].itemsize * (
+        audio_format.channels
+    )
+    chunk_size = min(max(chunk_size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    # frames never split a sample
+    audio_format.chunk_size = max(chunk_size - chunk_size % frame_size, frame_size)
+    audio_format.server_endpointing = requested.get("server_endpointing") in (
+        True,
+        "true",
+        "1",
+    )
+    return audio_format
+
+
+def to_samples(
+    data: bytes | memoryview, audio_format: AudioStreamFormat
+) -> numpy.ndarray:
+    """Interprets received audio as samples of shape (frames, channels). Doesn't copy."""
+    dtype = SAMPLE_DTYPES[audio_format.sample_format]
+    count = len(data) // (dtype.itemsize * audio_format.channels)
+    return numpy.frombuffer(
+        data, dtype=dtype, count=count * audio_format.channels
+    ).reshape(-1, audio_format.channels)
+
+
+def to_mono_float32(samples: numpy.ndarray) -> numpy.ndarray:
+    """Float32 in [-1, 1] of the first channel, e.g. for the VoiceActivityDetector."""
+    samples = samples[:, 0]
+    if samples.dtype.kind == "i":
+        return samples.astype(numpy.float32) / 32768
+    return samples.astype(numpy.float32)
+
+
+def timestamp_us() -> int:
+    return time.time_ns() // 1000
+
+
+def encode_frame(
+    frame_type: FrameType, sequence: int, payload: bytes | memoryview = b""
+) -> bytes:
+    return FRAME_HEADER.pack(frame_type, 0, 0, sequence, timestamp_us()) + payload
+
+
+def decode_frame(data: bytes) -> tuple[FrameType, int, int, memoryview]:
+    """Returns the type, sequence number, timestamp and payload of a frame. The payload isn't copied."""
+    if len(data) < FRAME_HEADER.size:
+        raise ValueError(f"Frame too short: {len(data)} bytes")
+    frame_type, _flags, _reserved, sequence, timestamp = FRAME_HEADER.unpack_from(
+        data
+    )
+    return (
+        FrameType(frame_type),
+        sequence,
+        timestamp,
+        memoryview(data)[FRAME_HEADER.size :],
+    )
+
+
+class AudioFramer:
+    """Splits outgoing audio into frames of the negotiated format and chunk size."""
+
+    def __init__(self, audio_format: AudioStreamFormat):
+        self.format = audio_format
+        self.dtype = SAMPLE_DTYPES[audio_format.sample_format]
+        self.sequence = 0
+        self.source_dtype = numpy.dtype("<i2")
+
+    def start(self, source_format: AudioStreamFormat) -> bytes:
+        """Announces the audio that follows. Sample rate and channels are the ones of the source."""
+        self.source_dtype = SAMPLE_DTYPES[source_format.sample_format]
+        announced = source_format.model_copy(
+            update={
+                "sample_format": self.format.sample_format,
+                "chunk_size": self.format.chunk_size,
+            }
+        )
+        return self.__next_frame(
+            FrameType.START, announced.model_dump_json().encode("utf-8")
+        )
+
+    def frames(self, audio: bytes) -> Iterator[bytes]:
+        if self.source_dtype != self.dtype:
+            samples = numpy.frombuffer(audio, dtype=self.source_dtype)
+            if self.source_dtype.kind == "i":
+                audio = (samples / 32768.0).astype(self.dtype).tobytes()
+            else:
+                samples = numpy.clip(samples, -1.0, 1.0) * 32767
+                audio = samples.astype(self.dtype).tobytes()
+        view = memoryview(audio)
+        for start in range(0, len(view), self.format.chunk_size):
+            yield self.__next_frame(
+                FrameType.AUDIO, view[start : start + self.format.chunk_size]
+            )
+
+    def end(self) -> bytes:
+        return self.__next_frame(FrameType.END)
+
+    def __next_frame(
+        self, frame_type: FrameType, payload: bytes | memoryview = b""
+    ) -> bytes:
+        frame = encode_frame(frame_type, self.sequence, payload)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        return frame
+
+
+class AudioReceiveBuffer:
+    """Collects the audio of an utterance as it arrives, without copying what has been received so far.
+
+    The memory grows by doubling, so appending a frame is amortized O(1).
+    """
+
+    def __init__(self, capacity: int = 16000 * 2 * 10):
+        self.buffer = bytearray(capacity)
+        self.size = 0
+        self.expected_sequence: int | None = None
+        self.lost = 0
+        """Frames that never arrived (gaps in the sequence numbers)."""
+        self.late = 0
+        """Frames that arrived after a newer one and were ignored."""
+
+    def __len__(self) -> int:
+        return self.size
+
+    def clear(self):
+        self.size = 0
+        self.expected_sequence = None
+        self.lost = 0
+        self.late = 0
+
+    def append(self, payload: bytes | memoryview, sequence: int = None) -> bool:
+        """Appends the payload of a frame. Returns False if the frame is late and has been ignored."""
+        if sequence is not None:
+            if self.expected_sequence is not None:
+                gap = (sequence - self.expected_sequence) & 0xFFFFFFFF
+                if gap >= 0x80000000:
+                    self.late += 1
+                    return False
+                self.lost += gap
+            self.expected_sequence = (sequence + 1) & 0xFFFFFFFF
+
+        end = self.size + len(payload)
+        if end > len(self.buffer):
+            capacity = max(end, len(self.buffer) * 2)
+            self.buffer.extend(bytes(capacity - len(self.buffer)))
+        self.buffer[self.size : end] = payload
+        self.size = end
+        return True
+
+    def take(self) -> memoryview:
+        """Hands over the received audio without copying it and starts over with new memory."""
+        data = memoryview(self.buffer)[: self.size]
+        self.buffer = bytearray(len(self.buffer))
+        self.clear()
+        return data
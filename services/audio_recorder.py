@@ -1,49 +1,49 @@
-from os import path
-from threading import Lock
+from threading import Event, Lock, Thread
 import time
 from typing import Callable
-import io
 import numpy
 import sounddevice
-import soundfile
 import speech_recognition as sr
-from speech_recognition import AudioData
-from scipy.signal import butter, filtfilt
 from api.enums import CommandTag, LogType
 from api.interface import VoiceActivationSettings
+from services.audio_input import AudioInput
 from services.printr import Printr
-from services.file import get_writable_dir
+from services.ring_buffer import AudioRingBuffer
+from services.voice_activity_detector import Utterance, VoiceActivityDetector
 
 
-RECORDING_PATH = "audio_output"
-RECORDING_FILE: str = "recording.wav"
-CONTINUOUS_RECORDING_FILE: str = "continuous_recording.wav"
+MAX_RECORDING_DURATION: float = 120
+"""Push-to-talk recordings longer than this (in seconds) only keep their last part."""
+AMBIENT_NOISE_DURATION: float = 1.5
+AMBIENT_NOISE_FACTOR: float = 1.5
+"""Voice activation only starts on frames that are this much louder than the ambient noise."""
 
 
 class AudioRecorder:
     def __init__(
         self,
-        on_speech_recorded: Callable[[str], None],
+        on_speech_recorded: Callable[[AudioInput], None],
         samplerate: int = 16000,
         channels: int = 1,
+        max_duration: float = MAX_RECORDING_DURATION,
     ):
         self.printr = Printr()
         self.on_speech_recorded = on_speech_recorded
-        self.file_path = path.join(get_writable_dir(RECORDING_PATH), RECORDING_FILE)
         self.samplerate = samplerate
         self.channels = channels
+        self.max_duration = max_duration
         self.is_recording = False
-        self.recording_data = None
+        # preallocated, so that the audio callback never has to grow the recording
+        self.recording_buffer = AudioRingBuffer(
+            capacity=int(max_duration * samplerate), channels=channels
+        )
         self.recstream = None
         self.va_settings: VoiceActivationSettings = None
 
         self.lock = Lock()
         self.is_listening_continuously = False
         self.microphone = sr.Microphone(sample_rate=samplerate)
-        self.recognizer = sr.Recognizer()
-        self.recognizer.dynamic_energy_threshold = (
-            False  # seems to be causing super long recordings / threading issues
-        )
+        self.ambient_energy = 0.0
         self.stop_function = None
         # default devices are fixed once this is called
         # so this methods needs to be called every time a new device is configured
@@ -74,10 +74,7 @@ class AudioRecorder:
 
     def __handle_input_stream(self, indata, _frames, _time, _status):
         if self.is_recording:
-            if self.recording_data is None:
-                self.recording_data = indata.copy()
-            else:
-                self.recording_data = numpy.concatenate((self.recording_data, indata))
+            self.recording_buffer.write(indata)
 
     # Push to talk:
 
@@ -85,6 +82,7 @@ class AudioRecorder:
         if self.is_recording or not self.recstream:
             return
 
+        self.recording_buffer.clear()
         self.recstream.start()
         self.is_recording = True
         self.printr.print(
@@ -93,7 +91,7 @@ class AudioRecorder:
             command_tag=CommandTag.RECORDING_STARTED,
         )
 
-    def stop_recording(self, wingman_name) -> None | str:
+    def stop_recording(self, wingman_name) -> None | AudioInput:
         if not self.recstream:
             return None
 
@@ -105,7 +103,9 @@ class AudioRecorder:
             command_tag=CommandTag.RECORDING_STOPPED,
         )
 
-        if self.recording_data is None:
+        dropped = self.recording_buffer.dropped
+        recording = self.recording_buffer.read()
+        if len(recording) == 0:
             self.printr.print(
                 f"Ignored empty recording ({wingman_name})",
                 color=LogType.WARNING,
@@ -113,7 +113,7 @@ class AudioRecorder:
                 command_tag=CommandTag.IGNORED_RECORDING,
             )
             return None
-        if (len(self.recording_data) / self.samplerate) < 0.15:
+        if (len(recording) / self.samplerate) < 0.15:
             self.printr.print(
                 f"Recording was too short to be handled by {wingman_name}",
                 color=LogType.WARNING,
@@ -121,83 +121,74 @@ class AudioRecorder:
                 command_tag=CommandTag.IGNORED_RECORDING,
             )
             return None
-
-        try:
-            soundfile.write(self.file_path, self.recording_data, self.samplerate)
-            self.recording_data = None
-            return self.file_path
-        except IndexError:
+        if dropped:
             self.printr.print(
-                "Ignored empty recording",
+                f"Recording was longer than {self.max_duration}s. Only the last {self.max_duration}s are used ({wingman_name}).",
                 color=LogType.WARNING,
                 source_name=wingman_name,
-                command_tag=CommandTag.IGNORED_RECORDING,
+                server_only=True,
             )
-            return None
+
+        return AudioInput(samples=recording, sample_rate=self.samplerate)
 
     # Continuous listening:
 
-    def contains_speech(self, audio_bytes: bytes, energy_threshold: float):
-        def butter_bandpass(lowcut: int, highcut: int, sample_rate, order):
-            nyq = 0.5 * sample_rate
-            low = lowcut / nyq
-            high = highcut / nyq
-            b, a = butter(order, [low, high], btype="band")
-            return b, a
-
-        def butter_bandpass_filter(
-            audio_data, lowcut: int, highcut: int, sample_rate, order: int
-        ):
-            b, a = butter_bandpass(
-                lowcut=lowcut, highcut=highcut, sample_rate=sample_rate, order=order
-            )
-            y = filtfilt(b, a, audio_data)
-            return y
-
-        audio_data, sample_rate = soundfile.read(io.BytesIO(audio_bytes))
-        filtered_audio = butter_bandpass_filter(
-            audio_data=audio_data,
-            sample_rate=sample_rate,
-            lowcut=85,
-            highcut=500,
-            order=5,
+    def __get_frame_threshold(self) -> float:
+        # in a noisy environment, only frames clearly above the ambient noise start an utterance
+        return max(
+            self.va_settings.energy_threshold,
+            self.ambient_energy * AMBIENT_NOISE_FACTOR,
         )
-        rms_energy = numpy.sqrt(numpy.mean(filtered_audio**2))
 
-        if rms_energy > energy_threshold:
-            return True, rms_energy
-        return False, rms_energy
-
-    def __handle_continuous_listening(self, _recognizer, audio: AudioData):
-        audio_bytes = audio.get_wav_data()
+    def __listen_continuously(self, stop_event: Event):
+        try:
+            with self.microphone as source:
+                vad = VoiceActivityDetector(
+                    sample_rate=source.SAMPLE_RATE,
+                    energy_threshold=self.__get_frame_threshold(),
+                )
+                while not stop_event.is_set():
+                    data = source.stream.read(source.CHUNK)
+                    samples = numpy.frombuffer(data, dtype="<i2").astype(numpy.float32)
+                    for utterance in vad.process(samples / 32768):
+                        self.__handle_utterance(utterance)
+        except Exception as e:
+            self.printr.print(
+                f"Error during continuous voice recognition: {e}",
+                server_only=True,
+                color=LogType.ERROR,
+            )
 
-        # skip early if the recording is just noise
-        contains_speech, recorded_energy = self.contains_speech(
-            audio_bytes=audio_bytes, energy_threshold=self.va_settings.energy_threshold
-        )
-        if not contains_speech:
+    def __handle_utterance(self, utterance: Utterance):
+        # skip if the recording is just noise
+        if utterance.energy <= self.va_settings.energy_threshold:
             self.printr.print(
-                f"Skipped recording with energy threshold {recorded_energy} < {self.va_settings.energy_threshold}",
+                f"Skipped recording with energy threshold {utterance.energy} < {self.va_settings.energy_threshold}",
                 command_tag=CommandTag.IGNORED_RECORDING,
             )
             return
 
-        file_path = path.join(
-            get_writable_dir(RECORDING_PATH), CONTINUOUS_RECORDING_FILE
-        )
-        with open(file_path, "wb") as audio_file:
-            audio_file.write(audio_bytes)
-
         if callable(self.on_speech_recorded):
-            self.on_speech_recorded(file_path)
+            self.on_speech_recorded(
+                AudioInput(samples=utterance.samples, sample_rate=utterance.sample_rate)
+            )
 
     def adjust_for_ambient_noise(self):
         with self.lock:
             try:
                 with self.microphone as mic:
-                    self.recognizer.adjust_for_ambient_noise(source=mic, duration=1.5)
+                    data = b"".join(
+                        mic.stream.read(mic.CHUNK)
+                        for _ in range(
+                            int(AMBIENT_NOISE_DURATION * mic.SAMPLE_RATE / mic.CHUNK)
+                        )
+                    )
+                    samples = numpy.frombuffer(data, dtype="<i2").astype(numpy.float32)
+                    self.ambient_energy = VoiceActivityDetector(
+                        sample_rate=mic.SAMPLE_RATE
+                    ).measure_energy(samples / 32768)
                     self.printr.print(
-                        "Microphone adjusted for ambient noise.",
+                        f"Microphone adjusted for ambient noise (energy: {self.ambient_energy:.4f}).",
                         color=LogType.INFO,
                         server_only=True,
                     )
@@ -221,9 +212,21 @@ class AudioRecorder:
         def safe_start():
             with self.lock:
                 if self.is_listening_continuously:
-                    self.stop_function = self.recognizer.listen_in_background(
-                        self.microphone, self.__handle_continuous_listening
+                    stop_event = Event()
+                    thread = Thread(
+                        target=self.__listen_continuously,
+                        args=(stop_event,),
+                        name="ContinuousListening",
+                        daemon=True,
                     )
+                    thread.start()
+
+                    def stop(wait_for_stop: bool = True):
+                        stop_event.set()
+                        if wait_for_stop:
+                            thread.join()
+
+                    self.stop_function = stop
                     self.printr.print(
                         "Continous voice recognition started.",
                         color=LogType.INFO,
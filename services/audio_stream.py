@@ -0,0 +1,72 @@
+import asyncio
+from threading import Event
+import numpy as np
+import sounddevice as sd
+from services.ring_buffer import StreamRingBuffer
+
+STREAM_BUFFER_DURATION = 30
+"""How many seconds of streamed audio can be buffered ahead of the playback."""
+
+
+class StreamingPlayback:
+    """Connects a producer of streamed PCM audio (e.g. TTS) with the callback of a sd.RawOutputStream.
+
+    The callback copies the buffered samples straight into the output block of the device, so it doesn't allocate.
+    The end of the stream is signalled with an event instead of polling.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        dtype: str = "int16",
+        buffer_duration: float = STREAM_BUFFER_DURATION,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.ring = StreamRingBuffer(
+            int(sample_rate * channels * buffer_duration), dtype=self.dtype
+        )
+        self.end_of_stream = False
+        self.stopped = False
+        self.finished = Event()
+        self.underruns = 0
+        """The number of blocks the device needed before the producer delivered them."""
+
+    def callback(self, outdata, frames, time, status):
+        out = np.frombuffer(outdata, dtype=self.dtype)
+        count = self.ring.read_into(out)
+        if count < len(out):
+            out[count:] = 0
+            if self.end_of_stream and len(self.ring) == 0:
+                # the device plays this last block and then calls on_finished
+                raise sd.CallbackStop
+            if self.ring.write_index > 0:
+                self.underruns += 1
+
+    def on_finished(self):
+        """The finished_callback of the stream. Stopping it to pause the playback doesn't finish it."""
+        if self.stopped or (self.end_of_stream and len(self.ring) == 0):
+            self.finished.set()
+
+    async def write(self, samples: np.ndarray) -> bool:
+        """Queues interleaved samples and waits while the buffer is full. Returns False if the playback was stopped."""
+        written = self.ring.write(samples)
+        while written < len(samples):
+            if self.stopped:
+                return False
+            await asyncio.sleep(len(samples) / self.channels / self.sample_rate)
+            written += self.ring.write(samples[written:])
+        return not self.stopped
+
+    def finish(self):
+        """Marks the end of the stream. The playback finishes once the buffered audio has been played."""
+        self.end_of_stream = True
+
+    def stop(self):
+        self.stopped = True
+        self.finished.set()
+
+    async def wait(self):
+        await asyncio.to_thread(self.finished.wait)
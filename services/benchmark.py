@@ -37,6 +37,14 @@ class Benchmark:
         self.snapshot_label = label
         self.snapshot_start_time = time.perf_counter()
 
+    def add_snapshot(self, label: str, start_time: float = None):
+        """Records a snapshot that ends now without touching the running one. Measures from the start of the benchmark by default."""
+        self.snapshots.append(
+            self._create_benchmark_result(
+                label=label, start_time=start_time or self.start_time
+            )
+        )
+
     def finish_snapshot(self):
         try:
             result = self._create_benchmark_result(
@@ -1,8 +1,6 @@
 import json
 import asyncio
-import threading
 from fastapi import WebSocket
-import pygame
 import keyboard.keyboard as keyboard
 from api.commands import (
     ActionsRecordedCommand,
@@ -62,20 +60,12 @@ class CommandHandler:
                 )
             elif command_name == "record_joystick_actions":
 
-                def run_async_joystick_recording():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        loop.run_until_complete(
-                            self.handle_record_joystick_actions(
-                                RecordJoystickActionsCommand(**command), websocket
-                            )
-                        )
-                    finally:
-                        loop.close()
-
-                play_thread = threading.Thread(target=run_async_joystick_recording)
-                play_thread.start()
+                self.core.runtime.submit(
+                    self.handle_record_joystick_actions,
+                    RecordJoystickActionsCommand(**command),
+                    websocket,
+                    executor="devices",
+                )
             elif command_name == "stop_recording":
                 await self.handle_stop_recording(
                     StopRecordingCommand(**command), websocket
@@ -167,6 +157,9 @@ class CommandHandler:
             server_only=True,
         )
 
+        # only needed to record joystick buttons, so not imported at startup
+        import pygame
+
         self.recorded_keys = []
         was_init = pygame.get_init()
         pygame.init()
@@ -0,0 +1,111 @@
+from collections import Counter
+from difflib import SequenceMatcher
+from api.interface import CommandConfig
+
+
+def bigrams(text: str) -> list[str]:
+    return [text[index : index + 2] for index in range(len(text) - 1)]
+
+
+class CommandMatcher:
+    """An index of the commands of a Wingman and their instant_activation phrases.
+
+    match returns the same commands as difflib.get_close_matches(transcript, phrases, n=1, cutoff=cutoff) would, but
+    only compares the transcript to phrases that can reach the cutoff:
+
+    - An exact match scores 1.0 and is looked up directly.
+    - The ratio of SequenceMatcher is 2 * M / T, with M the characters in matching blocks and T the length of both
+      strings. Phrases whose length alone rules out M >= cutoff * T / 2 are skipped (like real_quick_ratio).
+    - Every boundary between two matching blocks skips at least one character, so there are at most T - 2 * M + 1
+      blocks and the strings share at least M - (T - 2 * M + 1) bigrams. Phrases sharing fewer bigrams with the
+      transcript are skipped. (Trigrams would only guarantee M - 2 * (T - 2 * M + 1), which is < 0 at cutoff 0.8.)
+
+    The index is built once. Build a new one whenever the commands or their phrases change.
+    """
+
+    def __init__(self, commands: list[CommandConfig] | None, cutoff: float = 0.8):
+        self.commands = commands
+        self.command_count = len(commands or [])
+        self.cutoff = cutoff
+
+        self.commands_by_name: dict[str, CommandConfig] = {}
+        self.commands_by_phrase: dict[str, list[CommandConfig]] = {}
+        for command in commands or []:
+            self.commands_by_name.setdefault(command.name, command)
+            for phrase in command.instant_activation or []:
+                self.commands_by_phrase.setdefault(phrase.lower(), []).append(command)
+
+        self.phrases = list(self.commands_by_phrase.keys())
+        self.phrases_by_length: dict[int, list[int]] = {}
+        self.bigrams_by_length: dict[int, dict[str, list[tuple[int, int]]]] = {}
+        """Phrase length -> bigram -> (index of the phrase, occurrences in the phrase)"""
+        for index, phrase in enumerate(self.phrases):
+            self.phrases_by_length.setdefault(len(phrase), []).append(index)
+            postings = self.bigrams_by_length.setdefault(len(phrase), {})
+            for bigram, occurrences in Counter(bigrams(phrase)).items():
+                postings.setdefault(bigram, []).append((index, occurrences))
+        self.required_bigrams: dict[int, int] = {}
+
+    def is_current(self, commands: list[CommandConfig] | None) -> bool:
+        """False if the Wingman got a new config (or commands) since the index was built."""
+        return commands is self.commands and len(commands or []) == self.command_count
+
+    def get_command(self, command_name: str) -> CommandConfig | None:
+        return self.commands_by_name.get(command_name)
+
+    def match(self, transcript: str) -> list[CommandConfig] | None:
+        """Returns the commands of the instant_activation phrase most similar to the transcript, if it's similar enough."""
+        word = transcript.lower()
+        commands = self.commands_by_phrase.get(word)
+        if commands:
+            return commands
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        word_bigrams = Counter(bigrams(word))
+        best: tuple[float, str] = None
+        for length, indices in self.phrases_by_length.items():
+            total = len(word) + length
+            if not total or 2.0 * min(len(word), length) / total < self.cutoff:
+                continue
+
+            required = self.__get_required_bigrams(total)
+            if required > 0:
+                shared: dict[int, int] = {}
+                postings = self.bigrams_by_length[length]
+                for bigram, count in word_bigrams.items():
+                    for index, occurrences in postings.get(bigram, ()):
+                        shared[index] = shared.get(index, 0) + min(count, occurrences)
+                indices = [
+                    index for index, count in shared.items() if count >= required
+                ]
+
+            for index in indices:
+                phrase = self.phrases[index]
+                matcher.set_seq1(phrase)
+                if (
+                    matcher.real_quick_ratio() >= self.cutoff
+                    and matcher.quick_ratio() >= self.cutoff
+                ):
+                    score = matcher.ratio()
+                    # ties go to the greater phrase, like in get_close_matches
+                    if score >= self.cutoff and (
+                        best is None or (score, phrase) > best
+                    ):
+                        best = (score, phrase)
+
+        return self.commands_by_phrase[best[1]] if best else None
+
+    def __get_required_bigrams(self, total: int) -> int:
+        """The bigrams two strings of the given total length share at least if their ratio reaches the cutoff."""
+        required = self.required_bigrams.get(total)
+        if required is None:
+            # the fewest matching characters that reach the cutoff (compared like SequenceMatcher does)
+            matches = next(
+                matches
+                for matches in range(total + 1)
+                if 2.0 * matches / total >= self.cutoff
+            )
+            required = matches - (total - 2 * matches + 1)
+            self.required_bigrams[total] = required
+        return required
@@ -25,7 +25,7 @@ class ConfigService:
     def __init__(self, config_manager: ConfigManager):
         self.printr = Printr()
         self.config_manager = config_manager
-        self.config_events = PubSub()
+        self.config_events = PubSub("config")
         self.source_name = "Config Service"
 
         self.current_config_dir: ConfigDirInfo = (
@@ -1,6 +1,174 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
 from enum import Enum
 from fastapi import WebSocket
 from api.commands import WebSocketCommandModel
+from api.interface import WebSocketClientStats, WebSocketStats
+
+
+class DeliveryPolicy(Enum):
+    RELIABLE = "reliable"
+    """Always delivered, even if the queue of the client is full."""
+    DROPPABLE = "droppable"
+    """Dropped if the queue of the client is full. For high-frequency messages like log lines and audio chunks."""
+    COALESCE = "coalesce"
+    """Replaces an older message with the same key that is still queued. For state updates where only the latest counts."""
+
+
+COMMAND_POLICIES = {
+    "log": DeliveryPolicy.DROPPABLE,
+    "voice_activation_muted": DeliveryPolicy.COALESCE,
+}
+"""How broadcast commands are delivered. Commands that aren't listed are reliable."""
+
+CLIENT_QUEUE_LIMIT = 1000
+"""Messages that may wait for a client before droppable ones are dropped."""
+
+AUDIO_QUEUE_LIMIT = 200
+"""Audio chunks that may wait for a client of /ws/audio."""
+
+REPLAY_LIMIT = 1000
+"""Droppable messages kept for the next client while no client is connected. Others are always kept."""
+
+LAG_SAMPLES = 100
+
+
+class OutgoingMessage:
+    __slots__ = ("payload", "policy", "key", "created")
+
+    def __init__(
+        self,
+        payload: str | bytes,
+        policy: DeliveryPolicy = DeliveryPolicy.RELIABLE,
+        key: str = None,
+    ):
+        self.payload = payload
+        """Serialized once, no matter how many clients it's sent to."""
+        self.policy = policy
+        self.key = key
+        """Messages with the same key coalesce."""
+        self.created = time.perf_counter()
+
+
+class ClientConnection:
+    """Sends the messages for one websocket from a bounded queue, so a slow client doesn't stall the others.
+
+    Enqueueing never waits for the client and can be done from any thread.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        endpoint: str,
+        queue_limit: int = CLIENT_QUEUE_LIMIT,
+    ):
+        self.websocket = websocket
+        self.endpoint = endpoint
+        self.queue_limit = queue_limit
+        self.queue: deque[OutgoingMessage] = deque()
+        self.coalescing: dict[str, OutgoingMessage] = {}
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.max_queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.lags: deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.max_lag = 0.0
+        self.sender = self.loop.create_task(self.__send_messages())
+
+    def send(self, message: OutgoingMessage):
+        """Queues a message for this client. Returns immediately."""
+        if self.closed:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.__enqueue(message)
+        else:
+            self.loop.call_soon_threadsafe(self.__enqueue, message)
+
+    async def close(self):
+        self.closed = True
+        self.sender.cancel()
+        try:
+            await self.websocket.close()
+        except RuntimeError:
+            pass  # already closed, e.g. if the client closed the browser tab
+
+    def get_stats(self) -> WebSocketClientStats:
+        client = self.websocket.client
+        return WebSocketClientStats(
+            client=f"{client.host}:{client.port}" if client else "",
+            endpoint=self.endpoint,
+            queued=len(self.queue),
+            max_queued=self.max_queued,
+            sent=self.sent,
+            dropped=self.dropped,
+            coalesced=self.coalesced,
+            lag_ms=(
+                (time.perf_counter() - self.queue[0].created) * 1000
+                if self.queue
+                else 0.0
+            ),
+            avg_lag_ms=(
+                sum(self.lags) / len(self.lags) * 1000 if self.lags else 0.0
+            ),
+            max_lag_ms=self.max_lag * 1000,
+        )
+
+    def __enqueue(self, message: OutgoingMessage):
+        if message.policy == DeliveryPolicy.COALESCE:
+            queued = self.coalescing.get(message.key)
+            if queued is not None:
+                queued.payload = message.payload
+                self.coalesced += 1
+                return
+            self.coalescing[message.key] = message
+        elif (
+            message.policy == DeliveryPolicy.DROPPABLE
+            and len(self.queue) >= self.queue_limit
+        ):
+            self.dropped += 1
+            return
+
+        self.queue.append(message)
+        self.max_queued = max(self.max_queued, len(self.queue))
+        self.ready.set()
+
+    async def __send_messages(self):
+        try:
+            while True:
+                if not self.queue:
+                    self.ready.clear()
+                    await self.ready.wait()
+                    continue
+
+                message = self.queue.popleft()
+                if message.policy == DeliveryPolicy.COALESCE:
+                    self.coalescing.pop(message.key, None)
+                if isinstance(message.payload, bytes):
+                    await self.websocket.send_bytes(message.payload)
+                else:
+                    await self.websocket.send_text(message.payload)
+
+                lag = time.perf_counter() - message.created
+                self.lags.append(lag)
+                self.max_lag = max(self.max_lag, lag)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # the client is gone. The endpoint notices it on its next receive.
+            self.closed = True
+            self.queue.clear()
+            self.coalescing.clear()
 
 
 class ConnectionManager:
@@ -15,13 +183,32 @@ class ConnectionManager:
 
     def __init__(self):
         if not hasattr(self, "active_connections"):
-            self.active_connections = []
-            self.message_queue = []
+            self.active_connections: list[WebSocket] = []
+            self.clients: dict[WebSocket, ClientConnection] = {}
+            # messages broadcast while no client is connected, in order of their sequence number
+            self.replay_sequence = itertools.count()
+            self.replay: deque[tuple[int, OutgoingMessage]] = deque(
+                maxlen=REPLAY_LIMIT
+            )
+            self.replay_reliable: deque[tuple[int, OutgoingMessage]] = deque()
+            self.replay_dropped = 0
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
+        self.attach(websocket, endpoint="/ws")
         self.active_connections.append(websocket)
 
+    def attach(
+        self,
+        websocket: WebSocket,
+        endpoint: str,
+        queue_limit: int = CLIENT_QUEUE_LIMIT,
+    ) -> ClientConnection:
+        """Creates the send queue of an accepted websocket. Clients of other endpoints use it to send directly."""
+        client = ClientConnection(websocket, endpoint, queue_limit)
+        self.clients[websocket] = client
+        return client
+
     async def client_ready(self, websocket: WebSocket):
         await self._broadcast_queued_messages(websocket)
 
@@ -33,26 +220,44 @@ class ConnectionManager:
         )
 
     async def _broadcast_queued_messages(self, websocket: WebSocket):
-        while self.message_queue:
-            payload = self.message_queue.pop(0)
-            await websocket.send_text(payload.model_dump_json())
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        for _sequence, message in heapq.merge(self.replay, self.replay_reliable):
+            client.send(message)
+        self.replay.clear()
+        self.replay_reliable.clear()
 
     async def broadcast(self, command: WebSocketCommandModel):
-        json_str = command.model_dump_json()
+        """Serializes the command once and queues it for every client of /ws. Doesn't wait for the clients."""
+        policy = COMMAND_POLICIES.get(command.command, DeliveryPolicy.RELIABLE)
+        message = OutgoingMessage(
+            command.model_dump_json(), policy=policy, key=command.command
+        )
         if self.active_connections:
             for connection in self.active_connections:
-                await connection.send_text(json_str)
+                self.clients[connection].send(message)
+        elif policy == DeliveryPolicy.RELIABLE:
+            self.replay_reliable.append((next(self.replay_sequence), message))
         else:
-            self.message_queue.append(command)
+            if len(self.replay) == self.replay.maxlen:
+                self.replay_dropped += 1
+            self.replay.append((next(self.replay_sequence), message))
 
     async def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-            try:
-                await websocket.close()
-            except RuntimeError:
-                pass  # already closed, e.g. if the client closed the browser tab
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            await client.close()
+
+    def get_stats(self) -> WebSocketStats:
+        return WebSocketStats(
+            replay_queued=len(self.replay) + len(self.replay_reliable),
+            replay_dropped=self.replay_dropped,
+            clients=[client.get_stats() for client in self.clients.values()],
+        )
 
     async def shutdown(self):
-        for websocket in self.active_connections[:]:
+        for websocket in list(self.clients):
             await self.disconnect(websocket)
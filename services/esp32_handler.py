@@ -1,45 +1,121 @@
 import asyncio
 import json
-from os import path
-import wave
+import threading
 
 from fastapi import WebSocket, WebSocketDisconnect
 
-from services.file import get_writable_dir
+from api.interface import AudioStreamFormat
+from services.audio_input import AudioInput
+from services.audio_protocol import (
+    MAX_DOWNLINK_LAG,
+    PROTOCOL,
+    SAMPLE_DTYPES,
+    AudioFramer,
+    AudioReceiveBuffer,
+    FrameType,
+    decode_frame,
+    negotiate,
+    to_mono_float32,
+    to_samples,
+)
+from services.voice_activity_detector import VoiceActivityDetector
 from wingman_core import WingmanCore
 
-
 class Esp32Handler:
+    """Streams audio from and to an ESP32 device.
+
+    Devices that don't send a hello stream raw 16 bit mono PCM at 16kHz with JSON start/end messages. Devices that
+    send {"role": "user", "type": "hello", "protocol": "wingman-audio/1", "format": {...}} negotiate the format and
+    use the framed protocol of services/audio_protocol.py in both directions.
+    """
+
     def __init__(self, core: WingmanCore) -> None:
         self.to_device = asyncio.Queue()
+        """Belongs to the loop of the websocket, use send to add messages."""
+        self.loop = asyncio.get_running_loop()
         self.core = core
         self.wait_for_response = False
-        self.recording_path = "audio_output"
-        self.recording_file = "client_recording.wav"
-        self.recording_file_path = path.join(
-            get_writable_dir(self.recording_path), self.recording_file
-        )
+
+        self.audio_format: AudioStreamFormat = None
+        """Set once the device negotiated the framed protocol."""
+        self.framer: AudioFramer = None
+        self.receive_buffer = AudioReceiveBuffer()
+        self.voice_activity_detector: VoiceActivityDetector = None
+        self.utterance_sent = False
+        self.queued_audio = 0
+        """Bytes of all binary messages (audio, start and end frames) that are queued for the device."""
+        self.queued_audio_lock = threading.Lock()
+        self.max_queued_audio = int(MAX_DOWNLINK_LAG * 16000 * 2)
+        self.dropped_audio = 0
 
         core.audio_player.stream_event.subscribe("audio", self.handle_stream_playback)
+        core.audio_player.stream_event.subscribe(
+            "audio_format", self.handle_stream_format
+        )
         core.audio_player.playback_events.subscribe("started", self.handle_start)
         core.audio_player.playback_events.subscribe("finished", self.handle_end)
 
+    def close(self):
+        self.core.audio_player.stream_event.unsubscribe(
+            "audio", self.handle_stream_playback
+        )
+        self.core.audio_player.stream_event.unsubscribe(
+            "audio_format", self.handle_stream_format
+        )
+        self.core.audio_player.playback_events.unsubscribe("started", self.handle_start)
+        self.core.audio_player.playback_events.unsubscribe("finished", self.handle_end)
+
+    def send(self, message: dict | bytes):
+        """Queues a message for the device. Can be called from any thread, e.g. the worker that plays the audio."""
+        if isinstance(message, bytes):
+            with self.queued_audio_lock:
+                self.queued_audio += len(message)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.to_device.put_nowait(message)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.to_device.put_nowait, message)
+
     async def handle_start(self, _):
-        if self.wait_for_response:
-            await self.to_device.put({"role": "assistant", "type": "audio", "format": "bytes.raw", "start": True})
+        if self.wait_for_response and not self.framer:
+            self.send({"role": "assistant", "type": "audio", "format": "bytes.raw", "start": True})
 
     async def handle_end(self, _):
         if self.wait_for_response:
             self.wait_for_response = False
-            await self.to_device.put({"role": "assistant", "type": "audio", "format": "bytes.raw", "end": True})
+            if self.framer:
+                self.send(self.framer.end())
+            else:
+                self.send({"role": "assistant", "type": "audio", "format": "bytes.raw", "end": True})
+
+    async def handle_stream_format(self, source_format: AudioStreamFormat):
+        self.max_queued_audio = int(
+            MAX_DOWNLINK_LAG
+            * source_format.sample_rate
+            * source_format.channels
+            * SAMPLE_DTYPES[(self.audio_format or source_format).sample_format].itemsize
+        )
+        if self.wait_for_response and self.framer:
+            self.send(self.framer.start(source_format))
 
     async def handle_stream_playback(self, audio_stream):
         if self.wait_for_response:
-            for chunk in self.direct_stream(audio_stream):
-                await self.to_device.put(chunk)
-    
+            chunks = (
+                self.framer.frames(audio_stream)
+                if self.framer
+                else self.direct_stream(audio_stream)
+            )
+            for chunk in chunks:
+                # if the connection can't keep up, the device skips ahead instead of falling further behind
+                if self.queued_audio >= self.max_queued_audio:
+                    self.dropped_audio += 1
+                    continue
+                self.send(chunk)
+
     async def receive_messages(self, websocket: WebSocket):
-        byte_string = b''
         while True:
             try:
                 try:
@@ -47,29 +123,24 @@ class Esp32Handler:
                 except Exception as e:
                     print(str(e))
                     return
-                if "text" in data:
+                if data.get("text") is not None:
                     try:
-                        data = json.loads(data["text"])
-                        if data["role"] == "user":
-                            if "start" in data:
-                                byte_string = b''
-                            elif "end" in data:
-                                # Set the parameters for the WAV file
-                                nchannels = 1  # Mono audio
-                                sampwidth = 2  # 2 bytes per sample for 16-bit audio
-                                framerate = 16000  # Sample rate
-
-                                # Save the received stream of bytes as a WAV file
-                                loop = asyncio.get_event_loop()
-                                await loop.run_in_executor(None, self.save_wav, byte_string, nchannels, sampwidth, framerate)
-                                
-                                self.wait_for_response = True
-                                self.core.on_audio_recorder_speech_recorded(self.recording_file_path)
+                        message = json.loads(data["text"])
+                        if message.get("type") == "hello":
+                            await self.handle_hello(message)
+                        elif message["role"] == "user":
+                            if "start" in message:
+                                self.start_utterance()
+                            elif "end" in message:
+                                self.end_utterance()
 
                     except json.JSONDecodeError:
                         pass  # data is not JSON, leave it as is
-                if "bytes" in data:
-                    byte_string += data["bytes"]
+                if data.get("bytes") is not None:
+                    if self.audio_format:
+                        self.handle_frame(data["bytes"])
+                    else:
+                        self.receive_buffer.append(data["bytes"])
             except WebSocketDisconnect as e:
                 if e.code == 1000:
                     print("Websocket connection closed normally.")
@@ -77,6 +148,91 @@ class Esp32Handler:
                 else:
                     raise
 
+    async def handle_hello(self, message: dict):
+        if message.get("protocol") != PROTOCOL:
+            return
+        self.audio_format = negotiate(message.get("format"))
+        self.framer = AudioFramer(self.audio_format)
+        self.receive_buffer = AudioReceiveBuffer(
+            self.audio_format.sample_rate
+            * self.audio_format.channels
+            * SAMPLE_DTYPES[self.audio_format.sample_format].itemsize
+            * 10
+        )
+        self.send(
+            {
+                "role": "server",
+                "type": "hello",
+                "protocol": PROTOCOL,
+                "format": self.audio_format.model_dump(mode="json"),
+            }
+        )
+
+    def handle_frame(self, data: bytes):
+        try:
+            frame_type, sequence, _timestamp, payload = decode_frame(data)
+        except ValueError:
+            return
+        if frame_type == FrameType.AUDIO:
+            self.receive_audio(payload, sequence)
+        elif frame_type == FrameType.START:
+            self.start_utterance()
+        elif frame_type == FrameType.END:
+            self.end_utterance()
+
+    def start_utterance(self):
+        self.receive_buffer.clear()
+        self.utterance_sent = False
+        if self.audio_format and self.audio_format.server_endpointing:
+            va_settings = self.core.settings_service.settings.voice_activation
+            self.voice_activity_detector = VoiceActivityDetector(
+                sample_rate=self.audio_format.sample_rate,
+                energy_threshold=va_settings.energy_threshold,
+            )
+        else:
+            self.voice_activity_detector = None
+
+    def receive_audio(self, payload: memoryview, sequence: int):
+        if self.utterance_sent or not self.receive_buffer.append(payload, sequence):
+            return
+        if self.voice_activity_detector:
+            samples = to_mono_float32(to_samples(payload, self.audio_format))
+            for utterance in self.voice_activity_detector.process(samples):
+                # the speaker paused, so the transcription starts before the device ends the utterance
+                self.utterance_sent = True
+                self.send_recording(
+                    AudioInput(
+                        samples=utterance.samples, sample_rate=utterance.sample_rate
+                    )
+                )
+                break
+
+    def end_utterance(self):
+        if self.utterance_sent:
+            self.utterance_sent = False
+            self.receive_buffer.clear()
+            return
+
+        if self.audio_format:
+            audio_input = AudioInput(
+                samples=to_samples(self.receive_buffer.take(), self.audio_format),
+                sample_rate=self.audio_format.sample_rate,
+                name="client_recording.wav",
+            )
+        else:
+            # the device streams 16 bit mono PCM at 16kHz
+            audio_input = AudioInput.from_pcm16(
+                self.receive_buffer.take(),
+                sample_rate=16000,
+                channels=1,
+                name="client_recording.wav",
+            )
+        self.send_recording(audio_input)
+
+    def send_recording(self, audio_input: AudioInput):
+        self.wait_for_response = True
+        self.core.on_audio_recorder_speech_recorded(audio_input)
+
     async def send_messages(self, websocket: WebSocket):
         while True:
             message = await self.to_device.get()
@@ -85,6 +241,8 @@ class Esp32Handler:
                     await websocket.send_json(message)
                 elif isinstance(message, bytes):
                     await websocket.send_bytes(message)
+                    with self.queued_audio_lock:
+                        self.queued_audio -= len(message)
                 else:
                     raise TypeError("Message must be a dict or bytes")
             except:
@@ -92,17 +250,10 @@ class Esp32Handler:
                 await self.to_device.put(message)
                 raise
 
-    def save_wav(self, data, nchannels, sampwidth, framerate):
-        with wave.open(self.recording_file_path, "wb") as wf:
-            wf.setnchannels(nchannels)
-            wf.setsampwidth(sampwidth)
-            wf.setframerate(framerate)
-            wf.writeframes(data)
-
     def direct_stream(self, audio_bytes):
         chunk_size = 2048
 
         # Stream the audio
         for i in range(0, len(audio_bytes), chunk_size):
             chunk = audio_bytes[i : i + chunk_size]
-            yield chunk
\ No newline at end of file
+            yield chunk
@@ -1,7 +1,12 @@
+from collections import deque
+from contextvars import ContextVar
 from datetime import datetime
+import asyncio
+import atexit
 import logging
 import sys
-import inspect
+import threading
+import time
 from logging import Formatter
 from logging.handlers import RotatingFileHandler
 from os import path
@@ -9,23 +14,273 @@ from api.commands import LogCommand, ToastCommand
 from api.enums import CommandTag, LogSource, LogType, ToastType
 from api.interface import BenchmarkResult
 from services.file import get_writable_dir
+from services.runtime import Runtime
 from services.websocket_user import WebSocketUser
 
+wingman_context: ContextVar[str | None] = ContextVar("wingman_name", default=None)
+"""The name of the wingman the current code runs for. Log records that don't name a wingman explicitly use it.
+
+Set by Wingman.process and the Tower. Tasks and jobs submitted to the Runtime inherit it.
+"""
+
+LOG_QUEUE_LIMIT = 10000
+"""Records that may wait for the consumer. Beyond that, new subtle and info records are dropped."""
+
+LOG_COALESCE_THRESHOLD = 1000
+"""Once this many records are waiting, a record that repeats the previous one only increments its count."""
+
+LOG_BATCH_SIZE = 500
+"""The maximum number of records the consumer writes at once."""
+
+
+class LogRecord:
+    """A log line as enqueued by the callers. It's formatted and sent by the consumer thread of the LogPipeline."""
+
+    __slots__ = (
+        "created",
+        "text",
+        "log_type",
+        "level",
+        "stream",
+        "gui",
+        "toast_type",
+        "source",
+        "source_name",
+        "command_tag",
+        "skill_name",
+        "additional_data",
+        "wingman_name",
+        "benchmark_result",
+        "count",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        log_type: LogType = None,
+        level: int = logging.INFO,
+        stream=None,
+        gui: bool = False,
+        toast_type: ToastType = None,
+        source=LogSource.SYSTEM,
+        source_name: str = "",
+        command_tag: CommandTag = None,
+        skill_name: str = "",
+        additional_data: dict = None,
+        wingman_name: str = None,
+        benchmark_result: BenchmarkResult = None,
+    ):
+        self.created = time.time()
+        self.text = text
+        self.log_type = log_type
+        """None for lines written to the redirected stdout or stderr."""
+        self.level = level
+        self.stream = stream
+        """The original stream a redirected line is echoed to. Colored lines go to the console logger."""
+        self.gui = gui
+        self.toast_type = toast_type
+        self.source = source
+        self.source_name = source_name
+        self.command_tag = command_tag
+        self.skill_name = skill_name
+        self.additional_data = additional_data
+        self.wingman_name = wingman_name
+        self.benchmark_result = benchmark_result
+        self.count = 1
+
+    def repeats(self, other: "LogRecord") -> bool:
+        return (
+            self.text == other.text
+            and self.log_type == other.log_type
+            and self.stream is other.stream
+            and self.gui == other.gui
+            and self.toast_type == other.toast_type
+            and self.wingman_name == other.wingman_name
+            and self.benchmark_result is None
+            and other.benchmark_result is None
+            and self.additional_data is None
+            and other.additional_data is None
+        )
+
+    @property
+    def droppable(self) -> bool:
+        return (
+            self.toast_type is None
+            and self.benchmark_result is None
+            and self.level < logging.ERROR
+            and self.log_type in (None, LogType.SUBTLE, LogType.INFO)
+        )
+
+
+class LogPipeline:
+    """Decouples logging from the callers: enqueueing is O(1) and never waits for the console, the file or the client.
+
+    A single consumer thread writes the records in batches to the console, the log file and the client.
+    Under backpressure repeated records are coalesced and subtle or info records are dropped.
+    """
+
+    def __init__(self, printr: "Printr"):
+        self.printr = printr
+        self.records: deque[LogRecord] = deque()
+        self.wakeup = threading.Event()
+        self.drained = threading.Condition()
+        self.busy = False
+        self.enqueued = 0
+        self.written = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.reported_dropped = 0
+        self.loop: asyncio.AbstractEventLoop = None
+        """Sends to the client if the main loop isn't running, e.g. during startup and in benchmarks."""
+        self.thread = threading.Thread(
+            target=self.__consume, name="printr", daemon=True
+        )
+        self.thread.start()
+
+    def enqueue(self, record: LogRecord):
+        waiting = len(self.records)
+        if waiting >= LOG_COALESCE_THRESHOLD:
+            try:
+                last = self.records[-1]
+            except IndexError:
+                last = None
+            if last is not None and last.repeats(record):
+                last.count += 1
+                self.coalesced += 1
+                return
+            if waiting >= LOG_QUEUE_LIMIT and record.droppable:
+                self.dropped += 1
+                return
+
+        self.records.append(record)
+        self.enqueued += 1
+        # always, the consumer may have drained the queue and gone back to waiting since `waiting` was read
+        self.wakeup.set()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until the consumer has written everything that has been enqueued so far."""
+        if threading.current_thread() is self.thread:
+            return False
+        self.wakeup.set()
+        with self.drained:
+            return self.drained.wait_for(
+                lambda: not self.records and not self.busy, timeout=timeout
+            )
+
+    def __consume(self):
+        while True:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            while self.records:
+                self.busy = True
+                batch = []
+                while self.records and len(batch) < LOG_BATCH_SIZE:
+                    batch.append(self.records.popleft())
+                try:
+                    self.__write(batch)
+                except Exception as e:
+                    original_stderr = getattr(sys, "__stderr__", sys.stderr)
+                    original_stderr.write(f"Error in Printr: {str(e)}\n")
+                self.written += len(batch)
+            with self.drained:
+                self.busy = False
+                if not self.records:
+                    self.drained.notify_all()
+                else:
+                    self.wakeup.set()
+
+    def __write(self, batch: list[LogRecord]):
+        if self.dropped > self.reported_dropped:
+            dropped = self.dropped - self.reported_dropped
+            self.reported_dropped = self.dropped
+            batch.insert(
+                0,
+                LogRecord(
+                    f"Printr dropped {dropped} log records under backpressure.",
+                    log_type=LogType.WARNING,
+                ),
+            )
+
+        console_lines = []
+        file_records = []
+        commands = []
+        for record in batch:
+            text = record.text
+            if record.count > 1:
+                text = f"{text} (x{record.count})"
+            if record.log_type is None:
+                # a line written to the redirected stdout or stderr
+                record.stream.write(text + "\n")
+            else:
+                if record.benchmark_result:
+                    execution_time = record.benchmark_result.formatted_execution_time
+                    text = f"{text} ({execution_time})"
+                lines = [text]
+                if record.benchmark_result and record.benchmark_result.snapshots:
+                    lines.extend(
+                        f"  - {snapshot.label}: {snapshot.formatted_execution_time}"
+                        for snapshot in record.benchmark_result.snapshots
+                    )
+                color = self.printr.get_terminal_color(record.log_type)
+                console_lines.extend(self.printr.clr(line, color) for line in lines)
+                text = "\n".join(lines)
+            file_records.append(
+                logging.LogRecord(
+                    "file_logger", record.level, "", 0, text, None, None
+                )
+            )
+            file_records[-1].created = record.created
+            if record.gui:
+                commands.append(self.printr.create_command(record))
+
+        if console_lines:
+            self.printr.write_console("\n".join(console_lines))
+        self.printr.write_file(file_records)
+        if commands:
+            self.__send(commands)
+
+    def __send(self, commands: list):
+        connection_manager = self.printr._connection_manager
+        if connection_manager is None:
+            return
+
+        async def broadcast():
+            for command in commands:
+                await connection_manager.broadcast(command=command)
+
+        runtime = Runtime()
+        # only create the coroutine for the loop that runs it, an unscheduled one would never be awaited
+        if runtime.is_main_loop_running():
+            coroutine = broadcast()
+            if runtime.run_on_main_loop(coroutine) is not None:
+                return
+            # the main loop stopped in the meantime
+            coroutine.close()
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(broadcast())
+
 
 class StreamToLogger:
-    def __init__(self, logger, log_level=logging.INFO, stream=sys.stdout):
-        self.logger = logger
+    def __init__(
+        self, pipeline: LogPipeline, log_level=logging.INFO, stream=sys.stdout
+    ):
+        self.pipeline = pipeline
         self.log_level = log_level
         self.stream = stream
 
     def write(self, buf):
         try:
             for line in buf.rstrip().splitlines():
-                self.logger.log(self.log_level, line.rstrip())
                 if isinstance(line, str):
-                    self.stream.write(line.encode('utf-8', errors='replace').decode('utf-8') + "\n")
-                else:
-                    self.stream.write(line + "\n")
+                    line = (
+                        line.rstrip()
+                        .encode("utf-8", errors="replace")
+                        .decode("utf-8")
+                    )
+                self.pipeline.enqueue(
+                    LogRecord(line, level=self.log_level, stream=self.stream)
+                )
         except Exception as e:
             original_stderr = getattr(sys, '__stderr__', sys.stderr)
             original_stderr.write(f"Error in StreamToLogger: {str(e)} - Buffer: {buf}\n")
@@ -55,6 +310,7 @@ class Printr(WebSocketUser):
 
     _instance = None
     logger: logging.Logger
+    pipeline: LogPipeline
 
     def __new__(cls):
         if cls._instance is None:
@@ -76,6 +332,7 @@ class Printr(WebSocketUser):
             )
             fh.setFormatter(file_formatter)
             cls._instance.logger.addHandler(fh)
+            cls._instance.file_handler = fh
 
             # console logger with color
             cls._instance.console_logger = logging.getLogger("console_logger")
@@ -86,63 +343,17 @@ class Printr(WebSocketUser):
             console_formatter = Formatter("%(message)s")
             ch.setFormatter(console_formatter)
             cls._instance.console_logger.addHandler(ch)
+            cls._instance.console_handler = ch
+
+            # all output goes through the pipeline, so callers never wait for the console, the file or the client
+            cls._instance.pipeline = LogPipeline(cls._instance)
+            atexit.register(cls._instance.flush)
 
             # Redirect stdout and stderr
-            sys.stdout = StreamToLogger(cls._instance.logger, logging.INFO, sys.stdout)
-            sys.stderr = StreamToLogger(cls._instance.logger, logging.ERROR, sys.stderr)
+            sys.stdout = StreamToLogger(cls._instance.pipeline, logging.INFO, sys.stdout)
+            sys.stderr = StreamToLogger(cls._instance.pipeline, logging.ERROR, sys.stderr)
         return cls._instance
 
-    async def __send_to_gui(
-        self,
-        text,
-        log_type: LogType,
-        toast_type: ToastType,
-        source=LogSource.SYSTEM,
-        source_name: str = "",
-        command_tag: CommandTag = None,
-        skill_name: str = "",
-        additional_data: dict = None,
-        benchmark_result: BenchmarkResult = None,
-    ):
-        if self._connection_manager is None:
-            raise ValueError("connection_manager has not been set.")
-
-        elif toast_type is not None:
-            await self._connection_manager.broadcast(
-                command=ToastCommand(text=text, toast_type=toast_type)
-            )
-        else:
-            wingman_name = None
-            current_frame = inspect.currentframe()
-            if current_frame is not None:
-                while current_frame:
-                    # Check if the caller is a method of a class
-                    if "self" in current_frame.f_locals:
-                        caller_instance = current_frame.f_locals["self"]
-                        caller_instance_name = caller_instance.__class__.__name__
-                        if (
-                            caller_instance_name == "Wingman"
-                            or caller_instance_name == "OpenAiWingman"
-                        ):
-                            wingman_name = caller_instance.name
-                            break
-                    # Move to the previous frame in the call stack
-                    current_frame = current_frame.f_back
-
-            await self._connection_manager.broadcast(
-                command=LogCommand(
-                    text=text,
-                    log_type=log_type,
-                    source=source,
-                    source_name=source_name,
-                    tag=command_tag,
-                    skill_name=skill_name,
-                    additional_data=additional_data,
-                    wingman_name=wingman_name,
-                    benchmark_result=benchmark_result,
-                )
-            )
-
     def print(
         self,
         text,
@@ -153,23 +364,25 @@ class Printr(WebSocketUser):
         server_only=False,
         command_tag: CommandTag = None,
         additional_data: dict = None,
+        wingman_name: str = None,
     ):
-        # print to server (terminal)
-        self.print_colored(text, color=self.get_terminal_color(color))
-
-        if not server_only and self._connection_manager is not None:
-            # send to GUI without print() having to be async
-            self.ensure_async(
-                self.__send_to_gui(
-                    text,
-                    color,
-                    toast_type=toast,
-                    source=source,
-                    source_name=source_name,
-                    command_tag=command_tag,
-                    additional_data=additional_data,
-                )
+        """Logs to the terminal and the log file and sends it to the client unless server_only is set. Doesn't block.
+
+        The wingman_name defaults to the wingman the calling code runs for (see wingman_context).
+        """
+        self.pipeline.enqueue(
+            LogRecord(
+                text,
+                log_type=color,
+                gui=not server_only and self._connection_manager is not None,
+                toast_type=toast,
+                source=source,
+                source_name=source_name,
+                command_tag=command_tag,
+                additional_data=additional_data,
+                wingman_name=wingman_name or wingman_context.get(),
             )
+        )
 
     async def print_async(
         self,
@@ -183,35 +396,28 @@ class Printr(WebSocketUser):
         skill_name: str = "",
         additional_data: dict = None,
         benchmark_result: BenchmarkResult = None,
+        wingman_name: str = None,
     ):
-        # print to server (terminal)
-        self.print_colored(
-            (
-                text
-                if not benchmark_result
-                else f"{text} ({benchmark_result.formatted_execution_time})"
-            ),
-            color=self.get_terminal_color(color),
-        )
-        if benchmark_result and benchmark_result.snapshots:
-            for snapshot in benchmark_result.snapshots:
-                self.print_colored(
-                    f"  - {snapshot.label}: {snapshot.formatted_execution_time}",
-                    color=self.get_terminal_color(color),
-                )
-
-        if not server_only and self._connection_manager is not None:
-            await self.__send_to_gui(
+        """Like print, with the skill and benchmark result of the message. Returns once the record is enqueued."""
+        self.pipeline.enqueue(
+            LogRecord(
                 text,
-                color,
+                log_type=color,
+                gui=not server_only and self._connection_manager is not None,
                 toast_type=toast,
                 source=source,
                 source_name=source_name,
                 command_tag=command_tag,
                 skill_name=skill_name,
                 additional_data=additional_data,
+                wingman_name=wingman_name or wingman_context.get(),
                 benchmark_result=benchmark_result,
             )
+        )
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until everything that has been logged so far is written. Returns False on timeout."""
+        return self.pipeline.flush(timeout)
 
     def toast(self, text: str):
         self.print(text, toast=ToastType.NORMAL)
@@ -227,6 +433,22 @@ class Printr(WebSocketUser):
 
     # INTERNAL METHODS
 
+    def create_command(self, record: LogRecord) -> ToastCommand | LogCommand:
+        if record.toast_type is not None:
+            return ToastCommand(text=record.text, toast_type=record.toast_type)
+
+        return LogCommand(
+            text=record.text,
+            log_type=record.log_type,
+            source=record.source,
+            source_name=record.source_name,
+            tag=record.command_tag,
+            skill_name=record.skill_name,
+            additional_data=record.additional_data,
+            wingman_name=record.wingman_name,
+            benchmark_result=record.benchmark_result,
+        )
+
     def get_terminal_color(self, tag: LogType):
         if tag == LogType.SUBTLE:
             return "\033[90m"
@@ -248,6 +470,24 @@ class Printr(WebSocketUser):
     def clr(self, text, color):
         return f"{color}{text}{Printr.CLEAR}"
 
-    def print_colored(self, text, color):
-        self.console_logger.info(self.clr(text, color))
-        self.logger.info(text)
+    def write_console(self, text: str):
+        handler = self.console_handler
+        handler.acquire()
+        try:
+            handler.stream.write(text + handler.terminator)
+            handler.flush()
+        finally:
+            handler.release()
+
+    def write_file(self, records: list[logging.LogRecord]):
+        """Writes a batch of records with one lock and one flush instead of one per line."""
+        handler = self.file_handler
+        handler.acquire()
+        try:
+            for record in records:
+                if handler.shouldRollover(record):
+                    handler.doRollover()
+                handler.stream.write(handler.format(record) + handler.terminator)
+            handler.flush()
+        finally:
+            handler.release()
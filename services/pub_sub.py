@@ -1,40 +1,180 @@
 import asyncio
 import inspect
+import time
+import traceback
+from enum import Enum
+from api.enums import LogType
+from api.interface import PubSubTopicStats
+from services.printr import Printr
 
+printr = Printr()
+
+
+class DeliveryMode(Enum):
+    SEQUENTIAL = "sequential"
+    """Subscribers are awaited one after another, in the order they subscribed."""
+    CONCURRENT = "concurrent"
+    """Async subscribers run concurrently. publish returns once all of them are done."""
+    FIRE_AND_FORGET = "fire_and_forget"
+    """Async subscribers run as tasks. publish doesn't wait for them."""
+
+
+class Subscriber:
+    """A subscribed function and what publish needs to know to call it, resolved once when subscribing."""
+
+    __slots__ = ("fn", "is_coroutine", "expects_arg")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.is_coroutine = asyncio.iscoroutinefunction(fn)
+        # Get the number of parameters the function expects
+        params = inspect.signature(fn).parameters
+        # Determine if the function is a method (has 'self' parameter)
+        is_method = "self" in params
+        # Determine if the function expects an argument (excluding 'self' for methods)
+        self.expects_arg = (len(params) > 1) if is_method else (len(params) > 0)
+
+
+class TopicStats:
+    __slots__ = ("publishes", "errors", "total_time", "max_time")
 
-class PubSub:
     def __init__(self):
-        self.subscribers = {}
+        self.publishes = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class PubSub:
+    """Publishes events to subscribers. A failing subscriber is logged and doesn't affect the others or the publisher."""
+
+    def __init__(
+        self, name: str = "", delivery: DeliveryMode = DeliveryMode.SEQUENTIAL
+    ):
+        self.name = name
+        self.delivery = delivery
+        self.subscribers: dict[str, tuple[Subscriber, ...]] = {}
+        self.stats: dict[str, TopicStats] = {}
+        self.tasks: set[asyncio.Task] = set()
+        """Running fire-and-forget deliveries. Keeps them from being garbage collected."""
 
     def subscribe(self, event_type, fn):
-        if event_type not in self.subscribers:
-            self.subscribers[event_type] = []
-        self.subscribers[event_type].append(fn)
+        # tuples are replaced instead of modified, so (un)subscribing during a publish is safe
+        self.subscribers[event_type] = self.subscribers.get(event_type, ()) + (
+            Subscriber(fn),
+        )
 
     def unsubscribe(self, event_type, fn):
         if event_type in self.subscribers:
-            self.subscribers[event_type].remove(fn)
+            subscribers = list(self.subscribers[event_type])
+            for index, subscriber in enumerate(subscribers):
+                if subscriber.fn == fn:
+                    del subscribers[index]
+                    break
+            else:
+                raise ValueError(f"{fn} is not subscribed to {event_type}")
+            self.subscribers[event_type] = tuple(subscribers)
 
-    async def publish(self, event_type, data=None):
-        if event_type in self.subscribers:
-            for fn in self.subscribers[event_type]:
-                # Get the number of parameters the function expects
-                params = inspect.signature(fn).parameters
-                param_count = len(params)
-
-                # Determine if the function is a method (has 'self' parameter)
-                is_method = "self" in params
-
-                # Determine if the function expects an argument (excluding 'self' for methods)
-                expects_arg = (param_count > 1) if is_method else (param_count > 0)
-
-                if asyncio.iscoroutinefunction(fn):
-                    if expects_arg and data is not None:
-                        await fn(data)
-                    else:
-                        await fn()
+    async def publish(self, event_type, data=None, delivery: DeliveryMode = None):
+        subscribers = self.subscribers.get(event_type)
+        if not subscribers:
+            return
+
+        delivery = delivery or self.delivery
+        stats = self.stats.get(event_type)
+        if stats is None:
+            stats = self.stats[event_type] = TopicStats()
+        start_time = time.perf_counter()
+        errors = 0
+        pending = []
+        for subscriber in subscribers:
+            try:
+                if subscriber.expects_arg and data is not None:
+                    result = subscriber.fn(data)
                 else:
-                    if expects_arg and data is not None:
-                        fn(data)
-                    else:
-                        fn()
+                    result = subscriber.fn()
+            except Exception:
+                errors += 1
+                self.__report_error(event_type, subscriber)
+                continue
+
+            if not subscriber.is_coroutine:
+                continue
+            if delivery == DeliveryMode.SEQUENTIAL:
+                try:
+                    await result
+                except Exception:
+                    errors += 1
+                    self.__report_error(event_type, subscriber)
+            elif delivery == DeliveryMode.CONCURRENT:
+                pending.append((subscriber, result))
+            else:
+                task = asyncio.create_task(
+                    self.__deliver(event_type, subscriber, result)
+                )
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+        if len(pending) == 1:
+            subscriber, result = pending[0]
+            try:
+                await result
+            except Exception:
+                errors += 1
+                self.__report_error(event_type, subscriber)
+        elif pending:
+            results = await asyncio.gather(
+                *(result for _subscriber, result in pending), return_exceptions=True
+            )
+            for (subscriber, _result), result in zip(pending, results):
+                if isinstance(result, Exception):
+                    errors += 1
+                    self.__report_error(event_type, subscriber, result)
+
+        elapsed = time.perf_counter() - start_time
+        stats.publishes += 1
+        stats.errors += errors
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+
+    def get_stats(self) -> list[PubSubTopicStats]:
+        return [
+            PubSubTopicStats(
+                name=self.name,
+                topic=str(event_type),
+                delivery=self.delivery.value,
+                subscribers=len(self.subscribers.get(event_type, ())),
+                publishes=stats.publishes,
+                errors=stats.errors,
+                avg_publish_ms=stats.total_time / stats.publishes * 1000,
+                max_publish_ms=stats.max_time * 1000,
+            )
+            for event_type, stats in self.stats.items()
+            if stats.publishes
+        ]
+
+    async def __deliver(self, event_type, subscriber: Subscriber, coroutine):
+        try:
+            await coroutine
+        except Exception:
+            self.stats[event_type].errors += 1
+            self.__report_error(event_type, subscriber)
+
+    def __report_error(
+        self, event_type, subscriber: Subscriber, error: Exception = None
+    ):
+        name = getattr(subscriber.fn, "__qualname__", subscriber.fn)
+        printr.print(
+            f"Error in subscriber {name} of '{event_type}'",
+            color=LogType.ERROR,
+            server_only=True,
+        )
+        printr.print(
+            (
+                "".join(traceback.format_exception(error))
+                if error
+                else traceback.format_exc()
+            ),
+            color=LogType.ERROR,
+            server_only=True,
+        )
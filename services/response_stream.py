@@ -0,0 +1,364 @@
+import asyncio
+import queue
+import re
+import traceback
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, AsyncIterable, Awaitable, Callable
+import numpy as np
+from api.enums import LogType
+from api.interface import SoundConfig
+from services.benchmark import Benchmark
+from services.printr import Printr
+
+if TYPE_CHECKING:
+    from services.audio_player import AudioPlayer
+
+printr = Printr()
+
+# a sentence ends with punctuation followed by whitespace (so "3.5" or "v1.2" are not cut) or with a line break
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?…])\s+|\n+")
+CODE_BLOCK_FENCE = "```"
+END_OF_STREAM = object()
+
+
+class SentenceSplitter:
+    """Cuts a stream of text deltas into sentences that can be passed to a TTS provider one by one."""
+
+    def __init__(self, min_length: int = 20):
+        self.min_length = min_length
+        """Shorter sentences are merged with the next one to avoid choppy playback, e.g. for "Sure. On it."."""
+        self.buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Adds a text delta and returns all sentences that are complete now."""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_PATTERN.finditer(self.buffer):
+            # never cut inside of a code block, cleanup_text can only remove complete ones
+            if self.buffer.count(CODE_BLOCK_FENCE, 0, match.start()) % 2 == 1:
+                continue
+            sentence = self.buffer[start : match.start()].strip()
+            if len(sentence) < self.min_length:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> str | None:
+        """Returns the remaining text once the stream has ended."""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest or None
+
+
+class SpeechCapture:
+    """Stands in for the AudioPlayer of a TTS provider to keep the synthesized audio of a sentence instead of playing it.
+
+    Covers what the providers use of the AudioPlayer: play_with_effects, stream_with_effects and get_audio_from_file.
+    The effects, layers and beeps are applied once for the whole response when it is played.
+    """
+
+    def __init__(self, audio_player: "AudioPlayer"):
+        self.audio_player = audio_player
+        self.audio: np.ndarray | None = None
+        """float32 samples between -1 and 1, frames x channels if there is more than one channel."""
+        self.sample_rate = 0
+        self.use_gain_boost = False
+        """Whether the provider asked for the "Azure Streaming" low gain workaround."""
+
+    @property
+    def channels(self) -> int:
+        return self.audio.shape[1] if self.audio.ndim > 1 else 1
+
+    def get_audio_from_file(self, filename: str) -> tuple:
+        return self.audio_player.get_audio_from_file(filename)
+
+    async def play_with_effects(
+        self,
+        input_data: bytes | tuple,
+        config: SoundConfig,
+        wingman_name: str = None,
+        mixed_layer_gain_boost_db: float = -9.0,
+    ):
+        if isinstance(input_data, bytes):
+            audio, sample_rate = self.audio_player._get_audio_from_stream(input_data)
+        else:
+            audio, sample_rate = input_data
+        self.audio = np.asarray(audio, dtype=np.float32)
+        self.sample_rate = sample_rate
+
+    async def stream_with_effects(
+        self,
+        buffer_callback,
+        config: SoundConfig,
+        wingman_name: str,
+        mix_layer_gain_boost_db: float = 0.0,
+        buffer_size=2048,
+        sample_rate=16000,
+        channels=1,
+        dtype="int16",
+        use_gain_boost=False,
+    ):
+        data = bytearray()
+        audio_buffer = bytearray(buffer_size)
+        filled_size = buffer_callback(audio_buffer)
+        while filled_size > 0:
+            data += audio_buffer[:filled_size]
+            filled_size = buffer_callback(audio_buffer)
+
+        sample_type = np.dtype(dtype)
+        audio = np.frombuffer(
+            data, dtype=sample_type, count=len(data) // sample_type.itemsize
+        ).astype(np.float32)
+        if np.issubdtype(sample_type, np.integer):
+            audio /= np.iinfo(sample_type).max + 1
+        if channels > 1:
+            audio = audio[: len(audio) // channels * channels].reshape(-1, channels)
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.use_gain_boost = use_gain_boost
+
+    def get_samples(self, sample_rate: int, channels: int) -> np.ndarray:
+        """The interleaved samples in the format of the playback, linearly resampled if the provider used another rate."""
+        audio = self.audio if self.audio.ndim > 1 else self.audio[:, np.newaxis]
+        if audio.shape[1] != channels:
+            audio = np.repeat(audio.mean(axis=1, keepdims=True), channels, axis=1)
+        if self.sample_rate != sample_rate and len(audio) > 1:
+            positions = np.linspace(
+                0, len(audio) - 1, int(round(len(audio) * sample_rate / self.sample_rate))
+            )
+            frames = np.arange(len(audio))
+            audio = np.stack(
+                [np.interp(positions, frames, audio[:, channel]) for channel in range(channels)],
+                axis=1,
+            )
+        return np.ascontiguousarray(audio, dtype=np.float32).ravel()
+
+
+class SpeechReader:
+    """The buffer_callback of the playback of a streamed response.
+
+    Reads the synthesized sentences one after another and waits for the next one if it isn't synthesized yet.
+    Returns 0 (the end of the playback) once it has been closed and everything has been read.
+    """
+
+    def __init__(self):
+        self.clips: queue.Queue = queue.Queue()
+        self.clip: np.ndarray | None = None
+        self.position = 0
+
+    def put(self, samples: np.ndarray):
+        self.clips.put(samples)
+
+    def clear(self):
+        """Drops the clips that haven't been played yet."""
+        drain(self.clips)
+
+    def close(self):
+        self.clips.put(END_OF_STREAM)
+
+    def __call__(self, audio_buffer: bytearray) -> int:
+        while self.clip is None or self.position >= len(self.clip):
+            clip = self.clips.get()
+            if clip is END_OF_STREAM:
+                # the playback might ask again
+                self.clips.put(END_OF_STREAM)
+                return 0
+            self.clip, self.position = clip, 0
+
+        chunk = self.clip[
+            self.position : self.position + len(audio_buffer) // self.clip.itemsize
+        ]
+        audio_buffer[: chunk.nbytes] = chunk.tobytes()
+        self.position += len(chunk)
+        return chunk.nbytes
+
+
+class ResponseStreamer:
+    """Speaks a streamed LLM response sentence by sentence while it is still being generated.
+
+    Every sentence is synthesized as soon as it is complete, while the sentences before it are still playing.
+    All of them are played through a single stream of the AudioPlayer, so the effects, the mixed-in layer and the beeps
+    are applied once per response. Synthesis and playback run on separate workers (like other "background" playbacks
+    of the Wingman), so the LLM stream can be consumed without waiting for TTS.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str, bool], Awaitable[SpeechCapture | None]],
+        play: Callable[[SpeechReader, int, int, bool, bool], Awaitable[None]],
+        audio_player: "AudioPlayer",
+        threaded_execution: Callable,
+        benchmark: Benchmark = None,
+        interrupt: bool = True,
+    ):
+        self.synthesize = synthesize
+        """Usually synthesize_sentence(text, is_first) of the Wingman."""
+        self.play = play
+        """Usually play_stream_to_user(buffer_callback, sample_rate, channels, use_gain_boost, no_interrupt) of the Wingman."""
+        self.audio_player = audio_player
+        """The player that play uses, to measure when the response becomes audible."""
+        self.threaded_execution = threaded_execution
+        self.benchmark = benchmark
+        self.interrupt = interrupt
+        """Whether the response may interrupt a running playback."""
+        self.splitter = SentenceSplitter()
+        self.sentences: queue.Queue = queue.Queue()
+        self.reader: SpeechReader | None = None
+        self.is_speaking = False
+        self.cancelled = False
+        self.streamed_content = False
+        """Whether the last consumed LLM message had content, i.e. it has been (or is being) spoken already."""
+
+    async def consume(
+        self,
+        chunks: AsyncIterable[Any],
+        get_content: Callable[[Any], str | None],
+        is_cancelled: Callable[[], bool] = None,
+    ) -> bool:
+        """Reads the async chunk stream of a provider and feeds the content into the TTS queue.
+
+        Args:
+            chunks: The stream returned by the provider.
+            get_content: Called for every chunk. Returns its content delta and can collect other data, e.g. tool calls.
+            is_cancelled: Checked for every chunk, e.g. whether a newer LLM call superseded this one.
+
+        Returns:
+            bool: False if the stream was cancelled before it ended.
+        """
+        self.streamed_content = False
+        async for chunk in chunks:
+            if self.cancelled or (is_cancelled and is_cancelled()):
+                self.cancel()
+                await close_stream(chunks)
+                return False
+            self.feed(get_content(chunk))
+
+        rest = self.splitter.flush()
+        if rest:
+            self.__enqueue(rest)
+        return True
+
+    def feed(self, text: str | None):
+        if not text or self.cancelled:
+            return
+        self.streamed_content = True
+        for sentence in self.splitter.feed(text):
+            self.__enqueue(sentence)
+
+    def close(self):
+        """Ends the synthesis once all queued sentences have been synthesized. Call this when the turn is over."""
+        if self.is_speaking:
+            self.sentences.put(END_OF_STREAM)
+            self.is_speaking = False
+
+    def cancel(self):
+        """Stops speaking the response: drops the sentences that haven't been synthesized or played yet.
+
+        The sentence that is currently playing is finished.
+        """
+        self.cancelled = True
+        drain(self.sentences)
+        if self.reader:
+            self.reader.clear()
+        self.close()
+
+    def __enqueue(self, sentence: str):
+        if not self.is_speaking:
+            self.is_speaking = True
+            self.reader = SpeechReader()
+            self.threaded_execution(
+                self.__speak_sentences, self.sentences, self.reader
+            )
+        self.sentences.put(sentence)
+
+    async def __play(self, *args):
+        if not self.benchmark:
+            await self.play(*args)
+            return
+
+        playbacks = self.audio_player.subscribe_playbacks()
+
+        async def record_first_audio():
+            await playbacks.get()
+            self.benchmark.add_snapshot("Time to first audio")
+
+        first_audio = asyncio.create_task(record_first_audio())
+        try:
+            await self.play(*args)
+        finally:
+            first_audio.cancel()
+            self.audio_player.unsubscribe_playbacks(playbacks)
+
+    async def __speak_sentences(self, sentences: queue.Queue, reader: SpeechReader):
+        loop = asyncio.get_running_loop()
+        playback: Future | None = None
+        stream_format: tuple[int, int] | None = None
+        is_first = True
+        try:
+            while True:
+                sentence = await loop.run_in_executor(None, sentences.get)
+                if sentence is END_OF_STREAM:
+                    break
+                if playback is not None and playback.done():
+                    # the playback ended early, e.g. the user interrupted it
+                    break
+                try:
+                    # the sentences before are playing meanwhile
+                    capture = await self.synthesize(sentence, is_first)
+                    if capture is None and is_first:
+                        # e.g. a skill skipped the TTS of the response
+                        break
+                except Exception as e:
+                    capture = None
+                    await printr.print_async(
+                        f"Error while synthesizing streamed response: {str(e)}",
+                        color=LogType.ERROR,
+                    )
+                    printr.print(
+                        traceback.format_exc(), color=LogType.ERROR, server_only=True
+                    )
+                is_first = False
+                if self.cancelled:
+                    break
+                if capture is None or capture.audio is None or not len(capture.audio):
+                    continue
+
+                if stream_format is None:
+                    # the first sentence sets the format of the whole playback
+                    stream_format = (capture.sample_rate, capture.channels)
+                    playback = self.threaded_execution(
+                        self.__play,
+                        reader,
+                        capture.sample_rate,
+                        capture.channels,
+                        capture.use_gain_boost,
+                        not self.interrupt,
+                    )
+                reader.put(capture.get_samples(*stream_format))
+        finally:
+            reader.close()
+
+
+def drain(items: queue.Queue):
+    while True:
+        try:
+            items.get_nowait()
+        except queue.Empty:
+            return
+
+
+async def close_stream(chunks: AsyncIterable[Any]):
+    """Closes the stream of a provider, so that it stops generating (e.g. openai's AsyncStream)."""
+    close = getattr(chunks, "close", None) or getattr(chunks, "aclose", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception:
+        pass
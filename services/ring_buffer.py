@@ -0,0 +1,141 @@
+from threading import Lock
+import numpy
+
+
+class AudioRingBuffer:
+    """A preallocated FIFO buffer for audio frames that is safe to use between an audio callback and another thread.
+
+    Writing and reading only copies into/out of the preallocated memory, so the cost per callback is constant
+    no matter how long the buffer has been filled.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        channels: int = 1,
+        dtype: numpy.dtype = numpy.float32,
+        overwrite: bool = True,
+    ):
+        """
+        Args:
+            capacity (int): The maximum number of frames the buffer can hold.
+            channels (int): The number of channels per frame.
+            dtype (numpy.dtype): The sample format.
+            overwrite (bool): If True, writing to a full buffer drops the oldest frames. Otherwise, the new frames that don't fit are dropped.
+        """
+        self.capacity = max(int(capacity), 1)
+        self.channels = channels
+        self.overwrite = overwrite
+        self.buffer = numpy.zeros((self.capacity, channels), dtype=dtype)
+        self.start = 0
+        self.size = 0
+        self.dropped = 0
+        """The number of frames that have been dropped because the buffer was full."""
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.size
+
+    def clear(self):
+        with self.lock:
+            self.start = 0
+            self.size = 0
+            self.dropped = 0
+
+    def write(self, data: numpy.ndarray) -> int:
+        """Appends frames of shape (frames, channels) or (frames,) for mono. Returns the number of frames written."""
+        data = data.reshape(-1, self.channels)
+        count = len(data)
+        with self.lock:
+            if count > self.free:
+                if self.overwrite:
+                    if count > self.capacity:
+                        self.dropped += count - self.capacity
+                        data = data[-self.capacity :]
+                        count = self.capacity
+                    drop = count - self.free
+                    self.start = (self.start + drop) % self.capacity
+                    self.size -= drop
+                    self.dropped += drop
+                else:
+                    self.dropped += count - self.free
+                    count = self.free
+                    data = data[:count]
+
+            end = (self.start + self.size) % self.capacity
+            first = min(count, self.capacity - end)
+            self.buffer[end : end + first] = data[:first]
+            self.buffer[: count - first] = data[first:count]
+            self.size += count
+        return count
+
+    def read_into(self, out: numpy.ndarray) -> int:
+        """Moves as many frames as fit into out (shape (frames, channels)) and returns their number. Does not allocate."""
+        with self.lock:
+            count = min(len(out), self.size)
+            first = min(count, self.capacity - self.start)
+            out[:first] = self.buffer[self.start : self.start + first]
+            out[first:count] = self.buffer[: count - first]
+            self.start = (self.start + count) % self.capacity
+            self.size -= count
+        return count
+
+    def read(self, frames: int = None) -> numpy.ndarray:
+        """Moves up to the given number of frames (default: all) into a new array."""
+        out = numpy.empty(
+            (self.size if frames is None else min(frames, self.size), self.channels),
+            dtype=self.buffer.dtype,
+        )
+        count = self.read_into(out)
+        return out[:count]
+
+
+class StreamRingBuffer:
+    """A fixed-size ring buffer of interleaved samples for exactly one producer and one consumer thread.
+
+    The producer only advances write_index and the consumer only advances read_index, so neither side needs a lock.
+    Both indices only grow and their difference is the number of buffered samples.
+    """
+
+    def __init__(self, capacity: int, dtype: numpy.dtype = numpy.int16):
+        """
+        Args:
+            capacity (int): The maximum number of samples the buffer can hold.
+            dtype (numpy.dtype): The sample format.
+        """
+        self.capacity = max(int(capacity), 1)
+        self.buffer = numpy.zeros(self.capacity, dtype=dtype)
+        self.write_index = 0
+        self.read_index = 0
+
+    def __len__(self) -> int:
+        return self.write_index - self.read_index
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self)
+
+    def write(self, data: numpy.ndarray) -> int:
+        """Appends as many samples as fit and returns their number. Only call this from the producer."""
+        count = min(len(data), self.free)
+        start = self.write_index % self.capacity
+        first = min(count, self.capacity - start)
+        self.buffer[start : start + first] = data[:first]
+        self.buffer[: count - first] = data[first:count]
+        # publish the samples only after they have been copied
+        self.write_index += count
+        return count
+
+    def read_into(self, out: numpy.ndarray) -> int:
+        """Moves as many samples as fit into out and returns their number. Does not allocate. Only call this from the consumer."""
+        count = min(len(out), len(self))
+        start = self.read_index % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self.buffer[start : start + first]
+        out[first:count] = self.buffer[: count - first]
+        self.read_index += count
+        return count
@@ -0,0 +1,300 @@
+import asyncio
+import contextvars
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Coroutine
+from api.interface import RuntimeExecutorStats, RuntimeStats
+from services.async_client_pool import close_clients
+
+EXECUTORS = {
+    "wingmen": 8,
+    "skills": 32,
+    "audio": 8,
+    "devices": 2,
+    "blocking": 16,
+}
+"""The named executors and their maximum number of worker threads.
+
+wingmen: processing of commands (push-to-talk, voice activation, text and audio from the client) and playback.
+skills: work started by skills.
+audio: fades and other short jobs of the AudioLibrary.
+devices: the joystick recording.
+blocking: blocking calls that should not run on an event loop.
+"""
+
+DEDICATED = "dedicated"
+"""Not a pool: work submitted to it gets a thread of its own.
+
+For loops that run as long as the core, a wingman or a skill is loaded (the joystick loop, monitoring loops of skills)
+and for other long blocking jobs like the playbacks of the AudioLibrary.
+They would block a worker of a bounded executor for good and let every job queued behind them wait forever.
+"""
+
+
+def close_loop(loop: asyncio.AbstractEventLoop):
+    """Cancels the tasks that are still pending on the stopped loop, lets them handle it, closes the HTTP clients
+    that were used on the loop and closes the loop."""
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.run_until_complete(close_clients(loop))
+    loop.close()
+
+
+class RuntimeExecutor:
+    """A bounded pool of named worker threads. Every worker keeps one event loop for its whole lifetime.
+
+    The loop of a worker runs forever on a thread of its own. Coroutine functions run on it while their worker waits
+    for their result, plain functions are called directly. Tasks spawned by a coroutine without awaiting them
+    (e.g. playbacks, fades, follow-ups of skills) keep running on the loop after their job is done.
+    Work that is submitted while all workers are busy waits in the queue.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"runtime-{name}"
+        )
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.event_loops = 0
+        self.loops: list[asyncio.AbstractEventLoop] = []
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        with self.lock:
+            self.queued += 1
+        # the job keeps the context of the caller, e.g. the wingman it runs for
+        context = contextvars.copy_context()
+        try:
+            return self.pool.submit(context.run, self.__run, function, args, kwargs)
+        except Exception:
+            with self.lock:
+                self.queued -= 1
+            raise
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            loops, self.loops = self.loops, []
+        for loop in loops:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(loop.stop)
+
+    def get_stats(self) -> RuntimeExecutorStats:
+        with self.lock:
+            return RuntimeExecutorStats(
+                name=self.name,
+                max_workers=self.max_workers,
+                active=self.active,
+                queued=self.queued,
+                completed=self.completed,
+                event_loops=self.event_loops,
+            )
+
+    def __run(self, function: Callable, args: tuple, kwargs: dict):
+        with self.lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            result = function(*args, **kwargs)
+            if asyncio.iscoroutine(result):
+                return self.__run_on_loop(result)
+            return result
+        except Exception:
+            # nobody might look at the future, so report it like an uncaught exception in a thread
+            traceback.print_exc()
+            raise
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.completed += 1
+
+    def __run_on_loop(self, coroutine: Coroutine) -> Any:
+        loop = self.__get_loop()
+        future = Future()
+        # the task keeps the context of the job, e.g. the wingman it runs for
+        context = contextvars.copy_context()
+
+        def on_done(task: asyncio.Task):
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def start():
+            loop.create_task(coroutine).add_done_callback(on_done)
+
+        loop.call_soon_threadsafe(start, context=context)
+        return future.result()
+
+    def __get_loop(self) -> asyncio.AbstractEventLoop:
+        loop: asyncio.AbstractEventLoop = getattr(self.local, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self.__run_forever,
+                args=(loop,),
+                name=f"{threading.current_thread().name}-loop",
+                daemon=True,
+            ).start()
+            self.local.loop = loop
+            with self.lock:
+                self.event_loops += 1
+                self.loops.append(loop)
+        return loop
+
+    def __run_forever(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            close_loop(loop)
+
+
+class Runtime:
+    """Singleton
+
+    The central runtime of Wingman AI Core: the main event loop (the one uvicorn runs on) plus bounded, named executors.
+    Wingmen, skills and services submit their work here instead of starting a thread with a new event loop per request.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Runtime, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, "executors"):
+            self.main_loop: asyncio.AbstractEventLoop | None = None
+            self.executors = {
+                name: RuntimeExecutor(name, max_workers)
+                for name, max_workers in EXECUTORS.items()
+            }
+            self.main_loop_tasks = 0
+            self.dedicated_threads = 0
+            self.lock = threading.Lock()
+
+    def set_main_loop(self, loop: asyncio.AbstractEventLoop):
+        self.main_loop = loop
+
+    def is_main_loop_running(self) -> bool:
+        loop = self.main_loop
+        return loop is not None and not loop.is_closed() and loop.is_running()
+
+    def submit(
+        self, function: Callable, *args, executor: str = "wingmen", **kwargs
+    ) -> Future:
+        """Runs a coroutine function or a plain function on a worker of the given executor.
+
+        Can be called from any thread. Returns a concurrent Future of the result.
+        """
+        if executor == DEDICATED:
+            return self.start_dedicated(function, *args, **kwargs)
+        return self.executors[executor].submit(function, *args, **kwargs)
+
+    def start_dedicated(self, function: Callable, *args, **kwargs) -> Future:
+        """Runs a coroutine function or a plain function on a thread (and event loop) of its own.
+
+        Meant for lifetime loops, which have to stop themselves, e.g. when their wingman or skill is unloaded.
+        Returns a concurrent Future of the result.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        # the loop keeps the context of the caller, e.g. the wingman it runs for
+        context = contextvars.copy_context()
+
+        def run():
+            with self.lock:
+                self.dedicated_threads += 1
+            try:
+                result = function(*args, **kwargs)
+                if asyncio.iscoroutine(result):
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                    try:
+                        result = loop.run_until_complete(result)
+                    finally:
+                        close_loop(loop)
+                future.set_result(result)
+            except Exception as e:
+                traceback.print_exc()
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.dedicated_threads -= 1
+
+        thread = threading.Thread(
+            target=context.run,
+            args=(run,),
+            name=f"runtime-{DEDICATED}-{getattr(function, '__name__', 'function')}",
+            daemon=True,
+        )
+        thread.start()
+        return future
+
+    async def run_blocking(
+        self, function: Callable, *args, executor: str = "blocking"
+    ) -> Any:
+        """Awaits a blocking function that runs on a worker of the given executor."""
+        return await asyncio.wrap_future(
+            self.submit(function, *args, executor=executor)
+        )
+
+    def run_on_main_loop(
+        self, coroutine: Coroutine
+    ) -> asyncio.Task | Future | None:
+        """Schedules a coroutine on the main loop from any thread without blocking the caller.
+
+        Returns None if the main loop isn't running. The coroutine hasn't been scheduled then and the caller has to run
+        or close it. Check is_main_loop_running() first to not create the coroutine at all.
+        """
+        loop = self.main_loop
+        if not self.is_main_loop_running():
+            return None
+
+        with self.lock:
+            self.main_loop_tasks += 1
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            task = loop.create_task(coroutine)
+            task.add_done_callback(self.__on_main_loop_task_done)
+            return task
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        future.add_done_callback(self.__on_main_loop_task_done)
+        return future
+
+    def get_stats(self) -> RuntimeStats:
+        executors = [executor.get_stats() for executor in self.executors.values()]
+        return RuntimeStats(
+            main_loop_tasks=self.main_loop_tasks,
+            threads=threading.active_count(),
+            dedicated_threads=self.dedicated_threads,
+            event_loops=(1 if self.main_loop else 0)
+            + self.dedicated_threads
+            + sum(stats.event_loops for stats in executors),
+            executors=executors,
+        )
+
+    def shutdown(self):
+        for executor in self.executors.values():
+            executor.shutdown()
+
+    def __on_main_loop_task_done(self, _future):
+        with self.lock:
+            self.main_loop_tasks -= 1
@@ -46,7 +46,7 @@ class SecretKeeper(WebSocketUser):
                 get_writable_dir(CONFIGS_DIR), SECRETS_FILE
             )
             cls._instance.secrets = cls._instance.load() or {}
-            cls._instance.secret_events = PubSub()
+            cls._instance.secret_events = PubSub("secrets")
 
         return cls._instance
 
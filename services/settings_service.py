@@ -24,7 +24,7 @@ class SettingsService:
         self.config_service = config_service
         self.converted_audio_settings = False
         self.settings = self.get_settings()
-        self.settings_events = PubSub()
+        self.settings_events = PubSub("settings")
         self.whispercpp: Whispercpp = None
         self.fasterwhisper: FasterWhisper = None
         self.xvasynth: XVASynth = None
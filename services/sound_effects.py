@@ -155,36 +155,46 @@ class SoundEffects(Enum):
     )
 
 
+EFFECTS = {
+    SoundEffect.AI.value: SoundEffects.AI.value,
+    SoundEffect.LOW_QUALITY_RADIO.value: SoundEffects.LOW_QUALITY_RADIO.value,
+    SoundEffect.MEDIUM_QUALITY_RADIO.value: SoundEffects.MEDIUM_QUALITY_RADIO.value,
+    SoundEffect.HIGH_END_RADIO.value: SoundEffects.HIGH_END_RADIO.value,
+    SoundEffect.LOW_QUALITY_RADIO.value
+    + "_GAIN_BOOST": SoundEffects.LOW_QUALITY_RADIO_GAIN_BOOST.value,
+    SoundEffect.MEDIUM_QUALITY_RADIO.value
+    + "_GAIN_BOOST": SoundEffects.MEDIUM_QUALITY_RADIO_GAIN_BOOST.value,
+    SoundEffect.HIGH_END_RADIO.value
+    + "_GAIN_BOOST": SoundEffects.HIGH_END_RADIO_GAIN_BOOST.value,
+    SoundEffect.INTERIOR_SMALL.value: SoundEffects.INTERIOR_SMALL.value,
+    SoundEffect.INTERIOR_MEDIUM.value: SoundEffects.INTERIOR_MEDIUM.value,
+    SoundEffect.INTERIOR_LARGE.value: SoundEffects.INTERIOR_LARGE.value,
+}
+
+# one combined chain per effect set, so the audio passes through Pedalboard only once
+effect_chains: dict[tuple[tuple[str, ...], bool], list[Pedalboard]] = {}
+
+
 def get_sound_effects(config: SoundConfig, use_gain_boost: bool = False):
     if config is None or not config.effects or len(config.effects) == 0:
         return []
 
-    sound_effects = []
-
-    mapping = {
-        SoundEffect.AI.value: SoundEffects.AI.value,
-        SoundEffect.LOW_QUALITY_RADIO.value: SoundEffects.LOW_QUALITY_RADIO.value,
-        SoundEffect.MEDIUM_QUALITY_RADIO.value: SoundEffects.MEDIUM_QUALITY_RADIO.value,
-        SoundEffect.HIGH_END_RADIO.value: SoundEffects.HIGH_END_RADIO.value,
-        SoundEffect.LOW_QUALITY_RADIO.value
-        + "_GAIN_BOOST": SoundEffects.LOW_QUALITY_RADIO_GAIN_BOOST.value,
-        SoundEffect.MEDIUM_QUALITY_RADIO.value
-        + "_GAIN_BOOST": SoundEffects.MEDIUM_QUALITY_RADIO_GAIN_BOOST.value,
-        SoundEffect.HIGH_END_RADIO.value
-        + "_GAIN_BOOST": SoundEffects.HIGH_END_RADIO_GAIN_BOOST.value,
-        SoundEffect.INTERIOR_SMALL.value: SoundEffects.INTERIOR_SMALL.value,
-        SoundEffect.INTERIOR_MEDIUM.value: SoundEffects.INTERIOR_MEDIUM.value,
-        SoundEffect.INTERIOR_LARGE.value: SoundEffects.INTERIOR_LARGE.value,
-    }
+    key = (tuple(effect.value for effect in config.effects), use_gain_boost)
+    sound_effects = effect_chains.get(key)
+    if sound_effects is not None:
+        return sound_effects
 
+    chain = []
     for effect in config.effects:
         effect_name = effect.value
-        if use_gain_boost and f"{effect_name}_GAIN_BOOST" in mapping:
+        if use_gain_boost and f"{effect_name}_GAIN_BOOST" in EFFECTS:
             effect_name += "_GAIN_BOOST"
-        effect = mapping.get(effect_name)
+        effect = EFFECTS.get(effect_name)
         if effect:
-            sound_effects.append(effect)
+            chain.append(effect)
 
+    sound_effects = [Pedalboard(chain)] if chain else []
+    effect_chains[key] = sound_effects
     return sound_effects
 
 
@@ -0,0 +1,178 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# keep the imports of this module light: it's imported first to time everything else
+
+FIRST_CONNECT_BUDGET = 5.0
+"""Seconds from the start of main.py to the first websocket connection of a client we aim for."""
+
+
+class StartupTimeline:
+    """Singleton
+
+    Records the phases of the startup and the modules imported during it (like python -X importtime), from the start
+    of main.py until the first client connects via websocket.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StartupTimeline, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, "start_time"):
+            self.start_time = time.perf_counter()
+            self.phases: list[tuple[str, float, float]] = []
+            """(name, start, duration) in seconds since start_time"""
+            self.imports: list[tuple[str, float, float, float, str]] = []
+            """(module, start, duration, self duration, thread) in seconds since start_time"""
+            self.first_connect_time: float | None = None
+            self.lock = threading.Lock()
+            self.local = threading.local()
+            self.original_import = builtins.__import__
+            self.timing_imports = False
+
+    def install_import_timer(self):
+        """Times every module imported from now on until the first client connects."""
+        if not self.timing_imports and self.first_connect_time is None:
+            self.timing_imports = True
+            builtins.__import__ = self.__timed_import
+
+    def uninstall_import_timer(self):
+        self.timing_imports = False
+        if builtins.__import__ == self.__timed_import:
+            builtins.__import__ = self.original_import
+
+    @contextmanager
+    def phase(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, start_time)
+
+    def add_phase(self, name: str, start_time: float):
+        """Records a phase that started at start_time (perf_counter) and ends now."""
+        with self.lock:
+            self.phases.append(
+                (
+                    name,
+                    start_time - self.start_time,
+                    time.perf_counter() - start_time,
+                )
+            )
+
+    def mark_first_connect(self) -> bool:
+        """Records the first websocket connection of a client and stops timing imports. True only for the first one."""
+        with self.lock:
+            if self.first_connect_time is not None:
+                return False
+            self.first_connect_time = time.perf_counter() - self.start_time
+        self.uninstall_import_timer()
+        return True
+
+    def is_over_budget(self) -> bool:
+        return (
+            self.first_connect_time is not None
+            and self.first_connect_time > FIRST_CONNECT_BUDGET
+        )
+
+    def get_result(self, limit: int | None = 30):
+        """The phases in order and the imports that took the longest (by their own time, without nested imports)."""
+        # imported here, so the import timer is installed before pydantic and co. are
+        from api.interface import (
+            ImportTiming,
+            StartupPhaseTiming,
+            StartupTimelineResult,
+        )
+
+        with self.lock:
+            phases = list(self.phases)
+            imports = sorted(self.imports, key=lambda entry: entry[3], reverse=True)
+        return StartupTimelineResult(
+            time_to_first_connect_ms=(
+                self.first_connect_time * 1000
+                if self.first_connect_time is not None
+                else None
+            ),
+            first_connect_budget_ms=FIRST_CONNECT_BUDGET * 1000,
+            phases=[
+                StartupPhaseTiming(
+                    name=name, start_ms=start * 1000, duration_ms=duration * 1000
+                )
+                for name, start, duration in phases
+            ],
+            imports=[
+                ImportTiming(
+                    module=module,
+                    start_ms=start * 1000,
+                    duration_ms=duration * 1000,
+                    self_ms=self_duration * 1000,
+                    thread=thread,
+                )
+                for module, start, duration, self_duration, thread in imports[:limit]
+            ],
+        )
+
+    def report(self, limit: int = 15) -> str:
+        result = self.get_result(limit)
+        first_connect = (
+            f"{result.time_to_first_connect_ms:.0f}ms"
+            if result.time_to_first_connect_ms is not None
+            else "no client yet"
+        )
+        lines = [
+            f"Startup timeline (first websocket connect: {first_connect}, budget: {result.first_connect_budget_ms:.0f}ms)",
+            "Phases:",
+        ]
+        for phase in result.phases:
+            lines.append(
+                f"  +{phase.start_ms:>7.0f}ms  {phase.name:<30} {phase.duration_ms:>7.0f}ms"
+            )
+        if not result.imports:
+            # the import timer is only installed with --startup-timeline
+            return "\n".join(lines)
+        lines.append(f"Slowest {len(result.imports)} imports (own time / incl. nested):")
+        for module in result.imports:
+            lines.append(
+                f"  +{module.start_ms:>7.0f}ms  {module.module:<30} {module.self_ms:>7.0f}ms / {module.duration_ms:.0f}ms ({module.thread})"
+            )
+        return "\n".join(lines)
+
+    def dump(self, file_path: str):
+        """Writes the whole timeline (all phases and imports) to a JSON file."""
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(self.get_result(limit=None).model_dump_json(indent=2))
+
+    def __timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or not self.timing_imports or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        # the time spent in imports nested in this one
+        stack.append(0.0)
+        start_time = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            duration = time.perf_counter() - start_time
+            nested = stack.pop()
+            if stack:
+                stack[-1] += duration
+            with self.lock:
+                self.imports.append(
+                    (
+                        name,
+                        start_time - self.start_time,
+                        duration,
+                        duration - nested,
+                        threading.current_thread().name,
+                    )
+                )
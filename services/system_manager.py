@@ -1,8 +1,11 @@
 import platform
+from concurrent.futures import Future
+from typing import Callable
 from fastapi import APIRouter
 import requests
 from packaging import version
 from api.interface import SystemCore, SystemInfo
+from services.runtime import Runtime
 
 LOCAL_VERSION = "1.8.1"
 VERSION_ENDPOINT = "https://wingman-ai.com/api/version"
@@ -21,7 +24,22 @@ class SystemManager:
 
         self.latest_version = version.parse("0.0.0")
         self.local_version = version.parse(LOCAL_VERSION)
-        self.check_version()
+        self.version_check: Future | None = None
+        """The version check started by check_version_in_background. Its result is whether this is the latest version."""
+
+    def check_version_in_background(
+        self, on_checked: Callable[[bool], None] = None
+    ) -> Future:
+        """Checks for a new version on a worker of the shared runtime, so the startup doesn't wait for the network."""
+
+        def check():
+            is_latest = self.check_version()
+            if on_checked:
+                on_checked(is_latest)
+            return is_latest
+
+        self.version_check = Runtime().submit(check, executor="blocking")
+        return self.version_check
 
     def check_version(self):
         try:
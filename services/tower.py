@@ -1,9 +1,19 @@
-from api.enums import LogSource, LogType, WingmanInitializationErrorType
+import asyncio
+import traceback
+from api.enums import (
+    LogSource,
+    LogType,
+    StartupState,
+    WingmanInitializationErrorType,
+)
 from api.interface import (
+    BenchmarkResult,
     Config,
     SettingsConfig,
+    StartupTimings,
     WingmanConfig,
     WingmanInitializationError,
+    WingmanStartupTiming,
     ConfigDirInfo,
 )
 from providers.faster_whisper import FasterWhisper
@@ -11,15 +21,19 @@ from providers.whispercpp import Whispercpp
 from providers.xvasynth import XVASynth
 from services.audio_player import AudioPlayer
 from services.audio_library import AudioLibrary
+from services.benchmark import Benchmark
 from services.config_manager import ConfigManager
 from services.module_manager import ModuleManager
-from services.printr import Printr
+from services.printr import Printr, wingman_context
 from wingmen.open_ai_wingman import OpenAiWingman
 from wingmen.wingman import Wingman
 
 
 printr = Printr()
 
+WINGMAN_STARTUP_CONCURRENCY = 4
+"""How many Wingmen are instantiated, validated and prepared at the same time."""
+
 
 class Tower:
     def __init__(
@@ -44,6 +58,8 @@ class Tower:
         self.whispercpp = whispercpp
         self.fasterwhisper = fasterwhisper
         self.xvasynth = xvasynth
+        self.startup_benchmark: BenchmarkResult = None
+        self.wingman_timings: dict[str, WingmanStartupTiming] = {}
 
     async def instantiate_wingmen(self, settings: SettingsConfig):
         errors: list[WingmanInitializationError] = []
@@ -51,6 +67,10 @@ class Tower:
         if not self.config.wingmen:
             return errors
 
+        benchmark = Benchmark(label="Tower startup")
+        semaphore = asyncio.Semaphore(WINGMAN_STARTUP_CONCURRENCY)
+        order: list[str] = []
+        startups = []
         for wingman_name, wingman_config in self.config.wingmen.items():
             if wingman_config.disabled is True:
                 self.disabled_wingmen.append(wingman_config)
@@ -63,13 +83,22 @@ class Tower:
                 )
                 continue
 
-            _wingman = await self.__instantiate_wingman(
-                wingman_name=wingman_name,
-                wingman_config=wingman_config,
-                settings=settings,
-                errors=errors,
+            order.append(wingman_name)
+            startups.append(
+                self.__start_wingman(
+                    wingman_name=wingman_name,
+                    wingman_config=wingman_config,
+                    settings=settings,
+                    errors=errors,
+                    semaphore=semaphore,
+                )
             )
 
+        await asyncio.gather(*startups)
+        # they finish in any order
+        self.wingmen.sort(key=lambda wingman: order.index(wingman.name))
+        self.startup_benchmark = benchmark.finish()
+
         printr.print(
             f"Instantiated wingmen: {', '.join([w.name for w in self.wingmen])}.",
             color=LogType.POSITIVE,
@@ -79,6 +108,42 @@ class Tower:
         )
         return errors
 
+    async def __start_wingman(
+        self,
+        wingman_name: str,
+        wingman_config: WingmanConfig,
+        settings: SettingsConfig,
+        errors: list[WingmanInitializationError],
+        semaphore: asyncio.Semaphore,
+    ):
+        async with semaphore:
+            try:
+                await self.__instantiate_wingman(
+                    wingman_name=wingman_name,
+                    wingman_config=wingman_config,
+                    settings=settings,
+                    errors=errors,
+                )
+            except Exception as e:
+                # don't let one Wingman take down the startup of the others
+                printr.print(
+                    f"Error starting wingman {wingman_name}: {str(e)}",
+                    color=LogType.ERROR,
+                    server_only=True,
+                    source_name=self.log_source_name,
+                    source=LogSource.SYSTEM,
+                )
+                printr.print(
+                    traceback.format_exc(), color=LogType.ERROR, server_only=True
+                )
+                errors.append(
+                    WingmanInitializationError(
+                        wingman_name=wingman_name,
+                        message=str(e).strip() or type(e).__name__,
+                        error_type=WingmanInitializationErrorType.UNKNOWN,
+                    )
+                )
+
     async def __instantiate_wingman(
         self,
         wingman_name: str,
@@ -87,7 +152,10 @@ class Tower:
         errors: list[WingmanInitializationError],
     ):
         wingman = None
+        benchmark = Benchmark(label=wingman_name)
+        state = StartupState.FAILED
         try:
+            benchmark.start_snapshot("Instantiation")
             # it's a custom Wingman
             if wingman_config.custom_class:
                 wingman = ModuleManager.create_wingman_dynamically(
@@ -136,19 +204,53 @@ class Tower:
                 )
             )
         else:
-            # additional validation check if no exception was raised
-            validation_errors = await wingman.validate()
-            errors.extend(validation_errors)
+            context_token = wingman_context.set(wingman.name)
+            try:
+                # additional validation check if no exception was raised
+                benchmark.finish_snapshot()
+                benchmark.start_snapshot("Validation")
+                wingman_errors = await wingman.validate()
+                errors.extend(wingman_errors)
 
-            # init and validate skills
-            skill_errors = await wingman.init_skills()
+                # init and validate skills
+                benchmark.finish_snapshot()
+                benchmark.start_snapshot("Skills")
+                skill_errors = await wingman.init_skills()
 
-            if not errors or len(errors) == 0:
-                await wingman.prepare()
-                self.wingmen.append(wingman)
+                # other Wingmen starting at the same time don't affect this one
+                if not wingman_errors:
+                    benchmark.finish_snapshot()
+                    benchmark.start_snapshot("Preparation")
+                    await wingman.prepare()
+                    self.wingmen.append(wingman)
+                    state = StartupState.READY
+            finally:
+                wingman_context.reset(context_token)
 
+        if benchmark.snapshot_label:
+            benchmark.finish_snapshot()
+        self.wingman_timings[wingman_name] = WingmanStartupTiming(
+            wingman_name=wingman_name,
+            state=state,
+            benchmark=benchmark.finish(),
+            skills=[],
+        )
         return wingman
 
+    def get_startup_timings(self) -> StartupTimings:
+        timings = []
+        for wingman_name, timing in self.wingman_timings.items():
+            wingman = next(
+                (wingman for wingman in self.wingmen if wingman.name == wingman_name),
+                None,
+            )
+            timings.append(
+                timing.model_copy(
+                    update={"skills": wingman.skill_timings if wingman else []}
+                )
+            )
+        return StartupTimings(benchmark=self.startup_benchmark, wingmen=timings)
+
     def get_wingman_from_text(self, text: str) -> Wingman | None:
         for wingman in self.wingmen:
             # Check if a wingman name is in the text
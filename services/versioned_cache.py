@@ -0,0 +1,62 @@
+import time
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class VersionedCache(Generic[T]):
+    """Caches a value that is expensive to build until invalidate() is called.
+
+    Every invalidation bumps the version, so a value that was built while the cache was invalidated
+    (e.g. by another thread) is rebuilt on the next access.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = 0
+        self.value: T | None = None
+        self.value_version = -1
+        self.hits = 0
+        self.misses = 0
+        self.build_time_ms = 0.0
+        """How long the last build took. A hit saves roughly this much time."""
+        self.time_saved_ms = 0.0
+
+    def invalidate(self):
+        self.version += 1
+
+    def get(self, build: Callable[[], T]) -> T:
+        if self.value_version == self.version:
+            return self.__hit()
+        version = self.version
+        start_time = time.perf_counter()
+        value = build()
+        return self.__store(value, version, start_time)
+
+    async def get_async(self, build: Callable[[], Awaitable[T]]) -> T:
+        if self.value_version == self.version:
+            return self.__hit()
+        version = self.version
+        start_time = time.perf_counter()
+        value = await build()
+        return self.__store(value, version, start_time)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> str:
+        return f"{self.name} cache: {self.hits}/{self.hits + self.misses} hits ({self.hit_rate:.0%}), {self.time_saved_ms:.1f}ms saved"
+
+    def __hit(self) -> T:
+        self.hits += 1
+        self.time_saved_ms += self.build_time_ms
+        return self.value
+
+    def __store(self, value: T, version: int, start_time: float) -> T:
+        self.misses += 1
+        self.build_time_ms = (time.perf_counter() - start_time) * 1000
+        self.value = value
+        self.value_version = version
+        return value
@@ -0,0 +1,162 @@
+from collections import deque
+import numpy
+from scipy.signal import butter, sosfilt
+
+SPEECH_BAND = (85, 500)
+"""The frequency band (in Hz) of the fundamental frequencies of human voices."""
+
+
+class Utterance:
+    def __init__(self, samples: numpy.ndarray, sample_rate: int, energy: float):
+        self.samples = samples
+        """Mono float32 samples, including a short pre-roll before the speech started."""
+        self.sample_rate = sample_rate
+        self.energy = energy
+        """The RMS energy of the whole utterance in the speech band."""
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+class VoiceActivityDetector:
+    """Frame-level voice activity detection for a continuous audio stream.
+
+    The bandpass is designed once and its state is kept across chunks, so every sample is filtered exactly once.
+    The energy in the speech band is computed per frame and utterances end as soon as the speaker pauses.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        energy_threshold: float = 0.01,
+        frame_duration: float = 0.03,
+        start_duration: float = 0.09,
+        end_silence: float = 0.5,
+        pre_roll: float = 0.3,
+        min_duration: float = 0.15,
+        max_duration: float = 30,
+        order: int = 5,
+    ):
+        """
+        Args:
+            sample_rate (int): The sample rate of the stream.
+            energy_threshold (float): The RMS energy in the speech band a frame needs to count as voiced.
+            frame_duration (float): The length of a frame in seconds.
+            start_duration (float): How long the voice must be active before an utterance starts.
+            end_silence (float): How long the voice must be inactive to end an utterance.
+            pre_roll (float): How much audio before the start is added to the utterance, so the first syllable isn't cut.
+            min_duration (float): Shorter utterances are dropped.
+            max_duration (float): Longer utterances are ended.
+            order (int): The order of the Butterworth bandpass.
+        """
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.frame_size = max(int(frame_duration * sample_rate), 1)
+        self.start_frames = max(round(start_duration / frame_duration), 1)
+        self.end_frames = max(round(end_silence / frame_duration), 1)
+        self.min_frames = round(min_duration / frame_duration)
+        self.max_frames = max(round(max_duration / frame_duration), 1)
+
+        self.sos = butter(
+            order, SPEECH_BAND, btype="band", fs=sample_rate, output="sos"
+        )
+        self.pre_roll_frames: deque[tuple[numpy.ndarray, float]] = deque(
+            maxlen=max(round(pre_roll / frame_duration), self.start_frames)
+        )
+        self.reset()
+
+    def reset(self):
+        self.state = numpy.zeros((self.sos.shape[0], 2))
+        self.pending = numpy.empty(0, dtype=numpy.float32)
+        self.pending_filtered = numpy.empty(0, dtype=numpy.float64)
+        self.pre_roll_frames.clear()
+        self.voiced_run = 0
+        self.silent_run = 0
+        self.is_speaking = False
+        self.frames: list[numpy.ndarray] = []
+        self.energy_sum = 0.0
+        """Sum of the squared band samples of the current utterance."""
+
+    def measure_energy(self, samples: numpy.ndarray) -> float:
+        """The RMS energy of a clip in the speech band, e.g. to measure the ambient noise. Doesn't touch the stream state."""
+        if len(samples) == 0:
+            return 0.0
+        filtered = sosfilt(self.sos, samples)
+        return float(numpy.sqrt(numpy.mean(filtered**2)))
+
+    def process(self, samples: numpy.ndarray) -> list[Utterance]:
+        """Feeds the next chunk of mono float32 samples and returns the utterances that ended in it."""
+        filtered, self.state = sosfilt(self.sos, samples, zi=self.state)
+        if len(self.pending):
+            samples = numpy.concatenate((self.pending, samples))
+            filtered = numpy.concatenate((self.pending_filtered, filtered))
+
+        count = len(samples) // self.frame_size
+        end = count * self.frame_size
+        self.pending = samples[end:]
+        self.pending_filtered = filtered[end:]
+        if count == 0:
+            return []
+
+        frames = samples[:end].reshape(count, self.frame_size)
+        band_energies = numpy.sum(
+            filtered[:end].reshape(count, self.frame_size) ** 2, axis=1
+        )
+        voiced = band_energies / self.frame_size > self.energy_threshold**2
+
+        utterances = []
+        for frame, band_energy, is_voiced in zip(frames, band_energies, voiced):
+            utterance = self.__process_frame(frame, band_energy, is_voiced)
+            if utterance:
+                utterances.append(utterance)
+        return utterances
+
+    def flush(self) -> Utterance | None:
+        """Ends the current utterance, e.g. when the stream stops."""
+        utterance = self.__end_utterance() if self.is_speaking else None
+        self.reset()
+        return utterance
+
+    def __process_frame(
+        self, frame: numpy.ndarray, band_energy: float, is_voiced: bool
+    ) -> Utterance | None:
+        if not self.is_speaking:
+            self.pre_roll_frames.append((frame, band_energy))
+            self.voiced_run = self.voiced_run + 1 if is_voiced else 0
+            if self.voiced_run >= self.start_frames:
+                self.is_speaking = True
+                self.silent_run = 0
+                for pre_roll_frame, pre_roll_energy in self.pre_roll_frames:
+                    self.frames.append(pre_roll_frame)
+                    self.energy_sum += pre_roll_energy
+                self.pre_roll_frames.clear()
+            return None
+
+        self.frames.append(frame)
+        self.energy_sum += band_energy
+        self.silent_run = 0 if is_voiced else self.silent_run + 1
+        if self.silent_run >= self.end_frames or len(self.frames) >= self.max_frames:
+            return self.__end_utterance()
+        return None
+
+    def __end_utterance(self) -> Utterance | None:
+        # the energy covers the whole utterance like the old whole-clip check,
+        # but only a little of the trailing silence is passed on to the STT
+        energy = numpy.sqrt(self.energy_sum / (len(self.frames) * self.frame_size))
+        trailing = max(self.silent_run - self.start_frames, 0)
+        frames = self.frames[: len(self.frames) - trailing]
+
+        self.frames = []
+        self.energy_sum = 0.0
+        self.is_speaking = False
+        self.voiced_run = 0
+        self.silent_run = 0
+
+        if not frames or len(frames) < self.min_frames:
+            return None
+        return Utterance(
+            samples=numpy.concatenate(frames),
+            sample_rate=self.sample_rate,
+            energy=float(energy),
+        )
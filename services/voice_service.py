@@ -13,7 +13,6 @@ from api.interface import (
 )
 from providers.edge import Edge
 from providers.elevenlabs import ElevenLabs
-from providers.hume import Hume
 from providers.open_ai import OpenAi, OpenAiAzure, OpenAiCompatibleTts
 from providers.wingman_pro import WingmanPro
 from providers.xvasynth import XVASynth
@@ -158,6 +157,9 @@ class VoiceService:
 
     # GET /voices/hume
     async def get_hume_voices(self, api_key: str) -> list[VoiceInfo]:
+        # the Hume SDK is only needed for Hume, so not imported at startup
+        from providers.hume import Hume
+
         hume = Hume(api_key=api_key, wingman_name="")
         result = await hume.get_available_voices()
         return result
@@ -274,6 +276,8 @@ class VoiceService:
     async def play_hume(
         self, text: str, api_key: str, config: HumeConfig, sound_config: SoundConfig
     ):
+        from providers.hume import Hume
+
         hume = Hume(api_key=api_key, wingman_name="")
         await hume.play_audio(
             text=text,
@@ -1,5 +1,6 @@
 import asyncio
 from services.connection_manager import ConnectionManager
+from services.runtime import Runtime
 
 
 class WebSocketUser:
@@ -21,5 +22,9 @@ class WebSocketUser:
             # If we're in a running loop, just create a task
             return loop.create_task(coro)
         except RuntimeError:
-            # No running loop, so we need to run one
-            return asyncio.run(coro)
+            # No running loop in this thread, so hand it over to the main loop
+            task = Runtime().run_on_main_loop(coro)
+            if task is None:
+                # the main loop isn't running (yet), e.g. during startup
+                return asyncio.run(coro)
+            return task
@@ -270,7 +270,7 @@ class Msfs2020Control(Skill):
                 color=LogType.INFO,
             )
 
-        self.threaded_execution(self.start_data_monitoring_loop)
+        self.threaded_execution(self.start_data_monitoring_loop, executor="dedicated")
 
     async def start_data_monitoring_loop(self):
         if not self.data_monitoring_loop_running:
@@ -424,7 +424,7 @@ class Msfs2020Control(Skill):
     async def prepare(self) -> None:
         """Load the skill by trying to connect to the sim"""
         self.loaded = True
-        self.threaded_execution(self.start_simconnect)
+        self.threaded_execution(self.start_simconnect, executor="dedicated")
 
     async def unload(self) -> None:
         """Unload the skill."""
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import time
 import copy
@@ -230,7 +231,7 @@ class RadioChatter(Skill):
     async def prepare(self) -> None:
         self.loaded = True
         if self.auto_start:
-            self.threaded_execution(self._init_chatter)
+            self.threaded_execution(self._init_chatter, executor="dedicated")
 
     async def unload(self) -> None:
         self.loaded = False
@@ -296,7 +297,9 @@ class RadioChatter(Skill):
                 if self.radio_status:
                     function_response = "Radio is already on."
                 else:
-                    self.threaded_execution(self._init_chatter)
+                    self.threaded_execution(
+                        self._init_chatter, executor="dedicated"
+                    )
                     function_response = "Radio is now on."
             elif tool_name == "turn_off_radio":
                 if self.radio_status:
@@ -437,8 +440,7 @@ class RadioChatter(Skill):
                 return
 
             # wait for audio_player idling
-            while self.wingman.audio_player.is_playing:
-                time.sleep(2)
+            await self.wingman.audio_player.wait_until_idle()
 
             if not self.is_active():
                 return
@@ -453,19 +455,23 @@ class RadioChatter(Skill):
                     color=LogType.INFO,
                     source_name=self.wingman.name,
                 )
+            playbacks = self.wingman.audio_player.subscribe_playbacks()
             self.threaded_execution(self.wingman.play_to_user, text, True, sound_config)
             if self.radio_knowledge:
                 await self.wingman.add_assistant_message(
                     f"Background radio chatter: {text}"
                 )
-            max_wait = 10
-            while not self.wingman.audio_player.is_playing or max_wait < 0:
-                time.sleep(0.1)
-                max_wait -= 0.1
+            try:
+                # wait (max 10s) until the message is being played
+                await asyncio.wait_for(playbacks.get(), timeout=10)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self.wingman.audio_player.unsubscribe_playbacks(playbacks)
             await self._switch_voice(original_voice_setting, elevenlabs_streaming)
 
-        while self.wingman.audio_player.is_playing:
-            time.sleep(1)  # stay in function call until last message got played
+        # stay in function call until last message got played
+        await self.wingman.audio_player.wait_until_idle()
 
     async def _get_random_voice_index(self, count: int) -> list[int]:
         """Switch voice to a random voice from the list."""
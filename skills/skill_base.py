@@ -1,4 +1,4 @@
-import threading
+from concurrent.futures import Future
 from typing import TYPE_CHECKING
 from api.enums import WingmanInitializationErrorType
 from api.interface import (
@@ -34,6 +34,8 @@ class Skill:
         self.printr = Printr()
         self.execution_start: None | float = None
         """Used for benchmarking executon times. The timer is (re-)started whenever the process function starts."""
+        self.cache_prompt = type(self).get_prompt is Skill.get_prompt
+        """Whether the Wingman may cache the result of get_prompt(). Skills that override get_prompt() are asked on every LLM call unless they set this to True and call invalidate_prompt() whenever their prompt changes."""
 
     async def secret_changed(self, secrets: dict[str, any]):
         """Called when a secret is changed."""
@@ -61,6 +63,10 @@ class Skill:
         """Returns additional context for this skill. Will be injected into the the system prompt. Can be overridden by the skill to add dynamic data to context."""
         return self.config.prompt or None
 
+    def invalidate_prompt(self) -> None:
+        """Call this when get_prompt() returns something else now so that the Wingman rebuilds its cached system prompt."""
+        self.wingman.invalidate_context()
+
     async def execute_tool(
         self, tool_name: str, parameters: dict[str, any], benchmark: Benchmark
     ) -> tuple[str, str]:
@@ -78,6 +84,7 @@ class Skill:
     async def on_play_to_user(self, text: str, sound_config: SoundConfig) -> str:
         """Called before the text is synthetized to speech by the TTS provider.
         You can modify the text if needed. Add {SKIP-TTS} to the text to to skip playback.
+        If the response is streamed, this is called once with its first sentence.
         """
         return text
 
@@ -139,6 +146,12 @@ class Skill:
             return None
         return p.value
 
-    def threaded_execution(self, function, *args) -> threading.Thread:
-        """Execute a function in a separate thread."""
+    def threaded_execution(
+        self, function, *args, executor: str = "skills"
+    ) -> Future | None:
+        """Execute a function (or coroutine function) on a worker of the shared runtime, next to the other skills.
+
+        Pass executor="dedicated" for loops that run as long as the skill is loaded. They get a thread of their own
+        and must stop themselves in unload(), otherwise they block a worker of the skills for good.
+        """
         pass
@@ -131,7 +131,7 @@ class Timer(Skill):
 
     async def prepare(self) -> None:
         self.active = True
-        self.threaded_execution(self.start_timer_worker)
+        self.threaded_execution(self.start_timer_worker, executor="dedicated")
 
     async def unload(self) -> None:
         self.active = False
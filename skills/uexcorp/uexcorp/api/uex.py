@@ -1,5 +1,6 @@
 import requests
 import concurrent.futures
+import threading
 from itertools import product
 from typing import Optional
 from typing import TYPE_CHECKING
@@ -52,6 +53,7 @@ class Uex:
     ):
         self.helper = helper
         self.session = None
+        self.__session_lock = threading.Lock()
 
     def _get_headers(self) -> dict[str, str]:
         headers = {
@@ -71,8 +73,9 @@ class Uex:
         if get and any(isinstance(value, list) for value in get.values()):
             keys, values = zip(*((k, v if isinstance(v, list) else [v]) for k, v in get.items()))
             with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_combination = {executor.submit(self.__actual_fetch, endpoint, dict(zip(keys, combination)), params): combination for combination in product(*values)}
-                for future in concurrent.futures.as_completed(future_to_combination):
+                futures = [executor.submit(self.__actual_fetch, endpoint, dict(zip(keys, combination)), params) for combination in product(*values)]
+                # in the order of the requests, so the same data always results in the same content hash
+                for future in futures:
                     result = future.result()
                     if isinstance(result, list):
                         results.extend(result)
@@ -100,9 +103,11 @@ class Uex:
             self.helper.get_handler_error().write("Api.fetch", [endpoint, params], f"No API URL or endpoint provided -> {url}", False)
             return []
 
-        if self.session is None:
-            self.helper.get_handler_debug().write(f"Init session for {self.helper.get_handler_config().get_api_url()} for future requests ...")
-            self.session = requests.Session()
+        # tables are fetched in parallel, so only the first request may create the shared session
+        with self.__session_lock:
+            if self.session is None:
+                self.helper.get_handler_debug().write(f"Init session for {self.helper.get_handler_config().get_api_url()} for future requests ...")
+                self.session = requests.Session()
 
         request_count = 1
         max_retries = 2
@@ -1,7 +1,13 @@
-import uuid
+class Filter:
+    """Where clauses, joins, order, limit and offset of a query on a table.
 
+    The bind parameters are named by their position (param_0, param_1, ...), so filters of the same shape resolve to
+    the same SQL and sqlite can reuse its prepared statement. get_shape() identifies that SQL without resolving it.
+    """
+
+    LIST_BUCKET_MAX = 1024
+    """IN lists are padded to the next power of two up to this length and to a multiple of it above"""
 
-class Filter:
     def __init__(self, table: str | None = None):
         self.__base_table: str | None = table
         self.__where = []
@@ -21,7 +27,7 @@ class Filter:
             self.__limit = filter.get_limit()
         if filter.get_offset() is not None:
             self.__offset = filter.get_offset()
-        self.__binds.update(filter.get_bind())
+        self.__binds.update(filter.get_added_bind())
         if filter.get_where():
             self.__grouped_where.append({
                 "where": filter.get_where(),
@@ -46,9 +52,79 @@ class Filter:
     def add_bind(self, key: str, value):
         self.__binds[key] = value
 
-    def get_bind(self) -> dict[str, any]:
+    def get_added_bind(self) -> dict[str, any]:
+        """The binds added with add_bind, without the ones of the where clauses, limit and offset."""
         return self.__binds
 
+    def get_bind(self) -> dict[str, any]:
+        binds = dict(self.__binds)
+        index = 0
+        for where in self.__get_where_lists():
+            for field, value, operation, is_or, value_is_field in where:
+                for bind_value in self.__get_bind_values(value, value_is_field):
+                    binds[f"param_{index}"] = bind_value
+                    index += 1
+        if self.__limit is not None:
+            binds["param_limit"] = self.__limit
+        if self.__offset is not None:
+            binds["param_offset"] = self.__offset
+        return binds
+
+    def get_shape(self) -> tuple:
+        """Everything that makes up the SQL of this filter, but not the values bound to it."""
+        return (
+            self.__base_table,
+            tuple(self.__get_where_shape(where) for where in self.__get_where_lists()),
+            tuple(grouped_where["is_or"] for grouped_where in self.__grouped_where),
+            tuple(self.__joins),
+            tuple(self.__order_by.items()),
+            self.__limit is not None,
+            self.__offset is not None,
+        )
+
+    def __get_where_lists(self) -> list[list[tuple[str, any, str | None, bool, bool]]]:
+        """The where clauses and then the grouped ones, in the order they are resolved."""
+        return [self.__where] + [grouped_where["where"] for grouped_where in self.__grouped_where]
+
+    @staticmethod
+    def __get_where_shape(where: list[tuple[str, any, str | None, bool, bool]]) -> tuple:
+        shape = []
+        for field, value, operation, is_or, value_is_field in where:
+            if isinstance(value, bool):
+                kind = "bool"
+            elif isinstance(value, list):
+                kind = len(Filter.__get_list_values(value))
+            elif isinstance(value, int):
+                kind = "zero" if value == 0 else "int"
+            elif value_is_field:
+                kind = ("field", value)
+            else:
+                kind = "value"
+            shape.append((field, kind, operation, is_or))
+        return tuple(shape)
+
+    @staticmethod
+    def __get_bind_values(value, value_is_field: bool) -> list:
+        if isinstance(value, bool):
+            return [1 if value else 0]
+        if isinstance(value, list):
+            return Filter.__get_list_values(value)
+        if isinstance(value, int) or not value_is_field:
+            return [value]
+        return []
+
+    @staticmethod
+    def __get_list_values(values: list) -> list:
+        """Pads the list by repeating its last value (same result for IN and NOT IN), so lists of about the same
+        length share one statement instead of one per length."""
+        if len(values) < 2:
+            return values
+        if len(values) <= Filter.LIST_BUCKET_MAX:
+            size = 1 << (len(values) - 1).bit_length()
+        else:
+            size = -(-len(values) // Filter.LIST_BUCKET_MAX) * Filter.LIST_BUCKET_MAX
+        return values + [values[-1]] * (size - len(values))
+
     def limit(self, limit: int):
         self.__limit = limit
 
@@ -56,7 +132,7 @@ class Filter:
         return self.__limit
 
     def resolve_limit(self) -> str:
-        return f"LIMIT {self.__limit}" if self.__limit is not None else "LIMIT -1"
+        return "LIMIT :param_limit" if self.__limit is not None else "LIMIT -1"
 
     def offset(self, offset: int):
         self.__offset = offset
@@ -65,7 +141,7 @@ class Filter:
         return self.__offset
 
     def resolve_offset(self) -> str:
-        return f"OFFSET {self.__offset}" if self.__offset is not None else ""
+        return "OFFSET :param_offset" if self.__offset is not None else ""
 
     def where(self, field: str, value, operation: str | None = None, is_or: bool = False, value_is_field: bool = False):
         self.__where.append((field, value, operation, is_or, value_is_field))
@@ -77,6 +153,13 @@ class Filter:
         if len(self.__where) == 0 and len(self.__grouped_where) == 0:
             return ""
 
+        index = 0
+
+        def next_param_name() -> str:
+            nonlocal index
+            index += 1
+            return f"param_{index - 1}"
+
         def resolve_where_loop(where: list[tuple[str, any, str | None, bool, bool]]) -> str:
             where_str = ""
             for i, (field, value, operation, is_or, value_is_field) in enumerate(where):
@@ -89,19 +172,14 @@ class Filter:
                 if i > 0:
                     where_str += " OR " if is_or else " AND "
 
-                param_name = f"param_{uuid.uuid4().hex}"
+                # the binds are named in the same order by get_bind
                 if isinstance(value, bool):
-                    self.add_bind(param_name, 1 if value else 0)
-                    value = f"{field} {operation if operation is not None else '='} :{param_name}"
+                    value = f"{field} {operation if operation is not None else '='} :{next_param_name()}"
                 elif isinstance(value, list):
-                    placeholders = []
-                    for item in value:
-                        item_param_name = f"param_{uuid.uuid4().hex}"
-                        self.add_bind(item_param_name, item)
-                        placeholders.append(f":{item_param_name}")
+                    placeholders = [f":{next_param_name()}" for _item in self.__get_list_values(value)]
                     value = f"{field} {operation if operation is not None else 'IN'} ({','.join(placeholders)})"
                 elif isinstance(value, int):
-                    self.add_bind(param_name, value)
+                    param_name = next_param_name()
                     if value == 0:
                         value = f"({field} {operation if operation is not None else '='} :{param_name} OR {field} IS NULL)"
                     else:
@@ -110,8 +188,7 @@ class Filter:
                     if value_is_field:
                         value = f"{field} {operation if operation is not None else '='} {value}"
                     else:
-                        self.add_bind(param_name, value)
-                        value = f"{field} {operation if operation is not None else '='} :{param_name}"
+                        value = f"{field} {operation if operation is not None else '='} :{next_param_name()}"
 
                 where_str += value
 
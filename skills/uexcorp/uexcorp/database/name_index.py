@@ -0,0 +1,229 @@
+import difflib
+import re
+import unicodedata
+from collections import Counter
+
+
+class NameIndex:
+    """A fuzzy search index over names, e.g. of all ships or locations, for names that went through speech to text.
+
+    Names are compared lowercased, without punctuation and spacing ("Port Olisar" matches "portolisar"), with number
+    words as digits ("A two" matches "A2"), by a phonetic key ("Herston" matches "Hurston") and by their initials
+    ("CI" matches "Crusader Industries"). Candidates share trigrams, a phonetic key or their initials with the search
+    and are scored from 0 to 1 by the trigrams and words they have in common with it.
+    """
+
+    MATCH_MIN = 0.4
+    """Matches scoring lower are dropped, like the cutoff of difflib.get_close_matches before"""
+
+    CONFIDENT_MIN = 0.8
+    """The best match is taken without asking the LLM from this score on..."""
+
+    CONFIDENT_MARGIN = 0.08
+    """...if the second best scores at least this much less"""
+
+    CANDIDATES_MAX = 50
+    """Names scored per search, the ones sharing the most trigrams with it"""
+
+    NUMBER_WORDS = {
+        "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7",
+        "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+        "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19", "twenty": "20",
+    }
+
+    PHONETIC_REPLACEMENTS = [
+        ("ph", "f"), ("ck", "k"), ("qu", "k"), ("q", "k"), ("x", "ks"), ("z", "s"), ("wh", "w"), ("kn", "n"),
+        ("ce", "se"), ("ci", "si"), ("cy", "si"), ("c", "k"), ("dg", "j"), ("gh", "g"), ("v", "f"),
+    ]
+
+    def __init__(self, names: list[str] | set[str]):
+        self.__names: list[str] = list(dict.fromkeys(name for name in names if name))
+        self.__tokens: list[list[str]] = []
+        self.__compact: list[str] = []
+        self.__phonetic: list[str] = []
+        self.__trigram_counts: list[int] = []
+        self.__token_phonetics: dict[str, str] = {}
+        self.__by_name: dict[str, list[int]] = {}
+        self.__by_compact: dict[str, list[int]] = {}
+        self.__by_trigram: dict[str, list[int]] = {}
+        self.__by_phonetic: dict[str, list[int]] = {}
+        self.__by_initials: dict[str, list[int]] = {}
+        self.__matches: dict[str, str] = {}
+        """search => match, as confirmed by the LLM"""
+
+        for index, name in enumerate(self.__names):
+            tokens = self.get_tokens(name)
+            compact = "".join(tokens)
+            phonetic = self.get_phonetic(compact)
+            self.__tokens.append(tokens)
+            self.__compact.append(compact)
+            self.__phonetic.append(phonetic)
+            self.__by_name.setdefault(name, []).append(index)
+            self.__by_compact.setdefault(compact, []).append(index)
+            trigrams = set(self.get_trigrams(compact))
+            self.__trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                self.__by_trigram.setdefault(trigram, []).append(index)
+            for token in tokens:
+                if token not in self.__token_phonetics:
+                    self.__token_phonetics[token] = self.get_phonetic(token)
+            for key in {phonetic} | {self.__token_phonetics[token] for token in tokens}:
+                if key:
+                    self.__by_phonetic.setdefault(key, []).append(index)
+            if len(tokens) > 1:
+                self.__by_initials.setdefault("".join(token[0] for token in tokens), []).append(index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__by_name
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def get_names(self) -> list[str]:
+        return self.__names
+
+    def remember(self, search: str, match: str) -> None:
+        """Remembers a match confirmed by the LLM, so the same search is answered without it next time."""
+        self.__matches[search] = match
+
+    def get_remembered(self, search: str) -> str | None:
+        return self.__matches.get(search)
+
+    @staticmethod
+    def get_tokens(name: str) -> list[str]:
+        """The lowercased words of the name without accents and punctuation, number words as digits and single letters
+        joined with the number after them ("A two" => "a2")."""
+        name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+        # "MIC-L1" => "mic l1", but "O'Brien" => "obrien"
+        name = re.sub(r"['`´]", "", name)
+        tokens = []
+        for token in re.findall(r"[a-z0-9]+", name):
+            token = NameIndex.NUMBER_WORDS.get(token, token)
+            if tokens and token.isdigit() and len(tokens[-1]) == 1 and tokens[-1].isalpha():
+                tokens[-1] += token
+            else:
+                tokens.append(token)
+        return tokens
+
+    @staticmethod
+    def get_trigrams(compact: str) -> list[str]:
+        padded = f"${compact}$"
+        return [padded[index:index + 3] for index in range(len(padded) - 2)]
+
+    @staticmethod
+    def get_phonetic(word: str) -> str:
+        """A rough key of how the word sounds: similar sounding letters merged, vowels after the first letter and
+        repeated letters removed ("hurston" and "herston" => "hrstn")."""
+        if not word or word.isdigit():
+            return word
+        for source, target in NameIndex.PHONETIC_REPLACEMENTS:
+            word = word.replace(source, target)
+        key = word[0]
+        for char in word[1:]:
+            if char in "aeiouyhw" or char == key[-1]:
+                continue
+            key += char
+        return key
+
+    def search(self, search: str, limit: int = 10) -> list[tuple[str, float]]:
+        """The names matching the search best with their score, best first."""
+        tokens = self.get_tokens(search)
+        compact = "".join(tokens)
+        if not compact:
+            return []
+
+        if compact in self.__by_compact:
+            return [(self.__names[index], 1.0) for index in self.__by_compact[compact]][:limit]
+
+        trigrams = set(self.get_trigrams(compact))
+        hits = Counter()
+        for trigram in trigrams:
+            hits.update(self.__by_trigram.get(trigram, ()))
+        candidates = dict(hits.most_common(self.CANDIDATES_MAX))
+        phonetic = self.get_phonetic(compact)
+        token_phonetics = {token: self.get_phonetic(token) for token in tokens}
+        for key in {phonetic} | set(token_phonetics.values()):
+            for index in self.__by_phonetic.get(key, ())[:self.CANDIDATES_MAX]:
+                candidates.setdefault(index, hits[index])
+        for index in self.__by_initials.get(compact, ()):
+            candidates.setdefault(index, hits[index])
+
+        # names share most of their words, so each pair of words is compared once per search
+        token_similarities: dict[tuple[str, str], float] = {}
+        matches = []
+        for index, shared_trigrams in candidates.items():
+            # Dice coefficient of the trigrams
+            similarity = 2 * shared_trigrams / (len(trigrams) + self.__trigram_counts[index])
+            score = self.__score(tokens, token_phonetics, compact, similarity, index, token_similarities)
+            if len(compact) >= 5 and phonetic == self.__phonetic[index]:
+                # sounds the same as a whole, e.g. "Lore Ville" and "Lorville"
+                score = max(score, 0.9)
+            if score >= self.MATCH_MIN:
+                matches.append((self.__names[index], score))
+        matches.sort(key=lambda match: (-match[1], len(match[0])))
+        return matches[:limit]
+
+    def get_confident_match(self, matches: list[tuple[str, float]]) -> str | None:
+        """The best of the matches if it's clearly the one meant, None if it's a tie or not close enough."""
+        if not matches or matches[0][1] < self.CONFIDENT_MIN:
+            return None
+        if len(matches) > 1 and matches[0][1] - matches[1][1] < self.CONFIDENT_MARGIN:
+            return None
+        return matches[0][0]
+
+    def __score(
+            self,
+            tokens: list[str],
+            token_phonetics: dict[str, str],
+            compact: str,
+            similarity: float,
+            index: int,
+            token_similarities: dict[tuple[str, str], float],
+    ) -> float:
+        name_tokens = self.__tokens[index]
+
+        # how many words of the search are in the name and the other way around
+        matched_name_tokens = set()
+        search_coverage = 0.0
+        contained = True
+        for token in tokens:
+            best, best_index = 0.0, None
+            for name_token_index, name_token in enumerate(name_tokens):
+                token_similarity = token_similarities.get((token, name_token))
+                if token_similarity is None:
+                    token_similarity = self.__get_token_similarity(token, token_phonetics[token], name_token)
+                    token_similarities[(token, name_token)] = token_similarity
+                if token_similarity > best:
+                    best, best_index = token_similarity, name_token_index
+            if best_index is not None:
+                matched_name_tokens.add(best_index)
+            search_coverage += best
+            contained = contained and best >= 0.85
+        search_coverage /= len(tokens)
+        name_coverage = len(matched_name_tokens) / len(name_tokens) if name_tokens else 0.0
+
+        score = 0.4 * similarity + 0.45 * search_coverage + 0.15 * name_coverage
+        if contained:
+            # all words of the search are in the name, e.g. "Carrack" in "Anvil Carrack", the fewer others the better
+            score = max(score, self.CONFIDENT_MIN + (1 - self.CONFIDENT_MIN) * name_coverage)
+        if len(name_tokens) > 1 and compact == "".join(token[0] for token in name_tokens):
+            score = max(score, self.CONFIDENT_MIN)
+        return score
+
+    def __get_token_similarity(self, token: str, token_phonetic: str, name_token: str) -> float:
+        if token == name_token:
+            return 1.0
+        if token.isdigit() or name_token.isdigit():
+            return 0.0
+        # short words have too short keys to tell them apart, e.g. "ci" and "zeus" => "s"
+        if len(token) >= 4 and len(token_phonetic) >= 2 and token_phonetic == self.__token_phonetics[name_token]:
+            return 0.9
+        shorter, longer = sorted((token, name_token), key=len)
+        if len(shorter) >= 3 and longer.startswith(shorter):
+            return 0.85
+        matcher = difflib.SequenceMatcher(None, token, name_token)
+        # the quick ratios are upper bounds of the ratio
+        if matcher.real_quick_ratio() < 0.75 or matcher.quick_ratio() < 0.75:
+            return 0.0
+        similarity = matcher.ratio()
+        return similarity if similarity >= 0.75 else 0.0
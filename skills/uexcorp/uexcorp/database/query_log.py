@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    try:
+        from skills.uexcorp.uexcorp.database.database import Database
+    except ModuleNotFoundError:
+        from uexcorp.uexcorp.database.database import Database
+
+
+class QueryLog:
+    """Timings of the queries of the data_access classes, one entry per compiled query.
+
+    Entries keep the binds of their last run, so the query plan can be explained on demand.
+    """
+
+    MAX_ENTRIES = 256
+    """The least recently run queries are dropped above this"""
+
+    def __init__(self, database: "Database"):
+        self.__database = database
+        self.__entries: OrderedDict[str, dict[str, any]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def add(self, name: str, sql: str, binds: dict[str, any], seconds: float, rows: int) -> None:
+        with self.__lock:
+            entry = self.__entries.get(sql)
+            if entry is None:
+                entry = {
+                    "name": name,
+                    "sql": sql,
+                    "count": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                    "rows": 0,
+                }
+                self.__entries[sql] = entry
+                if len(self.__entries) > self.MAX_ENTRIES:
+                    self.__entries.popitem(last=False)
+            else:
+                self.__entries.move_to_end(sql)
+            entry["count"] += 1
+            entry["total_time"] += seconds
+            entry["max_time"] = max(entry["max_time"], seconds)
+            entry["rows"] += rows
+            entry["binds"] = binds
+
+    def get_entries(self) -> list[dict[str, any]]:
+        """name (of the data_access class), sql, count, total_time, max_time (in seconds), rows and binds (of the
+        last run) of each query, slowest in total first."""
+        with self.__lock:
+            entries = [dict(entry) for entry in self.__entries.values()]
+        return sorted(entries, key=lambda entry: entry["total_time"], reverse=True)
+
+    def explain(self, sql: str, binds: dict[str, any]) -> list[str]:
+        """The EXPLAIN QUERY PLAN output of the query, one line per step."""
+        rows = self.__database.fetch_all(f"EXPLAIN QUERY PLAN {sql}", binds)
+        return [row["detail"] for row in rows]
+
+    def get_report(self, explain: bool = True, limit: int | None = None) -> str:
+        lines = []
+        for entry in self.get_entries()[:limit]:
+            average = entry["total_time"] / entry["count"] * 1000
+            lines.append(
+                f"{entry['name']}: {entry['count']}x, {entry['total_time'] * 1000:.1f}ms total, {average:.2f}ms avg, "
+                f"{entry['max_time'] * 1000:.2f}ms max, {entry['rows'] / entry['count']:.0f} row(s) avg"
+            )
+            lines.append(f"    {' '.join(entry['sql'].split())}")
+            if explain:
+                lines += [f"    -> {detail}" for detail in self.explain(entry["sql"], entry["binds"])]
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
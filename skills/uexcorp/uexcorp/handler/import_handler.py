@@ -1,4 +1,8 @@
+import concurrent.futures
+import hashlib
+import json
 import time
+from importlib import import_module
 from typing import TYPE_CHECKING
 try:
     from skills.uexcorp.uexcorp.api.uex import Uex
@@ -8,11 +12,27 @@ except ModuleNotFoundError:
 if TYPE_CHECKING:
     try:
         from skills.uexcorp.uexcorp.helper import Helper
+        from skills.uexcorp.uexcorp.model.data_model import DataModel
+        from skills.uexcorp.uexcorp.model.import_data import ImportData
     except ModuleNotFoundError:
         from uexcorp.uexcorp.helper import Helper
+        from uexcorp.uexcorp.model.data_model import DataModel
+        from uexcorp.uexcorp.model.import_data import ImportData
 
 
 class ImportHandler:
+    """Imports the UEX api data into the database.
+
+    The API requests of independent tables run in parallel. The rows of each table are written by the importing
+    thread only, in one transaction per table, so writes stay serialized.
+
+    Imports are synced as deltas: a table whose response has the same content hash as the last import is skipped.
+    Otherwise, if this process imported the table before, only the rows that changed since are written and the ones
+    that are gone are deleted. Without that (first import after a start), the table is written completely.
+    """
+
+    FETCH_WORKERS = 4
+    """Maximum number of tables fetched from the API at the same time"""
 
     def __init__(
             self,
@@ -21,43 +41,49 @@ class ImportHandler:
         self.__helper = helper
         self.__api = Uex(helper)
         self.active = True
+        config = helper.get_handler_config()
+        # table => endpoint, cache lifetime, tables that must be imported first, builder for the request parameters,
+        # builder for the models of the response and the column identifying a row (default: id, None: no delta sync)
         self.__importers = {
-            "category": self.__import_data_category,
-            "category_attribute": self.__import_data_category_attribute,
-            "city": self.__import_data_city,
-            "commodity": self.__import_data_commodity,
-            "company": self.__import_data_company,
-            "faction": self.__import_data_faction,
-            "item": self.__import_data_item,
-            "jurisdiction": self.__import_data_jurisdiction,
-            "star_system": self.__import_data_star_system,
-            "moon": self.__import_data_moon,
-            "orbit": self.__import_data_orbit,
-            "orbit_distance": self.__import_data_orbit_distance,
-            "outpost": self.__import_data_outpost,
-            "planet": self.__import_data_planet,
-            "poi": self.__import_data_poi,
-            "refinery_method": self.__import_data_refinery_method,
-            "space_station": self.__import_data_space_station,
-            "terminal": self.__import_data_terminal,
-            "vehicle": self.__import_data_vehicle,
-            "commodity_status": self.__import_data_commodity_status,
-            "item_price": self.__import_data_item_price,
-            "item_attribute": self.__import_data_item_attribute,
-            "refinery_audit": self.__import_data_refinery_audit,
-            "fuel_price": self.__import_data_fuel_price,
-            "vehicle_purchase_price": self.__import_data_vehicle_purchase_price,
-            "vehicle_rental_price": self.__import_data_vehicle_rental_price,
-            "commodity_alert": self.__import_data_commodity_alert,
-            "commodity_price": self.__import_data_commodity_price,
-            "commodity_raw_price": self.__import_data_commodity_raw_price,
-            "commodity_route": self.__import_data_commodity_route,
-            "game_version": self.__import_data_game_version,
+            "category": {"endpoint": Uex.CATEGORIES, "lifetime": config.get_cache_lifetime_long, "models": self.__get_models_category},
+            "category_attribute": {"endpoint": Uex.CATEGORIES_ATTRIBUTES, "lifetime": config.get_cache_lifetime_long},
+            "city": {"endpoint": Uex.CITIES, "lifetime": config.get_cache_lifetime_long},
+            "commodity": {"endpoint": Uex.COMMODITIES, "lifetime": config.get_cache_lifetime_long},
+            "company": {"endpoint": Uex.COMPANIES, "lifetime": config.get_cache_lifetime_long},
+            "faction": {"endpoint": Uex.FACTIONS, "lifetime": config.get_cache_lifetime_long},
+            "item": {"endpoint": Uex.ITEMS, "lifetime": config.get_cache_lifetime_long, "depends_on": ["category"], "get": self.__get_request_item},
+            "jurisdiction": {"endpoint": Uex.JURISDICTIONS, "lifetime": config.get_cache_lifetime_long},
+            "star_system": {"endpoint": Uex.STAR_SYSTEMS, "lifetime": config.get_cache_lifetime_long},
+            "moon": {"endpoint": Uex.MOONS, "lifetime": config.get_cache_lifetime_long},
+            "orbit": {"endpoint": Uex.ORBITS, "lifetime": config.get_cache_lifetime_long},
+            "orbit_distance": {"endpoint": Uex.ORBITS_DISTANCES, "lifetime": config.get_cache_lifetime_long, "depends_on": ["star_system"], "get": self.__get_request_orbit_distance},
+            "outpost": {"endpoint": Uex.OUTPOSTS, "lifetime": config.get_cache_lifetime_long},
+            "planet": {"endpoint": Uex.PLANETS, "lifetime": config.get_cache_lifetime_long},
+            "poi": {"endpoint": Uex.POI, "lifetime": config.get_cache_lifetime_long},
+            "refinery_method": {"endpoint": Uex.REFINERIES_METHODS, "lifetime": config.get_cache_lifetime_long},
+            "space_station": {"endpoint": Uex.SPACE_STATIONS, "lifetime": config.get_cache_lifetime_long},
+            "terminal": {"endpoint": Uex.TERMINALS, "lifetime": config.get_cache_lifetime_long},
+            "vehicle": {"endpoint": Uex.VEHICLES, "lifetime": config.get_cache_lifetime_long},
+            "commodity_status": {"endpoint": Uex.COMMODITIES_STATUS, "lifetime": config.get_cache_lifetime_mid, "models": self.__get_models_commodity_status, "key": None},
+            "item_price": {"endpoint": Uex.ITEMS_PRICES, "lifetime": config.get_cache_lifetime_mid},
+            "item_attribute": {"endpoint": Uex.ITEMS_ATTRIBUTES, "lifetime": config.get_cache_lifetime_long, "depends_on": ["category"], "get": self.__get_request_item_attribute},
+            "refinery_audit": {"endpoint": Uex.REFINERIES_AUDITS, "lifetime": config.get_cache_lifetime_mid},
+            "fuel_price": {"endpoint": Uex.FUEL_PRICES, "lifetime": config.get_cache_lifetime_mid},
+            "vehicle_purchase_price": {"endpoint": Uex.VEHICLES_PURCHASES_PRICES, "lifetime": config.get_cache_lifetime_mid},
+            "vehicle_rental_price": {"endpoint": Uex.VEHICLES_RENTALS_PRICES, "lifetime": config.get_cache_lifetime_mid},
+            "commodity_alert": {"endpoint": Uex.COMMODITIES_ALERTS, "lifetime": config.get_cache_lifetime_short, "key": None},
+            "commodity_price": {"endpoint": Uex.COMMODITIES_PRICES, "lifetime": config.get_cache_lifetime_short},
+            "commodity_raw_price": {"endpoint": Uex.COMMODITIES_RAW_PRICES, "lifetime": config.get_cache_lifetime_short},
+            "commodity_route": {"endpoint": Uex.COMMODITIES_ROUTES, "lifetime": config.get_cache_lifetime_short, "depends_on": ["commodity"], "get": self.__get_request_commodity_route},
+            "game_version": {"endpoint": Uex.GAME_VERSIONS, "lifetime": config.get_cache_lifetime_short, "models": self.__get_models_game_version},
         }
         self.__common_data = {
             "last_import_run_id": 0,
         }
         self.__imported_percent: int = 0
+        self.__import_stats: dict[str, dict[str, float | int]] = {}
+        self.__row_hashes: dict[str, tuple[str, dict[any, int]]] = {}
+        """table => (content hash, row key => row hash) of the last import of the table by this process"""
 
         self.generate_import_session()
 
@@ -83,7 +109,7 @@ class ImportHandler:
         total_count = self.__import_data()
         self.__helper.sync_fasterwhisper_hotwords()
         self.__helper.get_handler_debug().write(
-            f"UEX api data imported: {total_count} record(s) in {self.__helper.end_timer('import_total')}s",
+            f"UEX api data imported: {total_count} record(s) written or deleted in {self.__helper.end_timer('import_total')}s",
             total_count > 0
         )
         self.__helper.on_import_completed(total_count)
@@ -97,1093 +123,283 @@ class ImportHandler:
         except ModuleNotFoundError:
             from uexcorp.uexcorp.model.game_version import GameVersion
 
-        self.__import_data_game_version(force_check)
+        self.__import_table("game_version", force_check)
         return GameVersion(load=True).get_live()
 
     def get_imported_percent(self) -> int:
         return self.__imported_percent
 
+    def get_import_stats(self) -> dict[str, dict[str, float | int]]:
+        """Per table of the last import (run): fetched, changed (written) and deleted rows, if it was skipped as
+        unchanged, fetch and write seconds and rows/s."""
+        return self.__import_stats
+
     def __import_data(self) -> int:
         total_count = 0
         self.__imported_percent = 0
-        for importer in self.__importers.values():
-            if self.active:
-                total_count += int(importer() or 0)
-                self.__imported_percent = int(min(self.__imported_percent + (100 / len(self.__importers)), 100))
+        self.__import_stats = {}
+        done = set()
+        pending = {}
+        for table, importer in self.__importers.items():
+            import_data = self.__get_pending_import(table, importer)
+            if import_data:
+                pending[table] = import_data
+            else:
+                done.add(table)
+        self.__add_imported_percent(len(done))
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.FETCH_WORKERS, thread_name_prefix="uex_import"
+        ) as executor:
+            fetching = {}
+
+            def submit_ready():
+                for table in list(pending):
+                    if all(dependency in done for dependency in self.__importers[table].get("depends_on", [])):
+                        future = executor.submit(self.__fetch, table, self.__get_request(table))
+                        fetching[future] = (table, pending.pop(table))
+
+            submit_ready()
+            while fetching and self.active:
+                finished, _ = concurrent.futures.wait(fetching, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    table, import_data = fetching.pop(future)
+                    try:
+                        if self.active:
+                            total_count += self.__write(table, import_data, *future.result())
+                    except Exception as e:
+                        self.__helper.get_handler_debug().write(f"Failed to import {table} data: {e}", True)
+                        self.__helper.get_handler_error().write("ImportHandler.__import_data", [table], e)
+                    done.add(table)
+                    self.__add_imported_percent(1)
+                if self.active:
+                    submit_ready()
+
+            for future in fetching:
+                future.cancel()
+
         self.__imported_percent = 100
         return total_count
 
-    def __import_data_category(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.category import Category
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.category import Category
-
-        if not self.__helper.get_database().table_exists("category"):
-            return False
-
-        category_import = ImportData("category", load=True)
-        if not category_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        category_data = self.__api.fetch(self.__api.CATEGORIES)
-        if category_data:
-            for index, data in enumerate(category_data):
-                category = Category(data["id"])
-
-                # workaround for missing sqlite CONCAT function
-                if "name" in data and "section" in data:
-                    data["combined_name"] = f"{data['section']} {data['name']}"
-
-                category.set_data(data)
-                if category.get_section() == "Armor" and category.get_name() == "Set":
-                    category.data["is_game_related"] = 0
-                category.persist(index < len(category_data) - 1)
-
-        category_import.set_date_imported(self.__helper.get_timestamp())
-        category_import.set_dataset_count(len(category_data))
-        category_import.set_time_taken(self.__helper.end_timer("import"))
-        category_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Category data imported: {category_import.get_dataset_count()} record(s) in {category_import.get_time_taken()}s"
-        )
-        return len(category_data)
-
-    def __import_data_category_attribute(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.category_attribute import CategoryAttribute
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.category_attribute import CategoryAttribute
-
-        if not self.__helper.get_database().table_exists("category_attribute"):
-            return False
-
-        category_attribute_import = ImportData("category_attribute", load=True)
-        if not category_attribute_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        category_attribute_data = self.__api.fetch(self.__api.CATEGORIES_ATTRIBUTES)
-        if category_attribute_data:
-            for index, data in enumerate(category_attribute_data):
-                category_attribute = CategoryAttribute(data["id"])
-                category_attribute.set_data(data)
-                category_attribute.persist(index < len(category_attribute_data) - 1)
-
-        category_attribute_import.set_date_imported(self.__helper.get_timestamp())
-        category_attribute_import.set_dataset_count(len(category_attribute_data))
-        category_attribute_import.set_time_taken(self.__helper.end_timer("import"))
-        category_attribute_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Category Attribute data imported: {category_attribute_import.get_dataset_count()} record(s) in {category_attribute_import.get_time_taken()}s"
-        )
-        return len(category_attribute_data)
-
-    def __import_data_city(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.city import City
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.city import City
-
-        if not self.__helper.get_database().table_exists("city"):
-            return False
-
-        city_import = ImportData("city", load=True)
-        if not city_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        city_data = self.__api.fetch(self.__api.CITIES)
-        if city_data:
-            for index, data in enumerate(city_data):
-                city = City(data["id"])
-                city.set_data(data)
-                city.persist(index < len(city_data) - 1)
-
-        city_import.set_date_imported(self.__helper.get_timestamp())
-        city_import.set_dataset_count(len(city_data))
-        city_import.set_time_taken(self.__helper.end_timer("import"))
-        city_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"City data imported: {city_import.get_dataset_count()} record(s) in {city_import.get_time_taken()}s"
-        )
-        return len(city_data)
-
-    def __import_data_commodity(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.commodity import Commodity
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.commodity import Commodity
-
-        if not self.__helper.get_database().table_exists("commodity"):
-            return False
-
-        commodity_import = ImportData("commodity", load=True)
-        if not commodity_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        commodity_data = self.__api.fetch(self.__api.COMMODITIES)
-        if commodity_data:
-            for index, data in enumerate(commodity_data):
-                commodity = Commodity(data["id"])
-                commodity.set_data(data)
-                commodity.persist(index < len(commodity_data) - 1)
-
-        commodity_import.set_date_imported(self.__helper.get_timestamp())
-        commodity_import.set_dataset_count(len(commodity_data))
-        commodity_import.set_time_taken(self.__helper.end_timer("import"))
-        commodity_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Commodity data imported: {commodity_import.get_dataset_count()} record(s) in {commodity_import.get_time_taken()}s"
-        )
-        return len(commodity_data)
-
-    def __import_data_commodity_alert(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.commodity_alert import CommodityAlert
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.commodity_alert import CommodityAlert
-
-        if not self.__helper.get_database().table_exists("commodity_alert"):
-            return False
-
-        commodity_alert_import = ImportData("commodity_alert", load=True)
-        if not commodity_alert_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_short()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        commodity_alert_data = self.__api.fetch(self.__api.COMMODITIES_ALERTS)
-        if commodity_alert_data:
-            for index, data in enumerate(commodity_alert_data):
-                commodity_alert = CommodityAlert(data["id"])
-                commodity_alert.set_data(data)
-                commodity_alert.persist(index < len(commodity_alert_data) - 1)
-
-        commodity_alert_import.set_date_imported(self.__helper.get_timestamp())
-        commodity_alert_import.set_dataset_count(len(commodity_alert_data))
-        commodity_alert_import.set_time_taken(self.__helper.end_timer("import"))
-        commodity_alert_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Commodity Alert data imported: {commodity_alert_import.get_dataset_count()} record(s) in {commodity_alert_import.get_time_taken()}s"
-        )
-        return len(commodity_alert_data)
-
-    def __import_data_commodity_price(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.commodity_price import CommodityPrice
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.commodity_price import CommodityPrice
-
-        if not self.__helper.get_database().table_exists("commodity_price"):
-            return False
-
-        commodity_price_import = ImportData("commodity_price", load=True)
-        if not commodity_price_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_short()):
-            return False
-
-        self.__helper.start_timer("import")
+    def __import_table(self, table: str, force: bool = False) -> int:
+        """Imports a single table right away, without waiting for a full import."""
+        importer = self.__importers[table]
+        import_data = self.__get_pending_import(table, importer, force)
+        if not import_data:
+            return 0
 
-        commodity_price_data = self.__api.fetch(self.__api.COMMODITIES_PRICES)
-        if commodity_price_data:
-            for index, data in enumerate(commodity_price_data):
-                commodity_price = CommodityPrice(data["id"])
-                commodity_price.set_data(data)
-                commodity_price.persist(index < len(commodity_price_data) - 1)
+        return self.__write(table, import_data, *self.__fetch(table, self.__get_request(table)))
 
-        commodity_price_import.set_date_imported(self.__helper.get_timestamp())
-        commodity_price_import.set_dataset_count(len(commodity_price_data))
-        commodity_price_import.set_time_taken(self.__helper.end_timer("import"))
-        commodity_price_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Commodity Price data imported: {commodity_price_import.get_dataset_count()} record(s) in {commodity_price_import.get_time_taken()}s"
-        )
-        return len(commodity_price_data)
+    def __add_imported_percent(self, tables: int):
+        self.__imported_percent = int(min(self.__imported_percent + (100 * tables / len(self.__importers)), 100))
 
-    def __import_data_commodity_raw_price(self) -> bool | int:
+    def __get_pending_import(self, table: str, importer: dict[str, any], force: bool = False) -> "ImportData | None":
         try:
             from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.commodity_raw_price import CommodityRawPrice
         except ModuleNotFoundError:
             from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.commodity_raw_price import CommodityRawPrice
-
-        if not self.__helper.get_database().table_exists("commodity_raw_price"):
-            return False
 
-        commodity_raw_price_import = ImportData("commodity_raw_price", load=True)
-        if not commodity_raw_price_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_short()):
-            return False
+        if not self.__helper.get_database().table_exists(table):
+            return None
 
-        self.__helper.start_timer("import")
+        import_data = ImportData(table, load=True)
+        if not force and not import_data.needs_import(importer["lifetime"]()):
+            return None
+        return import_data
 
-        commodity_raw_price_data = self.__api.fetch(self.__api.COMMODITIES_RAW_PRICES)
-        if commodity_raw_price_data:
-            for index, data in enumerate(commodity_raw_price_data):
-                commodity_raw_price = CommodityRawPrice(data["id"])
-                commodity_raw_price.set_data(data)
-                commodity_raw_price.persist(index < len(commodity_raw_price_data) - 1)
+    def __get_request(self, table: str) -> dict[str, any] | None:
+        get = self.__importers[table].get("get")
+        return get() if get else None
 
-        commodity_raw_price_import.set_date_imported(self.__helper.get_timestamp())
-        commodity_raw_price_import.set_dataset_count(len(commodity_raw_price_data))
-        commodity_raw_price_import.set_time_taken(self.__helper.end_timer("import"))
-        commodity_raw_price_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Commodity Raw Price data imported: {commodity_raw_price_import.get_dataset_count()} record(s) in {commodity_raw_price_import.get_time_taken()}s"
-        )
-        return len(commodity_raw_price_data)
+    def __fetch(
+            self,
+            table: str,
+            get: dict[str, any] | None
+    ) -> tuple[list["DataModel"], str, dict[any, int] | None, float]:
+        """Runs in a worker thread: fetches the table and builds its models and hashes, without touching the database."""
+        importer = self.__importers[table]
+        start = time.perf_counter()
+        response = self.__api.fetch(importer["endpoint"], get)
+        content_hash = hashlib.sha1(json.dumps(response).encode()).hexdigest()
+        models = importer["models"](response) if "models" in importer else self.__get_models(table, response)
+        key = importer.get("key", "id")
+        row_hashes = {model.get_data()[key]: model.get_content_hash() for model in models} if key else None
+        return models, content_hash, row_hashes, time.perf_counter() - start
+
+    def __write(
+            self,
+            table: str,
+            import_data: "ImportData",
+            models: list["DataModel"],
+            content_hash: str,
+            row_hashes: dict[any, int] | None,
+            fetch_time: float,
+    ) -> int:
+        try:
+            from skills.uexcorp.uexcorp.model.data_model import DataModel
+        except ModuleNotFoundError:
+            from uexcorp.uexcorp.model.data_model import DataModel
+
+        database = self.__helper.get_database()
+        key = self.__importers[table].get("key", "id")
+        last_content_hash = import_data.get_content_hash()
+        skipped = content_hash == last_content_hash
+        previous_row_hashes = None
+        if row_hashes is not None and table in self.__row_hashes and self.__row_hashes[table][0] == last_content_hash:
+            # the table is as this process left it
+            previous_row_hashes = self.__row_hashes[table][1]
+        count = 0
+        deleted = 0
+        failed = False
+        start = time.perf_counter()
+        with database.transaction():
+            if not skipped and previous_row_hashes is not None:
+                changed = [
+                    model for model in models
+                    if previous_row_hashes.get(model.get_data()[key]) != row_hashes[model.get_data()[key]]
+                ]
+                count = DataModel.persist_many(changed)
+                failed = count < len(changed)
+                removed_keys = [(row_key,) for row_key in previous_row_hashes.keys() - row_hashes.keys()]
+                if removed_keys:
+                    database.executemany(f"DELETE FROM {table} WHERE `{key}` = ?", removed_keys)
+                deleted = len(removed_keys)
+            elif not skipped:
+                count = DataModel.persist_many(models)
+                failed = count < len(models)
+                outdated = database.fetch_one(
+                    f"SELECT COUNT(*) FROM {table} WHERE last_import_run_id != ?",
+                    (self.__common_data["last_import_run_id"],),
+                )
+                deleted = outdated[0] if outdated else 0
+
+            import_data.set_date_imported(self.__helper.get_timestamp())
+            import_data.set_dataset_count(len(models))
+            import_data.set_time_taken(int(fetch_time + time.perf_counter() - start))
+            import_data.set_content_hash(content_hash)
+            # in a delta, rows that didn't change keep the run id of the import that wrote them
+            import_data.persist(True, delete_outdated=not skipped and previous_row_hashes is None)
+        write_time = time.perf_counter() - start
+
+        if failed:
+            # the hashes would mark the failed rows as written, so the next import writes the whole table again
+            self.__row_hashes.pop(table, None)
+        elif row_hashes is not None:
+            self.__row_hashes[table] = (content_hash, row_hashes)
+
+        rows_per_second = int(count / write_time) if write_time > 0 else count
+        self.__import_stats[table] = {
+            "fetched": len(models),
+            "changed": count,
+            "deleted": deleted,
+            "skipped": skipped,
+            "fetch_time": fetch_time,
+            "write_time": write_time,
+            "rows_per_second": rows_per_second,
+        }
+        name = table.replace('_', ' ').title()
+        if skipped:
+            self.__helper.get_handler_debug().write(
+                f"{name} data unchanged: {len(models)} record(s) fetched in {fetch_time:.2f}s, skipped writing"
+            )
+        else:
+            self.__helper.get_handler_debug().write(
+                f"{name} data imported: {len(models)} record(s) fetched, {count} changed, {deleted} deleted "
+                f"in {fetch_time + write_time:.2f}s (fetch {fetch_time:.2f}s, write {write_time:.2f}s, {rows_per_second} rows/s)"
+            )
+        # a delta that only deletes rows changes the table as well, e.g. the names in it
+        return count + deleted
+
+    def __get_model_class(self, table: str) -> type["DataModel"]:
+        class_name = "".join(part.capitalize() for part in table.split("_"))
+        try:
+            module = import_module(f"skills.uexcorp.uexcorp.model.{table}")
+        except ModuleNotFoundError:
+            module = import_module(f"uexcorp.uexcorp.model.{table}")
+        return getattr(module, class_name)
+
+    def __get_models(self, table: str, response: list[dict[str, any]]) -> list["DataModel"]:
+        model_class = self.__get_model_class(table)
+        models = []
+        for data in response or []:
+            # like DataAccess.load, e.g. commodity alerts have no id
+            model = model_class(**{key: data[key] for key in model_class.required_keys if key in data})
+            model.set_data(data)
+            models.append(model)
+        return models
+
+    def __get_models_category(self, response: list[dict[str, any]]) -> list["DataModel"]:
+        for data in response or []:
+            # workaround for missing sqlite CONCAT function
+            if "name" in data and "section" in data:
+                data["combined_name"] = f"{data['section']} {data['name']}"
+
+        categories = self.__get_models("category", response)
+        for category in categories:
+            if category.get_section() == "Armor" and category.get_name() == "Set":
+                category.data["is_game_related"] = 0
+        return categories
 
-    def __import_data_commodity_status(self) -> bool | int:
+    def __get_models_commodity_status(self, response: dict[str, list[dict[str, any]]]) -> list["DataModel"]:
         try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
             from skills.uexcorp.uexcorp.model.commodity_status import CommodityStatus
         except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
             from uexcorp.uexcorp.model.commodity_status import CommodityStatus
 
-        if not self.__helper.get_database().table_exists("commodity_status"):
-            return False
-
-        commodity_status_import = ImportData("commodity_status", load=True)
-        if not commodity_status_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_mid()):
-            return False
+        models = []
+        for key, is_buy in (("buy", True), ("sell", False)):
+            for data in (response or {}).get(key, []):
+                commodity_status = CommodityStatus(data["code"], is_buy)
+                commodity_status.set_data(data)
+                models.append(commodity_status)
+        return models
 
-        self.__helper.start_timer("import")
-
-        commodity_status_data = self.__api.fetch(self.__api.COMMODITIES_STATUS)
-        if commodity_status_data:
-            if "buy" in commodity_status_data:
-                for index, data in enumerate(commodity_status_data["buy"]):
-                    commodity_status = CommodityStatus(data["code"], True)
-                    commodity_status.set_data(data)
-                    commodity_status.persist(index < len(commodity_status_data["buy"]) - 1)
-            if "sell" in commodity_status_data:
-                for index, data in enumerate(commodity_status_data["sell"]):
-                    commodity_status = CommodityStatus(data["code"], False)
-                    commodity_status.set_data(data)
-                    commodity_status.persist(index < len(commodity_status_data["sell"]) - 1)
-
-        commodity_status_import.set_date_imported(self.__helper.get_timestamp())
-        commodity_status_import.set_dataset_count(len(commodity_status_data))
-        commodity_status_import.set_time_taken(self.__helper.end_timer("import"))
-        commodity_status_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Commodity Status data imported: {commodity_status_import.get_dataset_count()} record(s) in {commodity_status_import.get_time_taken()}s"
-        )
-        return len(commodity_status_data)
-
-    def __import_data_commodity_route(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.commodity_route import CommodityRoute
-            from skills.uexcorp.uexcorp.data_access.commodity_data_access import CommodityDataAccess
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.commodity_route import CommodityRoute
-            from uexcorp.uexcorp.data_access.commodity_data_access import CommodityDataAccess
-
-        if not self.__helper.get_database().table_exists("commodity_route"):
-            return False
-
-        commodity_route_import = ImportData("commodity_route", load=True)
-        if not commodity_route_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_short()):
-            return False
-
-        # Depends on commodity data
-        self.__import_data_commodity()
-
-        self.__helper.start_timer("import")
-
-        commodities = CommodityDataAccess().add_filter_has_buy_price().add_filter_has_sell_price().load()
-        commodity_ids = []
-        for commodity in commodities:
-            commodity_ids.append(commodity.get_id())
-
-        commodity_route_data = self.__api.fetch(self.__api.COMMODITIES_ROUTES, {"id_commodity": commodity_ids})
-        if commodity_route_data:
-            for index, data in enumerate(commodity_route_data):
-                commodity_route = CommodityRoute(data["id"])
-                commodity_route.set_data(data)
-                commodity_route.persist(index < len(commodity_route_data) - 1)
-
-        commodity_route_import.set_date_imported(self.__helper.get_timestamp())
-        commodity_route_import.set_dataset_count(len(commodity_route_data))
-        commodity_route_import.set_time_taken(self.__helper.end_timer("import"))
-        commodity_route_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Commodity Route data imported: {commodity_route_import.get_dataset_count()} record(s) in {commodity_route_import.get_time_taken()}s"
-        )
-        return len(commodity_route_data)
-
-    def __import_data_company(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.company import Company
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.company import Company
-
-        if not self.__helper.get_database().table_exists("company"):
-            return False
-
-        company_import = ImportData("company", load=True)
-        if not company_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        company_data = self.__api.fetch(self.__api.COMPANIES)
-        if company_data:
-            for index, data in enumerate(company_data):
-                company = Company(data["id"])
-                company.set_data(data)
-                company.persist(index < len(company_data) - 1)
-
-        company_import.set_date_imported(self.__helper.get_timestamp())
-        company_import.set_dataset_count(len(company_data))
-        company_import.set_time_taken(self.__helper.end_timer("import"))
-        company_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Company data imported: {company_import.get_dataset_count()} record(s) in {company_import.get_time_taken()}s"
-        )
-        return len(company_data)
-
-    def __import_data_faction(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.faction import Faction
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.faction import Faction
-
-        if not self.__helper.get_database().table_exists("faction"):
-            return False
-
-        faction_import = ImportData("faction", load=True)
-        if not faction_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        faction_data = self.__api.fetch(self.__api.FACTIONS)
-        if faction_data:
-            for index, data in enumerate(faction_data):
-                faction = Faction(data["id"])
-                faction.set_data(data)
-                faction.persist(index < len(faction_data) - 1)
-
-        faction_import.set_date_imported(self.__helper.get_timestamp())
-        faction_import.set_dataset_count(len(faction_data))
-        faction_import.set_time_taken(self.__helper.end_timer("import"))
-        faction_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Faction data imported: {faction_import.get_dataset_count()} record(s) in {faction_import.get_time_taken()}s"
-        )
-        return len(faction_data)
-
-    def __import_data_fuel_price(self) -> bool | int:
+    def __get_models_game_version(self, response: dict[str, any]) -> list["DataModel"]:
         try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.fuel_price import FuelPrice
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.fuel_price import FuelPrice
-
-        if not self.__helper.get_database().table_exists("fuel_price"):
-            return False
-
-        fuel_price_import = ImportData("fuel_price", load=True)
-        if not fuel_price_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_mid()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        fuel_price_data = self.__api.fetch(self.__api.FUEL_PRICES)
-        if fuel_price_data:
-            for index, data in enumerate(fuel_price_data):
-                fuel_price = FuelPrice(data["id"])
-                fuel_price.set_data(data)
-                fuel_price.persist(index < len(fuel_price_data) - 1)
-
-        fuel_price_import.set_date_imported(self.__helper.get_timestamp())
-        fuel_price_import.set_dataset_count(len(fuel_price_data))
-        fuel_price_import.set_time_taken(self.__helper.end_timer("import"))
-        fuel_price_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Fuel Price data imported: {fuel_price_import.get_dataset_count()} record(s) in {fuel_price_import.get_time_taken()}s"
-        )
-        return len(fuel_price_data)
-
-    def __import_data_game_version(self, force_check: bool = False) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
             from skills.uexcorp.uexcorp.model.game_version import GameVersion
         except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
             from uexcorp.uexcorp.model.game_version import GameVersion
 
-        if not self.__helper.get_database().table_exists("game_version"):
-            return False
-
-        game_version_import = ImportData("game_version", load=True)
-        if not force_check and not game_version_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_short()):
-            return False
+        if not response:
+            return []
+        game_version = GameVersion()
+        game_version.set_data(response)
+        return [game_version]
 
-        self.__helper.start_timer("import")
-
-        game_version_data = self.__api.fetch(self.__api.GAME_VERSIONS)
-        if game_version_data:
-            game_version = GameVersion()
-            game_version.set_data(game_version_data)
-            game_version.persist()
-
-        game_version_import.set_date_imported(self.__helper.get_timestamp())
-        game_version_import.set_dataset_count(len(game_version_data))
-        game_version_import.set_time_taken(self.__helper.end_timer("import"))
-        game_version_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Game Version data imported: {game_version_import.get_dataset_count()} record(s) in {game_version_import.get_time_taken()}s"
-        )
-        return len(game_version_data)
-
-    def __import_data_item(self) -> bool | int:
+    def __get_request_item(self) -> dict[str, any]:
         try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.item import Item
             from skills.uexcorp.uexcorp.data_access.category_data_access import CategoryDataAccess
         except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.item import Item
             from uexcorp.uexcorp.data_access.category_data_access import CategoryDataAccess
 
-        if not self.__helper.get_database().table_exists("item"):
-            return False
-
-        item_import = ImportData("item", load=True)
-        if not item_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
+        return {"id_category": [category.get_id() for category in CategoryDataAccess().load()]}
 
-        self.__helper.start_timer("import")
-
-        category_ids = []
-        categories = CategoryDataAccess().load()
-        for category in categories:
-            category_ids.append(category.get_id())
-
-        item_data = self.__api.fetch(self.__api.ITEMS, {"id_category": category_ids})
-        if item_data:
-            for index, data in enumerate(item_data):
-                item = Item(data["id"])
-                item.set_data(data)
-                item.persist(index < len(item_data) - 1)
-
-        item_import.set_date_imported(self.__helper.get_timestamp())
-        item_import.set_dataset_count(len(item_data))
-        item_import.set_time_taken(self.__helper.end_timer("import"))
-        item_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Item data imported: {item_import.get_dataset_count()} record(s) in {item_import.get_time_taken()}s"
-        )
-        return len(item_data)
-
-    def __import_data_item_price(self) -> bool | int:
+    def __get_request_item_attribute(self) -> dict[str, any]:
         try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.item_price import ItemPrice
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.item_price import ItemPrice
-
-        if not self.__helper.get_database().table_exists("item_price"):
-            return False
-
-        item_price_import = ImportData("item_price", load=True)
-        if not item_price_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_mid()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        item_price_data = self.__api.fetch(self.__api.ITEMS_PRICES)
-        if item_price_data:
-            for index, data in enumerate(item_price_data):
-                item_price = ItemPrice(data["id"])
-                item_price.set_data(data)
-                item_price.persist(index < len(item_price_data) - 1)
-
-        item_price_import.set_date_imported(self.__helper.get_timestamp())
-        item_price_import.set_dataset_count(len(item_price_data))
-        item_price_import.set_time_taken(self.__helper.end_timer("import"))
-        item_price_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Item Price data imported: {item_price_import.get_dataset_count()} record(s) in {item_price_import.get_time_taken()}s"
-        )
-        return len(item_price_data)
-
-    def __import_data_item_attribute(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.item_attribute import ItemAttribute
             from skills.uexcorp.uexcorp.data_access.category_data_access import CategoryDataAccess
         except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.item_attribute import ItemAttribute
             from uexcorp.uexcorp.data_access.category_data_access import CategoryDataAccess
 
-        if not self.__helper.get_database().table_exists("item_attribute"):
-            return False
-
-        item_attribute_import = ImportData("item_attribute", load=True)
-        if not item_attribute_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        # depends on categories
-        self.__import_data_category()
+        categories = CategoryDataAccess().add_filter_by_is_game_related(True).load()
+        return {"id_category": [category.get_id() for category in categories]}
 
-        self.__helper.start_timer("import")
-
-        category_ids = []
-        categories =  CategoryDataAccess().add_filter_by_is_game_related(True).load()
-        for category in categories:
-            category_ids.append(category.get_id())
-
-        item_attribute_data = self.__api.fetch(self.__api.ITEMS_ATTRIBUTES, {"id_category": category_ids})
-        if item_attribute_data:
-            for index, data in enumerate(item_attribute_data):
-                item_attribute = ItemAttribute(data["id"])
-                item_attribute.set_data(data)
-                item_attribute.persist(index < len(item_attribute_data) - 1)
-
-        item_attribute_import.set_date_imported(self.__helper.get_timestamp())
-        item_attribute_import.set_dataset_count(len(item_attribute_data))
-        item_attribute_import.set_time_taken(self.__helper.end_timer("import"))
-        item_attribute_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Orbit Distance data imported: {item_attribute_import.get_dataset_count()} record(s) in {item_attribute_import.get_time_taken()}s"
-        )
-        return item_attribute_import.get_dataset_count()
-
-    def __import_data_jurisdiction(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.jurisdiction import Jurisdiction
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.jurisdiction import Jurisdiction
-
-        if not self.__helper.get_database().table_exists("jurisdiction"):
-            return False
-
-        jurisdiction_import = ImportData("jurisdiction", load=True)
-        if not jurisdiction_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        jurisdiction_data = self.__api.fetch(self.__api.JURISDICTIONS)
-        if jurisdiction_data:
-            for index, data in enumerate(jurisdiction_data):
-                jurisdiction = Jurisdiction(data["id"])
-                jurisdiction.set_data(data)
-                jurisdiction.persist(index < len(jurisdiction_data) - 1)
-
-        jurisdiction_import.set_date_imported(self.__helper.get_timestamp())
-        jurisdiction_import.set_dataset_count(len(jurisdiction_data))
-        jurisdiction_import.set_time_taken(self.__helper.end_timer("import"))
-        jurisdiction_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Jurisdiction data imported: {jurisdiction_import.get_dataset_count()} record(s) in {jurisdiction_import.get_time_taken()}s"
-        )
-        return len(jurisdiction_data)
-
-    def __import_data_moon(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.moon import Moon
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.moon import Moon
-
-        if not self.__helper.get_database().table_exists("moon"):
-            return False
-
-        moon_import = ImportData("moon", load=True)
-        if not moon_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        moon_data = self.__api.fetch(self.__api.MOONS)
-        if moon_data:
-            for index, data in enumerate(moon_data):
-                moon = Moon(data["id"])
-                moon.set_data(data)
-                moon.persist(index < len(moon_data) - 1)
-
-        moon_import.set_date_imported(self.__helper.get_timestamp())
-        moon_import.set_dataset_count(len(moon_data))
-        moon_import.set_time_taken(self.__helper.end_timer("import"))
-        moon_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Moon data imported: {moon_import.get_dataset_count()} record(s) in {moon_import.get_time_taken()}s"
-        )
-        return len(moon_data)
-
-    def __import_data_orbit(self) -> bool | int:
+    def __get_request_orbit_distance(self) -> dict[str, any]:
         try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.orbit import Orbit
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.orbit import Orbit
-
-        if not self.__helper.get_database().table_exists("orbit"):
-            return False
-
-        orbit_import = ImportData("orbit", load=True)
-        if not orbit_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        orbit_data = self.__api.fetch(self.__api.ORBITS)
-        if orbit_data:
-            for index, data in enumerate(orbit_data):
-                orbit = Orbit(data["id"])
-                orbit.set_data(data)
-                orbit.persist(index < len(orbit_data) - 1)
-
-        orbit_import.set_date_imported(self.__helper.get_timestamp())
-        orbit_import.set_dataset_count(len(orbit_data))
-        orbit_import.set_time_taken(self.__helper.end_timer("import"))
-        orbit_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Orbit data imported: {orbit_import.get_dataset_count()} record(s) in {orbit_import.get_time_taken()}s"
-        )
-        return len(orbit_data)
-
-    def __import_data_orbit_distance(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.orbit_distance import OrbitDistance
             from skills.uexcorp.uexcorp.data_access.star_system_data_access import StarSystemDataAccess
         except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.orbit_distance import OrbitDistance
             from uexcorp.uexcorp.data_access.star_system_data_access import StarSystemDataAccess
 
-        if not self.__helper.get_database().table_exists("orbit_distance"):
-            return False
-
-        orbit_distance_import = ImportData("orbit_distance", load=True)
-        if not orbit_distance_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        # Depends on star_system data
-        self.__import_data_star_system()
-
-        self.__helper.start_timer("import")
-
-        star_system_ids = []
         star_systems = StarSystemDataAccess().add_filter_by_is_available(True).load()
-        for star_system in star_systems:
-            star_system_ids.append(star_system.get_id())
-
-        orbit_distance_data = self.__api.fetch(self.__api.ORBITS_DISTANCES, {"id_star_system": star_system_ids})
-        if orbit_distance_data:
-            for index, data in enumerate(orbit_distance_data):
-                orbit_distance = OrbitDistance(data["id"])
-                orbit_distance.set_data(data)
-                orbit_distance.persist(index < len(orbit_distance_data) - 1)
-
-        orbit_distance_import.set_date_imported(self.__helper.get_timestamp())
-        orbit_distance_import.set_dataset_count(len(orbit_distance_data))
-        orbit_distance_import.set_time_taken(self.__helper.end_timer("import"))
-        orbit_distance_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Orbit Distance data imported: {orbit_distance_import.get_dataset_count()} record(s) in {orbit_distance_import.get_time_taken()}s"
-        )
-        return len(orbit_distance_data)
-
-    def __import_data_outpost(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.outpost import Outpost
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.outpost import Outpost
-
-        if not self.__helper.get_database().table_exists("outpost"):
-            return False
-
-        outpost_import = ImportData("outpost", load=True)
-        if not outpost_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        outpost_data = self.__api.fetch(self.__api.OUTPOSTS)
-        if outpost_data:
-            for index, data in enumerate(outpost_data):
-                outpost = Outpost(data["id"])
-                outpost.set_data(data)
-                outpost.persist(index < len(outpost_data) - 1)
-
-        outpost_import.set_date_imported(self.__helper.get_timestamp())
-        outpost_import.set_dataset_count(len(outpost_data))
-        outpost_import.set_time_taken(self.__helper.end_timer("import"))
-        outpost_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Outpost data imported: {outpost_import.get_dataset_count()} record(s) in {outpost_import.get_time_taken()}s"
-        )
-        return len(outpost_data)
-
-    def __import_data_planet(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.planet import Planet
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.planet import Planet
-
-        if not self.__helper.get_database().table_exists("planet"):
-            return False
-
-        planet_import = ImportData("planet", load=True)
-        if not planet_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        planet_data = self.__api.fetch(self.__api.PLANETS)
-        if planet_data:
-            for index, data in enumerate(planet_data):
-                planet = Planet(data["id"])
-                planet.set_data(data)
-                planet.persist(index < len(planet_data) - 1)
-
-        planet_import.set_date_imported(self.__helper.get_timestamp())
-        planet_import.set_dataset_count(len(planet_data))
-        planet_import.set_time_taken(self.__helper.end_timer("import"))
-        planet_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Planet data imported: {planet_import.get_dataset_count()} record(s) in {planet_import.get_time_taken()}s"
-        )
-        return len(planet_data)
-
-    def __import_data_poi(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.poi import Poi
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.poi import Poi
-
-        if not self.__helper.get_database().table_exists("poi"):
-            return False
-
-        poi_import = ImportData("poi", load=True)
-        if not poi_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        poi_data = self.__api.fetch(self.__api.POI)
-        if poi_data:
-            for index, data in enumerate(poi_data):
-                poi = Poi(data["id"])
-                poi.set_data(data)
-                poi.persist(index < len(poi_data) - 1)
-
-        poi_import.set_date_imported(self.__helper.get_timestamp())
-        poi_import.set_dataset_count(len(poi_data))
-        poi_import.set_time_taken(self.__helper.end_timer("import"))
-        poi_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"POI data imported: {poi_import.get_dataset_count()} record(s) in {poi_import.get_time_taken()}s"
-        )
-        return len(poi_data)
-
-    def __import_data_refinery_audit(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.refinery_audit import RefineryAudit
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.refinery_audit import RefineryAudit
-
-        if not self.__helper.get_database().table_exists("refinery_audit"):
-            return False
-
-        refinery_audit_import = ImportData("refinery_audit", load=True)
-        if not refinery_audit_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_mid()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        refinery_audit_data = self.__api.fetch(self.__api.REFINERIES_AUDITS)
-        if refinery_audit_data:
-            for index, data in enumerate(refinery_audit_data):
-                refinery_audit = RefineryAudit(data["id"])
-                refinery_audit.set_data(data)
-                refinery_audit.persist(index < len(refinery_audit_data) - 1)
-
-        refinery_audit_import.set_date_imported(self.__helper.get_timestamp())
-        refinery_audit_import.set_dataset_count(len(refinery_audit_data))
-        refinery_audit_import.set_time_taken(self.__helper.end_timer("import"))
-        refinery_audit_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Refinery Audit data imported: {refinery_audit_import.get_dataset_count()} record(s) in {refinery_audit_import.get_time_taken()}s"
-        )
-        return len(refinery_audit_data)
-
-    def __import_data_refinery_method(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.refinery_method import RefineryMethod
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.refinery_method import RefineryMethod
-
-        if not self.__helper.get_database().table_exists("refinery_method"):
-            return False
-
-        refinery_method_import = ImportData("refinery_method", load=True)
-        if not refinery_method_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        refinery_method_data = self.__api.fetch(self.__api.REFINERIES_METHODS)
-        if refinery_method_data:
-            for index, data in enumerate(refinery_method_data):
-                refinery_method = RefineryMethod(data["id"])
-                refinery_method.set_data(data)
-                refinery_method.persist(index < len(refinery_method_data) - 1)
-
-        refinery_method_import.set_date_imported(self.__helper.get_timestamp())
-        refinery_method_import.set_dataset_count(len(refinery_method_data))
-        refinery_method_import.set_time_taken(self.__helper.end_timer("import"))
-        refinery_method_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Refinery Method data imported: {refinery_method_import.get_dataset_count()} record(s) in {refinery_method_import.get_time_taken()}s"
-        )
-        return len(refinery_method_data)
-
-    def __import_data_space_station(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.space_station import SpaceStation
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.space_station import SpaceStation
-
-        if not self.__helper.get_database().table_exists("space_station"):
-            return False
-
-        space_station_import = ImportData("space_station", load=True)
-        if not space_station_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        space_station_data = self.__api.fetch(self.__api.SPACE_STATIONS)
-        if space_station_data:
-            for index, data in enumerate(space_station_data):
-                space_station = SpaceStation(data["id"])
-                space_station.set_data(data)
-                space_station.persist(index < len(space_station_data) - 1)
-
-        space_station_import.set_date_imported(self.__helper.get_timestamp())
-        space_station_import.set_dataset_count(len(space_station_data))
-        space_station_import.set_time_taken(self.__helper.end_timer("import"))
-        space_station_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Space Station data imported: {space_station_import.get_dataset_count()} record(s) in {space_station_import.get_time_taken()}s"
-        )
-        return len(space_station_data)
-
-    def __import_data_star_system(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.star_system import StarSystem
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.star_system import StarSystem
-
-        if not self.__helper.get_database().table_exists("star_system"):
-            return False
-
-        star_system_import = ImportData("star_system", load=True)
-        if not star_system_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        star_system_data = self.__api.fetch(self.__api.STAR_SYSTEMS)
-        if star_system_data:
-            for index, data in enumerate(star_system_data):
-                star_system = StarSystem(data["id"])
-                star_system.set_data(data)
-                star_system.persist(index < len(star_system_data) - 1)
-
-        star_system_import.set_date_imported(self.__helper.get_timestamp())
-        star_system_import.set_dataset_count(len(star_system_data))
-        star_system_import.set_time_taken(self.__helper.end_timer("import"))
-        star_system_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Star System data imported: {star_system_import.get_dataset_count()} record(s) in {star_system_import.get_time_taken()}s"
-        )
-        return len(star_system_data)
-
-    def __import_data_terminal(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.terminal import Terminal
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.terminal import Terminal
-
-        if not self.__helper.get_database().table_exists("terminal"):
-            return False
-
-        terminal_import = ImportData("terminal", load=True)
-        if not terminal_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        terminal_data = self.__api.fetch(self.__api.TERMINALS)
-        if terminal_data:
-            for index, data in enumerate(terminal_data):
-                terminal = Terminal(data["id"])
-                terminal.set_data(data)
-                terminal.persist(index < len(terminal_data) - 1)
-
-        terminal_import.set_date_imported(self.__helper.get_timestamp())
-        terminal_import.set_dataset_count(len(terminal_data))
-        terminal_import.set_time_taken(self.__helper.end_timer("import"))
-        terminal_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Terminal data imported: {terminal_import.get_dataset_count()} record(s) in {terminal_import.get_time_taken()}s"
-        )
-        return len(terminal_data)
-
-    def __import_data_vehicle(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.vehicle import Vehicle
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.vehicle import Vehicle
-
-        if not self.__helper.get_database().table_exists("vehicle"):
-            return False
-
-        vehicle_import = ImportData("vehicle", load=True)
-        if not vehicle_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_long()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        vehicle_data = self.__api.fetch(self.__api.VEHICLES)
-        if vehicle_data:
-            for index, data in enumerate(vehicle_data):
-                vehicle = Vehicle(data["id"])
-                vehicle.set_data(data)
-                vehicle.persist(index < len(vehicle_data) - 1)
-
-        vehicle_import.set_date_imported(self.__helper.get_timestamp())
-        vehicle_import.set_dataset_count(len(vehicle_data))
-        vehicle_import.set_time_taken(self.__helper.end_timer("import"))
-        vehicle_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Vehicle data imported: {vehicle_import.get_dataset_count()} record(s) in {vehicle_import.get_time_taken()}s"
-        )
-        return len(vehicle_data)
+        return {"id_star_system": [star_system.get_id() for star_system in star_systems]}
 
-    def __import_data_vehicle_purchase_price(self) -> bool | int:
+    def __get_request_commodity_route(self) -> dict[str, any]:
         try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.vehicle_purchase_price import VehiclePurchasePrice
-        except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.vehicle_purchase_price import VehiclePurchasePrice
-
-        if not self.__helper.get_database().table_exists("vehicle_purchase_price"):
-            return False
-
-        vehicle_price_import = ImportData("vehicle_purchase_price", load=True)
-        if not vehicle_price_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_mid()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        vehicle_price_data = self.__api.fetch(self.__api.VEHICLES_PURCHASES_PRICES)
-        if vehicle_price_data:
-            for index, data in enumerate(vehicle_price_data):
-                vehicle_price = VehiclePurchasePrice(data["id"])
-                vehicle_price.set_data(data)
-                vehicle_price.persist(index < len(vehicle_price_data) - 1)
-
-        vehicle_price_import.set_date_imported(self.__helper.get_timestamp())
-        vehicle_price_import.set_dataset_count(len(vehicle_price_data))
-        vehicle_price_import.set_time_taken(self.__helper.end_timer("import"))
-        vehicle_price_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Vehicle Price data imported: {vehicle_price_import.get_dataset_count()} record(s) in {vehicle_price_import.get_time_taken()}s"
-        )
-        return len(vehicle_price_data)
-
-    def __import_data_vehicle_rental_price(self) -> bool | int:
-        try:
-            from skills.uexcorp.uexcorp.model.import_data import ImportData
-            from skills.uexcorp.uexcorp.model.vehicle_rental_price import VehicleRentalPrice
+            from skills.uexcorp.uexcorp.data_access.commodity_data_access import CommodityDataAccess
         except ModuleNotFoundError:
-            from uexcorp.uexcorp.model.import_data import ImportData
-            from uexcorp.uexcorp.model.vehicle_rental_price import VehicleRentalPrice
-
-        if not self.__helper.get_database().table_exists("vehicle_rental_price"):
-            return False
-
-        vehicle_rental_import = ImportData("vehicle_rental_price", load=True)
-        if not vehicle_rental_import.needs_import(self.__helper.get_handler_config().get_cache_lifetime_mid()):
-            return False
-
-        self.__helper.start_timer("import")
-
-        vehicle_rental_data = self.__api.fetch(self.__api.VEHICLES_RENTALS_PRICES)
-        if vehicle_rental_data:
-            for index, data in enumerate(vehicle_rental_data):
-                vehicle_rental = VehicleRentalPrice(data["id"])
-                vehicle_rental.set_data(data)
-                vehicle_rental.persist(index < len(vehicle_rental_data) - 1)
+            from uexcorp.uexcorp.data_access.commodity_data_access import CommodityDataAccess
 
-        vehicle_rental_import.set_date_imported(self.__helper.get_timestamp())
-        vehicle_rental_import.set_dataset_count(len(vehicle_rental_data))
-        vehicle_rental_import.set_time_taken(self.__helper.end_timer("import"))
-        vehicle_rental_import.persist()
-        self.__helper.get_handler_debug().write(
-            f"Vehicle Rental data imported: {vehicle_rental_import.get_dataset_count()} record(s) in {vehicle_rental_import.get_time_taken()}s"
-        )
-        return len(vehicle_rental_data)
+        commodities = CommodityDataAccess().add_filter_has_buy_price().add_filter_has_sell_price().load()
+        return {"id_commodity": [commodity.get_id() for commodity in commodities]}
 
     def destroy(self) -> None:
         if self.__imported_percent != 100:
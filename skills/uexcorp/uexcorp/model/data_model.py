@@ -8,6 +8,8 @@ except ModuleNotFoundError:
 class DataModel:
 
     required_keys = ["table"]
+    converted_types = frozenset((bool, dict, list))
+    """Types of values that are converted before persisting"""
 
     def __init__(
         self,
@@ -24,35 +26,96 @@ class DataModel:
         return self.get_data_for_ai()
 
     def persist(self, skip_commit: bool = False) -> bool:
-        if not self.data or not self.table:
+        persist_values = self.get_persist_values()
+        if not persist_values:
             return False
 
-        # Add common data to the model
-        for key, value in self.helper.get_handler_import().get_common_data().items():
-            if key in self.data:
-                self.data[key] = value
-
-        clean_data = {}
-        for key, value in self.data.items():
-            if isinstance(value, bool):
-                value = int(value)
-            elif isinstance(value, dict) or isinstance(value, list):
-                value = json.dumps(value)
-            clean_data[f"`{key}`"] = value
-
-        sql = f"INSERT OR REPLACE INTO {self.table} ({','.join(clean_data.keys())}) VALUES ({','.join(['?'] * len(clean_data))})"
+        columns, values = persist_values
+        sql = self.get_persist_sql(self.table, columns)
         try:
             self.helper.get_database().execute(
                 sql,
-                tuple(clean_data.values())
+                values
             )
         except Exception as e:
             self.helper.get_handler_error().write("data_model.persist", [sql], e)
             return False
         if not skip_commit:
-            self.helper.get_database().get_connection().commit()
+            self.helper.get_database().commit()
         return True
 
+    def get_persist_values(self) -> tuple[tuple[str, ...], list] | None:
+        """The columns and values to persist the model with, None if there is nothing to persist."""
+        if not self.data or not self.table:
+            return None
+
+        # Add common data to the model
+        for key, value in self.helper.get_handler_import().get_common_data().items():
+            if key in self.data:
+                self.data[key] = value
+
+        values = list(self.data.values())
+        # this runs for every imported row, most of them have nothing to convert
+        if not self.converted_types.isdisjoint(map(type, values)):
+            values = [
+                int(value) if isinstance(value, bool)
+                else json.dumps(value) if isinstance(value, dict) or isinstance(value, list)
+                else value
+                for value in values
+            ]
+        return tuple(self.data), values
+
+    def get_content_hash(self) -> int:
+        """Hash of the data, to tell if a row changed between two imports of the same process (not stable across runs)."""
+        values = self.data.values()
+        if not self.converted_types.isdisjoint(map(type, values)):
+            # dicts and lists aren't hashable
+            values = [
+                json.dumps(value) if isinstance(value, dict) or isinstance(value, list) else value
+                for value in values
+            ]
+        return hash(tuple(values))
+
+    @staticmethod
+    def get_persist_sql(table: str, columns: tuple[str, ...]) -> str:
+        return f"INSERT OR REPLACE INTO {table} ({','.join(f'`{column}`' for column in columns)}) VALUES ({','.join(['?'] * len(columns))})"
+
+    @staticmethod
+    def persist_many(models: list["DataModel"], batch_size: int = 5000) -> int:
+        """Persists the models with one executemany per table and columns, without committing.
+
+        Works through the models in batches, so the converted values of a big table aren't all held at once.
+        If a batch fails, its rows are persisted one by one, so a single bad row doesn't drop the others.
+        Returns the number of persisted models.
+        """
+        helper = Helper.get_instance()
+        database = helper.get_database()
+        count = 0
+        for start in range(0, len(models), batch_size):
+            batches: dict[tuple[str, tuple[str, ...]], list[list]] = {}
+            for model in models[start:start + batch_size]:
+                persist_values = model.get_persist_values()
+                if persist_values:
+                    columns, values = persist_values
+                    batches.setdefault((model.table, columns), []).append(values)
+
+            for (table, columns), rows in batches.items():
+                sql = DataModel.get_persist_sql(table, columns)
+                try:
+                    if database.executemany(sql, rows):
+                        count += len(rows)
+                    continue
+                except Exception as e:
+                    helper.get_handler_error().write("data_model.persist_many", [sql, len(rows)], e)
+
+                for values in rows:
+                    try:
+                        if database.execute(sql, values):
+                            count += 1
+                    except Exception as e:
+                        helper.get_handler_error().write("data_model.persist_many", [sql], e)
+        return count
+
     def get_data(self) -> dict:
         return self.data
 
@@ -95,8 +158,7 @@ class DataModel:
             else:
                 sql += f" AND `{key_two}` IS NULL"
 
-        self.helper.get_database().execute(sql, parameters)
-        result = self.helper.get_database().get_cursor().fetchmany(1)
+        result = self.helper.get_database().fetch_all(f"{sql} LIMIT 1", parameters)
 
         if not result:
             return False
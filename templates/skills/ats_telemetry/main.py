@@ -216,7 +216,9 @@ class ATSTelemetry(Skill):
                 "Starting ATS / ETS telemetry cache loop",
                 color=LogType.INFO,
             )
-        self.threaded_execution(self.start_telemetry_loop, loop_time)
+        self.threaded_execution(
+            self.start_telemetry_loop, loop_time, executor="dedicated"
+        )
 
     # Loop every designated number of seconds to retrieve telemetry data and run query function to determine if any tracked data points have changed
     async def start_telemetry_loop(self, loop_time: int):
@@ -521,7 +523,9 @@ class ATSTelemetry(Skill):
     async def prepare(self) -> None:
         self.loaded = True
         if self.autostart_dispatch_mode:
-            self.threaded_execution(self.autostart_dispatcher_mode)
+            self.threaded_execution(
+                self.autostart_dispatcher_mode, executor="dedicated"
+            )
 
     # Unload telemetry module and stop any ongoing loop when config / program unloads
     async def unload(self) -> None:
@@ -71,8 +71,17 @@ class ThinkingSound(Skill):
 
     async def auto_stop_playback(self):
         # Wait for main playback to start
-        while not ( self.wingman.audio_player.stream or self.wingman.audio_player.raw_stream ) and self.active:
-            await asyncio.sleep(0.1)
+        audio_player = self.wingman.audio_player
+        playbacks = audio_player.subscribe_playbacks()
+        try:
+            while not audio_player.is_playing and self.active:
+                try:
+                    await asyncio.wait_for(playbacks.get(), timeout=1)
+                    break
+                except asyncio.TimeoutError:
+                    pass  # check again if the skill is still active
+        finally:
+            audio_player.unsubscribe_playbacks(playbacks)
 
         if self.wingman.settings.debug_mode:
             await self.printr.print_async(
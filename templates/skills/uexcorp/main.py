@@ -48,7 +48,7 @@ class UEXCorp(Skill):
             return
         self.__helper.set_loaded()
         self.threaded_execution(self.threaded_prepare)
-        self.threaded_execution(self.loop_master)
+        self.threaded_execution(self.loop_master, executor="dedicated")
 
     async def unload(self) -> None:
         await super().unload()
@@ -1,7 +1,12 @@
-import difflib
 import json
+import threading
 from typing import TYPE_CHECKING
 
+try:
+    from skills.uexcorp.uexcorp.database.name_index import NameIndex
+except ModuleNotFoundError:
+    from uexcorp.uexcorp.database.name_index import NameIndex
+
 if TYPE_CHECKING:
     try:
         from skills.uexcorp.uexcorp.helper import Helper
@@ -53,7 +58,8 @@ class Llm:
         helper: "Helper",
     ):
         self.__helper = helper
-        self.__cache_search = {}
+        self.__name_indexes: dict[str, NameIndex] = {}
+        self.__name_indexes_lock = threading.Lock()
 
     async def call(self, message_history: MessageHistory, expect_json: bool = False) -> str | dict[str, any] | list | None:
         completion = await self.__helper.get_handler_config().get_wingman().actual_llm_call(message_history.get_messages())
@@ -98,29 +104,45 @@ class Llm:
 
         return answer
 
+    def get_name_index(self, key: str, get_names: callable) -> NameIndex:
+        """The name index of the key (e.g. "ship"), built from get_names() on first use and after imports changed data."""
+        with self.__name_indexes_lock:
+            index = self.__name_indexes.get(key)
+        if index is None:
+            index = NameIndex(get_names())
+            with self.__name_indexes_lock:
+                self.__name_indexes[key] = index
+            self.__helper.get_handler_debug().write(f"Built name index '{key}' over {len(index)} name(s).")
+        return index
+
+    def clear_name_indexes(self) -> None:
+        with self.__name_indexes_lock:
+            self.__name_indexes.clear()
+
     async def find_closest_match(
-        self, search: str | None, lst: list[str] | set[str]
+        self, search: str | None, lst: NameIndex | list[str] | set[str]
     ) -> (str | None, list[str] | set[str]):
         if not search or search == "None":
             return None, None
 
         self.__helper.get_handler_debug().write(f"Searching for closest match for '{search}' in list.")
 
-        checksum = f"{hash(frozenset(lst))}-{hash(search)}"
-        if checksum in self.__cache_search:
-            match = self.__cache_search[checksum]
+        index = lst if isinstance(lst, NameIndex) else NameIndex(lst)
+        match = index.get_remembered(search)
+        if match:
             self.__helper.get_handler_debug().write(f"Found closest match for '{search}' in cache: '{match}'")
             return match, None
 
-        if search in lst:
+        if search in index:
             self.__helper.get_handler_debug().write(f"Found exact match for '{search}' in list.")
             return search, None
 
         # make a list of possible matches
-        close_matches = difflib.get_close_matches(search, lst, n=10, cutoff=0.4)
-        close_matches.extend(item for item in lst if search.lower() in item.lower() and item not in close_matches)
+        matches = index.search(search)
+        close_matches = [name for name, _score in matches]
         self.__helper.get_handler_debug().write(
-            f"Creating a list of close matches for search term '{search}': {', '.join(close_matches)}"
+            f"Creating a list of close matches for search term '{search}': "
+            f"{', '.join(f'{name} ({score:.2f})' for name, score in matches)}"
         )
 
         if not close_matches:
@@ -129,6 +151,14 @@ class Llm:
             )
             return None, "No approximate matches found, given name too abstract."
 
+        # only ask the LLM if the index can't tell
+        match = index.get_confident_match(matches)
+        if match:
+            self.__helper.get_handler_debug().write(f"Name index said '{match}' is closest match to '{search}' in list.")
+            if match != search:
+                self.__helper.add_context(f"Note for function parameters: Use '{match}' instead of '{search}'.")
+            return match, None
+
         messages = MessageHistory()
         messages.add_direct(
             f"""
@@ -149,13 +179,12 @@ class Llm:
         answer = await self.call(messages)
 
         if not answer:
-            dumb_match = difflib.get_close_matches(search, close_matches, n=1, cutoff=0.8)
-            if dumb_match:
+            if matches[0][1] >= NameIndex.CONFIDENT_MIN:
                 self.__helper.get_handler_debug().write(
-                    f"LLM did not answer for '{search}'. Using dumb match '{dumb_match}'",
+                    f"LLM did not answer for '{search}'. Using dumb match '{matches[0][0]}'",
                     True,
                 )
-                return dumb_match[0], None
+                return matches[0][0], None
             else:
                 self.__helper.get_handler_debug().write(
                     f"LLM did not answer for '{search}' and dumb match to inaccurate.",
@@ -171,5 +200,5 @@ class Llm:
 
         self.__helper.get_handler_debug().write(f"LLM said '{answer}' is closest match to '{search}' in list.")
         self.__helper.add_context(f"Note for function parameters: Use '{answer}' instead of '{search}'.")
-        self.__cache_search[checksum] = answer
+        index.remember(search, answer)
         return answer, None
@@ -1,3 +1,8 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
 try:
     from skills.uexcorp.uexcorp.database.filter import Filter
     from skills.uexcorp.uexcorp.helper import Helper
@@ -9,6 +14,13 @@ except ModuleNotFoundError:
 
 
 class DataAccess :
+    MAX_QUERIES = 512
+    """Compiled queries kept, the least recently used are compiled again when needed"""
+
+    __queries: OrderedDict[tuple, str] = OrderedDict()
+    """SQL per data_access class, additional columns and filter shape, shared by all instances"""
+    __queries_lock = threading.Lock()
+
     def __init__(
         self,
         table: str,
@@ -46,14 +58,39 @@ class DataAccess :
         self.additional_cols.append((col, alias))
         return self
 
-    def __select(self, debug: bool = False) -> None:
+    def __select(self, debug: bool = False) -> tuple[str, dict[str, any]]:
+        key = (type(self), tuple(self.additional_cols), self.filter.get_shape())
+        with DataAccess.__queries_lock:
+            sql = DataAccess.__queries.get(key)
+            if sql is not None:
+                DataAccess.__queries.move_to_end(key)
+        if sql is None:
+            sql = self.__compile()
+            with DataAccess.__queries_lock:
+                DataAccess.__queries[key] = sql
+                if len(DataAccess.__queries) > self.MAX_QUERIES:
+                    DataAccess.__queries.popitem(last=False)
+        binds = self.filter.get_bind()
+
+        if debug:
+            def resolve_bind(match: re.Match) -> str:
+                if match.group(1) not in binds:
+                    return match.group(0)
+                value = binds[match.group(1)]
+                return f"'{value}'" if isinstance(value, str) else repr(value)
+
+            self.helper.get_handler_debug().write(re.sub(r":(\w+)", resolve_bind, sql))
+
+        return sql, binds
+
+    def __compile(self) -> str:
         def resolve_additional_cols() -> str:
             cols = ""
             for col, alias in self.additional_cols:
                 cols += f"{col} AS {alias}, " if alias else f"{col}, "
             return cols
 
-        sql = f"""
+        return f"""
             SELECT {resolve_additional_cols()} {self.table}.*
             FROM {self.table}
             {self.filter.resolve_joins()}
@@ -62,24 +99,22 @@ class DataAccess :
             {self.filter.resolve_limit()} {self.filter.resolve_offset()}
         """
 
-        if debug:
-            resolved_sql = sql
-            for key, value in self.filter.get_bind().items():
-                if isinstance(value, str):
-                    resolved_sql = resolved_sql.replace(f":{key}", f"'{value}'")
-                else:
-                    resolved_sql = resolved_sql.replace(f":{key}", repr(value))
-            self.helper.get_handler_debug().write(resolved_sql)
-
-        self.database.execute(sql, self.filter.get_bind())
+    def __fetch(self, debug: bool, size: int | None = None) -> list[dict[str, any]]:
+        sql, binds = self.__select(debug)
+        start = time.perf_counter()
+        if size == 1:
+            row = self.database.fetch_one(sql, binds)
+            rows = [row] if row is not None else []
+        else:
+            rows = self.database.fetch_all(sql, binds)
+        self.database.get_query_log().add(type(self).__name__, sql, binds, time.perf_counter() - start, len(rows))
+        return rows
 
     def _fetch_one(self, debug: bool = False) -> list[dict[str, any]]:
-        self.__select(debug)
-        return self.database.get_cursor().fetchmany(1)
+        return self.__fetch(debug, 1)
 
     def _fetch_all(self, debug: bool = False) -> list[dict[str, any]]:
-        self.__select(debug)
-        return self.database.get_cursor().fetchall()
+        return self.__fetch(debug)
 
     def load_one(self) -> DataModel | None:
         data = self._fetch_one()
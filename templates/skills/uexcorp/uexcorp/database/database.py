@@ -1,8 +1,16 @@
+import queue
 import sqlite3
+import threading
 import time
 import os
+from contextlib import contextmanager
 from typing import TYPE_CHECKING
 
+try:
+    from skills.uexcorp.uexcorp.database.query_log import QueryLog
+except ModuleNotFoundError:
+    from uexcorp.uexcorp.database.query_log import QueryLog
+
 if TYPE_CHECKING:
     try:
         from skills.uexcorp.uexcorp.helper import Helper
@@ -11,6 +19,18 @@ if TYPE_CHECKING:
 
 
 class Database:
+    """The SQLite database of the skill.
+
+    Runs in WAL mode, so reading and writing don't block each other. All writes go through one writer connection,
+    serialized by a lock. Reads get one of a small pool of read connections, each used by one thread at a time.
+    A thread with uncommitted writes (e.g. an import) reads through the writer connection to see its own writes.
+    """
+
+    READ_CONNECTIONS = 4
+    """Maximum number of read connections. More concurrent reads wait for a free one."""
+
+    CACHED_STATEMENTS = 256
+    """Prepared statements kept per connection, enough for the query shapes of all data_access classes"""
 
     def __init__(self, data_path: str, version: str, helper: "Helper") -> None:
         self.helper = helper
@@ -21,9 +41,18 @@ class Database:
         self.version = version
         self.cursor = None
         self.connection = None
-        self.__inuse = False
+        self.__write_lock = threading.RLock()
+        self.__writing_thread: int | None = None
+        """The thread with uncommitted writes, if any"""
+        self.__read_connections: queue.LifoQueue = queue.LifoQueue()
+        """Idle read connections as (generation, connection)"""
+        self.__read_connection_count = 0
+        self.__read_connections_lock = threading.Lock()
+        self.__generation = 0
+        """Increased whenever the database file changes, read connections of older generations are closed"""
         self.__set_db_name_current()
         self.__queue_wait_time_max = 30  # in seconds
+        self.__query_log = QueryLog(self)
         self.__init_connection()
         self.__init_database()
 
@@ -57,110 +86,283 @@ class Database:
             self.recreate_database()
             return
 
-        self.cursor.execute("SELECT value FROM skill WHERE key = 'version'")
-        if not self.cursor.fetchone()[0] == self.version:
+        version = self.fetch_one("SELECT value FROM skill WHERE key = 'version'")
+        if not version or not version[0] == self.version:
             self.helper.get_handler_debug().write(
                 "Skill version mismatch, recreating database.."
             )
             self.recreate_database()
+            return
+
+        # databases created by older versions of the skill don't have all indexes and columns yet
+        self.__migrate()
+        self.__create_indexes()
 
     def __init_connection(self) -> None:
         complete_path = os.path.join(self.db_path, self.db_name_complete)
-        self.connection = sqlite3.connect(complete_path, check_same_thread=False)
+        self.connection = sqlite3.connect(
+            complete_path,
+            check_same_thread=False,
+            timeout=self.__queue_wait_time_max,
+            cached_statements=self.CACHED_STATEMENTS,
+        )
         self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # in WAL mode, syncing on checkpoints only is still safe against corruption
+        self.connection.execute("PRAGMA synchronous=NORMAL")
         self.cursor = self.connection.cursor()
 
-    def recreate_database(self) -> None:
-        self.connection.close()
-
-        # For error prevention on multiple instances, we will always create a completely new database.
-        # So we will delete all old ones that are no longer needed.
-        # But as they might still be used by another process, we wrap it in a try-except block.
-        # No elegant solution, but it works.
-        db_files = [f for f in os.listdir(self.db_path) if f.endswith(".db")]
-        for db_file in db_files:
-            try:
-                os.remove(os.path.join(self.db_path, db_file))
-            except Exception:
-                self.helper.get_handler_debug().write(
-                    f"Failed to remove database file '{os.path.join(self.db_path, db_file)}'."
-                )
+    def __open_read_connection(self) -> sqlite3.Connection:
+        complete_path = os.path.join(self.db_path, self.db_name_complete)
+        # used by one thread at a time, but returned to the pool by whichever thread used it last
+        connection = sqlite3.connect(
+            complete_path,
+            check_same_thread=False,
+            timeout=self.__queue_wait_time_max,
+            cached_statements=self.CACHED_STATEMENTS,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only=ON")
+        return connection
 
-        self.__set_db_name_new()
-        self.__init_connection()
+    def __migrate(self) -> None:
+        columns = [row["name"] for row in self.fetch_all("PRAGMA table_info(imports)")]
+        if "content_hash" not in columns:
+            self.helper.get_handler_debug().write("Adding content hashes to the imports table..")
+            self.execute("ALTER TABLE imports ADD COLUMN `content_hash` TEXT")
+            self.commit()
 
+    def __create_indexes(self) -> None:
         with open(
-            os.path.join(os.path.dirname(__file__), "init.sql"), "r", encoding="UTF-8"
+            os.path.join(os.path.dirname(__file__), "indexes.sql"),
+            "r",
+            encoding="UTF-8",
         ) as file:
             self.executescript(file.read())
 
-        # update version
-        self.execute(
-            "INSERT INTO skill (key, value) VALUES (?, ?)", ("version", self.version)
-        )
-        self.connection.commit()
+    def recreate_database(self) -> None:
+        with self.__write_lock:
+            self.connection.close()
+            self.__close_read_connections()
+
+            # For error prevention on multiple instances, we will always create a completely new database.
+            # So we will delete all old ones that are no longer needed.
+            # But as they might still be used by another process, we wrap it in a try-except block.
+            # No elegant solution, but it works.
+            db_files = [
+                f
+                for f in os.listdir(self.db_path)
+                if f.endswith((".db", ".db-wal", ".db-shm"))
+            ]
+            for db_file in db_files:
+                try:
+                    os.remove(os.path.join(self.db_path, db_file))
+                except Exception:
+                    self.helper.get_handler_debug().write(
+                        f"Failed to remove database file '{os.path.join(self.db_path, db_file)}'."
+                    )
+
+            self.__set_db_name_new()
+            self.__init_connection()
+            # drop read connections opened to the old file in the meantime
+            self.__close_read_connections()
+
+            with open(
+                os.path.join(os.path.dirname(__file__), "init.sql"),
+                "r",
+                encoding="UTF-8",
+            ) as file:
+                self.executescript(file.read())
+            self.__create_indexes()
+
+            # update version
+            self.execute(
+                "INSERT INTO skill (key, value) VALUES (?, ?)",
+                ("version", self.version),
+            )
+            self.commit()
 
     def table_exists(self, table: str) -> bool:
-        self.execute(
-            f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'"
+        return (
+            self.fetch_one(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                (table,),
+            )
+            is not None
         )
-        return self.cursor.fetchone() is not None
 
     def table_clear(self, table: str) -> None:
         self.execute(f"DELETE FROM {table}")
-        self.connection.commit()
+        self.commit()
+
+    def get_query_log(self) -> QueryLog:
+        return self.__query_log
 
     def get_connection(self) -> sqlite3.Connection:
+        """The writer connection. Use execute and commit instead, they hold the write lock."""
         return self.connection
 
     def get_cursor(self) -> sqlite3.Cursor:
+        """The cursor of the writer connection. Use fetch_one and fetch_all to read."""
         return self.cursor
 
     def execute(self, sql: str, parameters: tuple | dict | list = ()) -> bool:
-        self.__wait_for_database_capacity()
-
-        self.__inuse = True
-        if not self.get_cursor():
-            self.helper.get_handler_debug().write(
-                f"Skipped SQL: {sql} with parameters: {parameters}. No active cursor found. Probably old instance."
-            )
-            return False
-        else:
+        """Executes a writing statement. It's committed with the next commit (of any thread)."""
+        with self.__write_lock:
+            if not self.get_cursor():
+                self.helper.get_handler_debug().write(
+                    f"Skipped SQL: {sql} with parameters: {parameters}. No active cursor found. Probably old instance."
+                )
+                return False
             self.get_cursor().execute(sql, parameters)
-        self.__inuse = False
+            if self.connection.in_transaction:
+                self.__writing_thread = threading.get_ident()
         return True
 
-    def executescript(self, sql: str) -> bool:
-        self.__wait_for_database_capacity()
+    def executemany(self, sql: str, parameters: list[tuple] | list[dict]) -> bool:
+        """Executes a prepared writing statement once per set of parameters. It's committed like execute."""
+        with self.__write_lock:
+            if not self.get_cursor():
+                self.helper.get_handler_debug().write(
+                    f"Skipped SQL: {sql} with {len(parameters)} parameter set(s). No active cursor found. Probably old instance."
+                )
+                return False
+            self.get_cursor().executemany(sql, parameters)
+            if self.connection.in_transaction:
+                self.__writing_thread = threading.get_ident()
+        return True
 
-        self.__inuse = True
-        self.get_cursor().executescript(sql)
-        self.__inuse = False
+    def executescript(self, sql: str) -> bool:
+        with self.__write_lock:
+            # executescript commits pending writes first
+            self.get_cursor().executescript(sql)
+            self.__writing_thread = None
         return True
 
-    def __wait_for_database_capacity(self) -> None:
-        if self.__inuse:
-            self.helper.get_handler_debug().write(
-                "Database is currently in use, waiting for it to be free..."
-            )
+    def commit(self) -> None:
+        with self.__write_lock:
+            if self.connection:
+                self.connection.commit()
+            self.__writing_thread = None
 
-            for _ in range(int(self.__queue_wait_time_max / 0.1)):
-                if not self.__inuse:
-                    self.helper.get_handler_debug().write(
-                        "Database is now free, proceeding with the action."
-                    )
-                    break
-                time.sleep(0.1)
+    @contextmanager
+    def transaction(self):
+        """Holds the write lock for the block and commits its writes at once, or rolls them back on an exception."""
+        with self.__write_lock:
+            try:
+                yield self
+            except BaseException:
+                if self.connection:
+                    self.connection.rollback()
+                self.__writing_thread = None
+                raise
+            self.commit()
+
+    def fetch_one(
+        self, sql: str, parameters: tuple | dict | list = ()
+    ) -> sqlite3.Row | None:
+        rows = self.__fetch(sql, parameters, 1)
+        return rows[0] if rows else None
 
-            if self.__inuse:
+    def fetch_all(
+        self, sql: str, parameters: tuple | dict | list = ()
+    ) -> list[sqlite3.Row]:
+        return self.__fetch(sql, parameters)
+
+    def __fetch(
+        self, sql: str, parameters: tuple | dict | list, size: int | None = None
+    ) -> list[sqlite3.Row]:
+        if self.__writing_thread == threading.get_ident():
+            with self.__write_lock:
+                return self.__read(self.connection, sql, parameters, size)
+
+        with self.__read_connection() as connection:
+            if not connection:
                 self.helper.get_handler_debug().write(
-                    f"Database is still in use after waiting {self.__queue_wait_time_max}s, forcing inuse state of false."
+                    f"Skipped SQL: {sql} with parameters: {parameters}. No active connection found. Probably old instance."
                 )
-                self.__inuse = False
+                return []
+            return self.__read(connection, sql, parameters, size)
+
+    @staticmethod
+    def __read(
+        connection: sqlite3.Connection,
+        sql: str,
+        parameters: tuple | dict | list,
+        size: int | None,
+    ) -> list[sqlite3.Row]:
+        cursor = connection.execute(sql, parameters)
+        try:
+            return cursor.fetchmany(size) if size else cursor.fetchall()
+        finally:
+            # ends the read transaction, so the connection doesn't keep an old snapshot
+            cursor.close()
+
+    @contextmanager
+    def __read_connection(self):
+        if not self.connection:
+            yield None
+            return
+
+        try:
+            generation, connection = self.__read_connections.get_nowait()
+        except queue.Empty:
+            generation, connection = self.__generation, None
+            with self.__read_connections_lock:
+                can_open = self.__read_connection_count < self.READ_CONNECTIONS
+                if can_open:
+                    self.__read_connection_count += 1
+            if can_open:
+                try:
+                    connection = self.__open_read_connection()
+                except Exception:
+                    with self.__read_connections_lock:
+                        self.__read_connection_count -= 1
+                    raise
+            else:
+                self.helper.get_handler_debug().write(
+                    "All read connections are in use, waiting for a free one..."
+                )
+                try:
+                    generation, connection = self.__read_connections.get(
+                        timeout=self.__queue_wait_time_max
+                    )
+                except queue.Empty:
+                    self.helper.get_handler_debug().write(
+                        f"No read connection got free within {self.__queue_wait_time_max}s, reading via the writer connection."
+                    )
+                    with self.__write_lock:
+                        yield self.connection
+                    return
+
+        try:
+            yield connection
+        finally:
+            with self.__read_connections_lock:
+                if generation == self.__generation and self.connection:
+                    self.__read_connections.put((generation, connection))
+                    connection = None
+            if connection:
+                # the database was recreated or destroyed in the meantime
+                connection.close()
+
+    def __close_read_connections(self) -> None:
+        with self.__read_connections_lock:
+            self.__generation += 1
+            self.__read_connection_count = 0
+            while True:
+                try:
+                    _generation, connection = self.__read_connections.get_nowait()
+                except queue.Empty:
+                    break
+                connection.close()
 
     def destroy(self) -> None:
-        """Close the database connection."""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            self.cursor = None
+        """Close the database connections."""
+        with self.__write_lock:
+            self.__close_read_connections()
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+                self.cursor = None
+            self.__writing_thread = None
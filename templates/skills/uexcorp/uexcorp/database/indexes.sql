@@ -0,0 +1,59 @@
+/* Index script for SQLite, applied on every start (indexes only, so existing databases get them too) */
+/* Derived from the columns the models, tools and handlers filter on via the data_access classes */
+
+/* prices of a terminal (Terminal) and of a commodity/item/vehicle */
+CREATE INDEX IF NOT EXISTS idx_commodity_price_id_terminal ON commodity_price(`id_terminal`);
+CREATE INDEX IF NOT EXISTS idx_commodity_price_id_commodity ON commodity_price(`id_commodity`);
+CREATE INDEX IF NOT EXISTS idx_commodity_raw_price_id_terminal ON commodity_raw_price(`id_terminal`);
+CREATE INDEX IF NOT EXISTS idx_commodity_raw_price_id_commodity ON commodity_raw_price(`id_commodity`);
+CREATE INDEX IF NOT EXISTS idx_item_price_id_terminal ON item_price(`id_terminal`);
+CREATE INDEX IF NOT EXISTS idx_item_price_id_item ON item_price(`id_item`);
+CREATE INDEX IF NOT EXISTS idx_vehicle_purchase_price_id_terminal ON vehicle_purchase_price(`id_terminal`);
+CREATE INDEX IF NOT EXISTS idx_vehicle_purchase_price_id_vehicle ON vehicle_purchase_price(`id_vehicle`);
+CREATE INDEX IF NOT EXISTS idx_vehicle_rental_price_id_terminal ON vehicle_rental_price(`id_terminal`);
+CREATE INDEX IF NOT EXISTS idx_vehicle_rental_price_id_vehicle ON vehicle_rental_price(`id_vehicle`);
+
+/* commodity routes (commodity_route tool) */
+CREATE INDEX IF NOT EXISTS idx_commodity_route_id_terminal_origin ON commodity_route(`id_terminal_origin`);
+CREATE INDEX IF NOT EXISTS idx_commodity_route_id_terminal_destination ON commodity_route(`id_terminal_destination`);
+CREATE INDEX IF NOT EXISTS idx_commodity_route_commodity_name ON commodity_route(`commodity_name`);
+
+/* items (item_information tool) */
+CREATE INDEX IF NOT EXISTS idx_item_id_category ON item(`id_category`);
+CREATE INDEX IF NOT EXISTS idx_item_id_company ON item(`id_company`);
+CREATE INDEX IF NOT EXISTS idx_item_name ON item(`name`);
+CREATE INDEX IF NOT EXISTS idx_item_attribute_id_item ON item_attribute(`id_item`);
+CREATE INDEX IF NOT EXISTS idx_item_attribute_id_category ON item_attribute(`id_category`);
+
+/* vehicles (Company, commodity_route and vehicle_information tools) */
+CREATE INDEX IF NOT EXISTS idx_vehicle_id_company ON vehicle(`id_company`);
+CREATE INDEX IF NOT EXISTS idx_vehicle_name_full ON vehicle(`name_full`);
+
+/* terminals of a location (City, Outpost, Poi, SpaceStation) and of a star system (validator) */
+CREATE INDEX IF NOT EXISTS idx_terminal_id_star_system ON terminal(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_terminal_id_city ON terminal(`id_city`);
+CREATE INDEX IF NOT EXISTS idx_terminal_id_space_station ON terminal(`id_space_station`);
+CREATE INDEX IF NOT EXISTS idx_terminal_name ON terminal(`name`);
+
+/* locations of a star system, planet, orbit or moon (StarSystem, Planet, Orbit, Moon, validator) */
+CREATE INDEX IF NOT EXISTS idx_planet_id_star_system ON planet(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_planet_name ON planet(`name`);
+CREATE INDEX IF NOT EXISTS idx_orbit_id_star_system ON orbit(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_moon_id_star_system ON moon(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_moon_id_planet ON moon(`id_planet`);
+CREATE INDEX IF NOT EXISTS idx_city_id_star_system ON city(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_city_id_planet_id_moon ON city(`id_planet`, `id_moon`);
+CREATE INDEX IF NOT EXISTS idx_city_id_moon ON city(`id_moon`);
+CREATE INDEX IF NOT EXISTS idx_outpost_id_star_system ON outpost(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_outpost_id_planet_id_moon ON outpost(`id_planet`, `id_moon`);
+CREATE INDEX IF NOT EXISTS idx_outpost_id_moon ON outpost(`id_moon`);
+CREATE INDEX IF NOT EXISTS idx_poi_id_star_system ON poi(`id_star_system`);
+CREATE INDEX IF NOT EXISTS idx_poi_id_planet_id_moon ON poi(`id_planet`, `id_moon`);
+CREATE INDEX IF NOT EXISTS idx_poi_id_moon ON poi(`id_moon`);
+CREATE INDEX IF NOT EXISTS idx_space_station_id_star_system_id_planet ON space_station(`id_star_system`, `id_planet`);
+CREATE INDEX IF NOT EXISTS idx_space_station_id_planet_id_moon ON space_station(`id_planet`, `id_moon`);
+CREATE INDEX IF NOT EXISTS idx_space_station_id_moon ON space_station(`id_moon`);
+CREATE INDEX IF NOT EXISTS idx_space_station_id_orbit ON space_station(`id_orbit`);
+
+/* CommodityStatus loads by code and is_buy */
+CREATE INDEX IF NOT EXISTS idx_commodity_status_code_is_buy ON commodity_status(`code`, `is_buy`);
@@ -126,6 +126,9 @@ class Helper:
 
     def on_import_completed(self, imported_rows_count: int):
         self.get_handler_config().sync_blacklists()
+        if imported_rows_count and self.__llm:
+            # names might have changed
+            self.__llm.clear_name_indexes()
         self.__version_uex = self.get_handler_import().get_version_uex()
         self.set_ready(True)
 
@@ -14,6 +14,7 @@ class ImportData(DataModel):
             date_imported: int | None = None,  # int(11)
             dataset_count: int | None = None,  # int(11)
             time_taken: int | None = None,  # int(11)
+            content_hash: str | None = None,  # text
             load: bool = False,
     ):
         super().__init__("imports")
@@ -23,6 +24,7 @@ class ImportData(DataModel):
             "dataset_count": dataset_count,
             "time_taken": time_taken,
             "last_import_run_id": None,
+            "content_hash": content_hash,
         }
         if load:
             if not self.data["table"]:
@@ -38,16 +40,17 @@ class ImportData(DataModel):
 
         return (self.data["date_imported"] + persistence) < self.helper.get_timestamp()
 
-    def persist(self, skip_commit: bool = False) -> bool:
+    def persist(self, skip_commit: bool = False, delete_outdated: bool = True) -> bool:
+        """Persists the import. With delete_outdated, rows of the table not written by this import run are deleted."""
         if super().persist(skip_commit):
-            if not self.data["last_import_run_id"]:
+            if not delete_outdated or not self.data["last_import_run_id"]:
                 return True
 
             self.helper.get_database().execute(
                 f"DELETE FROM {self.get_table()} WHERE last_import_run_id != {str(int(self.data['last_import_run_id'] or 0))}"
             )
             if not skip_commit:
-                self.helper.get_database().get_connection().commit()
+                self.helper.get_database().commit()
             return True
         return False
 
@@ -75,5 +78,11 @@ class ImportData(DataModel):
     def set_time_taken(self, time_taken: int):
         self.data["time_taken"] = time_taken
 
+    def get_content_hash(self) -> str | None:
+        return self.data["content_hash"]
+
+    def set_content_hash(self, content_hash: str | None):
+        self.data["content_hash"] = content_hash
+
     def __str__(self):
         return str(self.data["table"])
@@ -172,11 +172,14 @@ class Validator:
         return {"type": "string"}
 
     async def __validate_ship(self, name: str) -> (str | None, str | None):
-        ships = VehicleDataAccess().add_filter_by_is_spaceship(True).load()
-        ship_names = []
-        for ship in ships:
-            ship_names.append(str(ship))
-
+        def get_ship_names() -> list[str]:
+            ships = VehicleDataAccess().add_filter_by_is_spaceship(True).load()
+            ship_names = []
+            for ship in ships:
+                ship_names.append(str(ship))
+            return ship_names
+
+        ship_names = self.__helper.get_llm().get_name_index("ship", get_ship_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, ship_names)
         if closest_match:
             return closest_match, None
@@ -187,11 +190,14 @@ class Validator:
         return {"type": "string"}
 
     async def __validate_vehicle(self, name: str) -> (str | None, str | None):
-        vehicles = VehicleDataAccess().load()
-        vehicle_names = []
-        for vehicle in vehicles:
-            vehicle_names.append(str(vehicle))
-
+        def get_vehicle_names() -> list[str]:
+            vehicles = VehicleDataAccess().load()
+            vehicle_names = []
+            for vehicle in vehicles:
+                vehicle_names.append(str(vehicle))
+            return vehicle_names
+
+        vehicle_names = self.__helper.get_llm().get_name_index("vehicle", get_vehicle_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, vehicle_names)
         if closest_match:
             return closest_match, None
@@ -207,7 +213,8 @@ class Validator:
         except ModuleNotFoundError:
             from uexcorp.uexcorp.model.vehicle import Vehicle
 
-        closest_match, options = await self.__helper.get_llm().find_closest_match(name, list(Vehicle.VEHICLE_ROLES.keys()))
+        vehicle_roles = self.__helper.get_llm().get_name_index("vehicle_role", lambda: list(Vehicle.VEHICLE_ROLES.keys()))
+        closest_match, options = await self.__helper.get_llm().find_closest_match(name, vehicle_roles)
         if closest_match:
             return closest_match, None
 
@@ -222,15 +229,18 @@ class Validator:
         return {"type": "string", "enum": list(Vehicle.VEHICLE_ROLES.keys())}
 
     async def __validate_star_system(self, name: str, available: bool = False) -> (str | None, str | None):
-        star_system_data_access = StarSystemDataAccess()
-        if available:
-            star_system_data_access = star_system_data_access.add_filter_by_is_available_live(True)
-
-        star_systems = star_system_data_access.load()
-        star_system_names = []
-        for star_system in star_systems:
-            star_system_names.append(str(star_system))
-
+        def get_star_system_names() -> list[str]:
+            star_system_data_access = StarSystemDataAccess()
+            if available:
+                star_system_data_access = star_system_data_access.add_filter_by_is_available_live(True)
+
+            star_systems = star_system_data_access.load()
+            star_system_names = []
+            for star_system in star_systems:
+                star_system_names.append(str(star_system))
+            return star_system_names
+
+        star_system_names = self.__helper.get_llm().get_name_index(f"star_system:{available}", get_star_system_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, star_system_names)
         if closest_match:
             return closest_match, None
@@ -246,14 +256,17 @@ class Validator:
         return {"type": "string", "enum": star_system_names}
 
     async def __validate_commodity(self, name: str, for_trading: bool = False) -> (str | None, str | None):
-        commodity_data_access = CommodityDataAccess()
-        if for_trading:
-            commodity_data_access = commodity_data_access.add_filter_has_sell_price().add_filter_has_buy_price()
-        commodities = commodity_data_access.load()
-        commodity_names = []
-        for commodity in commodities:
-            commodity_names.append(str(commodity))
-
+        def get_commodity_names() -> list[str]:
+            commodity_data_access = CommodityDataAccess()
+            if for_trading:
+                commodity_data_access = commodity_data_access.add_filter_has_sell_price().add_filter_has_buy_price()
+            commodities = commodity_data_access.load()
+            commodity_names = []
+            for commodity in commodities:
+                commodity_names.append(str(commodity))
+            return commodity_names
+
+        commodity_names = self.__helper.get_llm().get_name_index(f"commodity:{for_trading}", get_commodity_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, commodity_names)
         if closest_match:
             return closest_match, None
@@ -264,59 +277,63 @@ class Validator:
         return {"type": "string"}
 
     async def __validate_location(self, name: str, for_trading: bool = False) -> (str | None, str | None):
-        name_collection = []
-
-        star_systems = StarSystemDataAccess().add_filter_by_is_available(True).load()
-        for star_system in star_systems:
-            name_collection.append(str(star_system))
-
-            planets = PlanetDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True).load()
-            for planet in planets:
-                name_collection.append(str(planet))
-
-            moons = MoonDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True).load()
-            for moon in moons:
-                name_collection.append(str(moon))
-
-            space_station_data_access = SpaceStationDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
-            if for_trading:
-                space_station_data_access = space_station_data_access.add_filter_by_has_trade_terminal(True)
-            space_stations = space_station_data_access.load()
-            for space_station in space_stations:
-                name_collection.append(str(space_station))
-
-            orbits = OrbitDataAccess().add_filter_by_id_star_system(star_system.get_id()).load()
-            for orbit in orbits:
-                name_collection.append(str(orbit))
-
-            terminal_data_access = TerminalDataAccess().add_filter_by_id_star_system(star_system.get_id())
-            if for_trading:
-                terminal_data_access.add_filter_by_type("commodity")
-            terminals = terminal_data_access.load()
-            for terminal in terminals:
-                name_collection.append(str(terminal))
-
-            city_data_access = CityDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
-            if for_trading:
-                city_data_access.add_filter_by_has_trade_terminal(True)
-            cities = city_data_access.load()
-            for city in cities:
-                name_collection.append(str(city))
-
-            poi_data_access = PoiDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
-            if for_trading:
-                poi_data_access.add_filter_by_has_trade_terminal(True)
-            pois = poi_data_access.load()
-            for poi in pois:
-                name_collection.append(str(poi))
-
-            outpost_data_access = OutpostDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
-            if for_trading:
-                outpost_data_access.add_filter_by_has_trade_terminal(True)
-            outposts = outpost_data_access.load()
-            for outpost in outposts:
-                name_collection.append(str(outpost))
-
+        def get_location_names() -> list[str]:
+            name_collection = []
+
+            star_systems = StarSystemDataAccess().add_filter_by_is_available(True).load()
+            for star_system in star_systems:
+                name_collection.append(str(star_system))
+
+                planets = PlanetDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True).load()
+                for planet in planets:
+                    name_collection.append(str(planet))
+
+                moons = MoonDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True).load()
+                for moon in moons:
+                    name_collection.append(str(moon))
+
+                space_station_data_access = SpaceStationDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
+                if for_trading:
+                    space_station_data_access = space_station_data_access.add_filter_by_has_trade_terminal(True)
+                space_stations = space_station_data_access.load()
+                for space_station in space_stations:
+                    name_collection.append(str(space_station))
+
+                orbits = OrbitDataAccess().add_filter_by_id_star_system(star_system.get_id()).load()
+                for orbit in orbits:
+                    name_collection.append(str(orbit))
+
+                terminal_data_access = TerminalDataAccess().add_filter_by_id_star_system(star_system.get_id())
+                if for_trading:
+                    terminal_data_access.add_filter_by_type("commodity")
+                terminals = terminal_data_access.load()
+                for terminal in terminals:
+                    name_collection.append(str(terminal))
+
+                city_data_access = CityDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
+                if for_trading:
+                    city_data_access.add_filter_by_has_trade_terminal(True)
+                cities = city_data_access.load()
+                for city in cities:
+                    name_collection.append(str(city))
+
+                poi_data_access = PoiDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
+                if for_trading:
+                    poi_data_access.add_filter_by_has_trade_terminal(True)
+                pois = poi_data_access.load()
+                for poi in pois:
+                    name_collection.append(str(poi))
+
+                outpost_data_access = OutpostDataAccess().add_filter_by_id_star_system(star_system.get_id()).add_filter_by_is_available_live(True)
+                if for_trading:
+                    outpost_data_access.add_filter_by_has_trade_terminal(True)
+                outposts = outpost_data_access.load()
+                for outpost in outposts:
+                    name_collection.append(str(outpost))
+
+            return name_collection
+
+        name_collection = self.__helper.get_llm().get_name_index(f"location:{for_trading}", get_location_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, name_collection)
         if closest_match:
             return closest_match, None
@@ -327,17 +344,22 @@ class Validator:
         return {"type": "string"}
 
     async def __validate_company(self, name: str, is_item_manufacturer: bool|None = None, is_vehicle_manufacturer: bool|None = None) -> (str | None, str | None):
-        company_data_access = CompanyDataAccess()
-        if is_item_manufacturer is not None:
-            company_data_access = company_data_access.add_filter_by_is_item_manufacturer(is_item_manufacturer)
-        if is_vehicle_manufacturer is not None:
-            company_data_access = company_data_access.add_filter_by_is_vehicle_manufacturer(is_vehicle_manufacturer)
-        companies = company_data_access.load()
-
-        company_names = []
-        for company in companies:
-            company_names.append(str(company))
-
+        def get_company_names() -> list[str]:
+            company_data_access = CompanyDataAccess()
+            if is_item_manufacturer is not None:
+                company_data_access = company_data_access.add_filter_by_is_item_manufacturer(is_item_manufacturer)
+            if is_vehicle_manufacturer is not None:
+                company_data_access = company_data_access.add_filter_by_is_vehicle_manufacturer(is_vehicle_manufacturer)
+            companies = company_data_access.load()
+
+            company_names = []
+            for company in companies:
+                company_names.append(str(company))
+            return company_names
+
+        company_names = self.__helper.get_llm().get_name_index(
+            f"company:{is_item_manufacturer}:{is_vehicle_manufacturer}", get_company_names
+        )
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, company_names)
         if closest_match:
             return closest_match, None
@@ -357,15 +379,18 @@ class Validator:
         return {"type": "string", "enum": enum}
 
     async def __validate_category(self, name: str, is_game_related: bool | None = None) -> (str | None, str | None):
-        category_data_access = CategoryDataAccess()
-        if is_game_related is not None:
-            category_data_access.add_filter_by_is_game_related(is_game_related)
-        categories = category_data_access.load()
-
-        category_names = []
-        for category in categories:
-            category_names.append(str(category))
-
+        def get_category_names() -> list[str]:
+            category_data_access = CategoryDataAccess()
+            if is_game_related is not None:
+                category_data_access.add_filter_by_is_game_related(is_game_related)
+            categories = category_data_access.load()
+
+            category_names = []
+            for category in categories:
+                category_names.append(str(category))
+            return category_names
+
+        category_names = self.__helper.get_llm().get_name_index(f"category:{is_game_related}", get_category_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, category_names)
         if closest_match:
             return closest_match, None
@@ -385,13 +410,16 @@ class Validator:
         return {"type": "string", "enum": category_names}
 
     async def __validate_item(self, name: str) -> (str | None, str | None):
-        item_data_access = ItemDataAccess()
-        items = item_data_access.load()
+        def get_item_names() -> list[str]:
+            item_data_access = ItemDataAccess()
+            items = item_data_access.load()
 
-        item_names = []
-        for item in items:
-            item_names.append(str(item))
+            item_names = []
+            for item in items:
+                item_names.append(str(item))
+            return item_names
 
+        item_names = self.__helper.get_llm().get_name_index("item", get_item_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(name, item_names)
 
         if closest_match:
@@ -412,12 +440,12 @@ class Validator:
         if not item_attribute_filter["attribute"] or not item_attribute_filter["value"] or not item_attribute_filter["operator"]:
             return None, "Invalid item attribute filter. Must have 'attribute', 'value' and 'operator'. Attribute must be a string, value must be a string and operator must be one of: '=', '!=', '>=', '<='."
 
-        item_attribute_names = []
-        item_attributes = ItemAttributeDataAccess().load()
-        for item_attribute in item_attributes:
-            if item_attribute.get_attribute_name() not in item_attribute_names:
-                item_attribute_names.append(item_attribute.get_attribute_name())
+        def get_item_attribute_names() -> list[str]:
+            item_attributes = ItemAttributeDataAccess().load()
+            # without duplicates, in order
+            return list(dict.fromkeys(item_attribute.get_attribute_name() for item_attribute in item_attributes))
 
+        item_attribute_names = self.__helper.get_llm().get_name_index("item_attribute", get_item_attribute_names)
         closest_match, options = await self.__helper.get_llm().find_closest_match(item_attribute_filter["attribute"], item_attribute_names)
 
         if closest_match:
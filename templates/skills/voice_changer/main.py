@@ -38,6 +38,7 @@ class VoiceChanger(Skill):
         self.context_generation = True
         self.context_prompt = None
         self.context_personality = ""
+        self.cache_prompt = True
         self.context_personality_next = ""
 
         self.active = False
@@ -232,6 +233,7 @@ class VoiceChanger(Skill):
 
         self.context_personality = self.context_personality_next
         self.context_personality_next = ""
+        self.invalidate_prompt()
 
         self.threaded_execution(self._generate_new_context)
 
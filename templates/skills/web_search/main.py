@@ -1,3 +1,4 @@
+import asyncio
 import time
 import math
 from urllib.parse import urlparse
@@ -162,14 +163,20 @@ class WebSearch(Skill):
             if search_type == "general":
                 self.min_results = 2
                 self.max_time = 5
-                search_results = DDGS().text(
-                    search_query, safesearch="off", max_results=self.max_results
+                search_results = await asyncio.to_thread(
+                    DDGS().text,
+                    search_query,
+                    safesearch="off",
+                    max_results=self.max_results,
                 )
             elif search_type == "news":
                 self.min_results = 2
                 self.max_time = 5
-                search_results = DDGS().news(
-                    search_query, safesearch="off", max_results=self.max_results
+                search_results = await asyncio.to_thread(
+                    DDGS().news,
+                    search_query,
+                    safesearch="off",
+                    max_results=self.max_results,
                 )
             else:
                 search_results = [
@@ -191,7 +198,7 @@ class WebSearch(Skill):
                 len(processed_results) < self.min_results
                 and time.time() - start_time < self.max_time
             ):
-                time.sleep(0.1)
+                await asyncio.sleep(0.1)
 
             final_results = "\n\n".join(processed_results)
 
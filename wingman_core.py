@@ -3,14 +3,12 @@ from concurrent.futures import ThreadPoolExecutor
 import os
 import re
 import threading
-from typing import Optional
-import pygame
+from typing import TYPE_CHECKING, Optional
 from google.genai import types
 from fastapi import APIRouter, File, UploadFile
 import requests
 import sounddevice as sd
 from showinfm import show_in_file_manager
-import azure.cognitiveservices.speech as speechsdk
 import keyboard.keyboard as keyboard
 import mouse.mouse as mouse
 from api.commands import VoiceActivationMutedCommand
@@ -28,6 +26,10 @@ from api.interface import (
     Config,
     ConfigWithDirInfo,
     ElevenlabsModel,
+    FasterWhisperStats,
+    PubSubTopicStats,
+    RuntimeStats,
+    StartupTimings,
     OpenRouterEndpointResult,
     VoiceActivationSettings,
     WingmanInitializationError,
@@ -46,20 +48,27 @@ from services.voice_service import VoiceService
 from services.settings_service import SettingsService
 from services.config_service import ConfigService
 from services.audio_player import AudioPlayer
+from services.async_client_pool import close_clients
 from services.audio_library import AudioLibrary
-from services.audio_recorder import RECORDING_PATH, AudioRecorder
+from services.audio_input import AudioInput
+from services.audio_recorder import AudioRecorder
 from services.config_manager import ConfigManager
 from services.printr import Printr
+from services.runtime import Runtime
 from services.secret_keeper import SecretKeeper
 from services.tower import Tower
 from services.websocket_user import WebSocketUser
 
+if TYPE_CHECKING:
+    import azure.cognitiveservices.speech as speechsdk
+
 
 class WingmanCore(WebSocketUser):
     def __init__(
         self, config_manager: ConfigManager, app_root_path: str, app_is_bundled: bool
     ):
         self.printr = Printr()
+        self.runtime = Runtime()
         self.app_root_path = app_root_path
         self.is_client_logged_in: bool = False
         self.is_client_pro: bool = False
@@ -144,6 +153,34 @@ class WingmanCore(WebSocketUser):
             endpoint=self.get_fasterwhisper_devices,
             tags=tags,
         )
+        self.router.add_api_route(
+            methods=["GET"],
+            path="/fasterwhisper/stats",
+            response_model=FasterWhisperStats,
+            endpoint=self.get_fasterwhisper_stats,
+            tags=tags,
+        )
+        self.router.add_api_route(
+            methods=["GET"],
+            path="/runtime/stats",
+            response_model=RuntimeStats,
+            endpoint=self.get_runtime_stats,
+            tags=tags,
+        )
+        self.router.add_api_route(
+            methods=["GET"],
+            path="/pubsub/stats",
+            response_model=list[PubSubTopicStats],
+            endpoint=self.get_pubsub_stats,
+            tags=tags,
+        )
+        self.router.add_api_route(
+            methods=["GET"],
+            path="/startup/timings",
+            response_model=StartupTimings,
+            endpoint=self.get_startup_timings,
+            tags=tags,
+        )
         self.router.add_api_route(
             methods=["POST"],
             path="/xvasynth/start",
@@ -308,6 +345,8 @@ class WingmanCore(WebSocketUser):
         self.audio_library = AudioLibrary()
 
         self.tower: Tower = None
+        self.joystick_stop: threading.Event | None = None
+        """Set to stop the joystick loop of the current tower"""
 
         self.active_recording = {"key": "", "wingman": None}
 
@@ -315,7 +354,7 @@ class WingmanCore(WebSocketUser):
         self.startup_errors: list[WingmanInitializationError] = []
         self.tower_errors: list[WingmanInitializationError] = []
 
-        self.azure_speech_recognizer: speechsdk.SpeechRecognizer = None
+        self.azure_speech_recognizer: "speechsdk.SpeechRecognizer" = None
         self.is_listening = False
         self.was_listening_before_ptt = False
         self.was_listening_before_playback = False
@@ -382,7 +421,10 @@ class WingmanCore(WebSocketUser):
             config.wingmen[wingman].record_joystick_button for wingman in config.wingmen
         )
 
-    async def start_joysticks(self, config: Config):
+    async def start_joysticks(self, config: Config, stop: threading.Event):
+        # only needed with joystick buttons configured, so not imported at startup
+        import pygame
+
         pygame.init()
 
         # Get all joystick configs
@@ -405,7 +447,7 @@ class WingmanCore(WebSocketUser):
                 joystick.init()
 
         running = True
-        while running and pygame.joystick.get_init():
+        while running and pygame.joystick.get_init() and not stop.is_set():
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
@@ -432,20 +474,14 @@ class WingmanCore(WebSocketUser):
             await asyncio.sleep(0.01)
 
     def init_joystick(self, config: Config):
+        # runs as long as the tower is loaded, so it gets a thread of its own instead of a "devices" worker
+        self.joystick_stop = threading.Event()
+        self.runtime.start_dedicated(self.start_joysticks, config, self.joystick_stop)
 
-        def run_async_process():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                # Create a task for start_joysticks instead of running it directly
-                loop.create_task(self.start_joysticks(config))
-                # Run the event loop forever instead of running until complete
-                loop.run_forever()
-            finally:
-                loop.close()
-
-        play_thread = threading.Thread(target=run_async_process)
-        play_thread.start()
+    def stop_joystick(self):
+        if self.joystick_stop:
+            self.joystick_stop.set()
+            self.joystick_stop = None
 
     async def initialize_tower(self, config_dir_info: ConfigWithDirInfo):
         if not self.is_client_logged_in:
@@ -490,6 +526,7 @@ class WingmanCore(WebSocketUser):
         )
 
     async def unload_tower(self):
+        self.stop_joystick()
         if self.tower:
             for wingman in self.tower.wingmen:
                 await wingman.unload()
@@ -590,7 +627,7 @@ class WingmanCore(WebSocketUser):
             )
         ):
             wingman = self.active_recording["wingman"]
-            recorded_audio_wav = self.audio_recorder.stop_recording(
+            recorded_audio = self.audio_recorder.stop_recording(
                 wingman_name=wingman.name
             )
             self.active_recording = {"key": "", "wingman": None}
@@ -602,20 +639,8 @@ class WingmanCore(WebSocketUser):
             ):
                 self.start_voice_recognition()
 
-            def run_async_process():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    if isinstance(wingman, Wingman):
-                        loop.run_until_complete(
-                            wingman.process(audio_input_wav=str(recorded_audio_wav))
-                        )
-                finally:
-                    loop.close()
-
-            if recorded_audio_wav:
-                play_thread = threading.Thread(target=run_async_process)
-                play_thread.start()
+            if recorded_audio and isinstance(wingman, Wingman):
+                self.runtime.submit(wingman.process, audio_input=recorded_audio)
 
     def on_key(self, key):
         if key.event_type == "down":
@@ -638,15 +663,11 @@ class WingmanCore(WebSocketUser):
             self.on_release(mouse_button=event.button)
 
     # called when AudioRecorder regonized voice
-    def on_audio_recorder_speech_recorded(self, recording_file: str):
-        def run_async_process():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(wingman.process(transcript=text))
-            finally:
-                loop.close()
+    def on_audio_recorder_speech_recorded(self, audio_input: AudioInput):
+        # transcription is async now, so it must not block the caller (audio thread or ESP32 event loop)
+        self.runtime.submit(self.__process_voice_activation_recording, audio_input)
 
+    async def __process_voice_activation_recording(self, audio_input: AudioInput):
         provider = self.settings_service.settings.voice_activation.stt_provider
         text = None
 
@@ -655,8 +676,8 @@ class WingmanCore(WebSocketUser):
                 wingman_name="system",
                 settings=self.settings_service.settings.wingman_pro,
             )
-            transcription = wingman_pro.transcribe_azure_speech(
-                filename=recording_file,
+            transcription = await wingman_pro.transcribe_azure_speech(
+                audio_input=audio_input,
                 config=AzureSttConfig(
                     languages=self.settings_service.settings.voice_activation.azure.languages,
                     # unused as Wingman Pro sets this at API level - just for Pydantic:
@@ -681,8 +702,8 @@ class WingmanCore(WebSocketUser):
 
                 return original_text != text, text
 
-            transcription = self.whispercpp.transcribe(
-                filename=recording_file,
+            transcription = await self.whispercpp.transcribe(
+                audio_input=audio_input,
                 config=self.settings_service.settings.voice_activation.whispercpp_config,
             )
             if transcription:
@@ -696,7 +717,7 @@ class WingmanCore(WebSocketUser):
         elif provider == VoiceActivationSttProvider.OPENAI:
             # TODO: can't await secret_keeper.retrieve here, so just assume the secret is there...
             openai = OpenAi(api_key=self.secret_keeper.secrets["openai"])
-            transcription = openai.transcribe(filename=recording_file)
+            transcription = await openai.transcribe(audio_input=audio_input)
             text = transcription.text
         elif provider == VoiceActivationSttProvider.FASTER_WHISPER:
             combined_hotwords: list[str] = []
@@ -716,18 +737,17 @@ class WingmanCore(WebSocketUser):
                 if wingman_hotwords and len(wingman_hotwords) > 0:
                     combined_hotwords.extend(wingman_hotwords)
 
-            transcription = self.fasterwhisper.transcribe(
+            transcription = await self.fasterwhisper.transcribe(
                 config=self.settings_service.settings.voice_activation.fasterwhisper_config,
-                filename=recording_file,
+                audio_input=audio_input,
                 hotwords=list(set(combined_hotwords)),
             )
-            text = transcription.text
+            text = transcription.text if transcription else None
 
         if text:
             wingman = self.tower.get_wingman_from_text(text)
             if wingman:
-                play_thread = threading.Thread(target=run_async_process)
-                play_thread.start()
+                await wingman.process(transcript=text)
         else:
             self.printr.print(
                 "ignored empty transcription - probably just noise.", server_only=True
@@ -764,24 +784,18 @@ class WingmanCore(WebSocketUser):
 
     # called when Azure Speech Recognizer recognized voice
     def on_azure_voice_recognition(self, voice_event):
-        def run_async_process():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(wingman.process(transcript=text))
-            finally:
-                loop.close()
-
         text = voice_event.result.text
         wingman = self.tower.get_wingman_from_text(text)
         if text and wingman:
-            play_thread = threading.Thread(target=run_async_process)
-            play_thread.start()
+            self.runtime.submit(wingman.process, transcript=text)
 
     async def __init_azure_voice_activation(self):
         if self.azure_speech_recognizer or not self.config_service.current_config:
             return
 
+        # only needed for Azure voice activation, so not imported at startup
+        import azure.cognitiveservices.speech as speechsdk
+
         key = await self.secret_keeper.retrieve(
             requester="Voice Activation",
             key="azure_tts",
@@ -917,17 +931,8 @@ class WingmanCore(WebSocketUser):
     async def send_text_to_wingman(self, text: str, wingman_name: str):
         wingman = self.tower.get_wingman_by_name(wingman_name)
 
-        def run_async_process():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(wingman.process(transcript=text))
-            finally:
-                loop.close()
-
         if wingman and text:
-            play_thread = threading.Thread(target=run_async_process)
-            play_thread.start()
+            self.runtime.submit(wingman.process, transcript=text)
 
     # POST /send-audio-to-wingman
     async def send_audio_to_wingman(
@@ -937,28 +942,12 @@ class WingmanCore(WebSocketUser):
         if not wingman:
             return
 
-        contents = await file.read()
-
-        filename = os.path.join(
-            get_writable_dir(RECORDING_PATH), "client_recording.wav"
+        audio_input = AudioInput(
+            encoded=await file.read(), name=file.filename or "client_recording.wav"
         )
-        with open(filename, "wb") as f:
-            f.write(contents)
-
-        def run_async_process():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                if isinstance(wingman, Wingman):
-                    loop.run_until_complete(
-                        wingman.process(audio_input_wav=str(filename))
-                    )
-            finally:
-                loop.close()
 
-        if filename:
-            play_thread = threading.Thread(target=run_async_process)
-            play_thread.start()
+        if isinstance(wingman, Wingman):
+            self.runtime.submit(wingman.process, audio_input=audio_input)
 
     # POST /reset-conversation-history
     def reset_conversation_history(self, wingman_name: Optional[str] = None):
@@ -1024,6 +1013,34 @@ class WingmanCore(WebSocketUser):
         ]
         return devices
 
+    # GET /fasterwhisper/stats
+    def get_fasterwhisper_stats(self):
+        return self.fasterwhisper.get_stats()
+
+    # GET /runtime/stats
+    def get_runtime_stats(self):
+        return self.runtime.get_stats()
+
+    # GET /pubsub/stats
+    def get_pubsub_stats(self):
+        return [
+            topic_stats
+            for pub_sub in (
+                self.audio_player.stream_event,
+                self.audio_player.playback_events,
+                self.config_service.config_events,
+                self.settings_service.settings_events,
+                self.secret_keeper.secret_events,
+            )
+            for topic_stats in pub_sub.get_stats()
+        ]
+
+    # GET /startup/timings
+    def get_startup_timings(self):
+        if not self.tower:
+            return StartupTimings(wingmen=[])
+        return self.tower.get_startup_timings()
+
     # POST /xvasynth/start
     def start_xvasynth(self):
         self.xvasynth.start_server()
@@ -1304,6 +1321,9 @@ class WingmanCore(WebSocketUser):
         if self.settings_service.settings.xvasynth.enable:
             await self.stop_xvasynth()
         await self.unload_tower()
+        self.runtime.shutdown()
+        # the ones of the workers' loops are closed by the runtime
+        await close_clients()
 
         self.printr.print(
             "Core shutdown.",
@@ -5,6 +5,8 @@ import random
 import traceback
 import uuid
 from typing import (
+    TYPE_CHECKING,
+    Callable,
     Mapping,
     Optional,
 )
@@ -20,6 +22,7 @@ from api.interface import (
     OpenRouterEndpointResult,
     SettingsConfig,
     SoundConfig,
+    WingmanConfig,
     WingmanInitializationError,
     CommandConfig,
 )
@@ -37,16 +40,26 @@ from api.enums import (
 from providers.edge import Edge
 from providers.elevenlabs import ElevenLabs
 from providers.google import GoogleGenAI
-from providers.open_ai import OpenAi, OpenAiAzure, OpenAiCompatibleTts
-from providers.hume import Hume
-from providers.open_ai import OpenAi, OpenAiAzure
+from providers.open_ai import (
+    ChatCompletionAccumulator,
+    OpenAi,
+    OpenAiAzure,
+    OpenAiCompatibleTts,
+)
 from providers.wingman_pro import WingmanPro
+from services.audio_input import AudioInput
+from services.audio_player import AudioPlayer
 from services.benchmark import Benchmark
 from services.markdown import cleanup_text
 from services.printr import Printr
+from services.response_stream import ResponseStreamer, SpeechCapture
+from services.versioned_cache import VersionedCache
 from skills.skill_base import Skill
 from wingmen.wingman import Wingman
 
+if TYPE_CHECKING:
+    from providers.hume import Hume
+
 printr = Printr()
 
 
@@ -78,7 +91,7 @@ class OpenAiWingman(Wingman):
         self.openai_azure: OpenAiAzure | None = None
         self.elevenlabs: ElevenLabs | None = None
         self.openai_compatible_tts: OpenAiCompatibleTts | None = None
-        self.hume: Hume | None = None
+        self.hume: "Hume | None" = None
         self.wingman_pro: WingmanPro | None = None
         self.google: GoogleGenAI | None = None
         self.perplexity: OpenAi | None = None
@@ -99,6 +112,11 @@ class OpenAiWingman(Wingman):
         self.tool_skills: dict[str, Skill] = {}
         self.skill_tools: list[dict] = []
 
+        self.context_cache: VersionedCache[list[str | Skill]] = VersionedCache(
+            "System prompt"
+        )
+        self.tools_cache: VersionedCache[list[dict]] = VersionedCache("Tools")
+
     async def validate(self):
         errors = await super().validate()
 
@@ -279,6 +297,12 @@ class OpenAiWingman(Wingman):
         await super().unload_skills()
         self.tool_skills = {}
         self.skill_tools = []
+        self.invalidate_caches()
+
+    async def init_skills(self) -> list[WingmanInitializationError]:
+        errors = await super().init_skills()
+        self.invalidate_caches()
+        return errors
 
     async def prepare_skill(self, skill: Skill):
         # prepare the skill and skill tools
@@ -286,6 +310,7 @@ class OpenAiWingman(Wingman):
             for tool_name, tool in skill.get_tools():
                 self.tool_skills[tool_name] = skill
                 self.skill_tools.append(tool)
+            self.invalidate_caches()
         except Exception as e:
             await printr.print_async(
                 f"Error while preparing skill '{skill.name}': {str(e)}",
@@ -420,6 +445,9 @@ class OpenAiWingman(Wingman):
     async def validate_and_set_hume(self, errors: list[WingmanInitializationError]):
         api_key = await self.retrieve_secret("hume", errors)
         if api_key:
+            # the Hume SDK is only needed for Hume, so not imported at startup
+            from providers.hume import Hume
+
             self.hume = Hume(
                 api_key=api_key,
                 wingman_name=self.name,
@@ -450,6 +478,26 @@ class OpenAiWingman(Wingman):
                 base_url=self.config.perplexity.endpoint,
             )
 
+    # overrides the base class method
+    async def update_config(
+        self, config: WingmanConfig, validate=False, update_skills=False
+    ) -> bool:
+        updated = await super().update_config(
+            config=config, validate=validate, update_skills=update_skills
+        )
+        # also if validation failed as the old config has been restored
+        self.invalidate_caches()
+        return updated
+
+    def invalidate_caches(self):
+        """Rebuilds the system prompt and tools on the next LLM call. Call this when the config or the skills have changed."""
+        self.context_cache.invalidate()
+        self.tools_cache.invalidate()
+
+    # overrides the base class method
+    def invalidate_context(self):
+        self.context_cache.invalidate()
+
     # overrides the base class method
     async def update_settings(self, settings: SettingsConfig):
         """Update the settings of the Wingman. This method should always be called when the user Settings have changed."""
@@ -534,11 +582,11 @@ class OpenAiWingman(Wingman):
             )
             printr.print(traceback.format_exc(), color=LogType.ERROR, server_only=True)
 
-    async def _transcribe(self, audio_input_wav: str) -> str | None:
+    async def _transcribe(self, audio_input: AudioInput) -> str | None:
         """Transcribes the recorded audio to text using the OpenAI Whisper API.
 
         Args:
-            audio_input_wav (str): The path to the audio file that contains the user's speech. This is a recording of what you you said.
+            audio_input (AudioInput): The user's speech. This is a recording of what you you said.
 
         Returns:
             str | None: The transcript of the audio file or None if the transcription failed.
@@ -547,20 +595,20 @@ class OpenAiWingman(Wingman):
 
         try:
             if self.config.features.stt_provider == SttProvider.AZURE:
-                transcript = self.openai_azure.transcribe_whisper(
-                    filename=audio_input_wav,
+                transcript = await self.openai_azure.transcribe_whisper(
+                    audio_input=audio_input,
                     api_key=self.azure_api_keys["whisper"],
                     config=self.config.azure.whisper,
                 )
             elif self.config.features.stt_provider == SttProvider.AZURE_SPEECH:
-                transcript = self.openai_azure.transcribe_azure_speech(
-                    filename=audio_input_wav,
+                transcript = await self.openai_azure.transcribe_azure_speech(
+                    audio_input=audio_input,
                     api_key=self.azure_api_keys["tts"],
                     config=self.config.azure.stt,
                 )
             elif self.config.features.stt_provider == SttProvider.WHISPERCPP:
-                transcript = self.whispercpp.transcribe(
-                    filename=audio_input_wav, config=self.config.whispercpp
+                transcript = await self.whispercpp.transcribe(
+                    audio_input=audio_input, config=self.config.whispercpp
                 )
             elif self.config.features.stt_provider == SttProvider.FASTER_WHISPER:
                 hotwords: list[str] = []
@@ -575,8 +623,8 @@ class OpenAiWingman(Wingman):
                 if wingman_hotwords and len(wingman_hotwords) > 0:
                     hotwords.extend(wingman_hotwords)
 
-                transcript = self.fasterwhisper.transcribe(
-                    filename=audio_input_wav,
+                transcript = await self.fasterwhisper.transcribe(
+                    audio_input=audio_input,
                     config=self.config.fasterwhisper,
                     hotwords=list(set(hotwords)),
                 )
@@ -585,18 +633,18 @@ class OpenAiWingman(Wingman):
                     self.config.wingman_pro.stt_provider
                     == WingmanProSttProvider.WHISPER
                 ):
-                    transcript = self.wingman_pro.transcribe_whisper(
-                        filename=audio_input_wav
+                    transcript = await self.wingman_pro.transcribe_whisper(
+                        audio_input=audio_input
                     )
                 elif (
                     self.config.wingman_pro.stt_provider
                     == WingmanProSttProvider.AZURE_SPEECH
                 ):
-                    transcript = self.wingman_pro.transcribe_azure_speech(
-                        filename=audio_input_wav, config=self.config.azure.stt
+                    transcript = await self.wingman_pro.transcribe_azure_speech(
+                        audio_input=audio_input, config=self.config.azure.stt
                     )
             elif self.config.features.stt_provider == SttProvider.OPENAI:
-                transcript = self.openai.transcribe(filename=audio_input_wav)
+                transcript = await self.openai.transcribe(audio_input=audio_input)
         except Exception as e:
             await printr.print_async(
                 f"Error during transcription using '{self.config.features.stt_provider}': {str(e)}",
@@ -631,6 +679,33 @@ class OpenAiWingman(Wingman):
         """
         await self.add_user_message(transcript)
 
+        response_streamer = (
+            ResponseStreamer(
+                synthesize=self.synthesize_sentence,
+                play=self.play_stream_to_user,
+                audio_player=self.audio_player,
+                threaded_execution=self.threaded_execution,
+                benchmark=benchmark,
+            )
+            if self.is_response_streaming_enabled()
+            else None
+        )
+        try:
+            return await self.__get_response_for_transcript(
+                transcript=transcript,
+                benchmark=benchmark,
+                response_streamer=response_streamer,
+            )
+        finally:
+            if response_streamer:
+                response_streamer.close()
+
+    async def __get_response_for_transcript(
+        self,
+        transcript: str,
+        benchmark: Benchmark,
+        response_streamer: ResponseStreamer | None,
+    ) -> tuple[str | None, str | None, Skill | None, bool]:
         benchmark.start_snapshot("Instant activation commands")
         instant_response, instant_command_executed = await self._try_instant_activation(
             transcript=transcript
@@ -649,7 +724,9 @@ class OpenAiWingman(Wingman):
         # if an instant command got executed, prevent tool calls to avoid duplicate executions
         benchmark.start_snapshot("LLM Processing")
 
-        completion = await self._llm_call(instant_command_executed is False)
+        completion = await self._llm_call(
+            instant_command_executed is False, response_streamer
+        )
 
         if completion is None:
             benchmark.finish_snapshot()
@@ -672,7 +749,13 @@ class OpenAiWingman(Wingman):
                     message = self._get_random_filler()
                     is_summarize_needed = True
                 if message:
-                    self.threaded_execution(self.play_to_user, message, interrupt)
+                    # streamed content is already being spoken
+                    if not (
+                        response_streamer
+                        and response_streamer.streamed_content
+                        and message == response_message.content
+                    ):
+                        self.threaded_execution(self.play_to_user, message, interrupt)
                     await printr.print_async(
                         f"{message}",
                         color=LogType.POSITIVE,
@@ -689,13 +772,15 @@ class OpenAiWingman(Wingman):
             benchmark.finish_snapshot()
 
             benchmark.start_snapshot("AI Commands & Skills")
-            instant_response, skill = await self._handle_tool_calls(tool_calls)
+            instant_response, skill = await self._handle_tool_calls(
+                tool_calls, benchmark
+            )
             if instant_response:
                 benchmark.finish_snapshot()
                 return None, instant_response, None, interrupt
 
             if is_summarize_needed:
-                completion = await self._llm_call(True)
+                completion = await self._llm_call(True, response_streamer)
                 if completion is None:
                     benchmark.finish_snapshot()
                     return None, None, None, True
@@ -713,8 +798,22 @@ class OpenAiWingman(Wingman):
                 return None, None, None, interrupt
 
         benchmark.finish_snapshot()
+
+        if response_streamer and response_streamer.streamed_content:
+            # the response has been spoken while it was generated, so only return it as text
+            if self.settings.streamer_mode:
+                self.tower.save_last_message(self.name, response_message.content)
+            return None, response_message.content, None, interrupt
+
         return response_message.content, response_message.content, None, interrupt
 
+    def is_response_streaming_enabled(self) -> bool:
+        """Wingman Pro returns complete responses only, all other conversation providers are OpenAI-compatible and can stream."""
+        return bool(self.config.features.stream_responses) and (
+            self.config.features.conversation_provider
+            != ConversationProvider.WINGMAN_PRO
+        )
+
     def _get_random_filler(self):
         # get last two used instant responses
         if len(self.last_used_instant_responses) > 2:
@@ -1060,16 +1159,32 @@ class OpenAiWingman(Wingman):
     async def get_context(self):
         """build the context and inserts it into the messages"""
         skill_prompts = ""
-        for skill in self.skills:
-            prompt = await skill.get_prompt()
-            if prompt:
-                skill_prompts += "\n\n" + skill.name + "\n\n" + prompt
+        for part in await self.context_cache.get_async(self.__build_context_parts):
+            if isinstance(part, Skill):
+                prompt = await part.get_prompt()
+                part = self.__format_skill_prompt(part, prompt) if prompt else ""
+            skill_prompts += part
 
         context = self.config.prompts.system_prompt.format(
             backstory=self.config.prompts.backstory, skills=skill_prompts
         )
         return context
 
+    async def __build_context_parts(self) -> list[str | Skill]:
+        """Collects the prompts of all skills with cacheable prompts. Skills with dynamic prompts are kept as placeholders and asked on every call."""
+        parts: list[str | Skill] = []
+        for skill in self.skills:
+            if not skill.cache_prompt:
+                parts.append(skill)
+                continue
+            prompt = await skill.get_prompt()
+            if prompt:
+                parts.append(self.__format_skill_prompt(skill, prompt))
+        return parts
+
+    def __format_skill_prompt(self, skill: Skill, prompt: str) -> str:
+        return "\n\n" + skill.name + "\n\n" + prompt
+
     async def add_context(self, messages):
         messages.insert(0, {"role": "system", "content": (await self.get_context())})
 
@@ -1094,63 +1209,73 @@ class OpenAiWingman(Wingman):
 
         return ""
 
-    async def actual_llm_call(self, messages, tools: list[dict] = None):
+    async def actual_llm_call(
+        self, messages, tools: list[dict] = None, stream: bool = False
+    ):
         """
         Perform the actual LLM call with the messages provided.
+
+        If stream is True, the chunk iterator of the provider is returned instead of a completion.
         """
 
         try:
             completion = None
             if self.config.features.conversation_provider == ConversationProvider.AZURE:
-                completion = self.openai_azure.ask(
+                completion = await self.openai_azure.ask(
                     messages=messages,
                     api_key=self.azure_api_keys["conversation"],
                     config=self.config.azure.conversation,
                     tools=tools,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider
                 == ConversationProvider.OPENAI
             ):
-                completion = self.openai.ask(
+                completion = await self.openai.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.openai.conversation_model,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider
                 == ConversationProvider.MISTRAL
             ):
-                completion = self.mistral.ask(
+                completion = await self.mistral.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.mistral.conversation_model.value,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider == ConversationProvider.GROQ
             ):
-                completion = self.groq.ask(
+                completion = await self.groq.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.groq.conversation_model,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider
                 == ConversationProvider.CEREBRAS
             ):
-                completion = self.cerebras.ask(
+                completion = await self.cerebras.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.cerebras.conversation_model,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider
                 == ConversationProvider.GOOGLE
             ):
-                completion = self.google.ask(
+                completion = await self.google.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.google.conversation_model,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider
@@ -1158,30 +1283,33 @@ class OpenAiWingman(Wingman):
             ):
                 # OpenRouter throws an error if the model doesn't support tools but we send some
                 if self.openrouter_model_supports_tools:
-                    completion = self.openrouter.ask(
+                    completion = await self.openrouter.ask(
                         messages=messages,
                         tools=tools,
                         model=self.config.openrouter.conversation_model,
+                        stream=stream,
                     )
                 else:
-                    completion = self.openrouter.ask(
+                    completion = await self.openrouter.ask(
                         messages=messages,
                         model=self.config.openrouter.conversation_model,
+                        stream=stream,
                     )
             elif (
                 self.config.features.conversation_provider
                 == ConversationProvider.LOCAL_LLM
             ):
-                completion = self.local_llm.ask(
+                completion = await self.local_llm.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.local_llm.conversation_model,
+                    stream=stream,
                 )
             elif (
                 self.config.features.conversation_provider
                 == ConversationProvider.WINGMAN_PRO
             ):
-                completion = self.wingman_pro.ask(
+                completion = await self.wingman_pro.ask(
                     messages=messages,
                     deployment=self.config.wingman_pro.conversation_deployment,
                     tools=tools,
@@ -1190,10 +1318,11 @@ class OpenAiWingman(Wingman):
                 self.config.features.conversation_provider
                 == ConversationProvider.PERPLEXITY
             ):
-                completion = self.perplexity.ask(
+                completion = await self.perplexity.ask(
                     messages=messages,
                     tools=tools,
                     model=self.config.perplexity.conversation_model.value,
+                    stream=stream,
                 )
         except Exception as e:
             await printr.print_async(
@@ -1204,9 +1333,17 @@ class OpenAiWingman(Wingman):
 
         return completion
 
-    async def _llm_call(self, allow_tool_calls: bool = True):
+    async def _llm_call(
+        self,
+        allow_tool_calls: bool = True,
+        response_streamer: ResponseStreamer | None = None,
+    ):
         """Makes the primary LLM call with the conversation history and tools enabled.
 
+        Args:
+            allow_tool_calls (bool): Whether the LLM may call tools.
+            response_streamer (ResponseStreamer): If set, the response is streamed and spoken sentence by sentence while it is generated.
+
         Returns:
             The LLM completion object or None if the call fails.
         """
@@ -1226,7 +1363,24 @@ class OpenAiWingman(Wingman):
 
         messages = self.messages.copy()
         await self.add_context(messages)
-        completion = await self.actual_llm_call(messages, tools)
+
+        if self.settings.debug_mode:
+            printr.print(
+                f"{self.context_cache.get_stats()}, {self.tools_cache.get_stats()}",
+                color=LogType.INFO,
+                server_only=True,
+            )
+
+        if response_streamer:
+            completion = await self.actual_streamed_llm_call(
+                messages,
+                tools,
+                response_streamer,
+                # stop speaking as soon as a newer call supersedes this one
+                is_cancelled=lambda: self.last_gpt_call != thiscall,
+            )
+        else:
+            completion = await self.actual_llm_call(messages, tools)
 
         # if request isnt most recent, ignore the response
         if self.last_gpt_call != thiscall:
@@ -1237,6 +1391,36 @@ class OpenAiWingman(Wingman):
 
         return completion
 
+    async def actual_streamed_llm_call(
+        self,
+        messages,
+        tools: list[dict],
+        response_streamer: ResponseStreamer,
+        is_cancelled: Callable[[], bool] = None,
+    ) -> ChatCompletion | None:
+        """Streams the LLM response into the response_streamer and assembles the chunks (including tool call deltas) into a regular completion.
+
+        Returns None if the call fails or is_cancelled returns True while it is streamed.
+        """
+        stream = await self.actual_llm_call(messages, tools, stream=True)
+        if stream is None:
+            return None
+
+        accumulator = ChatCompletionAccumulator()
+        try:
+            if not await response_streamer.consume(
+                stream, accumulator.add_chunk, is_cancelled
+            ):
+                return None
+        except Exception as e:
+            await printr.print_async(
+                f"Error during streamed LLM call: {str(e)}", color=LogType.ERROR
+            )
+            printr.print(traceback.format_exc(), color=LogType.ERROR, server_only=True)
+            return None
+
+        return accumulator.to_completion()
+
     async def _process_completion(self, completion: ChatCompletion):
         """Processes the completion returned by the LLM call.
 
@@ -1261,11 +1445,16 @@ class OpenAiWingman(Wingman):
 
         return response_message, response_message.tool_calls
 
-    async def _handle_tool_calls(self, tool_calls):
+    async def _handle_tool_calls(self, tool_calls, benchmark: Benchmark = None):
         """Processes all the tool calls identified in the response message.
 
+        Independent tool calls run concurrently: commands are executed one after another in the given order,
+        tool calls of the same skill share its max_concurrent_tool_calls limit and different skills run in parallel.
+        The responses are written to the conversation history in the order of the tool calls.
+
         Args:
             tool_calls: The list of tool calls to process.
+            benchmark (Benchmark): If set, the wall time of every tool call is added as a snapshot.
 
         Returns:
             str: The immediate response from processed tool calls or None if there are no immediate responses.
@@ -1275,23 +1464,15 @@ class OpenAiWingman(Wingman):
 
         skill = None
 
-        for tool_call in tool_calls:
+        lanes: dict[str, asyncio.Semaphore] = {}
+        tasks = [
+            asyncio.create_task(self.__execute_tool_call(tool_call, lanes, benchmark))
+            for tool_call in tool_calls
+        ]
+
+        for tool_call, task in zip(tool_calls, tasks):
             try:
-                function_name = tool_call.function.name
-                function_args = (
-                    tool_call.function.arguments
-                    # Mistral returns a dict
-                    if isinstance(tool_call.function.arguments, dict)
-                    # OpenAI returns a string
-                    else json.loads(tool_call.function.arguments)
-                )
-                (
-                    function_response,
-                    instant_response,
-                    skill,
-                ) = await self.execute_command_by_function_call(
-                    function_name, function_args
-                )
+                function_response, instant_response, skill = await task
 
                 if tool_call.id:
                     # updating the dummy tool response with the actual response
@@ -1309,6 +1490,48 @@ class OpenAiWingman(Wingman):
                 )
         return instant_response, skill
 
+    async def __execute_tool_call(
+        self,
+        tool_call,
+        lanes: dict[str, asyncio.Semaphore],
+        benchmark: Benchmark = None,
+    ) -> tuple[str, str | None, Skill | None]:
+        """Executes a single tool call once its lane (the skill or command execution) has capacity."""
+        function_name = tool_call.function.name
+        function_args = (
+            tool_call.function.arguments
+            # Mistral returns a dict
+            if isinstance(tool_call.function.arguments, dict)
+            # OpenAI returns a string
+            else json.loads(tool_call.function.arguments)
+        )
+
+        skill = self.tool_skills.get(function_name)
+        lane = skill.name if skill else function_name
+        if lane not in lanes:
+            lanes[lane] = asyncio.Semaphore(
+                max(skill.config.max_concurrent_tool_calls or 1, 1) if skill else 1
+            )
+        timeout = skill.config.tool_call_timeout if skill else None
+
+        async with lanes[lane]:
+            start_time = time.perf_counter()
+            try:
+                return await asyncio.wait_for(
+                    self.execute_command_by_function_call(function_name, function_args),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                await printr.print_async(
+                    f"Tool call '{function_name}' timed out after {timeout}s.",
+                    color=LogType.WARNING,
+                )
+                # hints to AI that there was an error
+                return f"ERROR: TIMED OUT AFTER {timeout}s", None, None
+            finally:
+                if benchmark:
+                    benchmark.add_snapshot(f"Tool '{function_name}'", start_time)
+
     async def execute_command_by_function_call(
         self, function_name: str, function_args: dict[str, any]
     ) -> tuple[str, str | None, Skill | None] | None:
@@ -1398,17 +1621,68 @@ class OpenAiWingman(Wingman):
         else:
             sound_config = self.config.sound
 
-        # remove Markdown, links, emotes and code blocks
-        text, contains_links, contains_code_blocks = cleanup_text(text)
-
         # wait for audio player to finish playing
-        if no_interrupt and self.audio_player.is_playing:
-            while self.audio_player.is_playing:
-                await asyncio.sleep(0.1)
+        if no_interrupt:
+            await self.audio_player.wait_until_idle()
+
+        text = await self.__prepare_speech(text, sound_config)
+        if text is None:
+            return
+
+        await self.synthesize(text, sound_config, self.audio_player)
+
+    async def synthesize_sentence(
+        self, text: str, is_first: bool
+    ) -> SpeechCapture | None:
+        """Synthesizes a sentence of a streamed response without playing it (see ResponseStreamer).
+
+        The skill hooks only run for the first sentence, so they are called once per response like for play_to_user.
+
+        Returns:
+            SpeechCapture | None: The synthesized audio or None if the sentence should not be spoken. None for the first sentence skips the whole response.
+        """
+        text = await self.__prepare_speech(
+            text, self.config.sound, call_skill_hooks=is_first
+        )
+        if text is None:
+            return None
+
+        capture = SpeechCapture(self.audio_player)
+        await self.synthesize(text, self.config.sound, capture)
+        return capture
+
+    async def play_stream_to_user(
+        self,
+        buffer_callback,
+        sample_rate: int,
+        channels: int,
+        use_gain_boost: bool,
+        no_interrupt: bool = False,
+    ):
+        """Plays the sentences of a streamed response as one playback, with effects and beeps applied once."""
+        if no_interrupt:
+            await self.audio_player.wait_until_idle()
+
+        await self.audio_player.stream_with_effects(
+            buffer_callback=buffer_callback,
+            config=self.config.sound,
+            wingman_name=self.name,
+            sample_rate=sample_rate,
+            channels=channels,
+            dtype="float32",
+            use_gain_boost=use_gain_boost,
+        )
+
+    async def __prepare_speech(
+        self, text: str, sound_config: SoundConfig, call_skill_hooks: bool = True
+    ) -> str | None:
+        """Cleans up the text for TTS and lets the skills change it. Returns None if nothing should be spoken."""
+        # remove Markdown, links, emotes and code blocks
+        text, _contains_links, _contains_code_blocks = cleanup_text(text)
 
         # call skill hooks
         changed_text = text
-        for skill in self.skills:
+        for skill in self.skills if call_skill_hooks else []:
             changed_text = await skill.on_play_to_user(text, sound_config)
             if changed_text != text:
                 printr.print(
@@ -1423,7 +1697,7 @@ class OpenAiWingman(Wingman):
                 LogType.WARNING,
                 server_only=True,
             )
-            return
+            return None
 
         if "{SKIP-TTS}" in text:
             printr.print(
@@ -1431,15 +1705,30 @@ class OpenAiWingman(Wingman):
                 LogType.WARNING,
                 server_only=True,
             )
-            return
+            return None
+
+        return text
 
+    async def synthesize(
+        self,
+        text: str,
+        sound_config: SoundConfig,
+        audio_player: AudioPlayer | SpeechCapture,
+    ):
+        """Synthesizes the text with the configured TTS Provider and passes the audio to the given player.
+
+        Args:
+            text (str): The text to synthesize.
+            sound_config (SoundConfig): The effects to apply.
+            audio_player (AudioPlayer | SpeechCapture): Plays the audio or keeps it to play it later.
+        """
         try:
             if self.config.features.tts_provider == TtsProvider.EDGE_TTS:
                 await self.edge_tts.play_audio(
                     text=text,
                     config=self.config.edge_tts,
                     sound_config=sound_config,
-                    audio_player=self.audio_player,
+                    audio_player=audio_player,
                     wingman_name=self.name,
                 )
             elif self.config.features.tts_provider == TtsProvider.ELEVENLABS:
@@ -1447,9 +1736,11 @@ class OpenAiWingman(Wingman):
                     text=text,
                     config=self.config.elevenlabs,
                     sound_config=sound_config,
-                    audio_player=self.audio_player,
+                    audio_player=audio_player,
                     wingman_name=self.name,
-                    stream=self.config.elevenlabs.output_streaming,
+                    # elevenlabslib plays streams itself
+                    stream=self.config.elevenlabs.output_streaming
+                    and not isinstance(audio_player, SpeechCapture),
                 )
             elif self.config.features.tts_provider == TtsProvider.HUME:
                 try:
@@ -1457,7 +1748,7 @@ class OpenAiWingman(Wingman):
                         text=text,
                         config=self.config.hume,
                         sound_config=sound_config,
-                        audio_player=self.audio_player,
+                        audio_player=audio_player,
                         wingman_name=self.name,
                     )
                 except RuntimeError as e:
@@ -1468,7 +1759,7 @@ class OpenAiWingman(Wingman):
                             text=text,
                             config=self.config.hume,
                             sound_config=sound_config,
-                            audio_player=self.audio_player,
+                            audio_player=audio_player,
                             wingman_name=self.name,
                         )
             elif self.config.features.tts_provider == TtsProvider.AZURE:
@@ -1477,7 +1768,7 @@ class OpenAiWingman(Wingman):
                     api_key=self.azure_api_keys["tts"],
                     config=self.config.azure.tts,
                     sound_config=sound_config,
-                    audio_player=self.audio_player,
+                    audio_player=audio_player,
                     wingman_name=self.name,
                 )
             elif self.config.features.tts_provider == TtsProvider.XVASYNTH:
@@ -1485,7 +1776,7 @@ class OpenAiWingman(Wingman):
                     text=text,
                     config=self.config.xvasynth,
                     sound_config=sound_config,
-                    audio_player=self.audio_player,
+                    audio_player=audio_player,
                     wingman_name=self.name,
                 )
             elif self.config.features.tts_provider == TtsProvider.OPENAI:
@@ -1495,7 +1786,7 @@ class OpenAiWingman(Wingman):
                     model=self.config.openai.tts_model,
                     speed=self.config.openai.tts_speed,
                     sound_config=sound_config,
-                    audio_player=self.audio_player,
+                    audio_player=audio_player,
                     wingman_name=self.name,
                 )
             elif self.config.features.tts_provider == TtsProvider.OPENAI_COMPATIBLE:
@@ -1509,7 +1800,7 @@ class OpenAiWingman(Wingman):
                         else NOT_GIVEN
                     ),
                     sound_config=sound_config,
-                    audio_player=self.audio_player,
+                    audio_player=audio_player,
                     wingman_name=self.name,
                 )
             elif self.config.features.tts_provider == TtsProvider.WINGMAN_PRO:
@@ -1520,7 +1811,7 @@ class OpenAiWingman(Wingman):
                         model=self.config.openai.tts_model,
                         speed=self.config.openai.tts_speed,
                         sound_config=sound_config,
-                        audio_player=self.audio_player,
+                        audio_player=audio_player,
                         wingman_name=self.name,
                     )
                 elif (
@@ -1530,7 +1821,7 @@ class OpenAiWingman(Wingman):
                         text=text,
                         config=self.config.azure.tts,
                         sound_config=sound_config,
-                        audio_player=self.audio_player,
+                        audio_player=audio_player,
                         wingman_name=self.name,
                     )
             else:
@@ -1553,10 +1844,14 @@ class OpenAiWingman(Wingman):
     def build_tools(self) -> list[dict]:
         """
         Builds a tool for each command that is not instant_activation.
+        The result is cached until the config or the skills change.
 
         Returns:
             list[dict]: A list of tool descriptors in OpenAI format.
         """
+        return list(self.tools_cache.get(self.__build_tools))
+
+    def __build_tools(self) -> list[dict]:
         commands = [
             command.name
             for command in self.config.commands
@@ -2,9 +2,9 @@ import traceback
 from copy import deepcopy
 import random
 import time
-import difflib
 import asyncio
-import threading
+from concurrent.futures import Future
+from functools import partial
 from typing import (
     Any,
     Dict,
@@ -16,6 +16,8 @@ import mouse.mouse as mouse
 from api.interface import (
     CommandConfig,
     SettingsConfig,
+    SkillConfig,
+    SkillStartupTiming,
     SoundConfig,
     WingmanConfig,
     WingmanInitializationError,
@@ -24,17 +26,21 @@ from api.enums import (
     CommandTag,
     LogSource,
     LogType,
+    StartupState,
     WingmanInitializationErrorType,
 )
 from providers.faster_whisper import FasterWhisper
 from providers.whispercpp import Whispercpp
 from providers.xvasynth import XVASynth
+from services.audio_input import AudioInput
 from services.audio_player import AudioPlayer
 from services.benchmark import Benchmark
+from services.command_matcher import CommandMatcher
 from services.module_manager import ModuleManager
 from services.secret_keeper import SecretKeeper
-from services.printr import Printr
+from services.printr import Printr, wingman_context
 from services.audio_library import AudioLibrary
+from services.runtime import Runtime
 from skills.skill_base import Skill
 
 if TYPE_CHECKING:
@@ -42,6 +48,11 @@ if TYPE_CHECKING:
 
 printr = Printr()
 
+SKILL_STARTUP_CONCURRENCY = 4
+"""How many skills of a Wingman are loaded, validated and prepared at the same time."""
+SKILL_READY_TIMEOUT = 3.0
+"""Seconds a skill may take to start (including the wait for a startup slot) before the Wingman gets ready without it. The skill keeps "warming" in the background."""
+
 
 class Wingman:
     """The "highest" Wingman base class in the chain. It does some very basic things but is meant to be 'virtual', and so are most its methods, so you'll probably never instantiate it directly.
@@ -89,6 +100,9 @@ class Wingman:
         self.audio_library = audio_library
         """A service that allows you to play and manage audio files from the audio library."""
 
+        self.runtime = Runtime()
+        """The shared runtime. Use threaded_execution to run work in the background instead of starting your own threads."""
+
         self.execution_start: None | float = None
         """Used for benchmarking executon times. The timer is (re-)started whenever the process function starts."""
 
@@ -106,6 +120,15 @@ class Wingman:
 
         self.skills: list[Skill] = []
 
+        self.skill_timings: list[SkillStartupTiming] = []
+        """How long each skill took to start (or that it's still warming), in the order of the config."""
+
+        self.skill_startup_tasks: set[asyncio.Task] = set()
+        """Skills that are still starting. They are added to self.skills once they are ready."""
+
+        self.command_matcher: CommandMatcher | None = None
+        """The index of the commands and their instant_activation phrases. Rebuilt when the config changes."""
+
     def get_record_key(self) -> str | int:
         """Returns the activation or "push-to-talk" key for this Wingman."""
         return self.config.record_key_codes or self.config.record_key
@@ -194,6 +217,12 @@ class Wingman:
 
     async def unload_skills(self):
         """Call this to trigger unload for all skills."""
+        # warming skills won't be added anymore
+        for task in self.skill_startup_tasks:
+            task.cancel()
+        if self.skill_startup_tasks:
+            await asyncio.gather(*self.skill_startup_tasks, return_exceptions=True)
+
         for skill in self.skills:
             try:
                 await skill.unload()
@@ -209,65 +238,159 @@ class Wingman:
     async def init_skills(self) -> list[WingmanInitializationError]:
         """This method is called when the Wingman is instantiated by Tower or when a skill's config changes.
         It is run AFTER validate() so you can access validated params safely here.
-        It is used to load and init the skills of the Wingman."""
-        if self.skills:
+        It is used to load and init the skills of the Wingman.
+
+        Skills start concurrently. Skills that aren't ready after SKILL_READY_TIMEOUT seconds don't hold up the Wingman and are added once they are ready.
+        Skills that wait for the user to enter a missing secret are waited for, so their validation errors are returned."""
+        if self.skills or self.skill_startup_tasks:
             await self.unload_skills()
 
         errors = []
         self.skills = []
+        self.skill_timings = []
         if not self.config.skills:
             return errors
 
+        semaphore = asyncio.Semaphore(SKILL_STARTUP_CONCURRENCY)
+        startups = []
         for skill_config in self.config.skills:
-            try:
-                skill = ModuleManager.load_skill(
-                    config=skill_config,
-                    settings=self.settings,
-                    wingman=self,
-                )
-                if skill:
-                    # init skill methods
-                    skill.threaded_execution = self.threaded_execution
+            timing = SkillStartupTiming(
+                skill_name=skill_config.name, state=StartupState.WARMING
+            )
+            self.skill_timings.append(timing)
+            startups.append(self.__start_skill(skill_config, timing, semaphore))
 
-                    validation_errors = await skill.validate()
+        for validation_errors in await asyncio.gather(*startups):
+            errors.extend(validation_errors)
 
-                    # Give the user 2*5 seconds to enter the secret if one is required and missing
-                    if any(
-                        error.error_type == "missing_secret"
-                        for error in validation_errors
-                    ):
-                        for _attempt in range(2):
-                            await asyncio.sleep(5)
-                            validation_errors = await skill.validate()
-                            if not validation_errors:
-                                break
-
-                    errors.extend(validation_errors)
-
-                    if len(validation_errors) == 0:
-                        self.skills.append(skill)
-                        await self.prepare_skill(skill)
-                        await skill.prepare()
-                        printr.print(
-                            f"Skill '{skill_config.name}' loaded successfully.",
-                            color=LogType.POSITIVE,
-                            server_only=True,
-                        )
-                    else:
-                        await printr.print_async(
-                            f"Skill '{skill_config.name}' could not be loaded: {' '.join(error.message for error in validation_errors)}",
-                            color=LogType.ERROR,
-                        )
-            except Exception as e:
-                await printr.print_async(
-                    f"Error loading skill '{skill_config.name}': {str(e)}",
-                    color=LogType.ERROR,
+        return errors
+
+    async def __start_skill(
+        self,
+        skill_config: SkillConfig,
+        timing: SkillStartupTiming,
+        semaphore: asyncio.Semaphore,
+    ) -> list[WingmanInitializationError]:
+        waiting_for_secret = asyncio.Event()
+
+        async def load_skill():
+            # the skill keeps its slot until it is loaded, even if the Wingman stops waiting for it
+            async with semaphore:
+                return await self.__load_skill(
+                    skill_config, timing, waiting_for_secret
                 )
-                printr.print(
-                    traceback.format_exc(), color=LogType.ERROR, server_only=True
+
+        task = asyncio.create_task(load_skill())
+        self.skill_startup_tasks.add(task)
+        task.add_done_callback(self.skill_startup_tasks.discard)
+        done, _pending = await asyncio.wait({task}, timeout=SKILL_READY_TIMEOUT)
+
+        if not done and waiting_for_secret.is_set():
+            # the client asks the user for the secret and needs the missing_secret errors if it's still missing
+            done, _pending = await asyncio.wait({task})
+
+        if done:
+            return task.result()
+
+        printr.print(
+            f"Skill '{skill_config.name}' is still starting. Wingman '{self.name}' is ready without it for now.",
+            color=LogType.WARNING,
+            server_only=True,
+        )
+        return []
+
+    async def __load_skill(
+        self,
+        skill_config: SkillConfig,
+        timing: SkillStartupTiming,
+        waiting_for_secret: asyncio.Event,
+    ) -> list[WingmanInitializationError]:
+        benchmark = Benchmark(label=skill_config.name)
+        skill = None
+        validation_errors = []
+        try:
+            benchmark.start_snapshot("Loading")
+            skill = ModuleManager.load_skill(
+                config=skill_config,
+                settings=self.settings,
+                wingman=self,
+            )
+            if skill:
+                # init skill methods
+                skill.threaded_execution = partial(
+                    self.threaded_execution, executor="skills"
                 )
 
-        return errors
+                benchmark.finish_snapshot()
+                benchmark.start_snapshot("Validation")
+                validation_errors = await skill.validate()
+
+                # Give the user 2*5 seconds to enter the secret if one is required and missing
+                if any(
+                    error.error_type == "missing_secret"
+                    for error in validation_errors
+                ):
+                    waiting_for_secret.set()
+                    for _attempt in range(2):
+                        await asyncio.sleep(5)
+                        validation_errors = await skill.validate()
+                        if not validation_errors:
+                            break
+
+                if len(validation_errors) == 0:
+                    benchmark.finish_snapshot()
+                    benchmark.start_snapshot("Preparation")
+                    self.__add_skill(skill)
+                    await self.prepare_skill(skill)
+                    await skill.prepare()
+                    timing.state = StartupState.READY
+                    printr.print(
+                        f"Skill '{skill_config.name}' loaded successfully.",
+                        color=LogType.POSITIVE,
+                        server_only=True,
+                    )
+                else:
+                    timing.state = StartupState.FAILED
+                    await printr.print_async(
+                        f"Skill '{skill_config.name}' could not be loaded: {' '.join(error.message for error in validation_errors)}",
+                        color=LogType.ERROR,
+                    )
+            else:
+                timing.state = StartupState.FAILED
+        except asyncio.CancelledError:
+            # unload_skills only unloads the skills that were added
+            if skill and skill not in self.skills:
+                await skill.unload()
+            raise
+        except Exception as e:
+            timing.state = StartupState.FAILED
+            await printr.print_async(
+                f"Error loading skill '{skill_config.name}': {str(e)}",
+                color=LogType.ERROR,
+            )
+            printr.print(traceback.format_exc(), color=LogType.ERROR, server_only=True)
+
+        if benchmark.snapshot_label:
+            benchmark.finish_snapshot()
+        timing.benchmark = benchmark.finish()
+        return validation_errors
+
+    def __add_skill(self, skill: Skill):
+        """Adds the skill in the order of the config, no matter when it finished loading."""
+        positions = {
+            id(skill_config): position
+            for position, skill_config in enumerate(self.config.skills or [])
+        }
+        position = positions.get(id(skill.config), len(positions))
+        index = next(
+            (
+                index
+                for index, other in enumerate(self.skills)
+                if positions.get(id(other.config), len(positions)) > position
+            ),
+            len(self.skills),
+        )
+        self.skills.insert(index, skill)
 
     async def prepare_skill(self, skill: Skill):
         """This method is called only once when the Skill is instantiated.
@@ -275,6 +398,10 @@ class Wingman:
 
         You can override it if you need to react on data of this skill."""
 
+    def invalidate_context(self):
+        """Called when the system prompt changed, e.g. because a skill returns another prompt now.
+        Override it if your Wingman caches its system prompt."""
+
     def reset_conversation_history(self):
         """This function is called when the user triggers the ResetConversationHistory command.
         It's a global command that should be implemented by every Wingman that keeps a message history.
@@ -282,7 +409,9 @@ class Wingman:
 
     # ──────────────────────────── The main processing loop ──────────────────────────── #
 
-    async def process(self, audio_input_wav: str = None, transcript: str = None):
+    async def process(
+        self, audio_input: AudioInput | str = None, transcript: str = None
+    ):
         """The main method that gets called when the wingman is activated. This method controls what your wingman actually does and you can override it if you want to.
 
         The base implementation here triggers the transcription and processing of the given audio input.
@@ -291,7 +420,7 @@ class Wingman:
         Async so you can do async processing, e.g. send a request to an API.
 
         Args:
-            audio_input_wav (str): The path to the audio file that contains the user's speech. This is a recording of what you you said.
+            audio_input (AudioInput | str): The user's speech, in memory or as path to an audio file. This is a recording of what you you said.
 
         Hooks:
             - async _transcribe: transcribe the audio to text
@@ -299,6 +428,8 @@ class Wingman:
             - async play_to_user: do something with the response, e.g. play it as audio
         """
 
+        # everything logged while processing (including tasks and runtime jobs started from here) belongs to this wingman
+        context_token = wingman_context.set(self.name)
         try:
             process_result = None
 
@@ -306,7 +437,9 @@ class Wingman:
             if not transcript:
                 # transcribe the audio.
                 benchmark_transcribe = Benchmark(label="Voice transcription")
-                transcript = await self._transcribe(audio_input_wav)
+                if isinstance(audio_input, str):
+                    audio_input = AudioInput.from_file(audio_input)
+                transcript = await self._transcribe(audio_input)
 
             interrupt = None
             if transcript:
@@ -354,14 +487,16 @@ class Wingman:
                 color=LogType.ERROR,
             )
             printr.print(traceback.format_exc(), color=LogType.ERROR, server_only=True)
+        finally:
+            wingman_context.reset(context_token)
 
     # ───────────────── virtual methods / hooks ───────────────── #
 
-    async def _transcribe(self, audio_input_wav: str) -> str | None:
+    async def _transcribe(self, audio_input: AudioInput) -> str | None:
         """Transcribes the audio to text. You can override this method if you want to use a different transcription service.
 
         Args:
-            audio_input_wav (str): The path to the audio file that contains the user's speech. This is a recording of what you you said.
+            audio_input (AudioInput): The user's speech. This is a recording of what you you said.
 
         Returns:
             str | None: The transcript of the audio file and the detected language as locale (if determined).
@@ -409,14 +544,15 @@ class Wingman:
         Returns:
             {}: The command object from the config
         """
-        if self.config.commands is None:
-            return None
+        return self.get_command_matcher().get_command(command_name)
 
-        command = next(
-            (item for item in self.config.commands if item.name == command_name),
-            None,
-        )
-        return command
+    def get_command_matcher(self) -> CommandMatcher:
+        """Returns the index of the commands, built again if the config changed since."""
+        if self.command_matcher is None or not self.command_matcher.is_current(
+            self.config.commands
+        ):
+            self.command_matcher = CommandMatcher(self.config.commands)
+        return self.command_matcher
 
     def _select_command_response(self, command: CommandConfig) -> str | None:
         """Returns one of the configured responses of the command. This base implementation returns a random one.
@@ -446,32 +582,14 @@ class Wingman:
         """
 
         try:
-            # create list with phrases pointing to commands
-            commands_by_instant_activation = {}
-            for command in self.config.commands:
-                if command.instant_activation:
-                    for phrase in command.instant_activation:
-                        if phrase.lower() in commands_by_instant_activation:
-                            commands_by_instant_activation[phrase.lower()].append(
-                                command
-                            )
-                        else:
-                            commands_by_instant_activation[phrase.lower()] = [command]
-
-            # find best matching phrase
-            phrase = difflib.get_close_matches(
-                transcript.lower(),
-                commands_by_instant_activation.keys(),
-                n=1,
-                cutoff=0.8,
-            )
+            # find the commands of the best matching phrase
+            commands = self.get_command_matcher().match(transcript)
 
             # if no phrase found, return None
-            if not phrase:
+            if not commands:
                 return None
 
             # execute all commands for the phrase
-            commands = commands_by_instant_activation[phrase[0]]
             for command in commands:
                 await self._execute_command(command, True)
 
@@ -618,23 +736,12 @@ class Wingman:
             )
             printr.print(traceback.format_exc(), color=LogType.ERROR, server_only=True)
 
-    def threaded_execution(self, function, *args) -> threading.Thread | None:
-        """Execute a function in a separate thread."""
+    def threaded_execution(
+        self, function, *args, executor: str = "wingmen"
+    ) -> Future | None:
+        """Execute a function (or coroutine function) on a worker of the shared runtime."""
         try:
-
-            def start_thread(function, *args):
-                if asyncio.iscoroutinefunction(function):
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    new_loop.run_until_complete(function(*args))
-                    new_loop.close()
-                else:
-                    function(*args)
-
-            thread = threading.Thread(target=start_thread, args=(function, *args))
-            thread.name = function.__name__
-            thread.start()
-            return thread
+            return self.runtime.submit(function, *args, executor=executor)
         except Exception as e:
             printr.print(
                 f"Error starting threaded execution: {str(e)}", color=LogType.ERROR
@@ -677,6 +784,8 @@ class Wingman:
 
     async def save_config(self):
         """Save the config of the Wingman."""
+        # skills like quick_commands add instant_activation phrases to the commands in place
+        self.command_matcher = None
         self.tower.save_wingman(self.name)
 
     async def update_settings(self, settings: SettingsConfig):